@@ -0,0 +1,111 @@
+"""
+Downsampling a long series to the points of a chart.
+
+    python benchmarks/downsampling.py                               # 10^6 and 10^7 points
+    python benchmarks/downsampling.py --points 100000000 --target 1000
+
+For every size, a random walk is downsampled to --target points. The list of tuples is first downsampled by
+`python_extremes`, the per-point Python implementation `downsample_points` had before it selected the points
+on arrays, then by every method of `downsample_indices` on the numpy columns, and by `downsample_df_polars`
+on a polars frame. The vectorized extremes method must keep the same points as the Python one.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import polars as pl
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from taskvine_report.src.downsampling import DOWNSAMPLING_METHODS, downsample_indices
+from taskvine_report.utils import downsample_df_polars
+
+
+def python_extremes(points, target_point_count):
+    # the indices the previous downsample_points kept, point by point
+    non_null_points = [(i, p) for i, p in enumerate(points) if p[1] is not None]
+    start_x = points[0][0]
+    start_candidates = [(i, p) for i, p in enumerate(points) if p[0] == start_x and p[1] is not None]
+    start_idx = min(start_candidates, key=lambda x: x[1][1])[0] if start_candidates else 0
+    end_x = points[-1][0]
+    end_candidates = [(i, p) for i, p in enumerate(points) if p[0] == end_x and p[1] is not None]
+    end_idx = min(end_candidates, key=lambda x: x[1][1])[0] if end_candidates else len(points) - 1
+    y_max_idx = max(non_null_points, key=lambda x: x[1][1])[0]
+    keep_indices = {start_idx, end_idx, y_max_idx}
+
+    remaining = target_point_count - len(keep_indices)
+    sorted_indices = sorted(keep_indices)
+    points_per_gap = remaining // (len(sorted_indices) - 1)
+    extra = remaining % (len(sorted_indices) - 1)
+    for i in range(len(sorted_indices) - 1):
+        start, end = sorted_indices[i], sorted_indices[i + 1]
+        if end - start - 1 <= 0:
+            continue
+        n = points_per_gap + (1 if extra > 0 else 0)
+        if extra > 0:
+            extra -= 1
+        available = list(range(start + 1, end))
+        if len(available) <= n:
+            sampled = available
+        else:
+            step = len(available) / n
+            sampled = [available[int(i * step)] for i in range(n)]
+        keep_indices.update(sampled)
+
+    if len(keep_indices) < target_point_count:
+        needed = target_point_count - len(keep_indices)
+        available = [i for i in range(len(points)) if i not in keep_indices]
+        step = len(available) / needed
+        keep_indices.update(available[int(i * step)] for i in range(needed))
+    return sorted(keep_indices)
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def run(points_count, target, skip_python):
+    rng = np.random.default_rng(0)
+    x = np.arange(points_count, dtype=np.float64) / 100
+    y = np.cumsum(rng.normal(size=points_count))
+    df = pl.DataFrame({'time': x, 'value': y})
+
+    print(f"{points_count} points to {target}")
+    python_seconds = None
+    if not skip_python:
+        points = list(zip(x.tolist(), y.tolist()))
+        python_keep, python_seconds = timed(lambda: python_extremes(points, target))
+        del points
+        print(f"  {'python extremes':<18} {python_seconds:8.3f} s")
+
+    for method in DOWNSAMPLING_METHODS:
+        keep, seconds = timed(lambda: downsample_indices(x, y, target, method))
+        speedup = f"{python_seconds / seconds:8.1f}x" if python_seconds else ''
+        print(f"  {method:<18} {seconds:8.3f} s {len(keep):8d} points {speedup}")
+        if method == 'extremes' and python_seconds and keep.tolist() != python_keep:
+            raise RuntimeError("the vectorized extremes method kept other points than the Python one")
+
+    _, seconds = timed(lambda: downsample_df_polars(df, target, y_col='value'))
+    speedup = f"{python_seconds / seconds:8.1f}x" if python_seconds else ''
+    print(f"  {'polars frame':<18} {seconds:8.3f} s {'':15} {speedup}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the downsampling methods on long series")
+    parser.add_argument('--points', type=int, nargs='+', default=[1000000, 10000000], help='series lengths to run')
+    parser.add_argument('--target', type=int, default=10000, help='points to downsample to (default: 10000)')
+    parser.add_argument('--skip-python', action='store_true',
+                        help='do not run the Python implementation, it takes a few GB of memory at 10^7 points')
+    args = parser.parse_args()
+
+    for points_count in args.points:
+        run(points_count, args.target, args.skip_python)
+
+
+if __name__ == '__main__':
+    main()
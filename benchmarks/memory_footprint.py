@@ -0,0 +1,194 @@
+"""
+Memory footprint of the parsed state, in bytes per record.
+
+    python benchmarks/memory_footprint.py                       # synthetic records, no logs needed
+    python benchmarks/memory_footprint.py --template LOGS_DIR   # the state parsed from a runtime template
+
+Memory is measured with tracemalloc, so it counts everything a record owns: the object, its collections,
+and the floats and strings that are not shared with other records.
+
+Every result is compared to a baseline, by default memory_footprint_baseline.json: the same synthetic records
+measured with the dict-based layout they had before they were slotted, 10^4 of each (a file kept all its
+transfer events in one object, which makes building more of them quadratic). --save-baseline writes the
+results of a run in the same format, to compare a later run or a template to.
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from taskvine_report.src.task_info import TaskInfo
+from taskvine_report.src.file_info import FileInfo
+from taskvine_report.src.transfer_table import TransferTable
+from taskvine_report.src.worker_info import WorkerInfo
+
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'memory_footprint_baseline.json')
+
+
+def measure(build, count, *args):
+    gc.collect()
+    tracemalloc.start()
+    records = build(count, *args)
+    traced, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return traced / count, records
+
+
+def build_tasks(count, file_ids):
+    # a task try as the parser leaves it: two inputs, one output, one core, all timestamps set
+    worker = WorkerInfo('10.0.0.1', 9000, 1)
+    worker.id = 1
+    worker.set_cores(16)
+    tasks = {}
+    for i in range(count):
+        task = TaskInfo(i, 1)
+        task.add_input_file(file_ids[2 * i])
+        task.add_input_file(file_ids[-1])
+        task.add_output_file(file_ids[2 * i + 1])
+        worker.run_task(task)
+        worker.reap_task(task)
+        task.set_when_ready(1e9 + i)
+        task.set_when_running(1e9 + i + 0.5)
+        task.set_time_worker_start(1e9 + i + 0.6)
+        task.set_time_worker_end(1e9 + i + 1.6)
+        task.set_when_waiting_retrieval(1e9 + i + 1.7)
+        task.set_when_retrieved(1e9 + i + 1.8)
+        task.set_when_done(1e9 + i + 1.9)
+        task.set_task_status(1e9 + i + 1.9, 0)
+        task.set_worker_id(worker.id)
+        tasks[task.task_entry] = task
+    return tasks
+
+
+def build_files(count, tasks):
+    # a temporary file: one producer, two consumers, no transfers
+    files = []
+    for i in range(count):
+        file = FileInfo(i, f"file-{i}", 1.0 + i, 1e9 + i)
+        file.add_producer(tasks[i])
+        file.add_consumer(tasks[count + i])
+        file.add_consumer(tasks[2 * count + i])
+        files.append(file)
+    return files
+
+
+def build_transfers(count, workers_count=100):
+    # replicas of one file spread over many workers, half of them cached through the manager without an id
+    workers = [WorkerInfo('10.0.0.1', 9000 + w, 1) for w in range(workers_count)]
+    for w, worker in enumerate(workers, start=1):
+        worker.id = w
+    file = FileInfo(0, "file-replicated", 1.0, 1e9)
+    file.add_producer(TaskInfo(0, 1))
+    transfers = TransferTable()
+    for i in range(count):
+        worker = workers[i % workers_count]
+        if i % 2:
+            transfers.cache_update(file, worker, 1e9 + i, 'X')
+        else:
+            transfer_id = f"{i:08x}-transfer"
+            transfers.add(file.file_id, worker.id, 1e9 + i, transfer_id, workers[(i + 1) % workers_count].id)
+            transfers.cache_update(file, worker, 1e9 + i + 0.5, transfer_id)
+        transfers.unlink(file, worker, 1e9 + i + 1)
+    return transfers
+
+
+def build_workers(count):
+    # a worker that connected, reported its resources and disconnected, tasks and replicas are counted elsewhere
+    workers = {}
+    for i in range(count):
+        worker = WorkerInfo(f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}", 9000, 1)
+        worker.id = i + 1
+        worker.add_connection(1e9 + i)
+        worker.set_hash(f"{i:08x}-worker")
+        worker.set_machine_name(f"node-{i}")
+        worker.set_transfer_port(9100)
+        worker.set_cores(16)
+        worker.set_gpus(0)
+        worker.set_memory_mb(64000)
+        worker.set_disk_mb(100000)
+        worker.add_disconnection(1e9 + i + 3600)
+        workers[worker.worker_entry] = worker
+    return workers
+
+
+def report(name, bytes_per_record, baseline):
+    line = f"{name:<12} {bytes_per_record:10.1f} bytes/record"
+    if name in baseline:
+        line += f", baseline {baseline[name]:10.1f}, {baseline[name] / bytes_per_record:.1f}x"
+    print(line)
+
+
+def run_synthetic(count, baseline):
+    # warm up allocator caches and interned constants so they are not charged to the first builder
+    build_tasks(100, list(range(201)))
+    # the file ids belong to the symbol table of the parser and the tasks referenced by the files exist
+    # already, neither is charged to the records that refer to them
+    file_ids = list(range(2 * count + 1))
+    tasks = [TaskInfo(i, 1) for i in range(3 * count)]
+    results = {}
+    for name, build, args in (('task', build_tasks, (file_ids,)), ('file', build_files, (tasks,)), ('transfer', build_transfers, ()),
+                              ('worker', build_workers, ())):
+        results[name], _ = measure(build, count, *args)
+        report(name, results[name], baseline)
+    return results
+
+
+def run_template(template, baseline):
+    from taskvine_report.src.data_parser import DataParser
+
+    dp = DataParser(template)
+    with contextlib.redirect_stdout(io.StringIO()):
+        dp.set_time_zone()
+    gc.collect()
+    tracemalloc.start()
+    with contextlib.redirect_stdout(io.StringIO()):
+        dp.parse_debug()
+    gc.collect()
+    traced, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    num_transfers = len(dp.transfers)
+    print(f"{len(dp.tasks)} task tries, {len(dp.files)} files, {num_transfers} transfers, {len(dp.workers)} workers")
+    print(f"state {traced / 2**20:.1f} MB, parse peak {peak / 2**20:.1f} MB")
+    results = {'per task': traced / max(len(dp.tasks), 1)}
+    report('per task', results['per task'], baseline)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the memory footprint of the parsed state")
+    parser.add_argument('--count', type=int, default=10000, help='records per kind in the synthetic mode')
+    parser.add_argument('--template', help='parse this runtime template instead of building synthetic records')
+    parser.add_argument('--baseline', default=BASELINE_FILE,
+                        help='results to compare to (default: the dict-based layout, memory_footprint_baseline.json)')
+    parser.add_argument('--save-baseline', help='write the results to this file, to use as a later --baseline')
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)['bytes_per_record']
+        print(f"Compared to {args.baseline}")
+
+    if args.template:
+        results = run_template(os.path.abspath(args.template), baseline)
+    else:
+        results = run_synthetic(args.count, baseline)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump({'layout': 'template ' + args.template if args.template else 'synthetic records',
+                       'count': None if args.template else args.count, 'bytes_per_record': results}, f, indent=2)
+        print(f"Results written to {args.save_baseline}")
+
+
+if __name__ == '__main__':
+    main()
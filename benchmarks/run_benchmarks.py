@@ -0,0 +1,246 @@
+"""
+End-to-end benchmarks on synthetic runtime templates: parsing, CSV generation and the web routes.
+
+    python benchmarks/run_benchmarks.py                                     # 10^3, 10^4 and 10^5 tasks
+    python benchmarks/run_benchmarks.py --scales 1000000 10000000 --workers 500
+    python benchmarks/run_benchmarks.py --output after.json --baseline before.json
+
+A template is generated for every scale with synthetic_logs.py (and kept in --work-dir, so that later runs
+reuse it). Every stage runs in a fresh process, so that its peak RSS is its own:
+
+- parse:  DataParser.parse_logs, lines per second are debug lines over wall time
+- csv:    CSVManager.generate_csv_files, from the checkpoint written after the parse, and each of its stages
+- routes: every /api route through the Flask test client, one request each after the template is loaded
+
+Results go to --output as JSON. With --baseline, the wall times are compared to an earlier result file and
+the command fails when a stage got slower by more than --tolerance.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic_logs import generate_template
+
+
+# routes that are not plain GETs on the loaded template
+SKIPPED_ROUTES = {'/api/live-updates', '/api/change-runtime-template', '/api/reload-runtime-template'}
+ROUTE_ARGS = {'/api/task-subgraphs': {'subgraph_id': 1}}
+
+# wall times below this are too noisy to flag as regressions
+MIN_COMPARED_SECONDS = 0.05
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (2**20 if sys.platform == 'darwin' else 2**10)
+
+
+def count_lines(path):
+    lines = 0
+    with open(path, 'rb') as f:
+        while chunk := f.read(1 << 24):
+            lines += chunk.count(b'\n')
+    return lines
+
+
+def stage_parse(template, jobs):
+    from taskvine_report.src.data_parser import DataParser
+    data_parser = DataParser(template, jobs=jobs)
+    start = time.perf_counter()
+    data_parser.parse_logs()
+    result = {'wall_seconds': time.perf_counter() - start, 'peak_rss_mb': peak_rss_mb()}
+    # the csv stage starts from the checkpoint
+    data_parser.checkpoint_pkl_files()
+    return [('parse', result)]
+
+
+def stage_csv(template, jobs):
+    from taskvine_report.src.data_parser import DataParser
+    from taskvine_report.src.csv_manager import CSVManager
+    data_parser = DataParser(template)
+    data_parser.load_pkl_files(tables=CSVManager.parsed_state_tables())
+    csv_manager = CSVManager(template, data_parser=data_parser)
+    start = time.perf_counter()
+    csv_manager.generate_csv_files()
+    results = [('csv', {'wall_seconds': time.perf_counter() - start, 'peak_rss_mb': peak_rss_mb()})]
+    # and every generation stage on its own
+    for name, seconds in csv_manager.stage_wall_times.items():
+        results.append((f'csv {name}', {'wall_seconds': seconds}))
+    return results
+
+
+def stage_routes(template, jobs):
+    from taskvine_report.cli.report import create_app
+    app = create_app(os.path.dirname(template))
+    client = app.test_client()
+    folder = os.path.basename(template)
+    results = []
+
+    # the first request loads the template
+    start = time.perf_counter()
+    response = client.get('/api/runtime-template-list', query_string={'folder': folder})
+    results.append(('route load', {'wall_seconds': time.perf_counter() - start, 'status': response.status_code}))
+
+    rules = sorted(rule.rule for rule in app.url_map.iter_rules()
+                   if 'GET' in rule.methods and not rule.arguments and rule.rule.startswith('/api/'))
+    for rule in rules:
+        if rule in SKIPPED_ROUTES:
+            continue
+        start = time.perf_counter()
+        response = client.get(rule, query_string={'folder': folder, **ROUTE_ARGS.get(rule, {})})
+        body = response.get_data()
+        results.append((f"route {rule}", {'wall_seconds': time.perf_counter() - start,
+                                          'status': response.status_code,
+                                          'response_bytes': len(body)}))
+    results.append(('routes', {'wall_seconds': sum(r['wall_seconds'] for _, r in results), 'peak_rss_mb': peak_rss_mb()}))
+    return results
+
+
+STAGES = {'parse': stage_parse, 'csv': stage_csv, 'routes': stage_routes}
+
+
+def _run_stage_in_child(stage, template, jobs, queue):
+    try:
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            queue.put(('ok', STAGES[stage](template, jobs)))
+    except Exception as e:
+        queue.put(('error', f"{type(e).__name__}: {e}"))
+
+
+def run_stage(stage, template, jobs):
+    # spawn, not fork, so that the peak RSS of the child does not start from the parent's
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    process = context.Process(target=_run_stage_in_child, args=(stage, template, jobs, queue))
+    process.start()
+    status, payload = queue.get()
+    process.join()
+    if status != 'ok':
+        raise RuntimeError(f"{stage} failed on {template}: {payload}")
+    return payload
+
+
+def prepare_template(work_dir, scale, args):
+    template = os.path.join(work_dir, f"synthetic-{scale}")
+    params = {'tasks': scale, 'workers': args.workers, 'cores': args.cores, 'failure_rate': args.failure_rate,
+              'worker_failures': args.worker_failures, 'restarts': args.restarts, 'seed': args.seed}
+    # the generator records its parameters, a template generated with the same ones is reused
+    workflow_file = os.path.join(template, 'vine-logs', 'workflow.json')
+    if os.path.exists(workflow_file):
+        with open(workflow_file) as f:
+            existing = json.load(f).get('parameters', {})
+        if all(existing.get(key) == value for key, value in params.items()):
+            return template, None
+    start = time.perf_counter()
+    generate_template(template, **params)
+    return template, time.perf_counter() - start
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, tolerance):
+    # returns the number of stages that got slower than the tolerance allows
+    previous = {(r['scale'], r['stage']): r for r in baseline['results']}
+    regressions = 0
+    print(f"\n{'scale':>10}  {'stage':<45} {'baseline':>10} {'now':>10} {'ratio':>7}")
+    for result in results:
+        before = previous.get((result['scale'], result['stage']))
+        if before is None:
+            continue
+        ratio = result['wall_seconds'] / before['wall_seconds'] if before['wall_seconds'] else float('inf')
+        flag = ''
+        if ratio > 1 + tolerance and max(result['wall_seconds'], before['wall_seconds']) >= MIN_COMPARED_SECONDS:
+            flag = '  slower'
+            regressions += 1
+        elif ratio < 1 - tolerance and before['wall_seconds'] >= MIN_COMPARED_SECONDS:
+            flag = '  faster'
+        print(f"{result['scale']:>10}  {result['stage']:<45} {before['wall_seconds']:>9.3f}s "
+              f"{result['wall_seconds']:>9.3f}s {ratio:>7.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parsing, CSV generation and the web routes on synthetic logs")
+    parser.add_argument('--scales', type=int, nargs='+', default=[1000, 10000, 100000], help='number of tasks of each template')
+    parser.add_argument('--stages', nargs='+', choices=list(STAGES), default=list(STAGES))
+    parser.add_argument('--work-dir', default=os.path.join(os.getcwd(), 'benchmark-templates'),
+                        help='where the synthetic templates are generated and kept (default: ./benchmark-templates)')
+    parser.add_argument('--workers', type=int, default=50, help='workers of the synthetic workflows (default: 50)')
+    parser.add_argument('--cores', type=int, default=4, help='cores per worker (default: 4)')
+    parser.add_argument('--failure-rate', type=float, default=0.01)
+    parser.add_argument('--worker-failures', type=int, default=2)
+    parser.add_argument('--restarts', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--jobs', type=int, default=1, help='parser jobs (default: 1)')
+    parser.add_argument('--output', default='benchmark-results.json', help='where to write the results (default: benchmark-results.json)')
+    parser.add_argument('--baseline', help='an earlier result file to compare the wall times with')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='slowdown that counts as a regression (default: 0.2)')
+    args = parser.parse_args()
+
+    os.makedirs(args.work_dir, exist_ok=True)
+    results = []
+    for scale in args.scales:
+        template, generate_seconds = prepare_template(args.work_dir, scale, args)
+        debug_lines = count_lines(os.path.join(template, 'vine-logs', 'debug'))
+        if generate_seconds is not None:
+            print(f"{scale} tasks: generated {debug_lines} debug lines in {generate_seconds:.1f}s")
+        for stage in args.stages:
+            for name, result in run_stage(stage, template, args.jobs):
+                result = {'scale': scale, 'stage': name, **result}
+                if name == 'parse':
+                    result['debug_lines'] = debug_lines
+                    result['lines_per_second'] = debug_lines / result['wall_seconds']
+                results.append(result)
+                if 'peak_rss_mb' in result:
+                    rate = f", {result['lines_per_second']:.0f} lines/s" if 'lines_per_second' in result else ''
+                    print(f"{scale} tasks: {name} {result['wall_seconds']:.2f}s{rate}, peak RSS {result['peak_rss_mb']:.0f} MB")
+                elif 'status' in result and result['status'] != 200:
+                    print(f"{scale} tasks: {name} returned {result['status']}")
+
+    output = {
+        'environment': {
+            'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'jobs': args.jobs,
+        },
+        'generator': {'workers': args.workers, 'cores': args.cores, 'failure_rate': args.failure_rate,
+                      'worker_failures': args.worker_failures, 'restarts': args.restarts, 'seed': args.seed},
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(output, f, indent=2)
+    print(f"results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"{regressions} stage(s) slower than the baseline by more than {args.tolerance:.0%}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,639 @@
+"""
+Synthetic TaskVine runtime templates for benchmarking, no cluster needed.
+
+    python benchmarks/synthetic_logs.py OUT_DIR --tasks 100000 --workers 50
+    python benchmarks/synthetic_logs.py OUT_DIR --tasks 10000 --failure-rate 0.05 --worker-failures 3 --restarts 1
+
+Writes OUT_DIR/vine-logs/{debug,transactions,performance,taskgraph,workflow.json}, with the debug lines in the
+formats the DataParser handlers consume. The workflow is simulated event by event on a virtual clock:
+
+- workers connect and report their resources, tasks are submitted in batches and dispatched first-come
+  first-served to workers with a free core;
+- every task reads `fan_in` files, the outputs of recent tasks (within `window` tasks) or shared input datasets,
+  and writes `fan_out` temporary files; inputs that are not on the worker yet are sent by the manager (`put`),
+  fetched from a url, or copied from a worker that holds them (`puturl workerip://`);
+- a temporary file is unlinked from every worker once no later task can consume it;
+- a fraction of the task tries fail with resource exhaustion and are retried;
+- workers can fail mid-run: their running tasks are rescheduled, the temporary files only they held are
+  re-created by recovery tasks, and they reconnect;
+- a debug log can hold several manager runs, the earlier ones stop mid-way.
+
+The output is deterministic for a given seed.
+"""
+
+import argparse
+import heapq
+import json
+import os
+import random
+import time
+from collections import deque
+
+
+MANAGER_PID = 4242
+MANAGER_PORT = 9123
+T0 = 1700000000.0
+
+# lines are written in blocks to keep the generator fast on 10^7 tasks
+FLUSH_LINES = 65536
+
+# the event formats of the transactions log, as TaskVine writes them at its top
+TRANSACTIONS_HEADER = (
+    "time manager_pid MANAGER manager_id START|END",
+    "time manager_pid WORKER worker_id CONNECTION host:port",
+    "time manager_pid WORKER worker_id DISCONNECTION (UNKNOWN|IDLE_OUT|FAST_ABORT|FAILURE|STATUS_WORKER|EXPLICIT)",
+    "time manager_pid WORKER worker_id RESOURCES {resources}",
+    "time manager_pid WORKER worker_id CACHE_UPDATE filename size_in_mb wall_time_us start_time_us",
+    "time manager_pid WORKER worker_id TRANSFER (INPUT|OUTPUT) filename size_in_mb wall_time_us start_time_us",
+    "time manager_pid TASK task_id WAITING category_name (FIRST_RESOURCES|MAX_RESOURCES) attempt_number {resources_requested}",
+    "time manager_pid TASK task_id RUNNING worker_address (FIRST_RESOURCES|MAX_RESOURCES) {resources_allocated}",
+    "time manager_pid TASK task_id WAITING_RETRIEVAL worker_address",
+    "time manager_pid TASK task_id RETRIEVED (SUCCESS|SIGNAL|END_TIME|FORSAKEN|MAX_RETRIES|MAX_WALLTIME|UNKNOWN|RESOURCE_EXHAUSTION) {limits_exceeded} {resources_measured}",
+    "time manager_pid TASK task_id DONE (SUCCESS|SIGNAL|END_TIME|FORSAKEN|MAX_RETRIES|MAX_WALLTIME|UNKNOWN|RESOURCE_EXHAUSTION) exit_code",
+)
+TASK_RESOURCES = '{"cores":[1,"cores"],"memory":[4096,"MB"],"disk":[8192,"MB"],"gpus":[0,"gpus"]}'
+
+
+class LogWriter:
+    """
+    Debug and transactions lines on a virtual clock. Timestamps are written in UTC, the parser derives the
+    time zone from the manager start in the transactions log.
+    """
+    def __init__(self, vine_logs_dir):
+        self.debug = open(os.path.join(vine_logs_dir, 'debug'), 'w')
+        self.transactions_path = os.path.join(vine_logs_dir, 'transactions')
+        self.transactions = []
+        self.buffer = []
+        self.num_lines = 0
+        self.now = T0
+        self._second = None
+        self._prefix = None
+
+    def advance(self, seconds):
+        self.now += seconds
+
+    def at(self, when):
+        # the clock never goes back, events scheduled in the past are logged now
+        if when > self.now:
+            self.now = when
+
+    def line(self, message):
+        self.now += 0.000007
+        second = int(self.now)
+        if second != self._second:
+            self._second = second
+            self._prefix = time.strftime('%Y/%m/%d %H:%M:%S', time.gmtime(second))
+        micros = int((self.now - second) * 1e6)
+        self.buffer.append(f"{self._prefix}.{micros:06d} vine_manager[{MANAGER_PID}] {message}\n")
+        if len(self.buffer) >= FLUSH_LINES:
+            self.flush()
+
+    def transaction(self, message):
+        self.transactions.append(f"{int(self.now * 1e6)} {MANAGER_PID} {message}\n")
+
+    def flush(self):
+        self.num_lines += len(self.buffer)
+        self.debug.writelines(self.buffer)
+        self.buffer = []
+
+    def close(self, transactions):
+        self.flush()
+        self.debug.close()
+        with open(self.transactions_path, 'w') as f:
+            f.writelines(f"# {header}\n" for header in TRANSACTIONS_HEADER)
+            f.writelines(transactions)
+
+
+class SyntheticWorker:
+    def __init__(self, index, cores, seg):
+        self.index = index
+        self.ip = f"10.{index // 65536 % 256}.{index // 256 % 256}.{index % 256}"
+        self.port = 9000 + seg
+        self.transfer_port = 20000 + seg
+        self.hostname = f"worker-{index}"
+        self.addr = f"{self.hostname} ({self.ip}:{self.port})"
+        self.cores = cores
+        self.free_cores = cores
+        self.connected = False
+        self.connect_count = 0
+        self.worker_id = None
+        self.files = set()      # temporary files and datasets this worker holds
+        self.running = set()    # task ids
+
+
+class SyntheticFile:
+    __slots__ = ('name', 'size', 'holders', 'pending_consumers', 'consumed', 'last_consumer', 'produced', 'recovering')
+
+    def __init__(self, name, size, last_consumer):
+        self.name = name
+        self.size = size
+        self.holders = set()
+        self.pending_consumers = 0
+        self.consumed = False
+        self.last_consumer = last_consumer  # the last task index that may pick it as an input
+        self.produced = False
+        self.recovering = False
+
+
+class SyntheticTask:
+    __slots__ = ('task_id', 'try_id', 'inputs', 'outputs', 'worker', 'time_start', 'is_recovery', 'dispatch')
+
+    @property
+    def category(self):
+        return 'recovery' if self.is_recovery else 'default'
+
+    def __init__(self, task_id, inputs, outputs, is_recovery=False):
+        self.task_id = task_id
+        self.try_id = 1
+        self.inputs = inputs
+        self.outputs = outputs
+        self.worker = None
+        self.time_start = None
+        self.is_recovery = is_recovery
+        self.dispatch = None    # the sequence number of its current run, stale heap entries do not match it
+
+
+class WorkflowRun:
+    """
+    One manager run of the simulated workflow, from "listening on port" to "manager end" or to the point
+    where it is cut short by a restart.
+    """
+    def __init__(self, log, rng, seg, tasks, workers, cores, fan_in, fan_out, window, failure_rate,
+                 worker_failures, dataset_count, url_fraction, noise, task_duration):
+        self.log = log
+        self.rng = rng
+        self.seg = seg
+        self.num_tasks = tasks
+        self.fan_in = fan_in
+        self.fan_out = fan_out
+        self.window = window
+        self.failure_rate = failure_rate
+        self.url_fraction = url_fraction
+        self.noise = noise
+        self.task_duration = task_duration
+        self.workers = [SyntheticWorker(w, cores, seg) for w in range(workers)]
+        self.worker_cursor = 0
+        self.datasets = [f"dataset-{seg}-{k}.dat" for k in range(dataset_count)]
+        self.dataset_sizes = {name: rng.randint(1 << 20, 1 << 28) for name in self.datasets}
+
+        self.files = {}             # key: temporary file name, value: SyntheticFile
+        self.files_by_task = {}     # key: task index, value: its output files, while they can still be consumed
+        self.expiring = deque()     # task indices in order, their outputs expire once no later task can pick them
+        self.priority_queue = deque()   # recovery tasks and retries, dispatched before new tasks
+        self.next_task = 1
+        self.planned = None         # the next new task, planned once its turn comes
+        self.submitted = 0
+        self.next_recovery_id = tasks + 1
+        self.next_transfer_id = 1
+        self.running = []           # heap of (end time, sequence, task)
+        self.sequence = 0
+        self.failure_points = set(int(tasks * (k + 1) / (worker_failures + 1)) for k in range(worker_failures))
+
+        self.num_recovery_tasks = 0
+        self.num_retries = 0
+
+    # workers
+
+    def connect(self, worker):
+        log = self.log
+        worker.connected = True
+        worker.connect_count += 1
+        worker.free_cores = worker.cores
+        worker.worker_id = f"worker-{self.seg}-{worker.index}-{worker.connect_count}"
+        log.line(f"vine: worker {worker.ip}:{worker.port} connected")
+        log.transaction(f"WORKER {worker.worker_id} CONNECTION {worker.ip}:{worker.port}")
+        log.line(f"vine: rx from {worker.addr}: transfer-port {worker.transfer_port}")
+        log.line(f"vine: rx from {worker.addr}: info worker-id {worker.worker_id}")
+        log.line(f"vine: rx from {worker.addr}: resources")
+        log.line(f"vine: rx from {worker.addr}: cores {worker.cores}")
+        log.line(f"vine: rx from {worker.addr}: memory {worker.cores * 4096}")
+        log.line(f"vine: rx from {worker.addr}: disk {worker.cores * 65536}")
+        log.line(f"vine: rx from {worker.addr}: gpus 0")
+        log.line(f"vine: rx from {worker.addr}: end")
+        log.transaction(f'WORKER {worker.worker_id} RESOURCES {{"cores":[{worker.cores},"cores"],'
+                        f'"memory":[{worker.cores * 4096},"MB"],"disk":[{worker.cores * 65536},"MB"],"gpus":[0,"gpus"]}}')
+
+    def remove(self, worker, reason="EXPLICIT"):
+        log = self.log
+        worker.connected = False
+        log.line(f"vine: worker {worker.addr} removed")
+        log.transaction(f"WORKER {worker.worker_id} DISCONNECTION {reason}")
+
+    def fail_worker(self, worker):
+        # the running tasks go back to the queue and the temporary files only this worker held are recovered
+        self.remove(worker, "FAILURE")
+        for task_id in sorted(worker.running):
+            self.log.line(f"vine: Task {task_id} state change: RUNNING (2) to READY (1)")
+        retried = []
+        for _, sequence, task in self.running:
+            if task.worker is worker and task.dispatch == sequence:
+                task.dispatch = None
+                self.retry(task)
+                retried.append(task)
+        for task in sorted(retried, key=lambda task: task.task_id):
+            self.task_waiting(task)
+        worker.running.clear()
+
+        for name in sorted(worker.files):
+            file = self.files.get(name)
+            if file is None:
+                continue
+            file.holders.discard(worker)
+            if not file.holders and file.produced and not file.recovering:
+                task = SyntheticTask(self.next_recovery_id, [], [name], is_recovery=True)
+                self.next_recovery_id += 1
+                self.num_recovery_tasks += 1
+                file.produced = False
+                file.recovering = True
+                self.log.line(f"vine: Task {task.task_id} state change: INITIAL (0) to READY (1)")
+                self.task_waiting(task)
+                self.log.line(f"vine: Submitted recovery task {task.task_id} to re-create lost temporary file {name}.")
+                self.priority_queue.appendleft(task)
+        worker.files.clear()
+
+        self.log.advance(1.0)
+        self.connect(worker)
+
+    def pick_worker(self, task):
+        # prefer a worker that already holds an input, otherwise go round the workers
+        for name in task.inputs:
+            file = self.files.get(name)
+            if file is not None:
+                for worker in sorted(file.holders, key=lambda w: w.index):
+                    if worker.connected and worker.free_cores > 0:
+                        return worker
+        workers = self.workers
+        for _ in range(len(workers)):
+            worker = workers[self.worker_cursor]
+            self.worker_cursor = (self.worker_cursor + 1) % len(workers)
+            if worker.connected and worker.free_cores > 0:
+                return worker
+        return None
+
+    # tasks
+
+    def submit_up_to(self, task_index):
+        # tasks are submitted in batches, ahead of the dispatch
+        while self.submitted < min(task_index, self.num_tasks):
+            self.submitted += 1
+            self.log.line(f"vine: Task {self.submitted} state change: INITIAL (0) to READY (1)")
+            self.log.transaction(f"TASK {self.submitted} WAITING default FIRST_RESOURCES 1 {TASK_RESOURCES}")
+
+    def task_waiting(self, task):
+        self.log.transaction(f"TASK {task.task_id} WAITING {task.category} FIRST_RESOURCES {task.try_id} {TASK_RESOURCES}")
+
+    def plan_task(self, index):
+        rng = self.rng
+        inputs = []
+        lo = max(1, index - self.window)
+        for _ in range(self.fan_in):
+            name = None
+            # an output of a recent task that is done, so that the workflow keeps its width
+            for _ in range(4 if index > 1 and rng.random() > 0.1 else 0):
+                outputs = self.files_by_task.get(rng.randint(lo, index - 1))
+                if outputs:
+                    file = self.files.get(outputs[rng.randrange(self.fan_out)])
+                    if file is not None and file.produced:
+                        name = file.name
+                        break
+            if name is None and self.datasets:
+                name = self.datasets[rng.randrange(len(self.datasets))]
+            if name is not None and name not in inputs:
+                inputs.append(name)
+        for name in inputs:
+            file = self.files.get(name)
+            if file is not None:
+                file.pending_consumers += 1
+                file.consumed = True
+
+        outputs = []
+        for k in range(self.fan_out):
+            name = f"temp-{self.seg}-{index}-{k}.out"
+            self.files[name] = SyntheticFile(name, rng.randint(1 << 10, 1 << 24), index + self.window)
+            outputs.append(name)
+        self.files_by_task[index] = outputs
+        self.expiring.append(index)
+        return SyntheticTask(index, inputs, outputs)
+
+    def inputs_ready(self, task):
+        for name in task.inputs:
+            file = self.files.get(name)
+            if file is not None and not file.produced:
+                return False
+        return True
+
+    def next_dispatchable(self):
+        if self.priority_queue:
+            task = self.priority_queue[0]
+            return task if self.inputs_ready(task) else None
+        if self.next_task > self.num_tasks:
+            return None
+        if self.planned is None or self.planned.task_id != self.next_task:
+            self.planned = self.plan_task(self.next_task)
+        return self.planned if self.inputs_ready(self.planned) else None
+
+    def stage_in(self, worker, name):
+        log = self.log
+        rng = self.rng
+        file = self.files.get(name)
+        if file is None:
+            # a dataset, sent by the manager or fetched from a url
+            if name in worker.files:
+                return
+            size = self.dataset_sizes[name]
+            if rng.random() < self.url_fraction:
+                transfer_id = self.new_transfer_id()
+                log.line(f"vine: tx to {worker.addr}: puturl https://data.example.org/{name} {name} 0 {size} 0644 {transfer_id}")
+                log.advance(size / 1e9)
+                log.line(f"vine: rx from {worker.addr}: cache-update {name} 1 1 {size} 0 {int(size / 1e3)} 1 {transfer_id}")
+                self.cache_update(worker, name, size, int(size / 1e3))
+            else:
+                log.line(f"vine: tx to {worker.addr}: put {name} 0644 {size}")
+                log.advance(size / 1e9)
+                log.line(f"vine: rx from {worker.addr}: cache-update {name} 1 1 {size} 0 {int(size / 1e3)} 1 X")
+                log.transaction(f"WORKER {worker.worker_id} TRANSFER INPUT {name} {size / 2**20:.6f} "
+                                f"{int(size / 1e3)} {int(log.now * 1e6) - int(size / 1e3)}")
+                self.cache_update(worker, name, size, int(size / 1e3))
+            worker.files.add(name)
+            return
+
+        if worker in file.holders:
+            return
+        # a temporary file, copied from a worker that holds it, retried when the copy fails
+        while True:
+            source = min(file.holders, key=lambda w: w.index)
+            transfer_id = self.new_transfer_id()
+            log.line(f"vine: tx to {worker.addr}: puturl workerip://{source.ip}:{source.transfer_port}/{name} "
+                     f"{name} 0 {file.size} 0644 {transfer_id}")
+            log.advance(file.size / 1e9)
+            if rng.random() < 0.01:
+                log.line(f"vine: rx from {worker.addr}: cache-invalid {name} 12 {transfer_id}")
+                continue
+            log.line(f"vine: rx from {worker.addr}: cache-update {name} 1 1 {file.size} 0 {int(file.size / 1e3)} 1 {transfer_id}")
+            self.cache_update(worker, name, file.size, int(file.size / 1e3))
+            break
+        file.holders.add(worker)
+        worker.files.add(name)
+
+    def cache_update(self, worker, name, size, transfer_time_us):
+        self.log.transaction(f"WORKER {worker.worker_id} CACHE_UPDATE {name} {size / 2**20:.6f} {transfer_time_us} "
+                             f"{int(self.log.now * 1e6) - transfer_time_us}")
+
+    def new_transfer_id(self):
+        transfer_id = f"{self.seg:02x}{self.next_transfer_id:012x}-f00d-4b1d-8d2c-{self.rng.getrandbits(48):012x}"
+        self.next_transfer_id += 1
+        return transfer_id
+
+    def dispatch(self, task, worker):
+        log = self.log
+        rng = self.rng
+        for name in task.inputs:
+            self.stage_in(worker, name)
+
+        log.line(f"vine: tx to {worker.addr}: task {task.task_id}")
+        log.line(f"vine: tx to {worker.addr}: cmd 24 0")
+        log.line(f"vine: tx to {worker.addr}: python3 task.py {task.task_id}")
+        log.line(f"vine: tx to {worker.addr}: category {'recovery' if task.is_recovery else 'default'}")
+        log.line(f"vine: tx to {worker.addr}: cores 1")
+        log.line(f"vine: tx to {worker.addr}: memory 4096")
+        log.line(f"vine: tx to {worker.addr}: disk 8192")
+        log.line(f"vine: tx to {worker.addr}: gpus 0")
+        for name in task.inputs:
+            log.line(f"vine: tx to {worker.addr}: infile {name} {name} 0")
+        for name in task.outputs:
+            log.line(f"vine: tx to {worker.addr}: outfile {name} {name} 0")
+        log.line(f"vine: tx to {worker.addr}: end")
+        log.line(f"vine: {worker.addr} busy on 'python3 task.py {task.task_id}'")
+        log.line(f"vine: Task {task.task_id} state change: READY (1) to RUNNING (2)")
+        log.transaction(f"TASK {task.task_id} RUNNING {worker.ip}:{worker.port} FIRST_RESOURCES {TASK_RESOURCES}")
+
+        worker.free_cores -= 1
+        worker.running.add(task.task_id)
+        task.worker = worker
+        task.time_start = log.now
+        duration = self.task_duration * rng.uniform(0.5, 1.5)
+        self.sequence += 1
+        task.dispatch = self.sequence
+        heapq.heappush(self.running, (log.now + duration, self.sequence, task))
+
+    def retry(self, task):
+        task.try_id += 1
+        task.worker = None
+        self.num_retries += 1
+        self.priority_queue.append(task)
+
+    def complete(self, task, time_end):
+        log = self.log
+        rng = self.rng
+        worker = task.worker
+        worker.free_cores += 1
+        worker.running.discard(task.task_id)
+        start_us = int(task.time_start * 1e6) + 1000
+        end_us = max(int(time_end * 1e6), start_us)
+
+        if not task.is_recovery and rng.random() < self.failure_rate:
+            log.line(f"vine: rx from {worker.addr}: complete {2 << 3} 0 0 0 {start_us} {end_us} 0 {task.task_id}")
+            log.line(f"vine: Task {task.task_id} state change: RUNNING (2) to WAITING_RETRIEVAL (3)")
+            log.transaction(f"TASK {task.task_id} WAITING_RETRIEVAL {worker.ip}:{worker.port}")
+            log.line(f"vine: Task {task.task_id} state change: WAITING_RETRIEVAL (3) to READY (1)")
+            self.retry(task)
+            self.task_waiting(task)
+            return
+
+        for name in task.outputs:
+            file = self.files.get(name)
+            if file is None:
+                continue
+            log.line(f"vine: rx from {worker.addr}: cache-update {name} 1 1 {file.size} 0 0 1 X")
+            self.cache_update(worker, name, file.size, 0)
+            file.holders.add(worker)
+            file.produced = True
+            file.recovering = False
+            worker.files.add(name)
+        log.line(f"vine: rx from {worker.addr}: complete 0 0 {rng.randint(0, 4096)} {rng.randint(0, 1 << 20)} "
+                 f"{start_us} {end_us} {rng.randint(1 << 20, 1 << 26)} {task.task_id}")
+        log.line(f"vine: rx from {worker.addr}: stdout {task.task_id} {rng.randint(0, 4096)}")
+        log.line(f"vine: Task {task.task_id} state change: RUNNING (2) to WAITING_RETRIEVAL (3)")
+        log.transaction(f"TASK {task.task_id} WAITING_RETRIEVAL {worker.ip}:{worker.port}")
+        log.line(f"vine: Task {task.task_id} state change: WAITING_RETRIEVAL (3) to RETRIEVED (4)")
+        log.transaction(f'TASK {task.task_id} RETRIEVED SUCCESS {{}} {{"start":[{start_us},"us"],"end":[{end_us},"us"],'
+                        f'"wall_time":[{end_us - start_us},"us"],"cores":[1,"cores"]}}')
+        log.line(f"vine: Task {task.task_id} state change: RETRIEVED (4) to DONE (5)")
+        log.transaction(f"TASK {task.task_id} DONE SUCCESS 0")
+
+        if task.is_recovery:
+            return
+        for name in task.inputs:
+            file = self.files.get(name)
+            if file is not None:
+                file.pending_consumers -= 1
+                if file.pending_consumers == 0 and file.last_consumer < self.next_task:
+                    self.unlink(file)
+
+    def unlink(self, file):
+        for worker in sorted(file.holders, key=lambda w: w.index):
+            if worker.connected:
+                self.log.line(f"vine: tx to {worker.addr}: unlink {file.name}")
+            worker.files.discard(file.name)
+        file.holders.clear()
+        del self.files[file.name]
+
+    def expire_outputs(self):
+        # outputs that no later task can pick any more: unlink the consumed ones once their consumers are done,
+        # the others are final outputs and stay where they are
+        while self.expiring and self.expiring[0] + self.window < self.next_task:
+            index = self.expiring.popleft()
+            for name in self.files_by_task.pop(index, ()):
+                file = self.files.get(name)
+                if file is None or file.recovering or not file.produced:
+                    continue
+                if file.pending_consumers == 0:
+                    if file.consumed:
+                        self.unlink(file)
+                    else:
+                        for worker in file.holders:
+                            worker.files.discard(name)
+                        del self.files[name]
+
+    def noise_lines(self):
+        # keepalives and other traffic the parser skips, real logs are mostly made of them
+        log = self.log
+        rng = self.rng
+        for _ in range(rng.randint(0, 2 * self.noise)):
+            worker = self.workers[rng.randrange(len(self.workers))]
+            if not worker.connected:
+                continue
+            kind = rng.randrange(4)
+            if kind == 0:
+                log.line(f"vine: rx from {worker.addr}: alive")
+            elif kind == 1:
+                log.line(f"tcp: sending keepalive to {worker.ip}:{worker.port}")
+            elif kind == 2:
+                log.line(f"vine: tx to {worker.addr}: check")
+            else:
+                log.line(f"vine: rx from {worker.addr}: info tasks_running {len(worker.running)}")
+
+    def run(self, stop_after=None):
+        log = self.log
+        log.line(f"tcp: listening on port {MANAGER_PORT}")
+        log.transaction(f"MANAGER {self.seg + 1} START")
+        for worker in self.workers:
+            self.connect(worker)
+        batch = max(100, len(self.workers) * 4)
+
+        dispatched = 0
+        while True:
+            if stop_after is not None and dispatched >= stop_after:
+                return False
+            self.submit_up_to(self.next_task + batch)
+            if self.next_task in self.failure_points:
+                # the worker holding the most files fails, which loses the most work
+                self.failure_points.discard(self.next_task)
+                self.fail_worker(max(self.workers, key=lambda w: (len(w.files), -w.index)))
+            task = self.next_dispatchable()
+            worker = self.pick_worker(task) if task is not None else None
+            if task is not None and worker is not None:
+                if self.priority_queue and task is self.priority_queue[0]:
+                    self.priority_queue.popleft()
+                else:
+                    self.next_task += 1
+                self.noise_lines()
+                self.dispatch(task, worker)
+                dispatched += 1
+                self.expire_outputs()
+                continue
+            if not self.running:
+                if task is None and not self.priority_queue and self.next_task > self.num_tasks:
+                    break
+                raise RuntimeError("the simulated workflow is stuck")
+            time_end, sequence, task = heapq.heappop(self.running)
+            if task.dispatch != sequence:
+                continue
+            log.at(time_end)
+            self.complete(task, time_end)
+
+        log.advance(1.0)
+        for worker in self.workers:
+            if worker.connected:
+                self.remove(worker)
+        log.line("vine: manager end")
+        log.transaction(f"MANAGER {self.seg + 1} END")
+        return True
+
+
+def generate_template(template_dir, tasks=1000, workers=10, cores=4, fan_in=2, fan_out=1, window=None,
+                      failure_rate=0.01, worker_failures=0, restarts=0, datasets=None, url_fraction=0.05,
+                      noise=2, task_duration=None, seed=0):
+    """
+    Write a runtime template with a synthetic debug log, returns a summary of what was generated.
+    See the module docstring for what is simulated.
+    """
+    parameters = {'tasks': tasks, 'workers': workers, 'cores': cores, 'fan_in': fan_in, 'fan_out': fan_out,
+                  'window': window, 'failure_rate': failure_rate, 'worker_failures': worker_failures,
+                  'restarts': restarts, 'datasets': datasets, 'url_fraction': url_fraction, 'noise': noise,
+                  'task_duration': task_duration, 'seed': seed}
+    rng = random.Random(seed)
+    vine_logs_dir = os.path.join(template_dir, 'vine-logs')
+    os.makedirs(vine_logs_dir, exist_ok=True)
+    window = window or max(10, workers * cores)
+    datasets = max(1, tasks // 1000) if datasets is None else datasets
+    # about ten task waves per run, whatever the scale
+    task_duration = task_duration or max(1.0, tasks / (workers * cores) / 10)
+
+    log = LogWriter(vine_logs_dir)
+    summary = {'tasks': tasks, 'workers': workers, 'segments': restarts + 1}
+    transactions = []
+    for seg in range(restarts + 1):
+        log.transactions = []
+        run = WorkflowRun(log, rng, seg, tasks, workers, cores, fan_in, fan_out, window, failure_rate,
+                          worker_failures, datasets, url_fraction, noise, task_duration)
+        if seg < restarts:
+            # an earlier manager run that stopped part way
+            run.run(stop_after=rng.randint(1, max(1, tasks // 2)))
+            log.advance(60.0)
+        else:
+            run.run()
+            summary['retries'] = run.num_retries
+            summary['recovery_tasks'] = run.num_recovery_tasks
+        # the parser reads the manager start of the run it parses, the last one, from the transactions log
+        transactions = log.transactions
+    log.close(transactions)
+
+    for name in ('performance', 'taskgraph'):
+        open(os.path.join(vine_logs_dir, name), 'w').close()
+    with open(os.path.join(vine_logs_dir, 'workflow.json'), 'w') as f:
+        json.dump({'generator': 'synthetic', 'parameters': parameters, 'summary': summary}, f)
+
+    summary['debug_lines'] = log.num_lines
+    summary['debug_bytes'] = os.path.getsize(os.path.join(vine_logs_dir, 'debug'))
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic TaskVine runtime template")
+    parser.add_argument('template_dir', help='the runtime template to write, vine-logs/ is created in it')
+    parser.add_argument('--tasks', type=int, default=1000, help='number of tasks (default: 1000)')
+    parser.add_argument('--workers', type=int, default=10, help='number of workers (default: 10)')
+    parser.add_argument('--cores', type=int, default=4, help='cores per worker (default: 4)')
+    parser.add_argument('--fan-in', type=int, default=2, help='input files per task (default: 2)')
+    parser.add_argument('--fan-out', type=int, default=1, help='output files per task (default: 1)')
+    parser.add_argument('--window', type=int, help='how many tasks back inputs are picked from (default: workers * cores)')
+    parser.add_argument('--failure-rate', type=float, default=0.01, help='fraction of task tries that fail and are retried (default: 0.01)')
+    parser.add_argument('--worker-failures', type=int, default=0,
+                        help='workers that fail mid-run, their lost temporary files are re-created by recovery tasks (default: 0)')
+    parser.add_argument('--restarts', type=int, default=0, help='manager runs before the last one in the same debug log (default: 0)')
+    parser.add_argument('--noise', type=int, default=2, help='average number of lines the parser skips per task (default: 2)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    start = time.time()
+    summary = generate_template(args.template_dir, tasks=args.tasks, workers=args.workers, cores=args.cores,
+                                fan_in=args.fan_in, fan_out=args.fan_out, window=args.window,
+                                failure_rate=args.failure_rate, worker_failures=args.worker_failures,
+                                restarts=args.restarts, noise=args.noise, seed=args.seed)
+    print(json.dumps(summary))
+    print(f"generated in {time.time() - start:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
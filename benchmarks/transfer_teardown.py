@@ -0,0 +1,87 @@
+"""
+Teardown of a hot shared input: one file replicated to many workers, then removed from them.
+
+    python benchmarks/transfer_teardown.py                          # 1000 and 10000 workers
+    python benchmarks/transfer_teardown.py --workers 10000 100000
+
+For every worker count, the file is put on every worker by a transfer the manager started, and every
+worker also caches a copy without a transfer id. Then every tenth worker invalidates its cached copy,
+every other worker unlinks both of its copies, and the manager tears down what is left. The time per operation
+of each phase, per replica it opens or closes, should not grow with the number of replicas.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from taskvine_report.src.file_info import FileInfo
+from taskvine_report.src.task_info import TaskInfo
+from taskvine_report.src.transfer_table import TransferTable
+from taskvine_report.src.worker_info import WorkerInfo
+
+
+def replicate(transfers, file, workers):
+    for worker in workers:
+        transfer_id = f"{worker.id:08x}-transfer"
+        transfers.add(file.file_id, worker.id, 1e9, transfer_id, 'manager')
+        transfers.cache_update(file, worker, 1e9 + 1, transfer_id)
+        transfers.cache_update(file, worker, 1e9 + 1, 'X')
+
+
+def invalidate(transfers, file, workers):
+    for worker in workers[::10]:
+        transfers.cache_invalid(file, worker, 1e9 + 2, None)
+
+
+def unlink(transfers, file, workers):
+    for worker in workers[::2]:
+        transfers.unlink(file, worker, 1e9 + 3)
+
+
+def unlink_all(transfers, file, workers):
+    transfers.unlink_all(file.file_id, 1e9 + 4)
+
+
+PHASES = (('replicate', replicate), ('invalidate', invalidate), ('unlink', unlink), ('unlink_all', unlink_all))
+
+
+def open_replicas(transfers, file):
+    return len(transfers.open_file_rows.get(file.file_id, ()))
+
+
+def run(workers_count):
+    workers = [WorkerInfo('10.0.0.1', 9000 + w, 1) for w in range(workers_count)]
+    for w, worker in enumerate(workers, start=1):
+        worker.id = w
+    file = FileInfo(0, "file-shared", 1.0, 1e9)
+    # a file with a producer is cached as a new replica by a cache-update without a transfer id
+    file.add_producer(TaskInfo(0, 1))
+    transfers = TransferTable()
+
+    print(f"{workers_count} workers")
+    for name, phase in PHASES:
+        before = open_replicas(transfers, file)
+        start = time.perf_counter()
+        phase(transfers, file, workers)
+        seconds = time.perf_counter() - start
+        # the replicas the phase opened or closed
+        replicas = max(abs(open_replicas(transfers, file) - before), 1)
+        print(f"  {name:<12} {seconds:8.3f} s {replicas:8d} replicas {seconds / replicas * 1e6:8.2f} us/replica")
+    if transfers.open_rows or transfers.open_file_rows:
+        raise RuntimeError("replicas are left open after the teardown")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the teardown of a file replicated to many workers")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1000, 10000], help='worker counts to run')
+    args = parser.parse_args()
+
+    for workers_count in args.workers:
+        run(workers_count)
+
+
+if __name__ == '__main__':
+    main()
@@ -70,6 +70,10 @@ setup(
         "pyarrow",
     ],
     extras_require={
+        # reading zstd compressed debug logs
+        "zstd": [
+            "zstandard",
+        ],
         "dev": [
             "pytest",
             "pytest-cov",
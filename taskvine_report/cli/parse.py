@@ -9,12 +9,19 @@ import argparse
 import os
 import sys
 import fnmatch
+import time
 import traceback as tb
 from pathlib import Path
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
-from taskvine_report.src.data_parser import DataParser
+from taskvine_report.src.data_parser import DataParser, PARSER_BACKENDS
+from taskvine_report.src.downsampling import DOWNSAMPLING_METHODS
 from taskvine_report.src.csv_manager import CSVManager
+from taskvine_report.src.debug_segments import create_segment_templates
+from taskvine_report.src.template_discovery import TemplateDiscovery, DEFAULT_DISCOVERY_THREADS, default_discovery_cache_file
+from taskvine_report.src.live_tail import LiveTail
+from taskvine_report.src.parse_profiler import DEFAULT_SAMPLE_EVERY
+from taskvine_report.src.template_pool import TemplatePool
 from taskvine_report.utils import check_pip_updates
 from taskvine_report import __version__
 
@@ -62,21 +69,112 @@ def find_matching_directories(root_dir, patterns):
         sys.exit(1)
 
 
-def find_valid_dirs(root_dir: str):
-    required = {"debug", "performance", "taskgraph", "transactions", "workflow.json"}
-    root = Path(root_dir)
-    results = []
-
-    for path in root.rglob("*"):
-        if path.is_dir():
-            vine_logs = path / "vine-logs"
-            if vine_logs.is_dir():
-                entries = {p.name for p in vine_logs.iterdir()}
-                if required.issubset(entries):
-                    results.append(str(path))
+def find_valid_dirs(root_dir: str, threads=DEFAULT_DISCOVERY_THREADS, cache_file=None):
+    # the walk stops at the first vine-logs directory on each branch, see TemplateDiscovery
+    start = time.time()
+    discovery = TemplateDiscovery(root_dir, threads=threads, cache_file=cache_file)
+    results = discovery.find()
+    print(f"Found {len(results)} log directories in {time.time() - start:.1f}s "
+          f"({discovery.listed} of {len(discovery.listings)} directories listed)")
     return results
 
 
+def expand_segment_templates(full_paths):
+    # each log directory whose manager has restarted is replaced by a sub-template per manager run
+    expanded = []
+    for template in full_paths:
+        try:
+            segment_templates = create_segment_templates(template)
+        except Exception as e:
+            print(f"⚠️  Could not index the manager runs of {template}: {e}")
+            segment_templates = []
+        if segment_templates:
+            print(f"🔀 {template}: {len(segment_templates)} manager runs, each parsed into {template}/segment-<k>")
+            expanded.extend(segment_templates)
+        else:
+            expanded.append(template)
+    return expanded
+
+
+def process_template(template, args):
+    data_parser = DataParser(template, debug_mode=args.debug, 
+                             enablee_checkpoint_pkl_files=args.checkpoint_pkl_files, 
+                             jobs=args.jobs,
+                             incremental=args.incremental,
+                             profile=args.profile,
+                             profile_sample_every=args.profile_sample_every,
+                             backend=args.backend,
+                            )
+    if args.load_pkl_files:
+        # only what the report tables are generated from
+        data_parser.load_pkl_files(tables=CSVManager.parsed_state_tables())
+    else:
+        data_parser.parse_logs()
+
+    csv_manager = CSVManager(template,
+                             data_parser=data_parser,
+                             downsampling=args.downsampling > 0,
+                             downsample_task_count=args.downsample_task_count,
+                             downsample_point_count=args.downsample_point_count,
+                             downsampling_method=args.downsampling_method,
+                             stage_jobs=args.stage_jobs)
+    csv_manager.generate_csv_files()
+    if args.profile and csv_manager.stage_wall_times:
+        print("Report table stages: " + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in csv_manager.stage_wall_times.items()))
+    if args.archive:
+        print(f"Archived the report tables to {csv_manager.store.archive()}")
+
+
+def process_templates_serially(full_paths, args):
+    success = 0
+    failed = 0
+
+    for template in full_paths:
+        print(f"\n=== Start parsing: {template}")
+        try:
+            if args.follow:
+                live_tail = LiveTail(template,
+                                     jobs=args.jobs,
+                                     debug_mode=args.debug,
+                                     refresh_interval=args.refresh_interval,
+                                     downsampling=args.downsampling > 0,
+                                     downsample_task_count=args.downsample_task_count,
+                                     downsample_point_count=args.downsample_point_count,
+                                     downsampling_method=args.downsampling_method,
+                                     stage_jobs=args.stage_jobs)
+                live_tail.run()
+                success += 1
+                print(f"✅ Successfully processed: {template}")
+                continue
+
+            process_template(template, args)
+            success += 1
+            print(f"✅ Successfully processed: {template}")
+        except Exception as e:
+            print(f"❌ Error processing {template}")
+            failed += 1
+            print(tb.format_exc())
+
+    return success, failed
+
+
+def process_templates_in_parallel(full_paths, args):
+    counts = {'success': 0, 'failed': 0}
+
+    def on_result(result, console):
+        if result.succeeded:
+            counts['success'] += 1
+            console.print(f"✅ Successfully processed: {result.template} ({result.elapsed:.1f}s)")
+        else:
+            counts['failed'] += 1
+            console.print(f"❌ Error processing {result.template}")
+            console.print(result.output + result.error, markup=False, highlight=False)
+
+    pool = TemplatePool(process_template, args.parallel_templates, min_free_memory_mb=args.min_free_memory_mb)
+    pool.run(full_paths, args, on_result)
+    return counts['success'], counts['failed']
+
+
 def main():
     parser = argparse.ArgumentParser(
         prog='vine_parse',
@@ -122,12 +220,115 @@ def main():
         help='Enable recursive mode'
     )
 
+    parser.add_argument(
+        '--discovery-threads',
+        type=int,
+        default=DEFAULT_DISCOVERY_THREADS,
+        help=f'With -R, number of threads listing directories while looking for log directories (default: {DEFAULT_DISCOVERY_THREADS})'
+    )
+
+    parser.add_argument(
+        '--discovery-cache',
+        nargs='?',
+        const='',
+        default=None,
+        metavar='FILE',
+        help='With -R, remember the directory listings in FILE (default: under ~/.cache/taskvine-report) and only '
+             'list again the directories whose modification time has changed'
+    )
+
     parser.add_argument(
         '-v', '--version',
         action='version',
         version=f'%(prog)s {__version__}'
     )
 
+    parser.add_argument(
+        '--jobs',
+        type=int,
+        default=1,
+        help='Number of processes used to decode and classify the debug log (default: 1)'
+    )
+
+    parser.add_argument(
+        '--stage-jobs',
+        type=int,
+        default=1,
+        help='Number of threads generating the report tables, the stages that do not depend on each other '
+             'run at the same time (default: 1)'
+    )
+
+    parser.add_argument(
+        '--parallel-templates',
+        type=int,
+        default=None,
+        help='Number of log directories processed at the same time, each in its own process, '
+             'on top of the --jobs processes of each (default: 1, the number of CPUs with --segments)'
+    )
+
+    parser.add_argument(
+        '--segments',
+        action='store_true',
+        help='Parse every manager run of a debug log the manager was restarted in, each into its own '
+             'sub-template <log directory>/segment-<k> and in its own process, instead of only the last run'
+    )
+
+    parser.add_argument(
+        '--min-free-memory-mb',
+        type=int,
+        default=2048,
+        help='With --parallel-templates, only start another log directory while at least this much memory '
+             'is available (default: 2048, 0 disables the check)'
+    )
+
+    parser.add_argument(
+        '--backend',
+        choices=PARSER_BACKENDS,
+        default='debug',
+        help='Build the task, worker and file tables from the debug log, or from the transactions log with the '
+             'debug log only read for what it lacks, or skipped if there is none (default: debug)'
+    )
+
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Resume from the state saved by the previous incremental run and only parse what was appended to the debug log'
+    )
+
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='Time the parse stages and the debug log handlers on a sample of the lines, and write the profile '
+             'to json-files/parse-profile.json and json-files/parse-profile.folded (collapsed stacks for flame graphs)'
+    )
+
+    parser.add_argument(
+        '--profile-sample-every',
+        type=int,
+        default=DEFAULT_SAMPLE_EVERY,
+        help=f'With --profile, time one line in this many (default: {DEFAULT_SAMPLE_EVERY})'
+    )
+
+    parser.add_argument(
+        '--follow',
+        action='store_true',
+        help='Keep following the debug log of a running manager and regenerate the plotting data as it grows '
+             '(vine_report pushes the updates to open pages), requires a single log directory'
+    )
+
+    parser.add_argument(
+        '--refresh-interval',
+        type=float,
+        default=5.0,
+        help='Minimum number of seconds between two regenerations of the plotting data with --follow (default: 5)'
+    )
+
+    parser.add_argument(
+        '--archive',
+        action='store_true',
+        help='Also write a zstd compressed Parquet copy of the report tables to report-files/parquet'
+    )
+
     parser.add_argument(
         '--downsampling',
         type=int,
@@ -149,6 +350,14 @@ def main():
         help='Downsample point count (default: 10000)'
     )
 
+    parser.add_argument(
+        '--downsampling-method',
+        choices=DOWNSAMPLING_METHODS,
+        default='extremes',
+        help='How the series of the report tables are downsampled: keep the extremes and evenly spread points, '
+             'Largest-Triangle-Three-Buckets, or the first, last, lowest and highest point of every M4 column (default: extremes)'
+    )
+
     args = parser.parse_args()
 
     check_pip_updates()
@@ -156,7 +365,10 @@ def main():
     root_dir = os.path.abspath(args.logs_dir)
 
     if args.recursive:
-        full_paths = find_valid_dirs(root_dir)
+        cache_file = args.discovery_cache
+        if cache_file == '':
+            cache_file = default_discovery_cache_file(root_dir)
+        full_paths = find_valid_dirs(root_dir, threads=args.discovery_threads, cache_file=cache_file)
     else:
         matched_dirs = find_matching_directories(root_dir, args.templates)
         deduped_names = remove_duplicates_preserve_order(matched_dirs)
@@ -192,37 +404,26 @@ def main():
         print("❌ No valid log directories found to process")
         sys.exit(1)
 
+    if args.segments:
+        full_paths = expand_segment_templates(full_paths)
+
+    if args.parallel_templates is None:
+        # the manager runs of a debug log are parsed side by side
+        args.parallel_templates = (os.cpu_count() or 1) if args.segments else 1
+
+    if args.follow and len(full_paths) != 1:
+        print(f"❌ --follow requires exactly one log directory, {len(full_paths)} were matched")
+        sys.exit(1)
+
     print(f"\n✅ The following {len(full_paths)} log directories will be processed:")
     for path in full_paths:
         print(f"  - {path}")
 
-    # process each directory
-    success = 0
-    failed = 0
-
-    for template in full_paths:
-        print(f"\n=== Start parsing: {template}")
-        try:
-            data_parser = DataParser(template, debug_mode=args.debug, 
-                                     enablee_checkpoint_pkl_files=args.checkpoint_pkl_files, 
-                                    )
-            if args.load_pkl_files:
-                data_parser.load_pkl_files()
-            else:
-                data_parser.parse_logs()
-
-            csv_manager = CSVManager(template,
-                                     data_parser=data_parser,
-                                     downsampling=args.downsampling > 0,
-                                     downsample_task_count=args.downsample_task_count,
-                                     downsample_point_count=args.downsample_point_count)
-            csv_manager.generate_csv_files()
-            success += 1
-            print(f"✅ Successfully processed: {template}")
-        except Exception as e:
-            print(f"❌ Error processing {template}")
-            failed += 1
-            print(tb.format_exc())
+    # process each directory, --follow runs on a single one
+    if args.parallel_templates > 1 and len(full_paths) > 1:
+        success, failed = process_templates_in_parallel(full_paths, args)
+    else:
+        success, failed = process_templates_serially(full_paths, args)
 
     if success > 0:
         print(f"\n🎉 {success} log {'directory' if success == 1 else 'directories'} processed successfully!")
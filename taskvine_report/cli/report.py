@@ -50,11 +50,13 @@ from taskvine_report.routes.task_dependencies import task_dependencies_bp
 from taskvine_report.routes.lock import lock_bp
 from taskvine_report.routes.task_subgraphs import task_subgraphs_bp
 from taskvine_report.routes.export_csv_files import register_csv_export_routes
+from taskvine_report.routes.live_updates import live_updates_bp
 from taskvine_report.utils import check_pip_updates
+from taskvine_report.src.downsampling import DOWNSAMPLING_METHODS
 from taskvine_report import __version__
 
 
-def create_app(logs_dir, downsample_task_bars=100000, downsample_points=10000):
+def create_app(logs_dir, downsample_task_bars=100000, downsample_points=10000, downsampling_method='extremes'):
     package_dir = os.path.dirname(os.path.dirname(__file__))
     template_dir = os.path.join(package_dir, "templates")
     static_dir = os.path.join(package_dir, "static")
@@ -120,9 +122,13 @@ def create_app(logs_dir, downsample_task_bars=100000, downsample_points=10000):
     # Lock
     app.register_blueprint(lock_bp)
 
+    # Live updates of a followed log
+    app.register_blueprint(live_updates_bp)
+
     # Set sampling parameters
     app.config["DOWNSAMPLE_TASK_BARS"] = downsample_task_bars
     app.config["DOWNSAMPLE_POINTS"] = downsample_points
+    app.config["DOWNSAMPLING_METHOD"] = downsampling_method
 
     # Set logger and logs directory
     app.config["RUNTIME_STATE"] = RuntimeState()
@@ -198,6 +204,13 @@ def main():
         help="",
     )
 
+    parser.add_argument(
+        "--downsampling-method",
+        choices=DOWNSAMPLING_METHODS,
+        default="extremes",
+        help="How the charts are downsampled to --downsample-points: extremes, lttb or m4 (default: extremes)",
+    )
+
     parser.add_argument(
         "--port",
         type=int,
@@ -222,7 +235,8 @@ def main():
     print(f"   📁 Logs directory: {logs_dir}")
     print(f"   🌐 Server accessible at:")
 
-    app = create_app(logs_dir, downsample_task_bars=args.downsample_task_bars, downsample_points=args.downsample_points)
+    app = create_app(logs_dir, downsample_task_bars=args.downsample_task_bars, downsample_points=args.downsample_points,
+                     downsampling_method=args.downsampling_method)
 
     if args.host == "0.0.0.0":
         ip_addresses = get_local_ip_addresses()
@@ -1,21 +1,13 @@
-import os
 from flask import Blueprint, current_app, jsonify, make_response
-from io import StringIO
-import pandas as pd
 
-def serve_existing_csv_file(csv_path, download_filename="data.csv"):
-    if not os.path.exists(csv_path):
-        return jsonify({'error': f'CSV file not found: {csv_path}'}), 404
+def serve_report_table_as_csv(store, name, download_filename="data.csv"):
+    if not store.exists(name):
+        return jsonify({'error': f'Report table not found: {store.path(name)}'}), 404
 
-    df = pd.read_csv(csv_path)
-    if df.empty:
+    if store.read(name).is_empty():
         return jsonify({'error': 'CSV is empty'}), 404
 
-    buffer = StringIO()
-    df.to_csv(buffer, index=False)
-    buffer.seek(0)
-
-    response = make_response(buffer.getvalue())
+    response = make_response(store.to_csv(name))
     response.headers['Content-Disposition'] = f'attachment; filename={download_filename}'
     response.headers['Content-Type'] = 'text/csv'
     return response
@@ -27,9 +19,9 @@ def register_csv_export_routes(app):
     @bp.route('/<path:slug>/export-csv')
     def export_csv(slug):
         try:
-            filename = slug.replace('-', '_') + '.csv'
-            csv_path = os.path.join(current_app.config["RUNTIME_STATE"].csv_files_dir, filename)
-            return serve_existing_csv_file(csv_path, filename)
+            # the csv file is generated from the table in the report-files
+            name = slug.replace('-', '_')
+            return serve_report_table_as_csv(current_app.config["RUNTIME_STATE"].store, name, name + '.csv')
         except Exception as e:
             current_app.config["RUNTIME_STATE"].log_error(f"CSV export error for {slug}: {e}")
             return jsonify({'error': str(e)}), 500
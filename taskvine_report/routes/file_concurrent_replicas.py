@@ -7,15 +7,15 @@ file_concurrent_replicas_bp = Blueprint('file_concurrent_replicas', __name__, ur
 @check_and_reload_data()
 def get_file_concurrent_replicas():
     try:
-        df = read_csv_to_fd(current_app.config["RUNTIME_STATE"].csv_file_file_concurrent_replicas)
+        df = read_report_table('file_concurrent_replicas')
         points = extract_points_from_df(df, 'file_idx', 'max_simul_replicas')
 
         x_domain = extract_x_range_from_points(points)
         y_domain = extract_y_range_from_points(points)
 
         return jsonify({
-            'points': downsample_points(points, target_point_count=current_app.config["DOWNSAMPLE_POINTS"]),
-            'file_idx_to_names': dict(zip(df['file_idx'], df['file_name'])),
+            'points': downsample_points(points, target_point_count=current_app.config["DOWNSAMPLE_POINTS"], method=current_app.config["DOWNSAMPLING_METHOD"]),
+            'file_idx_to_names': dict(zip(df['file_idx'].to_list(), df['file_name'].to_list())),
             'x_domain': x_domain,
             'y_domain': y_domain,
             'x_tick_values': compute_linear_tick_values(x_domain),
@@ -20,11 +20,11 @@ def _empty_file_created_size_payload():
 @check_and_reload_data()
 def get_file_created_size():
     try:
-        df = read_csv_to_fd(current_app.config["RUNTIME_STATE"].csv_file_file_created_size)
+        df = read_report_table('file_created_size')
 
         if 'time' not in df.columns:
             current_app.config["RUNTIME_STATE"].log_info(
-                "file_created_size.csv missing time column, returning empty payload"
+                "file_created_size table missing time column, returning empty payload"
             )
             return jsonify(_empty_file_created_size_payload())
 
@@ -33,18 +33,16 @@ def get_file_created_size():
         elif 'delta_size_mb' in df.columns:
             # Backward compatibility for datasets that only contain per-time delta values.
             tmp = (
-                df[['time', 'delta_size_mb']]
-                .dropna()
-                .assign(time=lambda t: pd.to_numeric(t['time'], errors='coerce'))
-                .dropna()
-                .groupby('time', as_index=False)['delta_size_mb'].sum()
-                .sort_values('time')
+                df.select(pl.col('time').cast(pl.Float64, strict=False), pl.col('delta_size_mb').cast(pl.Float64))
+                .drop_nulls()
+                .group_by('time').agg(pl.col('delta_size_mb').sum())
+                .sort('time')
+                .with_columns(pl.col('delta_size_mb').cum_sum().clip(lower_bound=0).alias('cumulative_size_mb'))
             )
-            tmp['cumulative_size_mb'] = tmp['delta_size_mb'].cumsum().clip(lower=0)
             points, unit = extract_size_points_from_df(tmp, 'time', 'cumulative_size_mb')
         else:
             current_app.config["RUNTIME_STATE"].log_info(
-                "file_created_size.csv missing cumulative/delta size columns, returning empty payload"
+                "file_created_size table missing cumulative/delta size columns, returning empty payload"
             )
             return jsonify(_empty_file_created_size_payload())
         
@@ -52,7 +50,7 @@ def get_file_created_size():
         y_domain = extract_y_range_from_points(points)
 
         return jsonify({
-            'points': downsample_points(points, target_point_count=current_app.config["DOWNSAMPLE_POINTS"]),
+            'points': downsample_points(points, target_point_count=current_app.config["DOWNSAMPLE_POINTS"], method=current_app.config["DOWNSAMPLING_METHOD"]),
             'x_domain': x_domain,
             'y_domain': y_domain,
             'x_tick_values': compute_linear_tick_values(x_domain),
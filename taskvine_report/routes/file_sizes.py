@@ -21,10 +21,10 @@ def _empty_file_sizes_payload():
 @check_and_reload_data()
 def get_file_sizes():
     try:
-        df = read_csv_to_fd(current_app.config["RUNTIME_STATE"].csv_file_sizes)
+        df = read_report_table('file_sizes')
         if "file_idx" not in df.columns or "file_name" not in df.columns:
             current_app.config["RUNTIME_STATE"].log_info(
-                "file_sizes.csv missing required columns (file_idx/file_name), returning empty payload"
+                "file_sizes table missing required columns (file_idx/file_name), returning empty payload"
             )
             return jsonify(_empty_file_sizes_payload())
 
@@ -35,7 +35,7 @@ def get_file_sizes():
             unit = "MB"
         elif size_col is None:
             current_app.config["RUNTIME_STATE"].log_info(
-                "file_sizes.csv missing size columns, returning empty payload"
+                "file_sizes table missing size columns, returning empty payload"
             )
             return jsonify(_empty_file_sizes_payload())
         else:
@@ -46,14 +46,14 @@ def get_file_sizes():
         y_domain = extract_y_range_from_points(points)
 
         return jsonify({
-            'points': downsample_points(points, target_point_count=current_app.config["DOWNSAMPLE_POINTS"]),
+            'points': downsample_points(points, target_point_count=current_app.config["DOWNSAMPLE_POINTS"], method=current_app.config["DOWNSAMPLING_METHOD"]),
             'x_domain': x_domain,
             'y_domain': y_domain,
             'x_tick_values': compute_linear_tick_values(x_domain),
             'y_tick_values': compute_linear_tick_values(y_domain),
             'x_tick_formatter': d3_int_formatter(),
             'y_tick_formatter': d3_size_formatter(unit),
-            'file_idx_to_names': dict(zip(df['file_idx'], df['file_name'])),
+            'file_idx_to_names': dict(zip(df['file_idx'].to_list(), df['file_name'].to_list())),
         })
 
     except Exception as e:
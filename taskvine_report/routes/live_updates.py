@@ -0,0 +1,52 @@
+import json
+import time
+from flask import Blueprint, Response, current_app, stream_with_context
+from ..src.live_tail import read_live_status
+
+live_updates_bp = Blueprint(
+    'live_updates', __name__, url_prefix='/api')
+
+# how often the status file written by `vine_parse --follow` is checked, and how often an idle stream is kept alive
+STATUS_CHECK_INTERVAL = 1.0
+KEEPALIVE_INTERVAL = 15.0
+# the follower renews the time of the status at least every minute, a status that says the manager is running but
+# is older than this was left by a follower that is gone (killed, or its machine went down), and the stream ends
+# instead of waiting for updates that never come
+STALE_STATUS_SECONDS = 300.0
+
+
+@live_updates_bp.route('/live-updates')
+def get_live_updates():
+    # server-sent events: one `update` event per refresh of the plotting data, so that the browser does not poll
+    runtime_state = current_app.config["RUNTIME_STATE"]
+    if not runtime_state.runtime_template:
+        return Response(status=204)
+    report_files_dir = runtime_state.store.directory
+
+    def stream():
+        last_seq = None
+        last_sent = time.time()
+        while True:
+            status = read_live_status(report_files_dir)
+            if status is None and last_seq is None:
+                # the template is not being followed, the browser closes the stream on `end` instead of reconnecting
+                yield "event: end\ndata: {}\n\n"
+                return
+            if status and status.get('seq') != last_seq:
+                if last_seq is not None or status.get('manager_running'):
+                    yield f"event: update\ndata: {json.dumps(status)}\n\n"
+                    last_sent = time.time()
+                last_seq = status.get('seq')
+                if not status.get('manager_running'):
+                    yield "event: end\ndata: {}\n\n"
+                    return
+            elif status and time.time() - status.get('time', 0) >= STALE_STATUS_SECONDS:
+                yield "event: end\ndata: {}\n\n"
+                return
+            elif time.time() - last_sent >= KEEPALIVE_INTERVAL:
+                yield ": keepalive\n\n"
+                last_sent = time.time()
+            time.sleep(STATUS_CHECK_INTERVAL)
+
+    return Response(stream_with_context(stream()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
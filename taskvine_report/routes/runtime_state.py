@@ -2,6 +2,7 @@ from taskvine_report.utils import *
 import os
 from pathlib import Path
 from ..src.csv_manager import CSVManager
+from ..src.debug_segments import is_segment_template_name
 from .logger import Logger
 import time
 import traceback
@@ -88,7 +89,7 @@ class RuntimeState(CSVManager):
     @property
     def log_prefix(self):
         if self.runtime_template:
-            return f"[{Path(self.runtime_template).name}]"
+            return f"[{self.runtime_template_name}]"
         else:
             return "APP"
 
@@ -125,15 +126,26 @@ class RuntimeState(CSVManager):
         if self.template_lock.is_locked():
             return False
 
-        if self.runtime_template and runtime_template == os.path.basename(self.runtime_template):
+        if self.runtime_template and runtime_template == self.runtime_template_name:
             return True
 
         self.reload_template(runtime_template)
         return True
     
+    @property
+    def runtime_template_name(self):
+        # the name the pages refer to the template by, <template>/segment-<k> for a manager run of a template
+        return os.path.relpath(self.runtime_template, self.logs_dir)
+
     def reload_template(self, runtime_template):
-        # init template and data parser
-        self.runtime_template = os.path.join(self.logs_dir, Path(runtime_template).name)
+        # init template and data parser, only templates right in the logs directory and their segment
+        # sub-templates can be loaded
+        parts = Path(runtime_template).parts
+        if len(parts) == 2 and not Path(runtime_template).is_absolute() and parts[0] not in ('.', '..') \
+           and is_segment_template_name(parts[1]):
+            self.runtime_template = os.path.join(self.logs_dir, *parts)
+        else:
+            self.runtime_template = os.path.join(self.logs_dir, Path(runtime_template).name)
         super().__init__(self.runtime_template)
 
         # load metadata if available
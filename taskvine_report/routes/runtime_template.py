@@ -1,6 +1,7 @@
 import os
 from pathlib import Path
 from flask import jsonify, request, Blueprint, current_app
+from taskvine_report.src.debug_segments import list_segment_templates
 
 runtime_template_bp = Blueprint(
     'runtime_template', __name__, url_prefix='/api')
@@ -19,10 +20,15 @@ def get_runtime_template_list():
     log_folders = [name for name in os.listdir(current_app.config["RUNTIME_STATE"].logs_dir)
                    if os.path.isdir(os.path.join(current_app.config["RUNTIME_STATE"].logs_dir, name))]
 
-    valid_runtime_templates = [
-        name for name in sorted(log_folders)
-        if all_subfolders_exists(os.path.join(current_app.config["RUNTIME_STATE"].logs_dir, name), ['vine-logs', 'pkl-files'])
-    ]
+    valid_runtime_templates = []
+    for name in sorted(log_folders):
+        template = os.path.join(current_app.config["RUNTIME_STATE"].logs_dir, name)
+        if all_subfolders_exists(template, ['vine-logs', 'pkl-files']):
+            valid_runtime_templates.append(name)
+        # the manager runs parsed by vine_parse --segments are listed as <template>/segment-<k>
+        for segment in list_segment_templates(template):
+            if all_subfolders_exists(os.path.join(template, segment), ['vine-logs', 'pkl-files']):
+                valid_runtime_templates.append(f"{name}/{segment}")
 
     return jsonify(valid_runtime_templates), 200
 
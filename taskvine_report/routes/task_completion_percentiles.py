@@ -7,13 +7,13 @@ task_completion_percentiles_bp = Blueprint('task_completion_percentiles', __name
 @check_and_reload_data()
 def get_task_completion_percentiles():
     try:
-        df = read_csv_to_fd(current_app.config["RUNTIME_STATE"].csv_file_task_completion_percentiles)
+        df = read_report_table('task_completion_percentiles')
         points = extract_points_from_df(df, 'Percentile', 'Completion Time')
         x_domain = list(range(1, 101))
         y_domain = extract_y_range_from_points(points)
 
         return jsonify({
-            'points': downsample_points(points, target_point_count=current_app.config["DOWNSAMPLE_POINTS"]),
+            'points': downsample_points(points, target_point_count=current_app.config["DOWNSAMPLE_POINTS"], method=current_app.config["DOWNSAMPLING_METHOD"]),
             'x_domain': x_domain,
             'y_domain': y_domain,
             'x_tick_values': compute_discrete_tick_values(x_domain),
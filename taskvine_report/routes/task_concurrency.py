@@ -11,16 +11,12 @@ def get_task_concurrency():
         # check if recovery-task-only parameter is set
         recovery_only = request.args.get('recovery-task-only', 'false').lower() == 'true'
         
-        # select appropriate CSV file based on parameter
-        csv_file = (current_app.config["RUNTIME_STATE"].csv_file_task_concurrency_recovery_only 
-                   if recovery_only 
-                   else current_app.config["RUNTIME_STATE"].csv_file_task_concurrency)
-        
-        df = read_csv_to_fd(csv_file)
+        # select appropriate table based on parameter
+        df = read_report_table('task_concurrency_recovery_only' if recovery_only else 'task_concurrency')
         phase_data = {}
         for phase in ['Waiting', 'Committing', 'Executing', 'Retrieving', 'Done']:
             phase_points = extract_points_from_df(df, 'time', phase)
-            phase_data[f"tasks_{phase.lower()}"] = downsample_points(phase_points, target_point_count=current_app.config["DOWNSAMPLE_POINTS"])
+            phase_data[f"tasks_{phase.lower()}"] = downsample_points(phase_points, target_point_count=current_app.config["DOWNSAMPLE_POINTS"], method=current_app.config["DOWNSAMPLING_METHOD"])
 
         x_domain = get_current_time_domain()
         y_domain = extract_y_range_from_series_points(phase_data)
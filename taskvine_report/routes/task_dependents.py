@@ -6,13 +6,13 @@ task_dependents_bp = Blueprint('task_dependents', __name__, url_prefix='/api')
 @task_dependents_bp.route('/task-dependents')
 def get_task_dependents():
     try:
-        df = read_csv_to_fd(current_app.config["RUNTIME_STATE"].csv_file_task_dependents)
+        df = read_report_table('task_dependents')
         points = extract_points_from_df(df, 'Global Index', 'Dependent Count')
         x_domain = extract_x_range_from_points(points)
         y_domain = extract_y_range_from_points(points)
 
         return jsonify({
-            'points': downsample_points(points, target_point_count=current_app.config["DOWNSAMPLE_POINTS"]),
+            'points': downsample_points(points, target_point_count=current_app.config["DOWNSAMPLE_POINTS"], method=current_app.config["DOWNSAMPLING_METHOD"]),
             'x_domain': x_domain,
             'y_domain': y_domain,
             'x_tick_values': compute_linear_tick_values(x_domain),
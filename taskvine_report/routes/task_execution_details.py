@@ -1,6 +1,6 @@
 from taskvine_report.utils import *
 
-import pandas as pd
+import json
 from collections import defaultdict
 from flask import Blueprint, jsonify, current_app
 
@@ -114,6 +114,17 @@ def calculate_legend(successful_tasks, unsuccessful_tasks, workers):
 
     return legend
 
+def parse_time_list(value):
+    # a list of times, written as a string in the csv files of older versions
+    if value is None:
+        return []
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except ValueError:
+            return []
+    return list(value)
+
 def downsample_tasks(tasks, key="execution_time", max_tasks=None):
     if not max_tasks:
         max_tasks = current_app.config["DOWNSAMPLE_TASK_BARS"]
@@ -130,17 +141,16 @@ def downsample_tasks(tasks, key="execution_time", max_tasks=None):
 @check_and_reload_data()
 def get_task_execution_details():
     try:
-        # Read data from CSV file
-        df = read_csv_to_fd(current_app.config["RUNTIME_STATE"].csv_file_task_execution_details)
+        df = read_report_table('task_execution_details')
         
         successful_tasks = []
         unsuccessful_tasks = []
         workers = []
         
         # Process task data
-        task_rows = df[df['record_type'].isin(['successful_tasks', 'unsuccessful_tasks'])]
-        for _, row in task_rows.iterrows():
-            if pd.isna(row['task_id']):
+        task_rows = df.filter(pl.col('record_type').is_in(['successful_tasks', 'unsuccessful_tasks']))
+        for row in task_rows.iter_rows(named=True):
+            if row['task_id'] is None:
                 continue
 
             base_task_data = {
@@ -150,69 +160,56 @@ def get_task_execution_details():
                 'worker_id': int(row['worker_id']),
                 'core_id': int(row['core_id']),
                 'is_recovery_task': bool(row['is_recovery_task']),
-                'input_files': str(row['input_files']) if pd.notna(row['input_files']) else '',
-                'output_files': str(row['output_files']) if pd.notna(row['output_files']) else '',
-                'num_input_files': int(row['num_input_files']) if pd.notna(row['num_input_files']) else 0,
-                'num_output_files': int(row['num_output_files']) if pd.notna(row['num_output_files']) else 0,
-                'task_status': int(row['task_status']) if pd.notna(row['task_status']) else None,
-                'category': str(row['category']) if pd.notna(row['category']) else '',
+                'input_files': str(row['input_files']) if row['input_files'] is not None else '',
+                'output_files': str(row['output_files']) if row['output_files'] is not None else '',
+                'num_input_files': int(row['num_input_files']) if row['num_input_files'] is not None else 0,
+                'num_output_files': int(row['num_output_files']) if row['num_output_files'] is not None else 0,
+                'task_status': int(row['task_status']) if row['task_status'] is not None else None,
+                'category': str(row['category']) if row['category'] is not None else '',
             }
             
             if row['record_type'] == 'successful_tasks':
                 base_task_data.update({
-                    'when_ready': float(row['when_ready']) if pd.notna(row['when_ready']) else None,
-                    'when_running': float(row['when_running']) if pd.notna(row['when_running']) else None,
-                    'time_worker_start': float(row['time_worker_start']) if pd.notna(row['time_worker_start']) else None,
-                    'time_worker_end': float(row['time_worker_end']) if pd.notna(row['time_worker_end']) else None,
-                    'execution_time': float(row['execution_time']) if pd.notna(row['execution_time']) else None,
-                    'when_waiting_retrieval': float(row['when_waiting_retrieval']) if pd.notna(row['when_waiting_retrieval']) else None,
-                    'when_retrieved': float(row['when_retrieved']) if pd.notna(row['when_retrieved']) else None,
-                    'when_done': float(row['when_done']) if pd.notna(row['when_done']) else 'N/A'
+                    'when_ready': float(row['when_ready']) if row['when_ready'] is not None else None,
+                    'when_running': float(row['when_running']) if row['when_running'] is not None else None,
+                    'time_worker_start': float(row['time_worker_start']) if row['time_worker_start'] is not None else None,
+                    'time_worker_end': float(row['time_worker_end']) if row['time_worker_end'] is not None else None,
+                    'execution_time': float(row['execution_time']) if row['execution_time'] is not None else None,
+                    'when_waiting_retrieval': float(row['when_waiting_retrieval']) if row['when_waiting_retrieval'] is not None else None,
+                    'when_retrieved': float(row['when_retrieved']) if row['when_retrieved'] is not None else None,
+                    'when_done': float(row['when_done']) if row['when_done'] is not None else 'N/A'
                 })
                 successful_tasks.append(base_task_data)
             else:  # unsuccessful
                 base_task_data.update({
-                    'when_ready': float(row['when_ready']) if pd.notna(row['when_ready']) else None,
-                    'when_running': float(row['when_running']) if pd.notna(row['when_running']) else None,
-                    'when_failure_happens': float(row['when_failure_happens']) if pd.notna(row['when_failure_happens']) else None,
-                    'execution_time': float(row['execution_time']) if pd.notna(row['execution_time']) else None,
-                    'unsuccessful_checkbox_name': str(row['unsuccessful_checkbox_name']) if pd.notna(row['unsuccessful_checkbox_name']) else 'unknown',
-                    'when_done': float(row['when_done']) if pd.notna(row['when_done']) else 'N/A'
+                    'when_ready': float(row['when_ready']) if row['when_ready'] is not None else None,
+                    'when_running': float(row['when_running']) if row['when_running'] is not None else None,
+                    'when_failure_happens': float(row['when_failure_happens']) if row['when_failure_happens'] is not None else None,
+                    'execution_time': float(row['execution_time']) if row['execution_time'] is not None else None,
+                    'unsuccessful_checkbox_name': str(row['unsuccessful_checkbox_name']) if row['unsuccessful_checkbox_name'] is not None else 'unknown',
+                    'when_done': float(row['when_done']) if row['when_done'] is not None else 'N/A'
                 })
                 unsuccessful_tasks.append(base_task_data)
         
         # Process worker data
-        worker_rows = df[df['record_type'] == 'worker']
-        for _, row in worker_rows.iterrows():
-            if pd.isna(row['worker_id']):
+        worker_rows = df.filter(pl.col('record_type') == 'worker')
+        for row in worker_rows.iter_rows(named=True):
+            if row['worker_id'] is None:
                 continue
                 
-            # Parse time_connected and time_disconnected arrays
-            time_connected = []
-            time_disconnected = []
-            
-            if pd.notna(row['time_connected']):
-                try:
-                    time_connected = eval(row['time_connected'])  # Convert string representation to list
-                except:
-                    time_connected = []
-                    
-            if pd.notna(row['time_disconnected']):
-                try:
-                    time_disconnected = eval(row['time_disconnected'])  # Convert string representation to list
-                except:
-                    time_disconnected = []
-                    
+            time_connected = parse_time_list(row['time_connected'])
+            time_disconnected = parse_time_list(row['time_disconnected'])
+
             workers.append({
-                'hash': str(row['hash']) if pd.notna(row['hash']) else '',
+                'hash': str(row['hash']) if row['hash'] is not None else '',
                 'id': int(row['worker_id']),
                 'worker_entry': str(row['worker_entry']),
                 'time_connected': time_connected,
                 'time_disconnected': time_disconnected,
-                'cores': int(row['cores']) if pd.notna(row['cores']) else 0,
-                'memory_mb': int(row['memory_mb']) if pd.notna(row['memory_mb']) else 0,
-                'disk_mb': int(row['disk_mb']) if pd.notna(row['disk_mb']) else 0,
-                'gpus': int(row['gpus']) if pd.notna(row['gpus']) else 0
+                'cores': int(row['cores']) if row['cores'] is not None else 0,
+                'memory_mb': int(row['memory_mb']) if row['memory_mb'] is not None else 0,
+                'disk_mb': int(row['disk_mb']) if row['disk_mb'] is not None else 0,
+                'gpus': int(row['gpus']) if row['gpus'] is not None else 0
             })
 
         # Calculate y_domain and y_tick_values
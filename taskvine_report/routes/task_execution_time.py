@@ -9,7 +9,7 @@ task_execution_time_bp = Blueprint(
 @check_and_reload_data()
 def get_task_execution_time():
     try:
-        df = read_csv_to_fd(current_app.config["RUNTIME_STATE"].csv_file_task_execution_time)
+        df = read_report_table('task_execution_time')
         points = extract_points_from_df(df, 'Global Index', 'Execution Time', 'Task ID', 'Task Try ID', 'Ran to Completion')
         x_domain = extract_x_range_from_points(points, x_index=0)
         y_domain = extract_y_range_from_points(points, y_index=1)
@@ -19,7 +19,7 @@ def get_task_execution_time():
         failed_count = metadata.get('unsuccessful_tasks', 0)
 
         return jsonify({
-            'points': downsample_points(points, y_index=1, target_point_count=current_app.config["DOWNSAMPLE_POINTS"]),
+            'points': downsample_points(points, y_index=1, target_point_count=current_app.config["DOWNSAMPLE_POINTS"], method=current_app.config["DOWNSAMPLING_METHOD"]),
             'x_domain': x_domain,
             'y_domain': y_domain,
             'x_tick_values': compute_linear_tick_values(x_domain),
@@ -9,7 +9,7 @@ task_response_time_bp = Blueprint(
 @check_and_reload_data()
 def get_task_response_time():
     try:
-        df = read_csv_to_fd(current_app.config["RUNTIME_STATE"].csv_file_task_response_time)
+        df = read_report_table('task_response_time')
         points = extract_points_from_df(df, 'Global Index', 'Response Time', 'Task ID', 'Task Try ID', 'Was Dispatched')
         x_domain = extract_x_range_from_points(points, x_index=0)
         y_domain = extract_y_range_from_points(points, y_index=1)
@@ -20,7 +20,7 @@ def get_task_response_time():
         undispatched_count = metadata.get('undispatched_tasks', 0)
 
         return jsonify({
-            'points': downsample_points(points, y_index=1, target_point_count=current_app.config["DOWNSAMPLE_POINTS"]),
+            'points': downsample_points(points, y_index=1, target_point_count=current_app.config["DOWNSAMPLE_POINTS"], method=current_app.config["DOWNSAMPLING_METHOD"]),
             'x_domain': x_domain,
             'y_domain': y_domain,
             'x_tick_values': compute_linear_tick_values(x_domain),
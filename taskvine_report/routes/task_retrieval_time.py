@@ -7,13 +7,13 @@ task_retrieval_time_bp = Blueprint('task_retrieval_time', __name__, url_prefix='
 @check_and_reload_data()
 def get_task_retrieval_time():
     try:
-        df = read_csv_to_fd(current_app.config["RUNTIME_STATE"].csv_file_task_retrieval_time)
+        df = read_report_table('task_retrieval_time')
         points = extract_points_from_df(df, 'Global Index', 'Retrieval Time')
         x_domain = extract_x_range_from_points(points, x_index=0)
         y_domain = extract_y_range_from_points(points, y_index=1)
 
         return jsonify({
-            'points': downsample_points(points, y_index=1, target_point_count=current_app.config["DOWNSAMPLE_POINTS"]),
+            'points': downsample_points(points, y_index=1, target_point_count=current_app.config["DOWNSAMPLE_POINTS"], method=current_app.config["DOWNSAMPLING_METHOD"]),
             'x_domain': x_domain,
             'y_domain': y_domain,
             'x_tick_values': compute_linear_tick_values(x_domain),
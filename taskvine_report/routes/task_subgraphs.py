@@ -3,13 +3,11 @@ import graphviz
 import os
 from pathlib import Path
 from io import StringIO
-import csv
 from flask import make_response
 import json
 import shutil
 from taskvine_report.utils import *
 import re
-import pandas as pd
 import time
 
 task_subgraphs_bp = Blueprint('task_subgraphs', __name__, url_prefix='/api')
@@ -43,15 +41,15 @@ def sanitize_filename(filename):
     return filename
 
 def generate_legend(df_subgraphs, selected_subgraph_id=None):
-    unique_subgraphs = df_subgraphs['subgraph_id'].unique()
+    subgraph_sizes = df_subgraphs.group_by('subgraph_id').len().sort('subgraph_id')
     return [
         {
             'id': str(int(sg_id)),
-            'label': f"Subgraph {int(sg_id)} ({len(df_subgraphs[df_subgraphs['subgraph_id'] == sg_id])} task{'s' if len(df_subgraphs[df_subgraphs['subgraph_id'] == sg_id]) != 1 else ''})",
+            'label': f"Subgraph {int(sg_id)} ({num_tasks} task{'s' if num_tasks != 1 else ''})",
             'color': '',
             'checked': bool(selected_subgraph_id and int(sg_id) == int(selected_subgraph_id))
         }
-        for sg_id in sorted(unique_subgraphs)
+        for sg_id, num_tasks in subgraph_sizes.iter_rows()
     ]
 
 def find_subgraph_by_filename(df_subgraphs, filename):
@@ -63,12 +61,12 @@ def find_subgraph_by_filename(df_subgraphs, filename):
         return None
     
     # search in both input_files and output_files columns
-    for _, row in df_subgraphs.iterrows():
+    for row in df_subgraphs.iter_rows(named=True):
         subgraph_id = row['subgraph_id']
         
         # check input files
         input_files_str = row.get('input_files', '')
-        if pd.notna(input_files_str) and str(input_files_str).strip():
+        if input_files_str is not None and str(input_files_str).strip():
             input_files = parse_files_with_timing(input_files_str)
             for file_name, _ in input_files:
                 if filename in file_name:  # substring match
@@ -76,7 +74,7 @@ def find_subgraph_by_filename(df_subgraphs, filename):
         
         # check output files
         output_files_str = row.get('output_files', '')
-        if pd.notna(output_files_str) and str(output_files_str).strip():
+        if output_files_str is not None and str(output_files_str).strip():
             output_files = parse_files_with_timing(output_files_str)
             for file_name, _ in output_files:
                 if filename in file_name:  # substring match
@@ -94,7 +92,7 @@ def find_subgraph_by_task_id(df_subgraphs, task_id):
         return None
     
     # search in task_id column - ensure both sides are int for comparison
-    for _, row in df_subgraphs.iterrows():
+    for row in df_subgraphs.iter_rows(named=True):
         try:
             row_task_id = int(row['task_id'])
             if row_task_id == task_id:
@@ -106,7 +104,7 @@ def find_subgraph_by_task_id(df_subgraphs, task_id):
 
 def parse_files_with_timing(files_str):
     files_with_timing = []
-    if pd.notna(files_str) and str(files_str).strip():
+    if files_str is not None and str(files_str).strip():
         for item in str(files_str).split('|'):
             if ':' in item:
                 file_name, timing = item.rsplit(':', 1)
@@ -127,14 +125,14 @@ def build_tasks_and_files(subgraph_tasks):
     tasks_dict = {}
     files_dict = {}
     
-    for _, task_row in subgraph_tasks.iterrows():
+    for task_row in subgraph_tasks.iter_rows(named=True):
         task_id = task_row['task_id']
         failure_count = int(task_row.get('failure_count', 0))
         recovery_count = int(task_row.get('recovery_count', 0))
         
         # get task execution time
         task_execution_time = task_row.get('task_execution_time', None)
-        if pd.notna(task_execution_time):
+        if task_execution_time is not None:
             try:
                 task_execution_time = float(task_execution_time)
             except (ValueError, TypeError):
@@ -414,7 +412,7 @@ def render_svg(subgraph_tasks, svg_file_path, params_dict=None):
             raise Exception("Generated file is not valid SVG")
         
         # generate and save metadata after successful SVG generation
-        subgraph_id = subgraph_tasks.iloc[0]['subgraph_id'] if not subgraph_tasks.empty else 0
+        subgraph_id = subgraph_tasks['subgraph_id'][0] if not subgraph_tasks.is_empty() else 0
         metadata = generate_subgraph_metadata(subgraph_tasks, subgraph_id)
         write_metadata(metadata, metadata_file_path)
 
@@ -445,11 +443,7 @@ def get_task_subgraphs():
             return create_response(error='Invalid subgraph ID', status_code=400)
 
         # read df_subgraphs
-        csv_dir = current_app.config["RUNTIME_STATE"].csv_files_dir
-        if not csv_dir:
-            return create_response(error='CSV directory not configured', status_code=500)
-
-        df_subgraphs = read_csv_to_fd(os.path.join(csv_dir, 'task_subgraphs.csv'))
+        df_subgraphs = read_report_table('task_subgraphs')
         
         # handle filename search when subgraph_id=0 and filename is provided
         if subgraph_id == 0 and filename:
@@ -483,8 +477,8 @@ def get_task_subgraphs():
         if subgraph_id == 0:
             return create_response(legend=generate_legend(df_subgraphs))
 
-        subgraph_tasks = df_subgraphs[df_subgraphs['subgraph_id'] == subgraph_id]
-        if subgraph_tasks.empty:
+        subgraph_tasks = df_subgraphs.filter(pl.col('subgraph_id') == subgraph_id)
+        if subgraph_tasks.is_empty():
             return create_response(
                 legend=generate_legend(df_subgraphs),
                 error='Subgraph not found'
@@ -7,14 +7,14 @@ worker_concurrency_bp = Blueprint('worker_concurrency', __name__, url_prefix='/a
 @check_and_reload_data()
 def get_worker_concurrency():
     try:
-        df = read_csv_to_fd(current_app.config["RUNTIME_STATE"].csv_file_worker_concurrency)
+        df = read_report_table('worker_concurrency')
         points = extract_points_from_df(df, 'time', 'Active Workers (count)')
         
         x_domain = get_current_time_domain()
         y_domain = extract_y_range_from_points(points)
 
         return jsonify({
-            'points': downsample_points(points, target_point_count=current_app.config["DOWNSAMPLE_POINTS"]),
+            'points': downsample_points(points, target_point_count=current_app.config["DOWNSAMPLE_POINTS"], method=current_app.config["DOWNSAMPLING_METHOD"]),
             'x_domain': x_domain,
             'y_domain': y_domain,
             'x_tick_values': compute_linear_tick_values(x_domain),
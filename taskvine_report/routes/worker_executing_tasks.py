@@ -7,14 +7,14 @@ worker_executing_tasks_bp = Blueprint('worker_executing_tasks', __name__, url_pr
 @check_and_reload_data()
 def get_worker_executing_tasks():
     try:
-        df = read_csv_to_fd(current_app.config["RUNTIME_STATE"].csv_file_worker_executing_tasks)
-        data = extract_series_points_dict(df, 'time')
+        df = read_worker_series_table('worker_executing_tasks', 'executing_tasks')
+        data = extract_worker_series_points_dict(df, 'executing_tasks')
         
         x_domain = get_current_time_domain()
         y_domain = extract_y_range_from_series_points(data)
 
         return jsonify({
-            'executing_tasks_data': downsample_series_points(data),
+            'executing_tasks_data': downsample_series_points(data, method=current_app.config["DOWNSAMPLING_METHOD"]),
             'x_domain': x_domain,
             'y_domain': y_domain,
             'x_tick_values': compute_linear_tick_values(x_domain),
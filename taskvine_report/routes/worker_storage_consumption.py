@@ -5,36 +5,14 @@ worker_storage_consumption_bp = Blueprint(
     'worker_storage_consumption', __name__, url_prefix='/api'
 )
 
-def _is_worker_storage_column(column_name):
-    if not isinstance(column_name, str):
-        return False
-    if column_name in {"time", "workflow_completion_percentage"}:
-        return False
-
-    # Worker series are written as "<host>:<port>:<core>"
-    parts = column_name.rsplit(":", 2)
-    if len(parts) != 3:
-        return False
-    host, port, core = parts
-    return bool(host) and port.isdigit() and core.isdigit()
-
-def _sanitize_worker_storage_df(df):
-    if "time" not in df.columns:
-        raise KeyError("Missing required column in worker storage CSV: time")
-
-    worker_cols = [col for col in df.columns if _is_worker_storage_column(col)]
-    kept_columns = ["time"] + worker_cols
-    dropped_columns = [col for col in df.columns if col not in kept_columns]
-    return df[kept_columns], dropped_columns
-
 def aggregate_storage_data(df):
-    if len(df.columns) <= 1:
-        return []
-    df_indexed = df.set_index('time')
-    df_filled = df_indexed.ffill().fillna(0)
-    aggregated_series = df_filled.sum(axis=1)
-    aggregated = aggregated_series.reset_index()
-    aggregated.columns = ['time', 'total_storage']
+    # the total at every time a worker changed: the changes of all workers, summed by time and accumulated
+    changes = df.select(
+        'time',
+        (pl.col('storage_mb') - pl.col('storage_mb').shift(1).over('worker').fill_null(0)).alias('change'),
+    )
+    aggregated = changes.group_by('time').agg(pl.col('change').sum()).sort('time').select(
+        'time', pl.col('change').cum_sum().alias('total_storage'))
     return extract_points_from_df(aggregated, 'time', 'total_storage')
 
 @worker_storage_consumption_bp.route('/worker-storage-consumption')
@@ -43,12 +21,7 @@ def get_worker_storage_consumption():
     try:
         accumulated = request.args.get('accumulated', 'false').lower() == 'true'
         
-        raw_df = read_csv_to_fd(current_app.config["RUNTIME_STATE"].csv_file_worker_storage_consumption)
-        df, dropped_columns = _sanitize_worker_storage_df(raw_df)
-        if dropped_columns:
-            current_app.config["RUNTIME_STATE"].log_info(
-                f"Ignoring non-worker storage columns: {dropped_columns}"
-            )
+        df = read_worker_series_table('worker_storage_consumption', 'storage_mb')
         x_domain = get_current_time_domain()
         
         if accumulated:
@@ -61,7 +34,7 @@ def get_worker_storage_consumption():
             y_domain = extract_y_range_from_points(accumulated_points)
             
             return jsonify({
-                'accumulated_data': downsample_points(accumulated_points, target_point_count=current_app.config["DOWNSAMPLE_POINTS"]),
+                'accumulated_data': downsample_points(accumulated_points, target_point_count=current_app.config["DOWNSAMPLE_POINTS"], method=current_app.config["DOWNSAMPLING_METHOD"]),
                 'x_domain': x_domain,
                 'y_domain': y_domain,
                 'x_tick_values': compute_linear_tick_values(x_domain),
@@ -70,12 +43,12 @@ def get_worker_storage_consumption():
                 'y_tick_formatter': d3_size_formatter(unit),
             })
         else:
-            storage_data = extract_series_points_dict(df, 'time')
+            storage_data = extract_worker_series_points_dict(df, 'storage_mb')
             storage_data, size_unit = scale_storage_series_points(storage_data)
             y_domain = extract_y_range_from_series_points(storage_data)
             
             return jsonify({
-                'storage_data': downsample_series_points(storage_data),
+                'storage_data': downsample_series_points(storage_data, method=current_app.config["DOWNSAMPLING_METHOD"]),
                 'x_domain': x_domain,
                 'y_domain': y_domain,
                 'x_tick_values': compute_linear_tick_values(x_domain),
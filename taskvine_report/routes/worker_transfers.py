@@ -5,16 +5,15 @@ worker_transfers_bp = Blueprint('worker_transfers', __name__, url_prefix='/api')
 
 def _get_worker_transfer_data(role):
     try:
-        csv_attr = "csv_file_worker_incoming_transfers" if role == "incoming" else "csv_file_worker_outgoing_transfers"
-        df = read_csv_to_fd(current_app.config["RUNTIME_STATE"].__getattribute__(csv_attr))
+        df = read_worker_series_table(f"worker_{role}_transfers", 'transfers')
 
-        data = extract_series_points_dict(df, 'time')
+        data = extract_worker_series_points_dict(df, 'transfers')
 
         x_domain = get_current_time_domain()
         y_domain = extract_y_range_from_series_points(data)
 
         return jsonify({
-            'transfers': downsample_series_points(data),
+            'transfers': downsample_series_points(data, method=current_app.config["DOWNSAMPLING_METHOD"]),
             'x_domain': x_domain,
             'y_domain': y_domain,
             'x_tick_values': compute_linear_tick_values(x_domain),
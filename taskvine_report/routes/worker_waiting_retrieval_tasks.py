@@ -7,13 +7,13 @@ worker_waiting_retrieval_tasks_bp = Blueprint('worker_waiting_retrieval_tasks',
 @check_and_reload_data()
 def get_worker_waiting_retrieval_tasks():
     try:
-        df = read_csv_to_fd(current_app.config["RUNTIME_STATE"].csv_file_worker_waiting_retrieval_tasks)
-        data = extract_series_points_dict(df, 'time')
+        df = read_worker_series_table('worker_waiting_retrieval_tasks', 'waiting_retrieval_tasks')
+        data = extract_worker_series_points_dict(df, 'waiting_retrieval_tasks')
         x_domain = get_current_time_domain()
         y_domain = extract_y_range_from_series_points(data)
 
         return jsonify({
-            'waiting_retrieval_tasks_data': downsample_series_points(data),
+            'waiting_retrieval_tasks_data': downsample_series_points(data, method=current_app.config["DOWNSAMPLING_METHOD"]),
             'x_domain': x_domain,
             'y_domain': y_domain,
             'x_tick_values': compute_linear_tick_values(x_domain),
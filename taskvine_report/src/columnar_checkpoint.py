@@ -0,0 +1,339 @@
+import os
+import pyarrow as pa
+import pyarrow.parquet as pq
+from bitarray import bitarray
+from collections import defaultdict
+from datetime import timezone, timedelta
+from .task_info import TaskInfo
+from .worker_info import WorkerInfo
+from .file_info import FileInfo
+from .transfer_table import TransferTable
+from .manager_info import ManagerInfo
+from .compact import small_set
+from .symbol_table import SymbolTable
+
+
+# bump whenever a table changes shape
+COLUMNAR_CHECKPOINT_VERSION = 3
+
+TASK_ENTRY_TYPE = pa.struct([('task_id', pa.int64()), ('task_try_id', pa.int64())])
+# files and workers are referred to by their ids in DataParser.file_symbols and DataParser.worker_symbols
+SYMBOL_ID_TYPE = pa.int32()
+
+TASK_SCHEMA = pa.schema([
+    ('task_id', pa.int64()),
+    ('task_try_id', pa.int64()),
+    ('category', pa.string()),
+    ('input_files', pa.list_(SYMBOL_ID_TYPE)),
+    ('output_files', pa.list_(SYMBOL_ID_TYPE)),
+    ('is_recovery_task', pa.bool_()),
+    ('exhausted_resources', pa.bool_()),
+    ('task_status', pa.int64()),
+    ('task_status_name', pa.string()),
+    ('exit_status', pa.int64()),
+    ('output_length', pa.int64()),
+    ('bytes_sent', pa.int64()),
+    ('sandbox_used', pa.int64()),
+    ('stdout_size_mb', pa.float64()),
+    ('when_ready', pa.float64()),
+    ('when_running', pa.float64()),
+    ('time_worker_start', pa.float64()),
+    ('time_worker_end', pa.float64()),
+    ('when_waiting_retrieval', pa.float64()),
+    ('when_retrieved', pa.float64()),
+    ('when_done', pa.float64()),
+    ('when_failure_happens', pa.float64()),
+    ('worker_id', SYMBOL_ID_TYPE),
+    ('core_id', pa.list_(pa.int64())),
+    ('committed_worker_hash', pa.string()),
+    ('cores_requested', pa.int64()),
+    ('gpus_requested', pa.int64()),
+    ('memory_requested_mb', pa.int64()),
+    ('disk_requested_mb', pa.int64()),
+    ('execution_time', pa.float64()),
+    ('is_library_task', pa.bool_()),
+    ('function_slots', pa.int64()),
+])
+
+WORKER_SCHEMA = pa.schema([
+    ('ip', pa.string()),
+    ('port', pa.int64()),
+    ('connect_id', pa.int64()),
+    ('id', SYMBOL_ID_TYPE),
+    ('hash', pa.string()),
+    ('machine_name', pa.string()),
+    ('transfer_port', pa.int64()),
+    ('cores', pa.int64()),
+    ('gpus', pa.int64()),
+    ('memory_mb', pa.int64()),
+    ('disk_mb', pa.int64()),
+    ('time_connected', pa.list_(pa.float64())),
+    ('time_disconnected', pa.list_(pa.float64())),
+    ('coremap', pa.list_(pa.uint8())),
+    ('is_checkpoint_worker', pa.bool_()),
+    ('tasks_completed', pa.list_(TASK_ENTRY_TYPE)),
+    ('tasks_failed', pa.list_(TASK_ENTRY_TYPE)),
+    ('tasks_running', pa.list_(pa.int64())),
+    ('current_replicas', pa.list_(SYMBOL_ID_TYPE)),
+])
+
+FILE_SCHEMA = pa.schema([
+    ('file_id', SYMBOL_ID_TYPE),
+    ('filename', pa.string()),
+    ('size_mb', pa.float64()),
+    ('created_time', pa.float64()),
+    ('file_idx', pa.int64()),
+    ('producers', pa.list_(TASK_ENTRY_TYPE)),
+    ('consumers', pa.list_(TASK_ENTRY_TYPE)),
+])
+
+# transfers the manager started have a transfer_id, the dense id of TransferTable, a source is either a url
+# or a worker
+TRANSFER_SCHEMA = pa.schema([
+    ('file_id', SYMBOL_ID_TYPE),
+    ('transfer_id', SYMBOL_ID_TYPE),
+    ('dest_worker_id', SYMBOL_ID_TYPE),
+    ('source', pa.string()),
+    ('source_worker_id', SYMBOL_ID_TYPE),
+    ('time_start_stage_in', pa.float64()),
+    ('time_stage_in', pa.float64()),
+    ('time_stage_out', pa.float64()),
+])
+
+SUBGRAPH_SCHEMA = pa.schema([
+    ('subgraph_id', pa.int64()),
+    ('task_id', pa.int64()),
+    ('task_try_id', pa.int64()),
+])
+
+# tables a table's objects refer to, they are loaded along with it. Ids of files and workers are valid without
+# their tables, which are only needed to resolve them
+TABLE_DEPENDENCIES = {
+    'manager': (),
+    'tasks': (),
+    'workers': ('tasks',),
+    'files': (),
+    'transfers': ('files',),
+    'subgraphs': (),
+}
+TABLE_NAMES = tuple(TABLE_DEPENDENCIES)
+
+
+def _task_entries(entries):
+    return [{'task_id': task_id, 'task_try_id': task_try_id} for task_id, task_try_id in entries]
+
+
+class ColumnarCheckpoint:
+    """
+    The parsed state of a runtime template stored as one Parquet table per entity: tasks (one row per try),
+    workers, files, transfers, subgraph membership and the manager.
+
+    Tables are read memory-mapped and can be restricted to the columns a consumer needs with `read_table`.
+    `load_into` rebuilds the parser objects, only for the tables asked for (and those they refer to).
+    Collections keep the iteration order they had in the parser, so the rebuilt state is the same as the
+    one that was written, and the file and worker tables rebuild the symbol tables of the parser in id order.
+    """
+    def __init__(self, checkpoint_dir):
+        self.checkpoint_dir = checkpoint_dir
+
+    def table_path(self, name):
+        return os.path.join(self.checkpoint_dir, f'{name}.parquet')
+
+    def exists(self):
+        return all(os.path.exists(self.table_path(name)) for name in TABLE_NAMES)
+
+    def _write_table(self, name, table):
+        table = table.replace_schema_metadata({'checkpoint_version': str(COLUMNAR_CHECKPOINT_VERSION)})
+        tmp_path = self.table_path(name) + '.tmp'
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, self.table_path(name))
+
+    def read_table(self, name, columns=None):
+        table = pq.read_table(self.table_path(name), columns=columns, memory_map=True)
+        version = (table.schema.metadata or {}).get(b'checkpoint_version')
+        if version != str(COLUMNAR_CHECKPOINT_VERSION).encode():
+            raise ValueError(f"checkpoint table {name} has version {version}, expected {COLUMNAR_CHECKPOINT_VERSION}")
+        return table
+
+    def read_columns(self, name, columns=None):
+        # plain python lists per column, which is the fastest way to get many objects out of a table
+        table = self.read_table(name, columns)
+        return {column: table.column(column).to_pylist() for column in table.column_names}, table.num_rows
+
+    # writing
+
+    def write(self, dp):
+        self.write_manager(dp.manager)
+        self.write_tasks(dp.tasks)
+        self.write_workers(dp.workers)
+        self.write_files(dp.files)
+        self.write_transfers(dp.transfers)
+        self.write_subgraphs(dp.subgraphs)
+
+    def write_manager(self, manager):
+        # a single row, the time zone is rebuilt from its offset like set_time_zone does
+        row = {k: v for k, v in vars(manager).items() if k != 'equivalent_tz'}
+        self._write_table('manager', pa.Table.from_pylist([row]))
+
+    def write_tasks(self, tasks):
+        columns = {name: [] for name in TASK_SCHEMA.names}
+        plain_columns = [name for name in TASK_SCHEMA.names if name not in ('input_files', 'output_files')]
+        for task in tasks.values():
+            for name in plain_columns:
+                columns[name].append(getattr(task, name))
+            columns['input_files'].append(list(task.input_files))
+            columns['output_files'].append(list(task.output_files))
+        self._write_table('tasks', pa.Table.from_pydict(columns, schema=TASK_SCHEMA))
+
+    def write_workers(self, workers):
+        columns = {name: [] for name in WORKER_SCHEMA.names}
+        plain_columns = [name for name in WORKER_SCHEMA.names if name not in (
+            'coremap', 'tasks_completed', 'tasks_failed', 'tasks_running', 'current_replicas')]
+        for worker in workers.values():
+            for name in plain_columns:
+                columns[name].append(getattr(worker, name))
+            columns['coremap'].append(worker.coremap.tolist() if worker.coremap is not None else None)
+            columns['tasks_completed'].append(_task_entries((t.task_id, t.task_try_id) for t in worker.tasks_completed))
+            columns['tasks_failed'].append(_task_entries((t.task_id, t.task_try_id) for t in worker.tasks_failed))
+            columns['tasks_running'].append(list(worker.tasks_running))
+            columns['current_replicas'].append(list(worker.current_replicas))
+        self._write_table('workers', pa.Table.from_pydict(columns, schema=WORKER_SCHEMA))
+
+    def write_files(self, files):
+        columns = {name: [] for name in FILE_SCHEMA.names}
+        for file in files.values():
+            columns['file_id'].append(file.file_id)
+            columns['filename'].append(file.filename)
+            columns['size_mb'].append(file.size_mb)
+            columns['created_time'].append(file.created_time)
+            columns['file_idx'].append(file.file_idx)
+            columns['producers'].append(_task_entries(file.producers))
+            columns['consumers'].append(_task_entries(file.consumers))
+        self._write_table('files', pa.Table.from_pydict(columns, schema=FILE_SCHEMA))
+
+    def write_transfers(self, transfers):
+        # the transfer table as it is, in row order
+        frame = transfers.frame()
+        columns = {
+            'file_id': frame['file_id'],
+            'transfer_id': frame['transfer_id'],
+            'dest_worker_id': frame['dest_worker_id'],
+            'source': frame['source_url'],
+            'source_worker_id': frame['source_worker_id'],
+            'time_start_stage_in': frame['t_start'],
+            'time_stage_in': frame['t_stage_in'],
+            'time_stage_out': frame['t_stage_out'],
+        }
+        arrays = [columns[field.name].to_arrow().cast(field.type) for field in TRANSFER_SCHEMA]
+        self._write_table('transfers', pa.Table.from_arrays(arrays, schema=TRANSFER_SCHEMA))
+
+    def write_subgraphs(self, subgraphs):
+        columns = {name: [] for name in SUBGRAPH_SCHEMA.names}
+        for subgraph_id, task_entries in subgraphs.items():
+            for task_id, task_try_id in task_entries:
+                columns['subgraph_id'].append(subgraph_id)
+                columns['task_id'].append(task_id)
+                columns['task_try_id'].append(task_try_id)
+        self._write_table('subgraphs', pa.Table.from_pydict(columns, schema=SUBGRAPH_SCHEMA))
+
+    # loading
+
+    def load_into(self, dp, tables=TABLE_NAMES):
+        to_load = set()
+        pending = list(tables)
+        while pending:
+            name = pending.pop()
+            if name not in TABLE_DEPENDENCIES:
+                raise ValueError(f"unknown checkpoint table {name}")
+            if name not in to_load:
+                to_load.add(name)
+                pending.extend(TABLE_DEPENDENCIES[name])
+
+        # dependencies first
+        for name in TABLE_NAMES:
+            if name in to_load:
+                getattr(self, f'load_{name}')(dp)
+
+    def load_manager(self, dp):
+        row = self.read_table('manager').to_pylist()[0]
+        manager = ManagerInfo()
+        for k, v in row.items():
+            setattr(manager, k, v)
+        if manager.time_zone_offset_hours is not None:
+            manager.equivalent_tz = timezone(timedelta(hours=manager.time_zone_offset_hours))
+        dp.manager = manager
+
+    def load_tasks(self, dp):
+        columns, num_rows = self.read_columns('tasks')
+        plain_columns = [name for name in columns if name not in (
+            'task_id', 'task_try_id', 'input_files', 'output_files')]
+        tasks = {}
+        for i in range(num_rows):
+            task = TaskInfo(columns['task_id'][i], columns['task_try_id'][i])
+            for name in plain_columns:
+                setattr(task, name, columns[name][i])
+            task.input_files = small_set(columns['input_files'][i])
+            task.output_files = small_set(columns['output_files'][i])
+            task.core_id = tuple(task.core_id)
+            tasks[task.task_entry] = task
+        dp.tasks = tasks
+
+    def load_workers(self, dp):
+        columns, num_rows = self.read_columns('workers')
+        plain_columns = [name for name in columns if name not in (
+            'ip', 'port', 'connect_id', 'coremap', 'tasks_completed', 'tasks_failed', 'tasks_running', 'current_replicas')]
+        worker_symbols = SymbolTable(first_id=1)
+        workers = {}
+        for i in range(num_rows):
+            worker = WorkerInfo(columns['ip'][i], columns['port'][i], columns['connect_id'][i])
+            for name in plain_columns:
+                setattr(worker, name, columns[name][i])
+            if worker_symbols.intern(worker.worker_entry) != worker.id:
+                raise ValueError(f"worker {worker.get_worker_key()} is out of id order in the checkpoint")
+            if columns['coremap'][i] is not None:
+                worker.coremap = bitarray(columns['coremap'][i])
+            worker.tasks_completed = [dp.tasks[(e['task_id'], e['task_try_id'])] for e in columns['tasks_completed'][i]]
+            worker.tasks_failed = [dp.tasks[(e['task_id'], e['task_try_id'])] for e in columns['tasks_failed'][i]]
+            worker.tasks_running = set(columns['tasks_running'][i])
+            worker.current_replicas = set(columns['current_replicas'][i])
+            workers[worker.id] = worker
+        dp.workers = workers
+        dp.worker_symbols = worker_symbols
+
+    def load_files(self, dp):
+        columns, num_rows = self.read_columns('files')
+
+        def task_entry(e):
+            # share the key tuple with the loaded task, if any
+            entry = (e['task_id'], e['task_try_id'])
+            task = dp.tasks.get(entry)
+            return task.task_entry if task is not None else entry
+
+        file_symbols = SymbolTable()
+        files = {}
+        for i in range(num_rows):
+            file_id = columns['file_id'][i]
+            if file_symbols.intern(columns['filename'][i]) != file_id:
+                raise ValueError(f"file {columns['filename'][i]} is out of id order in the checkpoint")
+            file = FileInfo(file_id, columns['filename'][i], columns['size_mb'][i], columns['created_time'][i])
+            file.file_idx = columns['file_idx'][i]
+            file.producers = small_set(task_entry(e) for e in columns['producers'][i])
+            file.consumers = small_set(task_entry(e) for e in columns['consumers'][i])
+            files[file_id] = file
+        dp.files = files
+        dp.file_symbols = file_symbols
+
+    def load_transfers(self, dp):
+        columns, num_rows = self.read_columns('transfers')
+        sources = [worker_id if worker_id is not None else url for worker_id, url in zip(columns['source_worker_id'], columns['source'])]
+        transfers = TransferTable()
+        transfers.append_columns(columns['file_id'], columns['dest_worker_id'], sources, columns['transfer_id'],
+                                 columns['time_start_stage_in'], columns['time_stage_in'], columns['time_stage_out'])
+        dp.transfers = transfers
+
+    def load_subgraphs(self, dp):
+        columns, num_rows = self.read_columns('subgraphs')
+        subgraphs = defaultdict(set)
+        for subgraph_id, task_id, task_try_id in zip(columns['subgraph_id'], columns['task_id'], columns['task_try_id']):
+            subgraphs[subgraph_id].add((task_id, task_try_id))
+        dp.subgraphs = dict(subgraphs)
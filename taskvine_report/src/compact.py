@@ -0,0 +1,70 @@
+"""
+Building blocks for the per-task, per-file and per-transfer records, of which a large run has millions.
+
+Small collections such as the input files of a task or the consumers of a file are kept as tuples, which
+take a fraction of the memory of a set, and only become sets once they grow past SMALL_SET_MAX_SIZE so
+that membership tests stay cheap. Both support `in`, iteration and `len`, so readers do not need to care
+which one they get. Dicts that usually stay empty start out as the shared EMPTY_DICT and are only
+allocated on the first insert.
+"""
+
+SMALL_SET_MAX_SIZE = 8
+
+
+def small_set(items=()):
+    items = tuple(dict.fromkeys(items))
+    return items if len(items) <= SMALL_SET_MAX_SIZE else set(items)
+
+
+def small_set_add(collection, item):
+    # returns the collection to store back, the tuple form is immutable
+    if isinstance(collection, set):
+        collection.add(item)
+        return collection
+    if item in collection:
+        return collection
+    if len(collection) < SMALL_SET_MAX_SIZE:
+        return collection + (item,)
+    return set(collection + (item,))
+
+
+class _EmptyDict(dict):
+    __slots__ = ()
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("EMPTY_DICT is shared by all records and cannot be modified")
+
+    __setitem__ = __delitem__ = setdefault = update = pop = popitem = clear = _read_only
+
+    def __reduce__(self):
+        # pickles and copies refer to the shared instance
+        return 'EMPTY_DICT'
+
+
+EMPTY_DICT = _EmptyDict()
+
+
+class SlottedRecord:
+    """
+    Base class of the records that declare __slots__, so that instances carry no __dict__.
+    Pickles written before the records were slotted hold a plain attribute dict, which is restored here.
+    Renamed attributes are listed in LEGACY_ATTRIBUTES (old name: new name) and take precedence over the
+    new name, attributes that no longer exist are dropped.
+    """
+    __slots__ = ()
+    LEGACY_ATTRIBUTES = {}
+
+    def __setstate__(self, state):
+        if isinstance(state, tuple):
+            dict_state, slots_state = state
+            state = {**(dict_state or {}), **(slots_state or {})}
+        for name, value in state.items():
+            if name in self.LEGACY_ATTRIBUTES:
+                continue
+            try:
+                setattr(self, name, value)
+            except AttributeError:
+                pass
+        for legacy_name, name in self.LEGACY_ATTRIBUTES.items():
+            if legacy_name in state:
+                setattr(self, name, state[legacy_name])
@@ -0,0 +1,161 @@
+import gzip
+import io
+import lzma
+import mmap
+import os
+import queue
+import threading
+
+
+# the debug log may be archived as debug.gz, debug.xz or debug.zst, it is read without decompressing it to disk
+DEBUG_LOG_NAMES = ['debug', 'debug.gz', 'debug.xz', 'debug.zst']
+
+# the compression is told from the first bytes of the file, not from its name
+MAGIC_NUMBERS = [
+    (b'\x1f\x8b', 'gzip'),
+    (b'\xfd7zXZ\x00', 'xz'),
+    (b'\x28\xb5\x2f\xfd', 'zstd'),
+]
+
+# the decompressing thread stays at most this many blocks ahead of the reader
+DECOMPRESS_BLOCK_SIZE = 1 << 20
+DECOMPRESS_READ_AHEAD_BLOCKS = 16
+
+
+def find_debug_log(vine_logs_dir):
+    # the plain debug log if there is one, otherwise the first compressed one, None if there is neither
+    for name in DEBUG_LOG_NAMES:
+        path = os.path.join(vine_logs_dir, name)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def detect_compression(path):
+    # 'gzip', 'xz', 'zstd', or None for a plain file
+    with open(path, 'rb') as f:
+        head = f.read(6)
+    for magic, compression in MAGIC_NUMBERS:
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def _open_decompressor(f, compression):
+    if compression == 'gzip':
+        # reads all the members of a multi-member file
+        return gzip.GzipFile(fileobj=f, mode='rb')
+    if compression == 'xz':
+        return lzma.LZMAFile(f, mode='rb')
+    if compression == 'zstd':
+        try:
+            import zstandard
+        except ImportError:
+            raise ValueError("reading a zstd compressed debug log requires the zstandard package, "
+                             "install it with: pip install zstandard")
+        # the frames of a seekable or concatenated zstd file are read one after the other
+        return zstandard.ZstdDecompressor().stream_reader(f, read_across_frames=True)
+    raise ValueError(f"unknown compression {compression}")
+
+
+class DecompressingReader(io.RawIOBase):
+    """
+    A compressed file read as a stream of decompressed bytes.
+
+    The file is decompressed by a background thread, a few blocks ahead of the reader, so that decompression
+    (which releases the GIL) overlaps with parsing the lines. `compressed_position` is how much of the compressed
+    file has been consumed for the bytes returned so far, which is what progress is reported in.
+    """
+    def __init__(self, path, compression):
+        self.compression = compression
+        self.compressed_position = 0
+        self._file = open(path, 'rb')
+        self._decompressor = _open_decompressor(self._file, compression)
+        self._blocks = queue.Queue(maxsize=DECOMPRESS_READ_AHEAD_BLOCKS)
+        self._block = memoryview(b'')
+        self._block_offset = 0
+        self._eof = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._decompress, daemon=True)
+        self._thread.start()
+
+    def _put(self, item):
+        while not self._stop.is_set():
+            try:
+                self._blocks.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _decompress(self):
+        try:
+            while True:
+                block = self._decompressor.read(DECOMPRESS_BLOCK_SIZE)
+                if not self._put((block, self._file.tell())) or not block:
+                    return
+        except Exception as e:
+            self._put((e, None))
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while self._block_offset >= len(self._block):
+            if self._eof:
+                return 0
+            block, position = self._blocks.get()
+            if isinstance(block, Exception):
+                raise block
+            if not block:
+                self._eof = True
+                return 0
+            self._block = memoryview(block)
+            self._block_offset = 0
+            self.compressed_position = position
+        size = min(len(buffer), len(self._block) - self._block_offset)
+        buffer[:size] = self._block[self._block_offset:self._block_offset + size]
+        self._block_offset += size
+        return size
+
+    def close(self):
+        if not self.closed:
+            self._stop.set()
+            self._thread.join()
+            self._decompressor.close()
+            self._file.close()
+        super().close()
+
+
+def open_log(path, compression=None, start=0, memory_map=False):
+    """
+    Open a log for reading in binary mode at the byte offset `start` of its decompressed content.
+    Compressed logs can only be read forward, the bytes before `start` are decompressed and skipped.
+    With `memory_map`, a plain (non-empty) log is memory-mapped, its lines are read with `readline` straight
+    from the page cache instead of being copied through a read buffer first.
+    """
+    if compression is None:
+        f = open(path, 'rb')
+        if memory_map and os.fstat(f.fileno()).st_size > 0:
+            # the map keeps its own handle on the file
+            with f:
+                f = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        f.seek(start)
+        return f
+
+    f = io.BufferedReader(DecompressingReader(path, compression), buffer_size=DECOMPRESS_BLOCK_SIZE)
+    remaining = start
+    while remaining > 0:
+        skipped = len(f.read(min(remaining, DECOMPRESS_BLOCK_SIZE)))
+        if not skipped:
+            break
+        remaining -= skipped
+    return f
+
+
+def compressed_position(f):
+    # how far a log opened by open_log has been read on disk
+    raw = getattr(f, 'raw', None)
+    if isinstance(raw, DecompressingReader):
+        return raw.compressed_position
+    return f.tell()
@@ -1,8 +1,46 @@
 from .data_parser import DataParser
+from .report_store import ReportStore
+from .stage_scheduler import Stage, StageScheduler
+from .time_axis import TimeAxis, centiseconds_to_seconds
 from collections import defaultdict
 from taskvine_report.utils import *
 
 
+# the TaskInfo times the task metrics and the task concurrency are computed from
+TASK_METRICS_TIME_FIELDS = ['when_ready', 'when_running', 'time_worker_start', 'time_worker_end', 'when_failure_happens',
+                            'when_waiting_retrieval', 'when_retrieved', 'when_done']
+
+# the stages of generate_csv_files: name, method, what it reads from the parsed state and the tables it writes,
+# none reads another's tables
+GENERATION_STAGES = (
+    ('metadata', 'generate_metadata',
+     ('manager', 'tasks', 'workers', 'files'),
+     ('metadata',)),
+    ('file_metrics', 'generate_file_metrics',
+     ('files', 'transfers', 'workers'),
+     ('file_concurrent_replicas', 'file_created_size', 'file_transferred_size', 'file_retention_time', 'file_sizes',
+      'worker_incoming_transfers', 'worker_outgoing_transfers', 'worker_storage_consumption',
+      'worker_storage_consumption_percentage', 'file_replica_activation_intervals')),
+    ('task_metrics', 'generate_task_metrics',
+     ('tasks',),
+     ('task_execution_time', 'task_response_time', 'task_retrieval_time', 'task_dependencies', 'task_dependents',
+      'task_completion_percentiles')),
+    ('task_concurrency', 'generate_task_concurrency_data',
+     ('tasks',),
+     ('task_concurrency', 'task_concurrency_recovery_only')),
+    ('task_execution_details', 'generate_task_execution_details_metrics',
+     ('tasks', 'workers', 'files'),
+     ('task_execution_details',)),
+    ('worker_metrics', 'generate_worker_metrics',
+     ('tasks', 'workers'),
+     ('worker_lifetime', 'worker_concurrency', 'worker_executing_tasks', 'worker_waiting_retrieval_tasks')),
+    # the subgraphs are computed again from the tasks and files, the checkpointed ones are not read
+    ('subgraphs', 'generate_subgraphs_and_graph_metrics',
+     ('tasks', 'files', 'transfers'),
+     ('task_subgraphs',)),
+)
+
+
 class CompletionIndex:
     def __init__(self, finish_times: list[float], total_tasks: int):
         self.total = max(int(total_tasks), 1)
@@ -69,49 +107,44 @@ class CompletionIndex:
         return joined.select([time_col, out_col] + [c for c in cols if c not in (time_col, out_col)])
         
 
+def cumulative_worker_series(events, value_col):
+    """
+    The running sum of the +/- `delta` events of every worker at each of its distinct times, clipped at 0.
+    `events` has `worker_id`, `time` in centiseconds and `delta`, the series has `worker_id`, `time` in
+    seconds and `value_col`, sorted by worker and time.
+    """
+    series = (
+        events.group_by('worker_id', 'time').agg(pl.col('delta').sum())
+        .sort('worker_id', 'time')
+        .with_columns(pl.col('delta').cum_sum().over('worker_id').clip(lower_bound=0).cast(pl.Float64).alias(value_col))
+    )
+    return series.select('worker_id', centiseconds_to_seconds(series['time']), value_col)
+
+
 class CSVManager:
     def __init__(self, runtime_template,
                  data_parser=None,
                  downsampling=True,
                  downsample_task_count=10000,
-                 downsample_point_count=1000):
+                 downsample_point_count=1000,
+                 downsampling_method='extremes',
+                 stage_jobs=1):
         self.runtime_template = runtime_template
         if not self.runtime_template:
             return
 
+        # number of generation stages run at the same time, and the wall time of each stage once generated
+        self.stage_jobs = stage_jobs
+        self.stage_wall_times = {}
+
         self.downsampling = downsampling
         self.downsample_task_count = downsample_task_count if self.downsampling else sys.maxsize
         self.downsample_point_count = downsample_point_count if self.downsampling else sys.maxsize
+        self.downsampling_method = downsampling_method
 
-        # csv files
-        self.csv_files_dir = os.path.join(self.runtime_template, 'csv-files')
-        ensure_dir(self.csv_files_dir, replace=False)
-        self.csv_file_time_domain = os.path.join(self.csv_files_dir, 'time_domain.csv')
-        self.csv_file_file_concurrent_replicas = os.path.join(self.csv_files_dir, 'file_concurrent_replicas.csv')
-        self.csv_file_metadata = os.path.join(self.csv_files_dir, 'metadata.csv')
-        self.csv_file_file_created_size = os.path.join(self.csv_files_dir, 'file_created_size.csv')
-        self.csv_file_file_transferred_size = os.path.join(self.csv_files_dir, 'file_transferred_size.csv')
-        self.csv_file_worker_concurrency = os.path.join(self.csv_files_dir, 'worker_concurrency.csv')
-        self.csv_file_retention_time = os.path.join(self.csv_files_dir, 'file_retention_time.csv')
-        self.csv_file_task_execution_time = os.path.join(self.csv_files_dir, 'task_execution_time.csv')
-        self.csv_file_task_response_time = os.path.join(self.csv_files_dir, 'task_response_time.csv')
-        self.csv_file_task_concurrency = os.path.join(self.csv_files_dir, 'task_concurrency.csv')
-        self.csv_file_task_concurrency_recovery_only = os.path.join(self.csv_files_dir, 'task_concurrency_recovery_only.csv')
-        self.csv_file_task_retrieval_time = os.path.join(self.csv_files_dir, 'task_retrieval_time.csv')
-        self.csv_file_task_dependencies = os.path.join(self.csv_files_dir, 'task_dependencies.csv')
-        self.csv_file_task_dependents = os.path.join(self.csv_files_dir, 'task_dependents.csv')
-        self.csv_file_task_completion_percentiles = os.path.join(self.csv_files_dir, 'task_completion_percentiles.csv')
-        self.csv_file_sizes = os.path.join(self.csv_files_dir, 'file_sizes.csv')
-        self.csv_file_worker_lifetime = os.path.join(self.csv_files_dir, 'worker_lifetime.csv')
-        self.csv_file_worker_executing_tasks = os.path.join(self.csv_files_dir, 'worker_executing_tasks.csv')
-        self.csv_file_worker_waiting_retrieval_tasks = os.path.join(self.csv_files_dir, 'worker_waiting_retrieval_tasks.csv')
-        self.csv_file_worker_incoming_transfers = os.path.join(self.csv_files_dir, 'worker_incoming_transfers.csv')
-        self.csv_file_worker_outgoing_transfers = os.path.join(self.csv_files_dir, 'worker_outgoing_transfers.csv')
-        self.csv_file_worker_storage_consumption = os.path.join(self.csv_files_dir, 'worker_storage_consumption.csv')
-        self.csv_file_worker_storage_consumption_percentage = os.path.join(self.csv_files_dir, 'worker_storage_consumption_percentage.csv')
-        self.csv_file_task_subgraphs = os.path.join(self.csv_files_dir, 'task_subgraphs.csv')
-        self.csv_file_task_execution_details = os.path.join(self.csv_files_dir, 'task_execution_details.csv')
-        self.csv_file_file_replica_activation_intervals = os.path.join(self.csv_files_dir, 'file_replica_activation_intervals.csv')
+        # the tables the report is drawn from
+        self.store = ReportStore(self.runtime_template)
+        ensure_dir(self.store.directory, replace=False)
 
         # svg files
         self.svg_files_dir = os.path.join(self.runtime_template, 'svg-files')
@@ -123,145 +156,165 @@ class CSVManager:
             self.MIN_TIME, self.MAX_TIME = self.dp.manager.get_min_max_time()
             if self.MAX_TIME and self.MIN_TIME:
                 self.time_domain = [0, self.MAX_TIME - self.MIN_TIME]
-                df = pd.DataFrame({
-                    'MIN_TIME': [self.MIN_TIME],
-                    'MAX_TIME': [self.MAX_TIME]
+                df = pl.DataFrame({
+                    'MIN_TIME': [float(self.MIN_TIME)],
+                    'MAX_TIME': [float(self.MAX_TIME)]
                 })
-                write_df_to_csv(df, self.csv_file_time_domain, index=False)
+                self.store.write('time_domain', df)
             self.ci = CompletionIndex.from_dp(self.dp)
 
     def add_workflow_completion_percentage(self, df, time_col: str = 'time'):
         assert time_col in df.columns, "time column is required"
         return self.ci.apply(df, time_col=time_col)
 
+    def downsample_worker_series(self, series, value_col):
+        # only the workers with more points than downsample_point_count are downsampled, each on its own
+        counts = series.group_by('worker_id').len()
+        large = counts.filter(pl.col('len') > self.downsample_point_count)['worker_id']
+        if large.is_empty():
+            return series
+        parts = [series.filter(~pl.col('worker_id').is_in(large.implode()))]
+        for worker_id in large.sort():
+            points = series.filter(pl.col('worker_id') == worker_id).select('time', value_col)
+            points = downsample_df_polars(points, y_col=value_col, downsample_point_count=self.downsample_point_count, method=self.downsampling_method)
+            parts.append(points.select(pl.lit(worker_id, dtype=series.schema['worker_id']).alias('worker_id'), 'time', value_col))
+        return pl.concat(parts).sort('worker_id', 'time', maintain_order=True)
+
+    def worker_series_table(self, series, value_col):
+        """
+        The series of all workers as one long table, `worker` (the worker key, <ip>:<port>:<connect id>),
+        `time` and `value_col`, a row per point of a worker. The rows are sorted by worker and time, so the
+        points of a worker are a single slice of the table, see `extract_worker_series_points_dict`.
+        """
+        keys = pl.DataFrame([
+            pl.Series('worker_id', list(self.dp.workers.keys()), dtype=series.schema['worker_id']),
+            pl.Series('worker', [worker.get_worker_key() for worker in self.dp.workers.values()], dtype=pl.String),
+        ])
+        return (
+            series.join(keys, on='worker_id', how='inner')
+            .select('worker', pl.col('time').cast(pl.Float64), pl.col(value_col).cast(pl.Float64))
+            .sort('worker', 'time', maintain_order=True)
+        )
+
     def generate_csv_files(self):
         # return if no tasks were dispatched
         if not self.MIN_TIME:
             return
 
+        stages = self.generation_stages()
+        scheduler = StageScheduler(stages, jobs=self.stage_jobs)
         with create_progress_bar() as progress:
-            task_id = progress.add_task("[green]Generating plotting data", total=7)
-
-            self.generate_metadata()
-            progress.advance(task_id)
+            task_id = progress.add_task("[green]Generating plotting data", total=len(stages))
+            self.stage_wall_times = scheduler.run(on_stage_done=lambda stage: progress.advance(task_id))
 
-            self.generate_file_metrics()
-            progress.advance(task_id)
+    def generation_stages(self):
+        return [Stage(name, getattr(self, method), inputs=inputs, outputs=outputs)
+                for name, method, inputs, outputs in GENERATION_STAGES]
 
-            self.generate_task_metrics()
-            progress.advance(task_id)
+    @staticmethod
+    def parsed_state_tables():
+        # the tables of the parsed state the stages read, all a checkpoint has to load to generate the report
+        tables = []
+        for _, _, inputs, _ in GENERATION_STAGES:
+            tables.extend(name for name in inputs if name not in tables)
+        return tuple(tables)
 
-            self.generate_task_concurrency_data()
-            progress.advance(task_id)
+    def generate_file_metrics(self):
+        time_axis = TimeAxis(self.MIN_TIME)
+
+        files = pl.DataFrame([
+            pl.Series('file_id', [file.file_id for file in self.dp.files.values()], dtype=pl.Int64),
+            pl.Series('file_idx', [file.file_idx for file in self.dp.files.values()], dtype=pl.Int64),
+            pl.Series('file_name', [file.filename for file in self.dp.files.values()], dtype=pl.String),
+            pl.Series('size_mb', [file.size_mb for file in self.dp.files.values()], dtype=pl.Float64),
+            pl.Series('has_producers', [len(file.producers) > 0 for file in self.dp.files.values()], dtype=pl.Boolean),
+        ])
+        # the times of the transfers in centiseconds since MIN_TIME
+        transfers = self.dp.transfers.frame().join(files.select('file_id', 'size_mb'), on='file_id', how='left', maintain_order='left')
+        transfers = transfers.with_columns(
+            time_axis.expr(pl.col('t_start')).alias('start'),
+            time_axis.expr(pl.col('t_stage_in')).alias('stage_in'),
+            time_axis.expr(pl.col('t_stage_out')).alias('stage_out'),
+        )
 
-            self.generate_task_execution_details_metrics()
-            progress.advance(task_id)
+        # per file, of the files created by tasks
+        per_file = (
+            transfers.group_by('file_id')
+            .agg(
+                pl.col('stage_in').min().alias('first_stage_in'),
+                pl.col('start').min().alias('first_start'),
+                pl.col('stage_out').max().alias('last_stage_out'),
+                pl.col('t_start').min().alias('created_time'),
+            )
+        )
+        per_file = files.filter(pl.col('has_producers')).join(per_file, on='file_id', how='inner', maintain_order='left')
+
+        # the most replicas of a file alive at once, from one sort of the stage-in (+1) and stage-out (-1) events
+        # of all files: the events of a file add up to 0, so the running sum starts over at every file. At the
+        # same time, the events follow the order of their rows, a start before the end of its own replica
+        replicas = transfers.filter(pl.col('stage_in').is_not_null() & pl.col('stage_out').is_not_null())
+        replica_events = pl.concat([
+            replicas.select('file_id', 'row', pl.col('stage_in').alias('time'), pl.lit(0, dtype=pl.Int8).alias('end'),
+                            pl.lit(1, dtype=pl.Int64).alias('delta')),
+            replicas.select('file_id', 'row', pl.col('stage_out').alias('time'), pl.lit(1, dtype=pl.Int8).alias('end'),
+                            pl.lit(-1, dtype=pl.Int64).alias('delta')),
+        ])
+        max_replicas = (
+            replica_events.sort('file_id', 'time', 'row', 'end')
+            .with_columns(pl.col('delta').cum_sum().alias('alive'))
+            .group_by('file_id')
+            .agg(pl.col('alive').max().alias('max_simul_replicas'))
+        )
+        rows_file_concurrent_replicas = per_file.join(max_replicas, on='file_id', how='left', maintain_order='left').select(
+            'file_idx', 'file_name', pl.col('max_simul_replicas').fill_null(0),
+        )
 
-            self.generate_worker_metrics()
-            progress.advance(task_id)
-            
-            self.generate_subgraphs_and_graph_metrics()
-            progress.advance(task_id)
+        rows_file_created_size = per_file.filter(pl.col('first_stage_in').is_not_null()).select(
+            pl.col('first_stage_in').alias('time'), pl.col('size_mb').alias('delta_size_mb'))
 
-    def generate_file_metrics(self):
-        base_time = self.MIN_TIME
+        rows_file_retention_time = per_file.filter(pl.col('first_start').is_not_null() & pl.col('last_stage_out').is_not_null()).select(
+            'file_idx', 'file_name', (pl.col('last_stage_out') - pl.col('first_start')).alias('retention_time'))
 
-        rows_file_concurrent_replicas = []
-        rows_file_created_size = []
-        rows_file_transferred_size = []
-        rows_file_retention_time = []
-        rows_sizes = []
-        max_size = 0
-
-        all_worker_storage = defaultdict(list)
-        rows_worker_transfer_events = {
-            'incoming': defaultdict(list),
-            'outgoing': defaultdict(list)
-        }
+        rows_sizes = per_file.filter(pl.col('size_mb').is_not_null() & pl.col('created_time').is_not_null()).select(
+            'file_idx', 'file_name', pl.col('size_mb').alias('file_size'))
 
-        for file in self.dp.files.values():
-            flattened_transfers = file.get_flattened_transfers()
-            if not flattened_transfers:
-                continue
+        # a replica counts as transferred when it was staged in, or when it went away without ever being staged in
+        rows_file_transferred_size = transfers.select(
+            pl.coalesce('stage_in', 'stage_out').alias('time'), pl.col('size_mb').alias('delta_size_mb')
+        ).drop_nulls('time')
 
-            for transfer in flattened_transfers:
-                # file transferred size
-                if transfer.time_stage_in:
-                    t = floor_decimal(float(transfer.time_stage_in - base_time), 2)
-                    rows_file_transferred_size.append((t, file.size_mb))
-                elif transfer.time_stage_out:
-                    t = floor_decimal(float(transfer.time_stage_out - base_time), 2)
-                    rows_file_transferred_size.append((t, file.size_mb))
-
-                # worker storage consumption
-                if transfer.time_stage_in:
-                    time_in = floor_decimal(transfer.time_stage_in - base_time, 2)
-                    time_out = floor_decimal(transfer.time_stage_out - base_time, 2)
-                    size = max(0, file.size_mb)
-                    all_worker_storage[transfer.dest_worker_entry].extend([(time_in, size), (time_out, -size)])
-
-                # worker incoming / outgoing transfers
-                for role in ['incoming', 'outgoing']:
-                    if role == "incoming":
-                        wid = transfer.dest_worker_entry
-                    else:
-                        wid = getattr(transfer, 'source', None)
-                        if not isinstance(wid, tuple):
-                            wid = None
-                    if wid is None:
-                        continue
+        # a replica takes space on its worker from its stage-in to its stage-out
+        stored = transfers.filter(pl.col('stage_in').is_not_null() & pl.col('stage_out').is_not_null())
+        size = pl.col('size_mb').clip(lower_bound=0)
+        rows_worker_storage_consumption = pl.concat([
+            stored.select(pl.col('dest_worker_id').alias('worker_id'), pl.col('stage_in').alias('time'), size.alias('delta')),
+            stored.select(pl.col('dest_worker_id').alias('worker_id'), pl.col('stage_out').alias('time'), (-size).alias('delta')),
+        ])
 
-                    t0 = floor_decimal(transfer.time_start_stage_in - base_time, 2)
-                    t1 = None
-                    if transfer.time_stage_in is not None:
-                        t1 = floor_decimal(transfer.time_stage_in - base_time, 2)
-                    elif transfer.time_stage_out is not None:
-                        t1 = floor_decimal(transfer.time_stage_out - base_time, 2)
-                    if t1 is not None and t1 >= t0:
-                        rows_worker_transfer_events[role][wid].extend([(t0, 1), (t1, -1)])
+        # a transfer is in flight from its start until the replica is staged in or goes away
+        in_flight = transfers.with_columns(pl.coalesce('stage_in', 'stage_out').alias('end')).filter(
+            pl.col('end').is_not_null() & (pl.col('end') >= pl.col('start')))
 
-            if not file.producers:
-                continue
-            intervals = [
-                (t.time_stage_in, t.time_stage_out)
-                for t in flattened_transfers
-                if t.time_stage_in and t.time_stage_out
-            ]
-            max_simul = max_interval_overlap(intervals)
-            rows_file_concurrent_replicas.append((file.file_idx, file.filename, max_simul, file.created_time))
-
-            stage_times = np.array([t.time_stage_in for t in flattened_transfers if t.time_stage_in is not None])
-            if stage_times.size > 0:
-                t = np.floor((stage_times.min() - base_time) * 100) / 100
-                rows_file_created_size.append((t, file.size_mb))
-
-            times = np.array([t.time_start_stage_in for t in flattened_transfers if t.time_start_stage_in is not None])
-            first_stage_in = times.min() if times.size > 0 else float('inf')
-            last_stage_out = max((t.time_stage_out for t in flattened_transfers if t.time_stage_out), default=float('-inf'))
-            if first_stage_in != float('inf') and last_stage_out != float('-inf'):
-                retention_time = floor_decimal(last_stage_out - first_stage_in, 2)
-                rows_file_retention_time.append((file.file_idx, file.filename, retention_time, file.created_time))
-
-            fname = file.filename
-            size = file.size_mb
-            if size is not None:
-                created_time = min((t.time_start_stage_in for t in flattened_transfers if t.time_start_stage_in), default=float('inf'))
-                if created_time != float('inf'):
-                    rows_sizes.append((file.file_idx, fname, size, created_time))
-                    max_size = max(max_size, size)
+        def transfer_events(worker_column):
+            flights = in_flight.filter(pl.col(worker_column).is_not_null())
+            return pl.concat([
+                flights.select(pl.col(worker_column).alias('worker_id'), pl.col('start').alias('time'), pl.lit(1.0).alias('delta')),
+                flights.select(pl.col(worker_column).alias('worker_id'), pl.col('end').alias('time'), pl.lit(-1.0).alias('delta')),
+            ])
 
         def _process_rows_file_concurrent_replicas(rows_file_concurrent_replicas):
-            if not rows_file_concurrent_replicas:
+            if rows_file_concurrent_replicas.is_empty():
                 return pl.DataFrame({
                     'file_idx': [],
                     'file_name': [],
                     'max_simul_replicas': [],
                 })
-            df = pl.DataFrame(rows_file_concurrent_replicas, schema=['file_idx', 'file_name', 'max_simul_replicas', 'created_time'], orient="row")
+            df = rows_file_concurrent_replicas
             downsampled_df = downsample_df_polars(
                 df.select(['file_idx', 'max_simul_replicas']),
                 y_col='max_simul_replicas',
-                downsample_point_count=self.downsample_point_count
+                downsample_point_count=self.downsample_point_count,
+                method=self.downsampling_method
             )
             df = downsampled_df.join(
                 df.select(['file_idx', 'file_name']),
@@ -269,56 +322,40 @@ class CSVManager:
                 how='left'
             )
             return df.select(['file_idx', 'file_name', 'max_simul_replicas'])
-        write_df_to_csv(_process_rows_file_concurrent_replicas(rows_file_concurrent_replicas), self.csv_file_file_concurrent_replicas)
+        self.store.write('file_concurrent_replicas', _process_rows_file_concurrent_replicas(rows_file_concurrent_replicas))
 
-        def _process_rows_file_created_size(rows_file_created_size):
-            if not rows_file_created_size:
+        def _process_rows_size_over_time(rows):
+            if rows.is_empty():
                 return pl.DataFrame({
                     'time': [],
                     'delta_size_mb': [],
                 })
-            df = pl.DataFrame(rows_file_created_size, schema=['time', 'delta_size_mb'], orient="row")
-            df = df.with_columns(pl.col('time').round(2))
-            df = df.group_by('time').agg(pl.col('delta_size_mb').sum()).sort('time')
+            df = rows.group_by('time').agg(pl.col('delta_size_mb').sum()).sort('time')
             df = df.with_columns(pl.col('delta_size_mb').cum_sum().clip(0).alias('cumulative_size_mb'))
+            df = df.with_columns(centiseconds_to_seconds(df['time']))
             downsampled_df = downsample_df_polars(
                 df.select(['time', 'cumulative_size_mb']),
                 y_col='cumulative_size_mb',
-                downsample_point_count=self.downsample_point_count
+                downsample_point_count=self.downsample_point_count,
+                method=self.downsampling_method
             )
             return downsampled_df.select(['time', 'cumulative_size_mb'])
-        write_df_to_csv(_process_rows_file_created_size(rows_file_created_size), self.csv_file_file_created_size)
-
-        def _process_rows_file_transferred_size(rows_file_transferred_size):
-            if not rows_file_transferred_size:
-                return pl.DataFrame({
-                    'time': [],
-                    'delta_size_mb': [],
-                })
-            df = pl.DataFrame(rows_file_transferred_size, schema=['time', 'delta_size_mb'], orient="row")
-            df = df.with_columns(pl.col('time').round(2))
-            df = df.group_by('time').agg(pl.col('delta_size_mb').sum()).sort('time')
-            df = df.with_columns(pl.col('delta_size_mb').cum_sum().clip(0).alias('cumulative_size_mb'))
-            downsampled_df = downsample_df_polars(
-                df.select(['time', 'cumulative_size_mb']),
-                y_col='cumulative_size_mb',
-                downsample_point_count=self.downsample_point_count
-            )
-            return downsampled_df.select(['time', 'cumulative_size_mb'])
-        write_df_to_csv(_process_rows_file_transferred_size(rows_file_transferred_size), self.csv_file_file_transferred_size)
+        self.store.write('file_created_size', _process_rows_size_over_time(rows_file_created_size))
+        self.store.write('file_transferred_size', _process_rows_size_over_time(rows_file_transferred_size))
 
         def _process_rows_file_retention_time(rows_file_retention_time):
-            if not rows_file_retention_time:
+            if rows_file_retention_time.is_empty():
                 return pl.DataFrame({
                     'file_idx': [],
                     'file_name': [],
                     'retention_time': [],
                 })
-            df = pl.DataFrame(rows_file_retention_time, schema=['file_idx', 'file_name', 'retention_time', 'created_time'], orient="row")
+            df = rows_file_retention_time.with_columns(centiseconds_to_seconds(rows_file_retention_time['retention_time']))
             downsampled_df = downsample_df_polars(
                 df.select(['file_idx', 'retention_time']),
                 y_col='retention_time',
-                downsample_point_count=self.downsample_point_count
+                downsample_point_count=self.downsample_point_count,
+                method=self.downsampling_method
             )
             df = downsampled_df.join(
                 df.select(['file_idx', 'file_name']),
@@ -326,20 +363,21 @@ class CSVManager:
                 how='left'
             )
             return df.select(['file_idx', 'file_name', 'retention_time'])
-        write_df_to_csv(_process_rows_file_retention_time(rows_file_retention_time), self.csv_file_retention_time)
+        self.store.write('file_retention_time', _process_rows_file_retention_time(rows_file_retention_time))
         
         def _process_rows_file_sizes(rows_sizes):
-            if not rows_sizes:
+            if rows_sizes.is_empty():
                 return pl.DataFrame({
                     'file_idx': [],
                     'file_name': [],
                     'file_size': [],
                 })
-            df = pl.DataFrame(rows_sizes, schema=['file_idx', 'file_name', 'file_size', 'created_time'], orient="row")
+            df = rows_sizes
             downsampled_df = downsample_df_polars(
                 df.select(['file_idx', 'file_size']),
                 y_col='file_size',
-                downsample_point_count=self.downsample_point_count
+                downsample_point_count=self.downsample_point_count,
+                method=self.downsampling_method
             )
             df = downsampled_df.join(
                 df.select(['file_idx', 'file_name']),
@@ -350,138 +388,69 @@ class CSVManager:
             unit, scale = get_size_unit_and_scale(max_size)
             df = df.with_columns((pl.col('file_size') * scale).alias(f'file_size_{unit.lower()}'))
             return df.select(['file_idx', 'file_name', f'file_size_{unit.lower()}'])
-        write_df_to_csv(_process_rows_file_sizes(rows_sizes), self.csv_file_sizes)
+        self.store.write('file_sizes', _process_rows_file_sizes(rows_sizes))
 
         def _process_rows_worker_transfers(rows_worker_transfer_events):
+            series = cumulative_worker_series(rows_worker_transfer_events, 'transfers')
+            return self.worker_series_table(self.downsample_worker_series(series, 'transfers'), 'transfers')
+        self.store.write('worker_incoming_transfers', _process_rows_worker_transfers(transfer_events('dest_worker_id')))
+        self.store.write('worker_outgoing_transfers', _process_rows_worker_transfers(transfer_events('source_worker_id')))
+
+        storage_series = cumulative_worker_series(rows_worker_storage_consumption, 'storage_mb')
+
+        # zero storage at the connection and disconnection times of every worker, over its own points at those times
+        boundary_workers = []
+        boundary_times = []
+        for worker_id, worker in self.dp.workers.items():
+            assert len(worker.time_connected) == 1
+            assert len(worker.time_disconnected) == 1
+            boundary_workers += [worker_id, worker_id]
+            boundary_times += [time_axis.scalar(worker.time_connected[0]), time_axis.scalar(worker.time_disconnected[0])]
+        storage_boundaries = pl.DataFrame([
+            pl.Series('worker_id', boundary_workers, dtype=storage_series.schema['worker_id']),
+            centiseconds_to_seconds(pl.Series('time', boundary_times, dtype=pl.Int64)),
+        ])
+        disk_mb = pl.DataFrame([
+            pl.Series('worker_id', list(self.dp.workers.keys()), dtype=storage_series.schema['worker_id']),
+            pl.Series('disk_mb', [worker.disk_mb for worker in self.dp.workers.values()], dtype=pl.Float64),
+        ])
 
-            if not rows_worker_transfer_events:
-                return pl.DataFrame({
-                    'time': [],
-                    'cumulative': [],
-                })
-            
-            col_data = {}
-            all_times = set()
-            for wid, events in rows_worker_transfer_events.items():
-                if not events:
-                    continue
-
-                arr = np.asarray(events, dtype=np.float64)
-                arr = arr[arr[:, 0].argsort()]
-                times, idx = np.unique(arr[:, 0], return_inverse=True)
-                delta = np.bincount(idx, weights=arr[:, 1], minlength=len(times))
-                cumulative = np.clip(np.cumsum(delta), 0, None)
-                df = pl.DataFrame({'time': times, 'cumulative': cumulative})
-                if df.height > self.downsample_point_count:
-                    df = downsample_df_polars(df, y_col='cumulative', downsample_point_count=self.downsample_point_count)
-                key = f"{wid[0]}:{wid[1]}:{wid[2]}"
-                col_data[key] = {float(row[0]): float(row[1]) for row in df.iter_rows()}
-                all_times.update(col_data[key].keys())
-            if not col_data:
-                return pl.DataFrame({
-                    'time': [],
-                    'cumulative': [],
-                })
-            sorted_times = sorted(all_times)
-            out_df = pl.DataFrame({'time': sorted_times})
-            for key in sorted(col_data):
-                values = [col_data[key].get(t, None) for t in sorted_times]
-                out_df = out_df.with_columns(pl.Series(name=key, values=values))
-            return out_df
-        write_df_to_csv(_process_rows_worker_transfers(rows_worker_transfer_events['incoming']), self.csv_file_worker_incoming_transfers)
-        write_df_to_csv(_process_rows_worker_transfers(rows_worker_transfer_events['outgoing']), self.csv_file_worker_outgoing_transfers)
-
-        def _process_rows_worker_storage_consumption(rows_worker_storage_consumption, workers=None, percentage=False):
-            col_data = {}
-            all_times = set()
-            for wid, events in rows_worker_storage_consumption.items():
-                arr = np.asarray(events, dtype=np.float64)
-                if arr.shape[0] == 0:
-                    continue
-                arr = arr[arr[:, 0].argsort()]
-                times, idx = np.unique(arr[:, 0], return_inverse=True)
-                delta = np.bincount(idx, weights=arr[:, 1], minlength=len(times))
-                cumulative = np.clip(np.cumsum(delta), 0, None)
-                if percentage and workers is not None:
-                    worker = workers.get(wid)
-                    if not worker or worker.disk_mb <= 0:
-                        continue
-                    cumulative = cumulative / worker.disk_mb * 100
-                df = pl.DataFrame({'time': times, 'cumulative': cumulative})
-                if df.height > self.downsample_point_count:
-                    df = downsample_df_polars(df, y_col='cumulative', downsample_point_count=self.downsample_point_count)
-                key = f"{wid[0]}:{wid[1]}:{wid[2]}"
-                col_data[key] = {float(row[0]): float(row[1]) for row in df.iter_rows()}
-                all_times.update(col_data[key].keys())
-
-            # Ensure zero storage at connection boundary times per worker: time_connected[0] and time_disconnected[0], applied last
-            if workers is not None:
-                for w_key, w in workers.items():
-                    key = f"{w_key[0]}:{w_key[1]}:{w_key[2]}"
-                    if key not in col_data:
-                        col_data[key] = {}
-                    assert len(w.time_connected) == 1
-                    assert len(w.time_disconnected) == 1
-                    t0 = floor_decimal(float(w.time_connected[0] - base_time), 2)
-                    col_data[key][float(t0)] = 0.0
-                    all_times.add(float(t0))
-                    t1 = floor_decimal(float(w.time_disconnected[0] - base_time), 2)
-                    col_data[key][float(t1)] = 0.0
-                    all_times.add(float(t1))
-
-            sorted_times = sorted(all_times)
-            out_df = pl.DataFrame({'time': sorted_times})
-
-            # filter out negative time
-            out_df = out_df.filter(pl.col("time") >= 0)
-
-            if col_data:
-                worker_data = {
-                    key: [col_data[key].get(t, None) for t in out_df['time']]
-                    for key in sorted(col_data)
-                }
-                out_df = out_df.hstack(pl.DataFrame(worker_data))
-
-            return self.add_workflow_completion_percentage(out_df)
-
-        write_df_to_csv(_process_rows_worker_storage_consumption(all_worker_storage, workers=self.dp.workers, percentage=False), self.csv_file_worker_storage_consumption)
-        write_df_to_csv(_process_rows_worker_storage_consumption(all_worker_storage, workers=self.dp.workers, percentage=True), self.csv_file_worker_storage_consumption_percentage)
+        def _process_rows_worker_storage_consumption(storage_series, value_col):
+            series = self.downsample_worker_series(storage_series, value_col)
+            series = pl.concat([series, storage_boundaries.with_columns(pl.lit(0.0).alias(value_col))])
+            series = (
+                series.unique(['worker_id', 'time'], keep='last', maintain_order=True)
+                .filter(pl.col('time') >= 0)
+            )
+            df = self.worker_series_table(series, value_col)
+            return self.add_workflow_completion_percentage(df).select('worker', 'time', value_col, 'workflow_completion_percentage')
+
+        self.store.write('worker_storage_consumption', _process_rows_worker_storage_consumption(storage_series, 'storage_mb'))
+        # the share of the disk of its worker, for the workers that reported one
+        storage_percentage_series = (
+            storage_series.join(disk_mb.filter(pl.col('disk_mb') > 0), on='worker_id', how='inner', maintain_order='left')
+            .select('worker_id', 'time', (pl.col('storage_mb') / pl.col('disk_mb') * 100).alias('storage_percentage'))
+        )
+        self.store.write('worker_storage_consumption_percentage', _process_rows_worker_storage_consumption(storage_percentage_series, 'storage_percentage'))
 
         def _generate_file_replica_activation_intervals():
-            base_time = self.MIN_TIME
-            rows = []
-            for file in self.dp.files.values():
-                flattened_transfers = file.get_flattened_transfers()
-                if not flattened_transfers:
-                    continue
-                for transfer in flattened_transfers:
-                    if transfer.time_stage_in is None or transfer.time_stage_out is None:
-                        continue
-                    dest = getattr(transfer, 'dest_worker_entry', None)
-                    if dest is None:
-                        continue
-                    worker_str = f"{dest[0]}:{dest[1]}:{dest[2]}"
-                    t_in = floor_decimal(float(transfer.time_stage_in - base_time), 2)
-                    t_out = floor_decimal(float(transfer.time_stage_out - base_time), 2)
-                    activation = floor_decimal(float(transfer.time_stage_out - transfer.time_stage_in), 2)
-                    rows.append((file.filename, worker_str, t_in, t_out, activation))
-            if not rows:
-                df = pd.DataFrame(columns=['filename', 'replica_idx', 'source_worker', 'time_stage_in', 'time_stage_out', 'time_activation'])
-                write_df_to_csv(df, self.csv_file_file_replica_activation_intervals, index=False)
+            schema = {'filename': pl.String, 'replica_idx': pl.Int64, 'source_worker': pl.String,
+                      'time_stage_in': pl.Float64, 'time_stage_out': pl.Float64, 'time_activation': pl.Float64}
+            replicas = stored.join(files.select('file_id', 'file_name'), on='file_id', how='left', maintain_order='left')
+            if replicas.is_empty():
+                self.store.write('file_replica_activation_intervals', pl.DataFrame(schema=schema))
                 return
-            rows.sort(key=lambda r: (r[0], r[2]))
-            indexed_rows = []
-            for idx, (fname, worker_str, t_in, t_out, activation) in enumerate(rows, start=1):
-                indexed_rows.append({
-                    'filename': fname,
-                    'replica_idx': idx,
-                    'source_worker': worker_str,
-                    'time_stage_in': t_in,
-                    'time_stage_out': t_out,
-                    'time_activation': activation
-                })                          
-            df = pd.DataFrame(indexed_rows, columns=['filename', 'replica_idx', 'source_worker', 'time_stage_in', 'time_stage_out', 'time_activation'])
-            write_df_to_csv(df, self.csv_file_file_replica_activation_intervals, index=False)
+            worker_keys = {worker_id: worker.get_worker_key() for worker_id, worker in self.dp.workers.items()}
+            replicas = replicas.sort('file_name', 'stage_in', maintain_order=True)
+            df = pl.DataFrame([
+                replicas['file_name'].alias('filename'),
+                pl.Series('replica_idx', np.arange(1, replicas.height + 1, dtype=np.int64)),
+                pl.Series('source_worker', [worker_keys[worker_id] for worker_id in replicas['dest_worker_id']], dtype=pl.String),
+                centiseconds_to_seconds(replicas['stage_in']).alias('time_stage_in'),
+                centiseconds_to_seconds(replicas['stage_out']).alias('time_stage_out'),
+                centiseconds_to_seconds(replicas['stage_out'] - replicas['stage_in']).alias('time_activation'),
+            ])
+            self.store.write('file_replica_activation_intervals', df)
 
         _generate_file_replica_activation_intervals()
 
@@ -491,14 +460,7 @@ class CSVManager:
             return
 
         sorted_tasks = sorted(filtered_tasks, key=lambda t: (t.when_ready or float('inf')))
-        base_time = self.MIN_TIME
-
-        execution_time_rows = []
-        response_time_rows = []
-        retrieval_time_rows = []
-        dependencies_rows = []
-        dependents_rows = []
-        finish_times = []
+        time_axis = TimeAxis(self.MIN_TIME)
 
         output_to_task = {f: t.task_id for t in filtered_tasks for f in t.output_files}
         dependency_map = defaultdict(set)
@@ -512,72 +474,59 @@ class CSVManager:
                     dependency_map[task_id].add(parent_id)
                     dependent_map[parent_id].add(task_id)
 
-        for idx, task in enumerate(sorted_tasks, 1):
-            tid = task.task_id
-            try_id = task.task_try_id
-            status = task.task_status
-
-            ready = task.when_ready
-            running = task.when_running
-            start = task.time_worker_start
-            end = task.time_worker_end
-            fail = task.when_failure_happens
-            retrieved = task.when_retrieved
-            wait_retrieval = task.when_waiting_retrieval
-            done = task.when_done
-
-            def fd(t): return floor_decimal(t - base_time, 2) if t else None
-
-            et = None
-            ran = 0
-            if status == 0 and end and start:
-                et = max(fd(end) - fd(start), 0.01)
-                ran = 1
-            elif running and fail:
-                et = max(fd(fail) - fd(running), 0.01)
-            if et:
-                execution_time_rows.append((idx, et, tid, try_id, ran))
-
-            rt = None
-            dispatched = 0
-            if running and ready:
-                rt = max(fd(running) - fd(ready), 0.01)
-                dispatched = 1
-            elif fail and ready:
-                rt = max(fd(fail) - fd(ready), 0.01)
-            if rt is not None:
-                response_time_rows.append((idx, rt, tid, try_id, dispatched))
-
-            if retrieved and wait_retrieval:
-                rtt = max(fd(retrieved) - fd(wait_retrieval), 0.01)
-                retrieval_time_rows.append((idx, rtt, tid, try_id))
-
-            dependencies_rows.append((idx, len(dependency_map[tid])))
-            dependents_rows.append((idx, len(dependent_map[tid])))
-
-            finish = done or retrieved
-            if finish:
-                finish_times.append(fd(finish))
-
-        def write_csv(data, cols, path):
-            if data:
-                df = pl.DataFrame(data, schema=cols, orient="row")
-                df = downsample_df_polars(df, y_index=1, downsample_point_count=self.downsample_point_count)
-            else:
-                df = pl.DataFrame({col: [] for col in cols})
-            write_df_to_csv(df, path, index=False)
+        # the times of the tasks in centiseconds since MIN_TIME, null where a task has no such time
+        tasks = time_axis.frame(sorted_tasks, TASK_METRICS_TIME_FIELDS).with_columns(
+            pl.int_range(1, len(sorted_tasks) + 1, dtype=pl.Int64).alias('Global Index'),
+            pl.Series('Task ID', [task.task_id for task in sorted_tasks], dtype=pl.Int64),
+            pl.Series('Task Try ID', [task.task_try_id for task in sorted_tasks], dtype=pl.Int64),
+            pl.Series('task_status', [task.task_status for task in sorted_tasks], dtype=pl.Int64),
+        )
+        ready, running, start, end = pl.col('when_ready'), pl.col('when_running'), pl.col('time_worker_start'), pl.col('time_worker_end')
+        fail, retrieved, wait_retrieval = pl.col('when_failure_happens'), pl.col('when_retrieved'), pl.col('when_waiting_retrieval')
+
+        def duration(t1, t0):
+            # at least a hundredth of a second
+            return pl.max_horizontal(t1 - t0, pl.lit(1))
+
+        ran = (pl.col('task_status') == 0) & end.is_not_null() & start.is_not_null()
+        dispatched = running.is_not_null() & ready.is_not_null()
+        tasks = tasks.with_columns(
+            pl.when(ran).then(duration(end, start))
+              .when(running.is_not_null() & fail.is_not_null()).then(duration(fail, running)).alias('Execution Time'),
+            ran.cast(pl.Int64).alias('Ran to Completion'),
+            pl.when(dispatched).then(duration(running, ready))
+              .when(fail.is_not_null() & ready.is_not_null()).then(duration(fail, ready)).alias('Response Time'),
+            dispatched.cast(pl.Int64).alias('Was Dispatched'),
+            pl.when(retrieved.is_not_null() & wait_retrieval.is_not_null()).then(duration(retrieved, wait_retrieval)).alias('Retrieval Time'),
+            pl.coalesce('when_done', 'when_retrieved').alias('finish'),
+        )
 
-        write_csv(execution_time_rows, ['Global Index', 'Execution Time', 'Task ID', 'Task Try ID', 'Ran to Completion'], self.csv_file_task_execution_time)
-        write_csv(response_time_rows, ['Global Index', 'Response Time', 'Task ID', 'Task Try ID', 'Was Dispatched'], self.csv_file_task_response_time)
-        write_csv(retrieval_time_rows, ['Global Index', 'Retrieval Time', 'Task ID', 'Task Try ID'], self.csv_file_task_retrieval_time)
-        write_csv(dependencies_rows, ['Global Index', 'Dependency Count'], self.csv_file_task_dependencies)
-        write_csv(dependents_rows, ['Global Index', 'Dependent Count'], self.csv_file_task_dependents)
+        def write_table(name, df, cols, time_col=None):
+            if time_col is not None:
+                df = df.filter(pl.col(time_col).is_not_null())
+                df = df.with_columns(centiseconds_to_seconds(df[time_col]))
+            df = df.select(cols)
+            if df.height:
+                df = downsample_df_polars(df, y_index=1, downsample_point_count=self.downsample_point_count, method=self.downsampling_method)
+            self.store.write(name, df)
+
+        write_table('task_execution_time', tasks, ['Global Index', 'Execution Time', 'Task ID', 'Task Try ID', 'Ran to Completion'], 'Execution Time')
+        write_table('task_response_time', tasks, ['Global Index', 'Response Time', 'Task ID', 'Task Try ID', 'Was Dispatched'], 'Response Time')
+        write_table('task_retrieval_time', tasks, ['Global Index', 'Retrieval Time', 'Task ID', 'Task Try ID'], 'Retrieval Time')
+        tasks = tasks.with_columns(
+            pl.Series('Dependency Count', [len(dependency_map[task.task_id]) for task in sorted_tasks], dtype=pl.Int64),
+            pl.Series('Dependent Count', [len(dependent_map[task.task_id]) for task in sorted_tasks], dtype=pl.Int64),
+        )
+        write_table('task_dependencies', tasks, ['Global Index', 'Dependency Count'])
+        write_table('task_dependents', tasks, ['Global Index', 'Dependent Count'])
 
-        if finish_times:
-            finish_times.sort()
-            n = len(finish_times)
-            percentiles = [(p, floor_decimal(finish_times[min(n - 1, max(0, math.ceil(p / 100 * n) - 1))], 2)) for p in range(1, 101)]
-            write_csv(percentiles, ['Percentile', 'Completion Time'], self.csv_file_task_completion_percentiles)
+        finish_times = np.sort(tasks['finish'].drop_nulls().to_numpy())
+        n = len(finish_times)
+        if n:
+            percentiles = np.arange(1, 101)
+            ranks = np.clip(np.ceil(percentiles / 100 * n).astype(np.int64) - 1, 0, n - 1)
+            df = pl.DataFrame({'Percentile': percentiles, 'Completion Time': centiseconds_to_seconds(finish_times[ranks])})
+            write_table('task_completion_percentiles', df, ['Percentile', 'Completion Time'])
 
     def generate_task_concurrency_data(self):
         filtered_tasks = [t for t in self.dp.tasks.values() if not t.is_library_task]
@@ -585,7 +534,7 @@ class CSVManager:
             return
 
         sorted_tasks = sorted(filtered_tasks, key=lambda t: (t.when_ready or float('inf')))
-        base_time = self.MIN_TIME
+        time_axis = TimeAxis(self.MIN_TIME)
 
         phase_titles = {
             'tasks_waiting': 'Waiting',
@@ -596,61 +545,54 @@ class CSVManager:
         }
 
         def _collect_phases(tasks):
-            phases = defaultdict(list)
-
-            def fd(t):
-                return floor_decimal(t - base_time, 2) if t else None
+            # the +1/-1 events of every phase, in centiseconds since MIN_TIME
+            phases = {}
+            if not tasks:
+                return phases
+            times = time_axis.frame(tasks, TASK_METRICS_TIME_FIELDS)
+            ready, running, start, end = 'when_ready', 'when_running', 'time_worker_start', 'time_worker_end'
+            fail, wait_retrieval, done = 'when_failure_happens', 'when_waiting_retrieval', 'when_done'
 
             def add_phase(name, t0, t1=None):
-                if t0:
-                    phases[name].append((fd(t0), 1))
-                if t0 and t1:
-                    phases[name].append((fd(t1), -1))
-
-            for task in tasks:
-                ready = task.when_ready
-                running = task.when_running
-                start = task.time_worker_start
-                end = task.time_worker_end
-                fail = task.when_failure_happens
-                wait_retrieval = task.when_waiting_retrieval
-                done = task.when_done
-
-                add_phase('tasks_waiting',    ready,                running or fail)
-                add_phase('tasks_committing', running,              start or fail or wait_retrieval)
-                add_phase('tasks_executing',  start,                end   or fail or wait_retrieval)
-                add_phase('tasks_retrieving', end,                  wait_retrieval or fail)
-                if done:
-                    phases['tasks_done'].append((fd(done), 1))
+                enter = times.select(pl.col(t0).alias('time'), pl.lit(1, dtype=pl.Int32).alias('event'))
+                events = [enter]
+                if t1 is not None:
+                    leave = times.select(pl.when(pl.col(t0).is_not_null()).then(pl.coalesce(t1)).alias('time'),
+                                         pl.lit(-1, dtype=pl.Int32).alias('event'))
+                    events.append(leave)
+                events = pl.concat(events).drop_nulls('time')
+                if events.height:
+                    phases[name] = events
+
+            add_phase('tasks_waiting',    ready,   [running, fail])
+            add_phase('tasks_committing', running, [start, fail, wait_retrieval])
+            add_phase('tasks_executing',  start,   [end, fail, wait_retrieval])
+            add_phase('tasks_retrieving', end,     [wait_retrieval, fail])
+            add_phase('tasks_done',       done)
 
             return phases
 
-        def _build_concurrency_df(phases: dict[str, list[tuple[float, int]]]) -> pl.DataFrame | None:
-            all_times = sorted({t for evs in phases.values() for (t, _) in evs if t is not None})
-            if not all_times:
+        def _build_concurrency_df(phases: dict[str, pl.DataFrame]) -> pl.DataFrame | None:
+            if not phases:
                 return None
+            all_times = pl.concat([events.select('time') for events in phases.values()]).unique().sort('time')
 
-            df = pl.DataFrame({'time': all_times})
-            first_time = all_times[0]
+            df = all_times
+            first_time = all_times['time'][0]
 
             for name in phase_titles:
                 title = phase_titles[name]
-                events = phases.get(name, [])
+                events = phases.get(name)
 
-                if not events:
+                if events is None:
                     df = df.with_columns(pl.lit(0).alias(title))
                     continue
 
-                df_phase = pl.DataFrame(
-                    data=events,
-                    schema={'time': pl.Float64, 'event': pl.Int32},
-                    orient='row'
-                ).drop_nulls('time').sort('time')
-
                 df_phase = (
-                    df_phase
+                    events
                     .group_by('time')
                     .agg(pl.col('event').sum().alias('event'))
+                    .sort('time')
                     .with_columns(
                         # nonnegative cumulative sum without using clip APIs
                         pl.when(pl.col('event').cum_sum() < 0)
@@ -671,6 +613,7 @@ class CSVManager:
                 if phase_titles[k] in df.columns else pl.lit(0).alias(phase_titles[k]))
                 for k in phase_titles
             ])
+            df = df.with_columns(centiseconds_to_seconds(df['time']))
             df = self.add_workflow_completion_percentage(df)
 
             return df.fill_null(0)
@@ -679,18 +622,16 @@ class CSVManager:
         task_phases = _collect_phases(sorted_tasks)
         time_df = _build_concurrency_df(task_phases)
         if time_df is not None and time_df.height > 0:
-            pdf = time_df.to_pandas()
-            pdf = downsample_df(pdf, y_index=1, downsample_point_count=self.downsample_point_count)
-            write_df_to_csv(pdf, self.csv_file_task_concurrency, index=False)
+            time_df = downsample_df_polars(time_df, y_index=1, downsample_point_count=self.downsample_point_count, method=self.downsampling_method)
+            self.store.write('task_concurrency', time_df)
 
         # recovery only
         recovery_tasks = [t for t in sorted_tasks if t.is_recovery_task]
         recovery_phases = _collect_phases(recovery_tasks)
         time_df = _build_concurrency_df(recovery_phases)
         if time_df is not None and time_df.height > 0:
-            pdf = time_df.to_pandas()
-            pdf = downsample_df(pdf, y_index=1, downsample_point_count=self.downsample_point_count)
-            write_df_to_csv(pdf, self.csv_file_task_concurrency_recovery_only, index=False)
+            time_df = downsample_df_polars(time_df, y_index=1, downsample_point_count=self.downsample_point_count, method=self.downsampling_method)
+            self.store.write('task_concurrency_recovery_only', time_df)
  
     def generate_task_execution_details_metrics(self):
         base_time = self.MIN_TIME
@@ -699,10 +640,10 @@ class CSVManager:
         for task in self.dp.tasks.values():
             if not hasattr(task, 'core_id') or not task.core_id:
                 continue
-            if not task.worker_entry:
+            if not task.worker_id:
                 continue
 
-            worker = self.dp.workers[task.worker_entry]
+            worker = self.dp.workers[task.worker_id]
             worker_id = worker.id
             core_id = task.core_id[0]
 
@@ -710,12 +651,12 @@ class CSVManager:
             task_data = {
                 'task_id': task.task_id,
                 'task_try_id': task.task_try_id,
-                'worker_entry': f"{task.worker_entry[0]}:{task.worker_entry[1]}:{task.worker_entry[2]}",
+                'worker_entry': worker.get_worker_key(),
                 'worker_id': worker_id,
                 'core_id': core_id,
                 'is_recovery_task': task.is_recovery_task,
-                'input_files': file_list_formatter(task.input_files) if task.input_files else '',
-                'output_files': file_list_formatter(task.output_files) if task.output_files else '',
+                'input_files': file_list_formatter(self.dp.file_symbols.resolve_many(task.input_files)) if task.input_files else '',
+                'output_files': file_list_formatter(self.dp.file_symbols.resolve_many(task.output_files)) if task.output_files else '',
                 'num_input_files': len(task.input_files) if task.input_files else 0,
                 'num_output_files': len(task.output_files) if task.output_files else 0,
                 'task_status': task.task_status,
@@ -785,29 +726,29 @@ class CSVManager:
                 time_disconnected.extend([self.MAX_TIME] * (len(worker.time_connected) - len(time_disconnected)))
 
             worker_data = {
-                'task_id': pd.NA,
-                'task_try_id': pd.NA,
+                'task_id': None,
+                'task_try_id': None,
                 'worker_entry': f"{worker.ip}:{worker.port}:{worker.connect_id}",
                 'worker_id': worker.id,
-                'core_id': pd.NA,
-                'is_recovery_task': pd.NA,
-                'input_files': pd.NA,
-                'output_files': pd.NA,
-                'num_input_files': pd.NA,
-                'num_output_files': pd.NA,
-                'task_status': pd.NA,
-                'category': pd.NA,
-                'when_ready': pd.NA,
-                'when_running': pd.NA,
-                'time_worker_start': pd.NA,
-                'time_worker_end': pd.NA,
-                'execution_time': pd.NA,
-                'when_waiting_retrieval': pd.NA,
-                'when_retrieved': pd.NA,
-                'when_failure_happens': pd.NA,
-                'when_done': pd.NA,
+                'core_id': None,
+                'is_recovery_task': None,
+                'input_files': None,
+                'output_files': None,
+                'num_input_files': None,
+                'num_output_files': None,
+                'task_status': None,
+                'category': None,
+                'when_ready': None,
+                'when_running': None,
+                'time_worker_start': None,
+                'time_worker_end': None,
+                'execution_time': None,
+                'when_waiting_retrieval': None,
+                'when_retrieved': None,
+                'when_failure_happens': None,
+                'when_done': None,
                 'record_type': 'worker',
-                'unsuccessful_checkbox_name': pd.NA,
+                'unsuccessful_checkbox_name': None,
                 'hash': worker.hash,
                 'time_connected': [round(max(t - base_time, 0), 2) for t in worker.time_connected],
                 'time_disconnected': [round(max(t - base_time, 0), 2) for t in time_disconnected],
@@ -821,133 +762,86 @@ class CSVManager:
         # --- output ---
 
         if rows:
-            df = pd.DataFrame(rows)
-            
-            # Define column order
-            columns = [
-                'record_type', 'task_id', 'task_try_id', 'worker_entry', 'worker_id', 'core_id',
-                'is_recovery_task', 'input_files', 'output_files', 'num_input_files', 'num_output_files',
-                'task_status', 'category', 'when_ready', 'when_running', 'time_worker_start',
-                'time_worker_end', 'execution_time', 'when_waiting_retrieval', 'when_retrieved',
-                'when_failure_happens', 'when_done', 'unsuccessful_checkbox_name', 'hash',
-                'time_connected', 'time_disconnected', 'cores', 'memory_mb', 'disk_mb', 'gpus'
-            ]
-            
-            # Reorder columns and fill missing ones with None
-            for col in columns:
-                if col not in df.columns: 
-                    df[col] = None
-            df = df[columns]
-            
-            write_df_to_csv(df, self.csv_file_task_execution_details, index=False)
+            # every column typed, a worker has its connection times as lists
+            schema = {
+                'record_type': pl.String, 'task_id': pl.Int64, 'task_try_id': pl.Int64, 'worker_entry': pl.String,
+                'worker_id': pl.Int64, 'core_id': pl.Int64, 'is_recovery_task': pl.Boolean, 'input_files': pl.String,
+                'output_files': pl.String, 'num_input_files': pl.Int64, 'num_output_files': pl.Int64,
+                'task_status': pl.Int64, 'category': pl.String, 'when_ready': pl.Float64, 'when_running': pl.Float64,
+                'time_worker_start': pl.Float64, 'time_worker_end': pl.Float64, 'execution_time': pl.Float64,
+                'when_waiting_retrieval': pl.Float64, 'when_retrieved': pl.Float64, 'when_failure_happens': pl.Float64,
+                'when_done': pl.Float64, 'unsuccessful_checkbox_name': pl.String, 'hash': pl.String,
+                'time_connected': pl.List(pl.Float64), 'time_disconnected': pl.List(pl.Float64),
+                'cores': pl.Int64, 'memory_mb': pl.Int64, 'disk_mb': pl.Int64, 'gpus': pl.Int64,
+            }
+            df = pl.DataFrame(
+                {col: [row.get(col) for row in rows] for col in schema},
+                schema=schema,
+            )
+
+            self.store.write('task_execution_details', df)
 
     def generate_worker_metrics(self):
-        base_time = self.MIN_TIME
+        time_axis = TimeAxis(self.MIN_TIME)
         
         worker_lifetime_entries = []
         connect_events = []
         disconnect_events = []
-        executing_task_events = defaultdict(list)
-        waiting_retrieval_events = defaultdict(list)
         
         for worker in self.dp.workers.values():
             worker_key = worker.get_worker_key()
             worker_ip_port = ':'.join(worker_key.split(':')[:-1])  # Remove connect_id
             worker_id = worker.id
-            worker_entry = (worker.ip, worker.port, worker.connect_id)
             
-            for i, t_start in enumerate(worker.time_connected):
-                t_end = (
-                    worker.time_disconnected[i]
-                    if i < len(worker.time_disconnected)
-                    else self.MAX_TIME
-                )
-                t0 = floor_decimal(max(0, t_start - base_time), 2)
-                t1 = floor_decimal(max(0, t_end - base_time), 2)
-                duration = floor_decimal(max(0, t1 - t0), 2)
-                worker_lifetime_entries.append((t0, duration, worker_id, worker_ip_port))
-            
-            for t in worker.time_connected:
-                connect_events.append(floor_decimal(t - base_time, 2))
-            for t in worker.time_disconnected:
-                disconnect_events.append(floor_decimal(t - base_time, 2))
-        
-        for task in self.dp.tasks.values():
-            if not task.worker_entry:
-                continue
-            
-            worker_entry = task.worker_entry
-            
-            if task.time_worker_start and task.time_worker_end:
-                start = floor_decimal(task.time_worker_start - base_time, 2)
-                end = floor_decimal(task.time_worker_end - base_time, 2)
-                if start < end:
-                    executing_task_events[worker_entry].extend([(start, 1), (end, -1)])
-            
-            if task.when_waiting_retrieval and task.when_retrieved:
-                start = floor_decimal(task.when_waiting_retrieval - base_time, 2)
-                end = floor_decimal(task.when_retrieved - base_time, 2)
-                if start < end:
-                    waiting_retrieval_events[worker_entry].extend([(start, 1), (end, -1)])
-
-        # Helper function for worker time series data
-        def generate_worker_time_series_csv(events_dict, csv_file):
-            if not events_dict:
-                return
-
-            column_data = {}
-            time_set = set()
-
-            for worker_entry, events in events_dict.items():
-                w = self.dp.workers.get(worker_entry)
-                if w:
-                    t_connected = floor_decimal(w.time_connected[0] - base_time, 2)
-                    t_disconnected = floor_decimal(w.time_disconnected[0] - base_time, 2)
-                    boundary = []
-                    if t_connected > 0:
-                        boundary.append((t_connected, 0))
-                    if t_disconnected > 0:
-                        boundary.append((t_disconnected, 0))
-                    events += boundary
-
-                if not events:
-                    continue
-
-                df = pd.DataFrame(events, columns=['time', 'delta'])
-                df = df.groupby('time', as_index=False)['delta'].sum()
-                df['cumulative'] = df['delta'].cumsum().clip(lower=0)
-                
-                if df['cumulative'].isna().all():
-                    continue
-
-                downsampled_df = downsample_df(df[['time', 'cumulative']], y_col='cumulative', downsample_point_count=self.downsample_point_count)
-                timeline = downsampled_df.values
-
-                wid = f"{worker_entry[0]}:{worker_entry[1]}:{worker_entry[2]}"
-                col_map = {t: v for t, v in timeline}
-                column_data[wid] = col_map
-                time_set.update(col_map.keys())
+            # all times in centiseconds since MIN_TIME
+            time_connected = time_axis.array(worker.time_connected)
+            time_disconnected = time_axis.array(worker.time_disconnected)
+            # a connection that was not closed lasts until MAX_TIME
+            time_end = np.full(len(time_connected), time_axis.scalar(self.MAX_TIME), dtype=np.int64)
+            closed = min(len(time_connected), len(time_disconnected))
+            time_end[:closed] = time_disconnected[:closed]
+            t0 = np.maximum(time_connected, 0)
+            durations = np.maximum(np.maximum(time_end, 0) - t0, 0)
+            worker_lifetime_entries.extend((t, duration, worker_id, worker_ip_port) for t, duration in zip(t0.tolist(), centiseconds_to_seconds(durations).tolist()))
+
+            connect_events.extend(time_connected.tolist())
+            disconnect_events.extend(time_disconnected.tolist())
+
+        # the connection and disconnection times of every worker, in centiseconds since MIN_TIME
+        worker_ids = list(self.dp.workers.keys())
+        connection_times = pl.DataFrame([
+            pl.Series('worker_id', worker_ids + worker_ids, dtype=pl.Int64),
+            pl.Series('time', [time_axis.scalar(w.time_connected[0]) for w in self.dp.workers.values()] +
+                              [time_axis.scalar(w.time_disconnected[0]) for w in self.dp.workers.values()], dtype=pl.Int64),
+        ])
+        tasks_with_worker = [task for task in self.dp.tasks.values() if task.worker_id]
+
+        def worker_interval_events(start_field, end_field):
+            # a +1 and a -1 event on the worker of every task that spent time between the two times, and a 0 at
+            # the connection and disconnection of those workers so that their series spans their connection
+            intervals = time_axis.frame(tasks_with_worker, [start_field, end_field]).with_columns(
+                pl.Series('worker_id', [task.worker_id for task in tasks_with_worker], dtype=pl.Int64)
+            ).filter(pl.col(start_field) < pl.col(end_field))
+            boundaries = connection_times.join(intervals.select('worker_id').unique(), on='worker_id', how='semi')
+            return pl.concat([
+                intervals.select('worker_id', pl.col(start_field).alias('time'), pl.lit(1, dtype=pl.Int64).alias('delta')),
+                intervals.select('worker_id', pl.col(end_field).alias('time'), pl.lit(-1, dtype=pl.Int64).alias('delta')),
+                boundaries.filter(pl.col('time') > 0).with_columns(pl.lit(0, dtype=pl.Int64).alias('delta')),
+            ])
 
-            if not column_data:
+        def generate_worker_time_series(events, name, value_col):
+            if events.is_empty():
                 return
+            series = self.downsample_worker_series(cumulative_worker_series(events, value_col), value_col)
+            self.store.write(name, self.worker_series_table(series, value_col))
 
-            sorted_times = sorted(time_set)
-            rows = []
-            for t in sorted_times:
-                row = {'time': floor_decimal(t, 2)}
-                for c in sorted(column_data.keys()):
-                    row[c] = column_data[c].get(t, float('nan'))
-                rows.append(row)
-
-            write_df_to_csv(pl.DataFrame(rows), csv_file, index=False)
-
-        # Write CSV files
+        # Write the tables
         
         # 1. Worker Lifetime
         if worker_lifetime_entries:
             worker_lifetime_entries.sort(key=lambda x: x[0])
             rows = [(worker_id, worker_ip_port, duration) for _, duration, worker_id, worker_ip_port in worker_lifetime_entries]
-            write_df_to_csv(pl.DataFrame(rows, schema=['ID', 'Worker IP Port', 'LifeTime (s)'], orient="row"), self.csv_file_worker_lifetime, index=False)
+            self.store.write('worker_lifetime', pl.DataFrame(rows, schema=['ID', 'Worker IP Port', 'LifeTime (s)'], orient="row"))
         
         # 2. Worker Concurrency
         initial_active = sum(1 for t in connect_events if t <= 0)
@@ -957,31 +851,32 @@ class CSVManager:
         )
         
         if events or initial_active > 0:
-            df = pd.DataFrame(events, columns=["time", "delta"])
-            df = df.groupby("time", as_index=False)["delta"].sum().sort_values("time")
-            
-            df.loc[-1] = [0.0, 0]
-            df = df.sort_index().reset_index(drop=True)
-            
-            df["active"] = df["delta"].cumsum() + initial_active
-            
-            max_time = floor_decimal(self.MAX_TIME - base_time, 2)
-            if df.iloc[-1]["time"] < max_time:
-                last_active = df.iloc[-1]["active"]
-                new_row = pd.DataFrame({"time": [max_time], "delta": [0], "active": [last_active]})
-                df = pd.concat([df, new_row], ignore_index=True)
-
-            export_df = df[['time', 'active']].rename(columns={'time': 'time', 'active': 'Active Workers (count)'})
-            export_df = downsample_df(export_df, y_col='Active Workers (count)', downsample_point_count=self.downsample_point_count)
-            write_df_to_csv(export_df, self.csv_file_worker_concurrency, index=False)
+            df = pl.DataFrame(events, schema={"time": pl.Int64, "delta": pl.Int64}, orient="row")
+            df = df.group_by("time").agg(pl.col("delta").sum()).sort("time")
+            df = df.with_columns(centiseconds_to_seconds(df["time"]))
+
+            # start from the workers that were connected at time 0
+            df = pl.concat([pl.DataFrame({"time": [0.0], "delta": [0]}), df])
+            df = df.with_columns((pl.col("delta").cum_sum() + initial_active).alias("active"))
+
+            max_time = centiseconds_to_seconds(time_axis.scalar(self.MAX_TIME))
+            if df["time"][-1] < max_time:
+                last_active = df["active"][-1]
+                df = pl.concat([df, pl.DataFrame({"time": [max_time], "delta": [0], "active": [last_active]})])
+
+            export_df = df.select(pl.col('time'), pl.col('active').alias('Active Workers (count)'))
+            export_df = downsample_df_polars(export_df, y_col='Active Workers (count)', downsample_point_count=self.downsample_point_count, method=self.downsampling_method)
+            self.store.write('worker_concurrency', export_df)
         
         # 3. Worker Executing Tasks
-        generate_worker_time_series_csv(executing_task_events, self.csv_file_worker_executing_tasks)
+        generate_worker_time_series(worker_interval_events('time_worker_start', 'time_worker_end'), 'worker_executing_tasks', 'executing_tasks')
         
         # 4. Worker Waiting Retrieval Tasks
-        generate_worker_time_series_csv(waiting_retrieval_events, self.csv_file_worker_waiting_retrieval_tasks)
+        generate_worker_time_series(worker_interval_events('when_waiting_retrieval', 'when_retrieved'), 'worker_waiting_retrieval_tasks', 'waiting_retrieval_tasks')
 
     def generate_subgraphs_and_graph_metrics(self):
+        transfers = self.dp.transfers
+
         # Step 1: Find unique tasks (exclude library and recovery tasks)
         unique_tasks = {}
         task_failure_counts = defaultdict(int)
@@ -1070,8 +965,8 @@ class CSVManager:
         for task in unique_tasks.values():
             task_id = task.task_id
             recovery_task_id_set = set()
-            for file_name in task.output_files:
-                file_obj = self.dp.files[file_name]
+            for file_id in task.output_files:
+                file_obj = self.dp.files[file_id]
                 for (producer_tid, producer_try_id) in file_obj.producers:
                     producer_task = self.dp.tasks[(producer_tid, producer_try_id)]
                     if producer_task.is_recovery_task:
@@ -1086,10 +981,11 @@ class CSVManager:
             recovery_count = recovery_count_map.get(task_id, 0)
             
             input_files_with_timing = []
-            for file_name in getattr(task, 'input_files', []):
+            for file_id in getattr(task, 'input_files', []):
                 # Only include files that have producers (are in dependency graph)
-                if file_name in self.dp.files and self.dp.files[file_name].producers:
-                    file_obj = self.dp.files[file_name]
+                if file_id in self.dp.files and self.dp.files[file_id].producers:
+                    file_obj = self.dp.files[file_id]
+                    file_name = file_obj.filename
                     if task.when_running and file_obj.created_time:
                         waiting_time = max(0, task.when_running - file_obj.created_time)
                         input_files_with_timing.append(f"{file_name}:{waiting_time:.2f}")
@@ -1097,27 +993,29 @@ class CSVManager:
                         input_files_with_timing.append(f"{file_name}:0.00")
 
             output_files_with_timing = []
-            for file_name in getattr(task, 'output_files', []):
-                file = self.dp.files[file_name]
+            for file_id in getattr(task, 'output_files', []):
+                file = self.dp.files[file_id]
+                file_name = file.filename
                 # skip files without any producer tasks
                 if len(file.producers) == 0:
                     continue
                 creation_time = 0.0
                 
                 # skip tasks that were not committed to a worker
-                if not task.worker_entry:
+                if not task.worker_id:
                     continue
                 if not task.time_worker_start:
                     continue
 
-                for transfer in file.get_flattened_transfers():
-                    if transfer.dest_worker_entry != task.worker_entry:
+                for row in transfers.rows_of(file_id):
+                    if transfers.dest_worker_id[row] != task.worker_id:
                         continue
-                    if not transfer.time_stage_in:
+                    time_stage_in = transfers.time_stage_in(row)
+                    if not time_stage_in:
                         continue
-                    if transfer.time_stage_in < task.time_worker_start:
+                    if time_stage_in < task.time_worker_start:
                         continue
-                    creation_time = max(0, transfer.time_stage_in - task.time_worker_start)
+                    creation_time = max(0, time_stage_in - task.time_worker_start)
                     break
 
                 if creation_time == 0.0 and file.created_time and task.time_worker_start:
@@ -1129,7 +1027,7 @@ class CSVManager:
             output_files_str = '|'.join(output_files_with_timing) if output_files_with_timing else ''
             
             # Calculate task execution time
-            execution_time = np.nan
+            execution_time = None
             if task.task_status == 0 and task.time_worker_start and task.time_worker_end:
                 execution_time = max(0, task.time_worker_end - task.time_worker_start)
             
@@ -1146,11 +1044,12 @@ class CSVManager:
         if len(rows) == 0:
             return
 
-        df = pd.DataFrame(rows, columns=[
-            'subgraph_id', 'task_id', 'task_execution_time', 'failure_count', 'recovery_count', 'input_files', 'output_files'
-        ])
-        df = df.sort_values(['subgraph_id', 'task_id'])
-        write_df_to_csv(df, self.csv_file_task_subgraphs, index=False)
+        df = pl.DataFrame(rows, schema={
+            'subgraph_id': pl.Int64, 'task_id': pl.Int64, 'task_execution_time': pl.Float64, 'failure_count': pl.Int64,
+            'recovery_count': pl.Int64, 'input_files': pl.String, 'output_files': pl.String
+        }, orient='row')
+        df = df.sort(['subgraph_id', 'task_id'], maintain_order=True)
+        self.store.write('task_subgraphs', df)
 
     def generate_metadata(self):
         metadata = {}
@@ -1233,13 +1132,14 @@ class CSVManager:
         metadata['manager_duration'] = (self.dp.manager.time_end - self.dp.manager.time_start) if (self.dp.manager.time_start and self.dp.manager.time_end) else None
         
         rows = [{"key": k, "value": json.dumps(v, ensure_ascii=False)} for k, v in metadata.items()]
-        pl.DataFrame(rows).write_csv(self.csv_file_metadata)
+        self.store.write('metadata', pl.DataFrame(rows, schema={"key": pl.String, "value": pl.String}))
 
     def load_metadata_to_dict(self):
         metadata = {}
         try:
-            if os.path.exists(self.csv_file_metadata):
-                df = pl.read_csv(self.csv_file_metadata, dtypes={"key": pl.Utf8, "value": pl.Utf8}, null_values=None)
+            if self.store.exists('metadata'):
+                # the values of a legacy csv file may have been read as numbers
+                df = self.store.read('metadata').cast({"key": pl.Utf8, "value": pl.Utf8})
                 keys = df["key"].to_list()
                 vals = df["value"].to_list()
                 for k, v in zip(keys, vals):
@@ -1,23 +1,35 @@
-import platform
-import subprocess
 from .worker_info import WorkerInfo
 from .task_info import TaskInfo
-from .file_info import FileInfo, IndexedTransferEvent, UnindexedTransferEvent
+from .file_info import FileInfo, IndexedTransferEvent, LegacyUnpickler
+from .transfer_table import TransferTable
 from .manager_info import ManagerInfo
+from .debug_dispatch import DebugHandler, DebugDispatchTable
+from .parallel_parse import iter_classified_chunks, iter_classified_stream_chunks
+from .compressed_log import find_debug_log, detect_compression, open_log, compressed_position
+from .debug_segments import MANAGER_START_PATTERN, read_segment_info
+from .transactions_log import TransactionsLog
+from .timestamp_decoder import TimestampDecoder
+from .time_axis import microseconds_to_centiseconds, centiseconds_to_seconds
+from .parse_profiler import ParseProfiler, DEFAULT_SAMPLE_EVERY
+from .symbol_table import SymbolTable
+from .compact import small_set
+from .columnar_checkpoint import ColumnarCheckpoint, TABLE_NAMES
 
 import os
 import math
 import pandas as pd
 import polars as pl
 import traceback
-from functools import lru_cache
+import time
+import hashlib
+import copy
 from datetime import datetime
 import numpy as np
 from collections import defaultdict
+from bisect import bisect_right
 import cloudpickle
 from datetime import timezone, timedelta
 import pytz
-import platform
 from taskvine_report.utils import *
 
 
@@ -25,24 +37,64 @@ from taskvine_report.utils import *
 # if taskvine protocol version is changed, this file needs to be updated accordingly
 VALID_VINE_PROTOCOL_VERSION = 14
 
-def count_lines(file_name):
-    if platform.system() in ["Linux", "Darwin"]:  # Linux or macOS
-        try:
-            return int(subprocess.check_output(["wc", "-l", file_name]).split()[0])
-        except subprocess.CalledProcessError:
-            pass
+# bump whenever the parser state saved in the resume checkpoint changes shape
+RESUME_CHECKPOINT_VERSION = 3
+RESUME_FINGERPRINT_BYTES = 4096
+
+# the debug file is scanned backwards in blocks of this size to find where the last manager run starts
+DEBUG_SCAN_BLOCK_SIZE = 1 << 20
+
+# the serial parse reports its progress every so many lines
+PROGRESS_UPDATE_LINES = 8192
 
-    with open(file_name, 'r', encoding='utf-8', errors='ignore') as f:
-        return sum(1 for _ in f)
+# where the task, worker and file tables come from: the debug log, or the transactions log with the debug log
+# only read for what the transactions log does not have
+PARSER_BACKENDS = ('debug', 'transactions')
+
+# the debug handlers the transactions backend still runs, for the file transfers, what a worker reports when a
+# task completes, and the worker connections that resolve an ip:port of the debug log to a transactions worker
+TRANSACTIONS_DEBUG_HANDLERS = (
+    'puturl', 'cache_update', 'unlink', 'complete', 'receive_worker_info', 'cache_invalid', 'stdout',
+    'recovery_task', 'put_file', 'transfer_port', 'exhausted_resources', 'worker_connected',
+)
+
+def rfind_line_start(f, offset):
+    # offset of the first byte after the last newline before offset, 0 if there is none
+    while offset > 0:
+        block_start = max(offset - DEBUG_SCAN_BLOCK_SIZE, 0)
+        f.seek(block_start)
+        pos = f.read(offset - block_start).rfind(b"\n")
+        if pos >= 0:
+            return block_start + pos + 1
+        offset = block_start
+    return 0
 
 
 class DataParser:
+    # the parser state carried over from one incremental run to the next
+    RESUME_STATE_ATTRIBUTES = (
+        'manager', 'tasks', 'current_try_id', 'workers', 'current_worker_connect_id',
+        'map_ip_and_transfer_port_to_worker_port', 'files', 'transfers', 'subgraphs', 'file_symbols', 'worker_symbols',
+        'receiving_resources_from_worker', 'sending_task', 'mini_task_transferring', 'sending_task_to_worker_id',
+    )
+
     def __init__(self,
                  runtime_template, 
                  enablee_checkpoint_pkl_files=False, 
-                 debug_mode=False):
+                 debug_mode=False,
+                 jobs=1,
+                 incremental=False,
+                 profile=False,
+                 profile_sample_every=DEFAULT_SAMPLE_EVERY,
+                 backend='debug'):
+        if backend not in PARSER_BACKENDS:
+            raise ValueError(f"unknown parser backend {backend}, expected one of {', '.join(PARSER_BACKENDS)}")
         self.runtime_template = runtime_template
         self.enablee_checkpoint_pkl_files = enablee_checkpoint_pkl_files
+        self.jobs = max(int(jobs), 1)
+        self.incremental = incremental
+        self.backend = backend
+        self.timestamp_decoder = None
 
         self.ip = None
         self.port = None
@@ -58,14 +110,42 @@ class DataParser:
         ensure_dir(self.json_files_dir, replace=False)
         ensure_dir(self.pkl_files_dir, replace=False)
 
-        self.debug = os.path.join(self.vine_logs_dir, 'debug')
+        self.debug = find_debug_log(self.vine_logs_dir) or os.path.join(self.vine_logs_dir, 'debug')
         self.transactions = os.path.join(self.vine_logs_dir, 'transactions')   # not necessary
         self.taskgraph = os.path.join(self.vine_logs_dir, 'taskgraph')         # not necessary
-        for file_path in [self.debug]:
+        # the transactions backend can do without a debug log, e.g. when debug logging was off
+        required_files = [self.transactions] if self.backend == 'transactions' else [self.debug]
+        for file_path in required_files:
             if not os.path.exists(file_path):
                 raise ValueError(f"file {file_path} does not exist")
-
-        # these are the main files for data analysis
+        if not os.path.exists(self.debug):
+            self.debug = None
+
+        if self.backend == 'transactions' and self.incremental:
+            print(f"The transactions backend reads the transactions log as a whole, parsing it from the beginning")
+            self.incremental = False
+
+        # a compressed debug log is streamed, it is an archive so there is nothing to resume from or to follow
+        self.debug_compression = detect_compression(self.debug) if self.debug else None
+        if self.debug_compression and self.incremental:
+            print(f"The debug log is {self.debug_compression} compressed, parsing it from the beginning")
+            self.incremental = False
+
+        # a segment sub-template parses one manager run of the debug log of its parent, see debug_segments
+        self.debug_segment = read_segment_info(self.runtime_template)
+        if self.debug_segment is not None:
+            if os.path.basename(self.debug) != self.debug_segment['debug']:
+                raise ValueError(f"the debug log of {self.runtime_template} has been replaced, "
+                                 f"run vine_parse --segments on the parent log directory again")
+            if self.incremental:
+                print(f"Parsing manager run {self.debug_segment['segment']} from its start")
+                self.incremental = False
+            if self.backend == 'transactions':
+                # the transactions log only has the last manager run
+                print(f"Parsing manager run {self.debug_segment['segment']} from the debug log")
+                self.backend = 'debug'
+
+        # cloudpickle files written by older versions, the parsed state is now checkpointed by ColumnarCheckpoint
         self.pkl_file_names = ['workers.pkl', 'files.pkl', 'tasks.pkl', 'manager.pkl', 'subgraphs.pkl']
         self.pkl_files = []
         for pkl_file_name in self.pkl_file_names:
@@ -74,25 +154,38 @@ class DataParser:
         # metadata pkl file
         self.pkl_file_metadata = os.path.join(self.pkl_files_dir, 'metadata.pkl')
 
+        # resume checkpoint for incremental parsing, the debug file is parsed up to debug_parsed_offset
+        self.resume_checkpoint_file = os.path.join(self.pkl_files_dir, 'resume.pkl')
+        self.debug_segment_start = 0
+        self.debug_parsed_offset = 0
+        self.debug_resumed_offset = None
+
         self.manager = ManagerInfo()
 
         # tasks
         self.tasks = {}        # key: (task_id, task_try_id), value: TaskInfo
         self.current_try_id = defaultdict(int)   # key: task_id, value: task_try_id
 
-        # workers
-        self.workers = {}      # key: (ip, port, connect_id), value: WorkerInfo
+        # workers, the records refer to a worker by the id of its (ip, port, connect_id) entry
+        self.worker_symbols = SymbolTable(first_id=1)
+        self.workers = {}      # key: worker id, value: WorkerInfo
         self.current_worker_connect_id = defaultdict(int)  # key: (ip, port), value: connect_id
         self.map_ip_and_transfer_port_to_worker_port = {}  # key: (ip, transfer_port), value: WorkerInfo
 
-        # files
-        self.files = {}      # key: file_name, value: FileInfo
+        # files, the records refer to a file by the id of its name
+        self.file_symbols = SymbolTable()
+        self.files = {}      # key: file id, value: FileInfo
+        self.transfers = TransferTable()    # the replicas of all files
 
         # subgraphs
         self.subgraphs = {}   # key: subgraph_id, value: set()
 
         # status
         self.debug_mode = debug_mode
+        # debug mode times every line, --profile only a sample of them
+        self.profiler = None
+        if profile or debug_mode:
+            self.profiler = ParseProfiler(1 if debug_mode else profile_sample_every)
         self.receiving_resources_from_worker = None
         self.sending_task = None
         self.mini_task_transferring = None
@@ -100,121 +193,179 @@ class DataParser:
         self.debug_current_parts = None
         self.debug_current_timestamp = None
         self._init_debug_handlers()
-        self.sending_task_to_worker_entry = None
+        self.sending_task_to_worker_id = None
+
+        # the transactions backend replays the task tries of the transactions log along the debug log
+        self.transactions_try_starts = []   # (time, task_id, task_try_id) of the tries after the first
+        self.transactions_try_index = 0
+        self.transactions_skipped_debug_lines = 0
 
     def _init_debug_handlers(self):
-        def H(name, cond, action):
-            action.__name__ = name
-            return (cond, action)
+        # handlers are listed in precedence order, each indexed on keywords its condition implies
+        H = DebugHandler
 
         self.debug_handlers = [
 
             H("busy_on",
             lambda l, p, ctx: "busy on" in l,
-            lambda l, p, ctx: ctx._handle_debug_line_busy_on()),
+            lambda l, p, ctx: ctx._handle_debug_line_busy_on(),
+            phrases=("busy on",)),
 
             H("puturl",
             lambda l, p, ctx: "puturl" in p or "puturl_now" in p,
-            lambda l, p, ctx: ctx._handle_debug_line_puturl()),
+            lambda l, p, ctx: ctx._handle_debug_line_puturl(),
+            tokens=("puturl", "puturl_now")),
 
             H("cache_update",
             lambda l, p, ctx: "cache-update" in p,
-            lambda l, p, ctx: ctx._handle_debug_line_cache_update()),
+            lambda l, p, ctx: ctx._handle_debug_line_cache_update(),
+            tokens=("cache-update",)),
 
             H("task_state_change",
             lambda l, p, ctx: "state change:" in l,
-            lambda l, p, ctx: ctx._handle_debug_line_task_state_change()),
+            lambda l, p, ctx: ctx._handle_debug_line_task_state_change(),
+            phrases=("state change:",)),
 
             H("unlink",
             lambda l, p, ctx: "unlink" in p,
-            lambda l, p, ctx: ctx._handle_debug_line_unlink()),
+            lambda l, p, ctx: ctx._handle_debug_line_unlink(),
+            tokens=("unlink",)),
 
             H("worker_removed",
             lambda l, p, ctx: "removed" in p and "worker" in p,
-            lambda l, p, ctx: ctx._handle_debug_line_worker_removed()),
+            lambda l, p, ctx: ctx._handle_debug_line_worker_removed(),
+            tokens=("removed",)),
 
             H("complete",
             lambda l, p, ctx: "complete" in p,
-            lambda l, p, ctx: ctx._handle_debug_line_complete()),
+            lambda l, p, ctx: ctx._handle_debug_line_complete(),
+            tokens=("complete",)),
 
             H("worker_received",
             lambda l, p, ctx: "received" in p,
-            lambda l, p, ctx: ctx._handle_debug_line_worker_received()),
+            lambda l, p, ctx: ctx._handle_debug_line_worker_received(),
+            tokens=("received",)),
 
             H("receive_worker_info",
             lambda l, p, ctx: " info " in l,
-            lambda l, p, ctx: ctx._handle_debug_line_receive_worker_info()),
+            lambda l, p, ctx: ctx._handle_debug_line_receive_worker_info(),
+            tokens=("info",)),
 
             H("cache_invalid",
             lambda l, p, ctx: "cache-invalid" in p,
-            lambda l, p, ctx: ctx._handle_debug_line_cache_invalid()),
+            lambda l, p, ctx: ctx._handle_debug_line_cache_invalid(),
+            tokens=("cache-invalid",)),
 
             H("worker_resources",
             lambda l, p, ctx: "resources" in p or ctx.receiving_resources_from_worker,
-            lambda l, p, ctx: ctx._handle_debug_line_worker_resources()),
+            lambda l, p, ctx: ctx._handle_debug_line_worker_resources(),
+            tokens=("resources",),
+            state=lambda ctx: ctx.receiving_resources_from_worker,
+            state_tokens=("cores", "memory", "disk", "gpus", "end")),
 
             H("stdout",
             lambda l, p, ctx: "stdout" in p,
-            lambda l, p, ctx: ctx._handle_debug_line_stdout()),
+            lambda l, p, ctx: ctx._handle_debug_line_stdout(),
+            tokens=("stdout",)),
 
             H("recovery_task",
             lambda l, p, ctx: "Submitted recovery task" in l,
-            lambda l, p, ctx: ctx._handle_debug_line_submitted_recovery_task()),
+            lambda l, p, ctx: ctx._handle_debug_line_submitted_recovery_task(),
+            tokens=("recovery",)),
 
             H("put_file",
             lambda l, p, ctx: "put" in p,
-            lambda l, p, ctx: ctx._handle_debug_line_put_file()),
+            lambda l, p, ctx: ctx._handle_debug_line_put_file(),
+            tokens=("put",)),
 
             H("failed_to_send_task",
             lambda l, p, ctx: "Failed to send task" in l,
-            lambda l, p, ctx: ctx._handle_debug_line_failed_to_send_task()),
+            lambda l, p, ctx: ctx._handle_debug_line_failed_to_send_task(),
+            tokens=("send",)),
 
             H("transfer_port",
             lambda l, p, ctx: "transfer-port" in p,
-            lambda l, p, ctx: ctx._handle_debug_line_get_worker_transfer_port()),
+            lambda l, p, ctx: ctx._handle_debug_line_get_worker_transfer_port(),
+            tokens=("transfer-port",)),
 
             H("exhausted_resources",
             lambda l, p, ctx: "exhausted" in p and "resources" in p,
-            lambda l, p, ctx: ctx._handle_debug_line_exhausted_resources_on_worker()),
+            lambda l, p, ctx: ctx._handle_debug_line_exhausted_resources_on_worker(),
+            tokens=("exhausted",)),
 
             H("listening",
             lambda l, p, ctx: "listening on port" in l,
-            lambda l, p, ctx: ctx._handle_debug_line_listening_on_port()),
+            lambda l, p, ctx: ctx._handle_debug_line_listening_on_port(),
+            tokens=("on",)),
 
             H("worker_connected",
             lambda l, p, ctx: "worker" in p and "connected" in p,
-            lambda l, p, ctx: ctx._handle_debug_line_worker_connected()),
+            lambda l, p, ctx: ctx._handle_debug_line_worker_connected(),
+            tokens=("connected",)),
 
             H("manager_end",
             lambda l, p, ctx: "manager end" in l,
-            lambda l, p, ctx: ctx.manager.set_time_end(ctx.debug_current_timestamp)),
+            lambda l, p, ctx: ctx.manager.set_time_end(ctx.debug_current_timestamp),
+            phrases=("manager end",)),
 
             H("remove_instances",
             lambda l, p, ctx: "Removing instances of worker" in l,
-            lambda l, p, ctx: None),
+            lambda l, p, ctx: None,
+            tokens=("instances",)),
 
             H("kill_task",
             lambda l, p, ctx: " kill " in l,
-            lambda l, p, ctx: ctx._handle_debug_line_kill_task()),
+            lambda l, p, ctx: ctx._handle_debug_line_kill_task(),
+            tokens=("kill",)),
 
             H("added_dependency",
             lambda l, p, ctx: "added dependency" in l,
-            lambda l, p, ctx: None),
+            lambda l, p, ctx: None,
+            phrases=("added dependency",)),
 
         ]
-        self.debug_handler_profiling = defaultdict(lambda: {"hits": 0})
+        self.debug_dispatch = DebugDispatchTable(self.debug_handlers)
+
+    def _init_transactions_debug_handlers(self):
+        # the subset of the debug handlers the transactions backend runs, in the same precedence order. The
+        # tasks and workers already come from the transactions log: a worker connection only advances the
+        # connect id of its ip:port, the worker info only adds the machine name, and a line about a task or
+        # a worker the transactions log does not have is skipped.
+        actions = {
+            'worker_connected': lambda l, p, ctx: ctx._replay_debug_line_worker_connected(),
+            'receive_worker_info': lambda l, p, ctx: ctx._handle_debug_line_worker_machine_name(),
+        }
+
+        def replayed(action):
+            def replayed_action(l, p, ctx):
+                ctx._replay_transactions_task_tries(ctx.debug_current_timestamp)
+                try:
+                    action(l, p, ctx)
+                except KeyError:
+                    ctx.transactions_skipped_debug_lines += 1
+            return replayed_action
+
+        handlers = [DebugHandler(handler.name, handler.cond, replayed(actions.get(handler.name, handler.action)),
+                                 tokens=handler.tokens, phrases=handler.phrases,
+                                 state=handler.state, state_tokens=handler.state_tokens)
+                    for handler in self.debug_handlers if handler.name in TRANSACTIONS_DEBUG_HANDLERS]
+        self.debug_dispatch = DebugDispatchTable(handlers)
 
     def get_current_worker_by_ip_port(self, worker_ip: str, worker_port: int):
-        connect_id = self.current_worker_connect_id[(worker_ip, worker_port)]
-        if connect_id == 0:
+        worker_id = self.get_current_worker_id_by_ip_port(worker_ip, worker_port)
+        if worker_id is None:
             return None
-        return self.workers[(worker_ip, worker_port, connect_id)]
+        return self.workers[worker_id]
 
-    def get_current_worker_entry_by_ip_port(self, worker_ip: str, worker_port: int):
+    def get_current_worker_id_by_ip_port(self, worker_ip: str, worker_port: int):
         connect_id = self.current_worker_connect_id[(worker_ip, worker_port)]
         if connect_id == 0:
             return None
-        return (worker_ip, worker_port, connect_id)
+        return self.worker_symbols[(worker_ip, worker_port, connect_id)]
+
+    def get_file_by_name(self, file_name):
+        # raises KeyError for a file that has not been seen
+        return self.files[self.file_symbols[file_name]]
 
     def worker_ip_port_to_hash(self, worker_ip: str, worker_port: int):
         return f"{worker_ip}:{worker_port}"
@@ -222,18 +373,18 @@ class DataParser:
     def count_elements_after_current_parts(self, item):
         return count_elements_after(item, self.debug_current_parts)
 
-    def set_time_zone(self, debug_file_path=None):
+    def set_time_zone(self, debug_file_path=None, debug_file_offset=0):
         if debug_file_path is None:
             debug_file_path = self.debug
-            
+
         mgr_start_datestring = None
         mgr_start_timestamp = None
 
         # read the first line containing "listening on port" in debug file
-        with open(debug_file_path, 'r') as file:
-            for line in file:
-                if "listening on port" in line:
-                    parts = line.strip().split()
+        with open_log(debug_file_path, detect_compression(debug_file_path), debug_file_offset) as file:
+            for raw_line in file:
+                if b"listening on port" in raw_line:
+                    parts = raw_line.decode('utf-8').strip().split()
                     mgr_start_datestring = f"{parts[0]} {parts[1]}"
                     mgr_start_datestring = datetime.strptime(mgr_start_datestring, "%Y/%m/%d %H:%M:%S.%f").replace(microsecond=0)
                     break
@@ -275,25 +426,26 @@ class DataParser:
         else:
             raise ValueError("Could not match to a known time zone.")
 
+        self.timestamp_decoder = TimestampDecoder(self.manager.equivalent_tz)
         print(f"Set time zone to {self.manager.equivalent_tz} offset {self.manager.time_zone_offset_hours}")
 
-    @lru_cache(maxsize=4096)
     def datestring_to_timestamp(self, datestring):
-        equivalent_datestring = datetime.strptime(datestring, "%Y/%m/%d %H:%M:%S.%f").replace(tzinfo=self.manager.equivalent_tz)
-        unix_timestamp = float(equivalent_datestring.timestamp())
-        return unix_timestamp
+        # floored to a hundredth of a second
+        return self.timestamp_decoder.decode_seconds(datestring)
 
     def ensure_file_info_entry(self, file_name, size_mb, timestamp):
-        if file_name not in self.files:
-            self.files[file_name] = FileInfo(file_name, size_mb, timestamp)
-        file = self.files[file_name]
+        file_id = self.file_symbols.intern(file_name)
+        file = self.files.get(file_id)
+        if file is None:
+            # the name is kept once, by the symbol table and the file
+            file = self.files[file_id] = FileInfo(file_id, self.file_symbols.resolve(file_id), size_mb, timestamp)
         if size_mb > 0:
             file.set_size_mb(size_mb)
         return file
 
     def add_task(self, task: TaskInfo):
         assert isinstance(task, TaskInfo)
-        task_entry = (task.task_id, task.task_try_id)
+        task_entry = task.task_entry
         if task_entry in self.tasks:
             raise ValueError(f"task {task.task_id} already exists")
         self.tasks[task_entry] = task
@@ -302,9 +454,9 @@ class DataParser:
         self.current_worker_connect_id[(ip, port)] += 1
         connect_id = self.current_worker_connect_id[(ip, port)]
         worker = WorkerInfo(ip, port, connect_id)
-        self.workers[(ip, port, connect_id)] = worker
+        worker.id = self.worker_symbols.intern(worker.worker_entry)
+        self.workers[worker.id] = worker
         worker.add_connection(time_connected)
-        worker.id = len(self.workers)
         return worker
     
     def _handle_debug_line_worker_connected(self):
@@ -331,14 +483,12 @@ class DataParser:
         file_name = parts[put_idx + 1]
         file_size_mb = int(parts[put_idx + 3]) / 2**20
         ip, port = WorkerInfo.extract_ip_port_from_string(parts[put_idx - 1])
-        dest_worker_entry = self.get_current_worker_entry_by_ip_port(ip, port)
-        worker = self.workers[dest_worker_entry]
+        worker = self.workers[self.get_current_worker_id_by_ip_port(ip, port)]
 
         file = self.ensure_file_info_entry(file_name, file_size_mb, timestamp)
-        new_transfer = UnindexedTransferEvent(file_name, dest_worker_entry, timestamp)
-        file.unindexed_transfers[dest_worker_entry].append(new_transfer)
+        self.transfers.add(file.file_id, worker.id, timestamp)
 
-        worker.add_active_file_or_transfer(file_name)
+        worker.add_active_file_or_transfer(file.file_id)
 
     def _handle_debug_line_worker_received(self):
         # do not take the synchronous worker received message as if the file has been staged in,
@@ -371,21 +521,20 @@ class DataParser:
         dest_worker = self.get_current_worker_by_ip_port(dest_ip, dest_port)
         assert dest_worker is not None
 
-        dest_worker_entry = (dest_worker.ip, dest_worker.port, dest_worker.connect_id)
         # the source can be a url or an ip:port
         source = parts[puturl_id + 1]
         if source.startswith('https://') or source.startswith('file://'):
-            file.indexed_transfers[transfer_id] = IndexedTransferEvent(file_name, dest_worker_entry, timestamp, transfer_id, source)
+            self.transfers.add(file.file_id, dest_worker.id, timestamp, transfer_id, source)
         elif source.startswith('workerip://'):
             source_ip, source_transfer_port = WorkerInfo.extract_ip_port_from_string(source)
             source_worker_port = self.map_ip_and_transfer_port_to_worker_port[(source_ip, source_transfer_port)]
-            source_worker_entry = self.get_current_worker_entry_by_ip_port(source_ip, source_worker_port)
-            assert source_worker_entry is not None
-            file.indexed_transfers[transfer_id] = IndexedTransferEvent(file_name, dest_worker_entry, timestamp, transfer_id, source_worker_entry)
+            source_worker_id = self.get_current_worker_id_by_ip_port(source_ip, source_worker_port)
+            assert source_worker_id is not None
+            self.transfers.add(file.file_id, dest_worker.id, timestamp, transfer_id, source_worker_id)
         else:
             raise ValueError(f"unrecognized source: {source}, line: {self.debug_current_line}")
         
-        dest_worker.add_active_file_or_transfer(file_name)
+        dest_worker.add_active_file_or_transfer(file.file_id)
 
     def _handle_debug_line_kill_task(self):
         assert self.count_elements_after_current_parts("kill") == 1
@@ -393,8 +542,8 @@ class DataParser:
         task_entry = (task_id, self.current_try_id[task_id])
         task = self.tasks[task_entry]
         # note that the task may not be committed (Failed to send task is followed)
-        if task.worker_entry:
-            worker = self.workers[task.worker_entry]
+        if task.worker_id:
+            worker = self.workers[task.worker_id]
             worker.reap_task(task)
 
     def _handle_debug_line_worker_resources(self):
@@ -437,6 +586,33 @@ class DataParser:
         else:
             pass
 
+    def _replay_debug_line_worker_connected(self):
+        worker_idx = self.debug_current_parts.index("worker")
+        ip, port = WorkerInfo.extract_ip_port_from_string(self.debug_current_parts[worker_idx + 1])
+        self.current_worker_connect_id[(ip, port)] += 1
+
+    def _handle_debug_line_worker_machine_name(self):
+        parts = self.debug_current_parts
+        if "worker-id" not in parts:
+            return
+        info_idx = parts.index("info")
+        ip, port = WorkerInfo.extract_ip_port_from_string(parts[info_idx - 1])
+        worker = self.workers[self.get_current_worker_id_by_ip_port(ip, port)]
+        if worker.hash is None:
+            worker.set_hash(parts[info_idx + 2])
+        worker.set_machine_name(parts[info_idx - 2])
+
+    def _replay_transactions_task_tries(self, timestamp):
+        # the current try of a task is the last one dispatched before the line, a line logged in the same
+        # hundredth of a second as a dispatch still belongs to the previous try
+        try_starts = self.transactions_try_starts
+        i = self.transactions_try_index
+        while i < len(try_starts) and try_starts[i][0] < timestamp:
+            _, task_id, task_try_id = try_starts[i]
+            self.current_try_id[task_id] = task_try_id
+            i += 1
+        self.transactions_try_index = i
+
     def _handle_debug_line_task_state_change(self):
         parts = self.debug_current_parts
         line = self.debug_current_line
@@ -459,7 +635,7 @@ class DataParser:
                 task.set_when_ready(timestamp)
                 self.add_task(task)
             task = self.tasks[(task_id, self.current_try_id[task_id])]
-            self._match_sending_task_to_worker_entry(task, timestamp, True)
+            self._match_sending_task_to_worker(task, timestamp, True)
             return
 
         task_entry = (task_id, self.current_try_id[task_id])
@@ -471,18 +647,17 @@ class DataParser:
             if self.manager.when_first_task_start_commit is None:
                 self.manager.set_when_first_task_start_commit(timestamp)
 
-            self._match_sending_task_to_worker_entry(task, timestamp, False)
+            self._match_sending_task_to_worker(task, timestamp, False)
 
-            if not task.worker_entry:
+            if not task.worker_id:
                 return
             else:
                 # update the coremap
-                worker = self.workers[task.worker_entry]
+                worker = self.workers[task.worker_id]
                 task.committed_worker_hash = worker.hash
-                task.worker_id = worker.id
                 core_id = worker.run_task(task)
                 if core_id == -1:
-                    print(f"Warning: worker {task.worker_entry} has no enough cores to run task {task_id}")
+                    print(f"Warning: worker {worker.worker_entry} has no enough cores to run task {task_id}")
                     print(f"current running tasks: {worker.tasks_running}")
                 # check if this is the first try
                 if task_id not in self.current_try_id:
@@ -505,27 +680,27 @@ class DataParser:
         elif "RUNNING (2) to WAITING_RETRIEVAL (3)" in line:    # as expected
             task.set_when_waiting_retrieval(timestamp)
             # update the coremap
-            if not task.worker_entry:
+            if not task.worker_id:
                 raise ValueError(f"task {task_id} has no worker entry")
-            worker = self.workers[task.worker_entry]
+            worker = self.workers[task.worker_id]
         elif "WAITING_RETRIEVAL (3) to RETRIEVED (4)" in line:  # as expected
             task.set_when_retrieved(timestamp)
         elif "RETRIEVED (4) to DONE (5)" in line:               # as expected
             task.set_when_done(timestamp)
-            if task.worker_entry:
-                worker = self.workers[task.worker_entry]
+            if task.worker_id:
+                worker = self.workers[task.worker_id]
                 self.manager.set_when_last_task_done(timestamp)
                 worker.tasks_completed.append(task)
         elif "WAITING_RETRIEVAL (3) to READY (1)" in line or \
                 "RUNNING (2) to READY (1)" in line:             # task failure
-            if task.worker_entry:
-                worker = self.workers[task.worker_entry]
+            if task.worker_id:
+                worker = self.workers[task.worker_id]
                 worker.tasks_failed.append(task)
             # we need to set the task status if it was not set yet
             if task.task_status is None:
                 # if it was committed to a worker
-                if task.worker_entry:
-                    worker = self.workers[task.worker_entry]
+                if task.worker_id:
+                    worker = self.workers[task.worker_id]
                     # it could be that the worker disconnected
                     if len(worker.time_connected) == len(worker.time_disconnected):
                         task.set_task_status(worker.time_disconnected[-1], 15 << 3)
@@ -568,8 +743,8 @@ class DataParser:
         exit_status = int(parts[complete_idx + 2])
         output_length = int(parts[complete_idx + 3])
         bytes_sent = int(parts[complete_idx + 4])
-        time_worker_start = floor_decimal(float(parts[complete_idx + 5]) / 1e6, 2)
-        time_worker_end = floor_decimal(float(parts[complete_idx + 6]) / 1e6, 2)
+        time_worker_start = centiseconds_to_seconds(microseconds_to_centiseconds(int(parts[complete_idx + 5])))
+        time_worker_end = centiseconds_to_seconds(microseconds_to_centiseconds(int(parts[complete_idx + 6])))
         sandbox_used = None
         try:
             task_id = int(parts[complete_idx + 8])
@@ -601,19 +776,19 @@ class DataParser:
         transfer_id = parts[cache_update_idx + 8]   # 'X' or a real id
 
         # note: the transfer may be from an unknown worker and the transfer id could be invalid
-        if transfer_id != 'X' and file_name not in self.files:
+        if transfer_id != 'X' and file_name not in self.file_symbols:
             return
 
         # if this is a task-generated file, it is the first time the file is cached on this worker, otherwise we only update the stage in time
         file = self.ensure_file_info_entry(file_name, size_in_mb, timestamp)
         ip, port = WorkerInfo.extract_ip_port_from_string(parts[cache_update_idx - 1])
-        worker_entry = self.get_current_worker_entry_by_ip_port(ip, port)
+        worker_id = self.get_current_worker_id_by_ip_port(ip, port)
         # TODO: better handle a special case where the file is created by a previous manager
-        if worker_entry is None:
+        if worker_id is None:
             return
-        worker = self.workers[worker_entry]
+        worker = self.workers[worker_id]
         
-        file.cache_update(worker, timestamp, transfer_id)
+        self.transfers.cache_update(file, worker, timestamp, transfer_id)
 
     def _handle_debug_line_cache_invalid(self):
         parts = self.debug_current_parts
@@ -621,7 +796,7 @@ class DataParser:
 
         cache_invalid_idx = parts.index("cache-invalid")
         file_name = parts[cache_invalid_idx + 1]
-        if file_name not in self.files:
+        if file_name not in self.file_symbols:
             # special case: this file was created by a previous manager
             return
         
@@ -631,11 +806,10 @@ class DataParser:
             transfer_id = None
 
         ip, port = WorkerInfo.extract_ip_port_from_string(parts[cache_invalid_idx - 1])
-        worker_entry = (ip, port, self.current_worker_connect_id[(ip, port)])
-        worker = self.workers[worker_entry]
+        worker = self.workers[self.worker_symbols[(ip, port, self.current_worker_connect_id[(ip, port)])]]
 
-        file = self.files[file_name]
-        file.cache_invalid(worker, timestamp, transfer_id)
+        file = self.get_file_by_name(file_name)
+        self.transfers.cache_invalid(file, worker, timestamp, transfer_id)
 
     def _handle_debug_line_unlink(self):
         if "total time spent on" in self.debug_current_line:
@@ -647,12 +821,12 @@ class DataParser:
         unlink_id = parts.index("unlink")
         file_name = parts[unlink_id + 1]
         ip, port = WorkerInfo.extract_ip_port_from_string(parts[unlink_id - 1])
-        worker_entry = self.get_current_worker_entry_by_ip_port(ip, port)
-        assert worker_entry is not None
-        worker = self.workers[worker_entry]
+        worker_id = self.get_current_worker_id_by_ip_port(ip, port)
+        assert worker_id is not None
+        worker = self.workers[worker_id]
 
-        file = self.files[file_name]
-        file.unlink(worker, timestamp)
+        file = self.get_file_by_name(file_name)
+        self.transfers.unlink(file, worker, timestamp)
 
     def _handle_debug_line_exhausted_resources_on_worker(self):
         parts = self.debug_current_parts
@@ -697,11 +871,11 @@ class DataParser:
         # format: Submitted recovery task xxx to re-create lost temporary file xxx.
         file_name = parts[-1].rstrip(".")
         # this filename must have been appeared before
-        if file_name not in self.files:
+        if file_name not in self.file_symbols:
             raise ValueError(f"file {file_name} not found in files")
-        file = self.files[file_name]
+        file = self.get_file_by_name(file_name)
         file.add_producer(task)
-        task.add_output_file(file_name)
+        task.add_output_file(file.file_id)
 
     def _handle_debug_line_listening_on_port(self):
         self.manager.set_time_start(self.debug_current_timestamp)
@@ -710,10 +884,10 @@ class DataParser:
         parts = self.debug_current_parts
         busy_idx = parts.index("busy")
         worker_ip, worker_port = WorkerInfo.extract_ip_port_from_string(parts[busy_idx - 1])
-        worker_entry = self.get_current_worker_entry_by_ip_port(worker_ip, worker_port)
-        if worker_entry is None:
+        worker_id = self.get_current_worker_id_by_ip_port(worker_ip, worker_port)
+        if worker_id is None:
             raise ValueError(f"worker {worker_ip}:{worker_port} is not found")
-        self.sending_task_to_worker_entry = worker_entry
+        self.sending_task_to_worker_id = worker_id
 
     def _handle_debug_line_send_task_to_worker(self):
         parts = self.debug_current_parts
@@ -738,9 +912,9 @@ class DataParser:
 
             try:
                 worker_ip, worker_port = WorkerInfo.extract_ip_port_from_string(parts[task_idx - 1])
-                worker_entry = (worker_ip, worker_port, self.current_worker_connect_id[(worker_ip, worker_port)])
-                if not self.sending_task.worker_entry:
-                    self.sending_task.set_worker_entry(worker_entry)
+                worker_id = self.worker_symbols.lookup((worker_ip, worker_port, self.current_worker_connect_id[(worker_ip, worker_port)]))
+                if not self.sending_task.worker_id:
+                    self.sending_task.set_worker_id(worker_id)
             except Exception:
                 raise
         else:
@@ -770,13 +944,13 @@ class DataParser:
                 file = self.ensure_file_info_entry(file_name, 0, timestamp)
                 if not file.is_consumer(self.sending_task):
                     file.add_consumer(self.sending_task)
-                    self.sending_task.add_input_file(file_name)
+                    self.sending_task.add_input_file(file.file_id)
             elif "outfile" in parts:
                 file_name = parts[parts.index("outfile") + 1]
                 file = self.ensure_file_info_entry(file_name, 0, timestamp)
                 if not file.is_producer(self.sending_task):
                     file.add_producer(self.sending_task)
-                    self.sending_task.add_output_file(file_name)
+                    self.sending_task.add_output_file(file.file_id)
             elif "function_slots" in parts:
                 function_slots = int(parts[parts.index("function_slots") + 1])
                 self.sending_task.set_function_slots(function_slots)
@@ -789,141 +963,623 @@ class DataParser:
             else:
                 pass
 
-    def _resort_debug_handlers(self):
-        # sort handlers in-place by descending hit count
-        self.debug_handlers.sort(
-            key=lambda pair: -self.debug_handler_profiling.get(pair[1], {}).get("hits", 0)
-        )
-
-    def parse_debug_line(self):
+    def parse_debug_line(self, candidates=None, sampled=False):
+        # sampled: the line is timed for the profiler
         line = self.debug_current_line
         parts = self.debug_current_parts
         timestamp = self.debug_current_timestamp
         self.manager.set_current_max_time(timestamp)
 
-        if self.debug_mode:
-            for cond_fn, handler_fn in self.debug_handlers:
-                if cond_fn(line, parts, self):
-                    try:
-                        handler_fn(line, parts, self)
-                    except Exception:
-                        raise ValueError(f"Failed in handler {handler_fn.__name__}")
-                    self.debug_handler_profiling[handler_fn]["hits"] += 1
-                    return
+        if sampled:
+            handler = self.debug_dispatch.match_timed(line, parts, self, candidates, self.profiler)
         else:
-            for cond_fn, handler_fn in self.debug_handlers:
-                if cond_fn(line, parts, self):
-                    try:
-                        handler_fn(line, parts, self)
-                    except Exception:
-                        raise ValueError(f"Failed in handler {handler_fn.__name__}")
-                    return
-
-    def _clean_debug_file(self):
-        result = subprocess.run(
-            ["grep", "-n", "tcp: listening on port", self.debug],
-            capture_output=True,
-            text=True,
-            check=False
-        )
-        
-        if result.returncode != 0:
-            return
-            
-        lines = result.stdout.strip().split('\n')
-        # Filter out empty lines that might result from strip().split()
-        lines = [line for line in lines if line]
-
-        if len(lines) == 0:
+            handler = self.debug_dispatch.match(line, parts, self, candidates)
+        if self.debug_mode:
+            # cross-check the keyword index against a full scan over the handlers
+            reference = self.debug_dispatch.match_linear(line, parts, self)
+            if reference is not handler:
+                raise ValueError(f"dispatch mismatch: indexed {getattr(handler, 'name', None)}, "
+                                 f"linear {getattr(reference, 'name', None)}")
+        if handler is None:
+            if self.profiler is not None:
+                self.profiler.unmatched_lines += 1
             return
 
-        last_match_line_num = int(lines[-1].split(':')[0])
-        if len(lines) > 1:
-            print(f"Found {len(lines)} entries in the debug file, only keeping the last one")
-
-        debug_cleaned = os.path.join(self.vine_logs_dir, 'debug.cleaned')
-        
-        with open(self.debug, 'r', encoding='utf-8', errors='ignore') as input_file:
-            lines_to_keep = []
-            for i, line in enumerate(input_file, 1):
-                if i >= last_match_line_num:
-                    lines_to_keep.append(line)
-        
-        with open(debug_cleaned, 'w', encoding='utf-8') as output_file:
-            output_file.writelines(lines_to_keep)
+        try:
+            if sampled:
+                start = time.perf_counter_ns()
+                handler.action(line, parts, self)
+                self.profiler.add_sampled(('dispatch', handler.name, 'action'), time.perf_counter_ns() - start)
+            else:
+                handler.action(line, parts, self)
+        except Exception:
+            raise ValueError(f"Failed in handler {handler.name}")
+        if self.profiler is not None:
+            self.profiler.handler_hits[handler.name] += 1
 
-    def _match_sending_task_to_worker_entry(self, task, when_running, is_library_task):
-        if self.sending_task_to_worker_entry is not None:
-            task.set_worker_entry(self.sending_task_to_worker_entry)
+    def _match_sending_task_to_worker(self, task, when_running, is_library_task):
+        if self.sending_task_to_worker_id is not None:
+            task.set_worker_id(self.sending_task_to_worker_id)
             task.set_when_running(when_running)
             task.is_library_task = is_library_task
         else:
             # if no busy on was above then the task commission failed and sending task to worker entry is None
             task.set_task_status(when_running, 43 << 3)   # failed to dispatch
-        self.sending_task_to_worker_entry = None
+        self.sending_task_to_worker_id = None
 
-    def parse_debug(self):
-        # Remove existing debug.cleaned file if exists
-        debug_cleaned = os.path.join(self.vine_logs_dir, 'debug.cleaned')
-        if os.path.exists(debug_cleaned):
-            os.remove(debug_cleaned)
-        
+    def _debug_read_position(self, file, offset, start):
+        # how much of the debug file on disk has been read since start, in compressed bytes for a compressed log
+        return compressed_position(file) if self.debug_compression else offset - start
+
+    def _parse_debug_raw_line(self, raw_line):
+        # decode and dispatch one line, returns False if it does not start with a timestamp
         try:
-            self.set_time_zone()
-        except Exception as e:
-            self._clean_debug_file()
-            self.set_time_zone(debug_cleaned)
-        
-        # Use cleaned file if exists, otherwise use original
-        debug_file_to_use = debug_cleaned if os.path.exists(debug_cleaned) else self.debug
-        
-        total_lines = count_lines(debug_file_to_use)
-        debug_file_size_mb = floor_decimal(os.path.getsize(debug_file_to_use) / 1024 / 1024, 2)
-        unit, scale = get_size_unit_and_scale(debug_file_size_mb)
-        debug_file_size_str = f"{floor_decimal(debug_file_size_mb * scale, 2)} {unit}"
+            self.debug_current_line = raw_line.decode('utf-8').strip()
+            self.debug_current_parts = self.debug_current_line.split(" ")
+        except UnicodeDecodeError:
+            # this sometimes happens, especially when the manager handles a null pointer
+            return False
+        try:
+            datestring = self.debug_current_parts[0] + " " + self.debug_current_parts[1]
+            self.debug_current_timestamp = self.datestring_to_timestamp(datestring)
+        except Exception:
+            # this line does not start with a timestamp, which sometimes happens
+            return False
+        self.parse_debug_line()
+        return True
+
+    def _parse_debug_raw_line_sampled(self, raw_line, search):
+        # _parse_debug_raw_line with every stage timed for the profiler, returns None if the line filter skips the line
+        profiler = self.profiler
+        start = time.perf_counter_ns()
+        matched = search(raw_line) is not None
+        filtered = time.perf_counter_ns()
+        profiler.add_sampled(('filter',), filtered - start)
+        if not matched:
+            return None
+        try:
+            self.debug_current_line = raw_line.decode('utf-8').strip()
+            self.debug_current_parts = self.debug_current_line.split(" ")
+        except UnicodeDecodeError:
+            return False
+        decoded = time.perf_counter_ns()
+        profiler.add_sampled(('decode',), decoded - filtered)
+        try:
+            datestring = self.debug_current_parts[0] + " " + self.debug_current_parts[1]
+            self.debug_current_timestamp = self.datestring_to_timestamp(datestring)
+        except Exception:
+            return False
+        profiler.add_sampled(('timestamp',), time.perf_counter_ns() - decoded)
+        self.parse_debug_line(sampled=True)
+        return True
 
-        with create_progress_bar() as progress:
-            task_id = progress.add_task(f"[green]Parsing debug ({debug_file_size_str})", total=total_lines)
-            resort_debug_handlers_interval = 10000
-            with open(debug_file_to_use, 'rb') as file:
-                for i, raw_line in enumerate(file):
-                    progress.update(task_id, advance=1)
-                    if i % resort_debug_handlers_interval == 0:
-                        self._resort_debug_handlers()
-                    try:
-                        self.debug_current_line = raw_line.decode('utf-8').strip()
-                        self.debug_current_parts = self.debug_current_line.strip().split(" ")
-                    except UnicodeDecodeError:
-                        # this sometimes happens, especially when the manager handles a null pointer
-                        continue
-                    try:
-                        datestring = self.debug_current_parts[0] + " " + self.debug_current_parts[1]
-                        self.debug_current_timestamp = floor_decimal(self.datestring_to_timestamp(datestring), 2)
-                    except Exception:
-                        # this line does not start with a timestamp, which sometimes happens
+    def _check_skipped_debug_line(self, raw_line):
+        # debug mode: cross-check the line filter, no handler may act on a line it skips
+        try:
+            line = raw_line.decode('utf-8').strip()
+        except UnicodeDecodeError:
+            return
+        parts = line.split(" ")
+        if self.debug_dispatch.is_relevant(self.debug_dispatch.classify(line, parts), parts):
+            self.debug_current_line = line
+            raise ValueError("the line filter skipped a line a handler may act on")
+
+    def _parse_debug_serial(self, debug_file_to_use, start, end, progress=None, task_id=None):
+        # the lines are tested against the line filter on their raw bytes, only those it matches are decoded,
+        # split and dispatched. end is None to parse up to the end of the file.
+        search = self.debug_dispatch.line_filter.search
+        profiler = self.profiler
+        with open_log(debug_file_to_use, self.debug_compression, start, memory_map=True) as file:
+            offset = start
+            num_lines = 0
+            reported_lines, reported_offset = 0, start
+            # the skipped lines still advance the manager's clock, the last one that starts with a date
+            # after the last dispatched line is decoded at the end
+            last_skipped_line = None
+            for raw_line in iter(file.readline, b""):
+                if end is not None and offset >= end:
+                    break
+                offset += len(raw_line)
+                num_lines += 1
+                if num_lines % PROGRESS_UPDATE_LINES == 0:
+                    if progress is not None:
+                        progress.update(task_id, completed=self._debug_read_position(file, offset, start))
+                    if profiler is not None:
+                        profiler.record_progress(num_lines - reported_lines, offset - reported_offset)
+                        reported_lines, reported_offset = num_lines, offset
+                try:
+                    if profiler is not None and profiler.sample():
+                        parsed = self._parse_debug_raw_line_sampled(raw_line, search)
+                    elif search(raw_line) is None:
+                        parsed = None
+                    else:
+                        parsed = self._parse_debug_raw_line(raw_line)
+                    if parsed is None:
+                        if self.debug_mode:
+                            self._check_skipped_debug_line(raw_line)
+                        if raw_line[4:5] == b"/":
+                            last_skipped_line = raw_line
                         continue
+                    if parsed:
+                        last_skipped_line = None
+                except Exception as e:
+                    print(f"Error parsing line {num_lines - 1}: {self.debug_current_line}")
+                    print(traceback.format_exc())
+                    exit(1)
+            if last_skipped_line is not None:
+                try:
+                    parts = last_skipped_line.decode('utf-8').strip().split(" ")
+                    self.manager.set_current_max_time(self.datestring_to_timestamp(parts[0] + " " + parts[1]))
+                except Exception:
+                    pass
+            if progress is not None:
+                progress.update(task_id, completed=self._debug_read_position(file, offset, start))
+            if profiler is not None:
+                profiler.record_progress(num_lines - reported_lines, offset - reported_offset)
+        return num_lines
+
+    def _parse_debug_parallel(self, debug_file_to_use, start, end, progress, task_id):
+        # phase 1 runs in worker processes: decoding, timestamp conversion and line classification.
+        # lines no handler can act on are dropped there, only the rest is sent back in file order.
+        # phase 2 replays the records through the handlers here, in order, as the state machine needs.
+        classifier = self.debug_dispatch.classifier()
+        if self.debug_compression:
+            # a compressed log cannot be split by offsets, it is decompressed here and handed out in chunks
+            stream = open_log(debug_file_to_use, self.debug_compression, start)
+            chunks = iter_classified_stream_chunks(stream, self.jobs, self.timestamp_decoder, classifier,
+                                                   None if end is None else end - start)
+        else:
+            stream = None
+            chunks = iter_classified_chunks(debug_file_to_use, start, end, self.jobs, self.timestamp_decoder, classifier)
+
+        profiler = self.profiler
+        first_line_idx = 0
+        try:
+            for chunk in chunks:
+                if profiler is not None:
+                    # the workers time their stages on every line of the chunk
+                    for stage, ns in chunk.stage_ns.items():
+                        profiler.add_measured(('worker', stage), ns)
+                for line_idx, timestamp, line, candidates in zip(chunk.line_indices, chunk.timestamps, chunk.lines, chunk.candidates):
+                    self.debug_current_line = line
+                    self.debug_current_parts = line.split(" ")
+                    self.debug_current_timestamp = timestamp
                     try:
-                        self.parse_debug_line()
+                        self.parse_debug_line(candidates, sampled=profiler is not None and profiler.sample())
                     except Exception as e:
-                        print(f"Error parsing line {i}: {self.debug_current_line}")
+                        print(f"Error parsing line {first_line_idx + line_idx}: {self.debug_current_line}")
                         print(traceback.format_exc())
                         exit(1)
+                # the dropped lines still advance the manager's clock
+                if chunk.last_timestamp is not None:
+                    self.manager.set_current_max_time(chunk.last_timestamp)
+                first_line_idx += chunk.num_lines
+                if profiler is not None:
+                    profiler.record_progress(chunk.num_lines, chunk.num_bytes)
+                if stream is not None:
+                    progress.update(task_id, completed=compressed_position(stream))
+                else:
+                    progress.update(task_id, advance=chunk.num_bytes)
+        finally:
+            if stream is not None:
+                stream.close()
+        return first_line_idx
+
+    def _find_debug_end_offset(self):
+        # the debug file may be in the middle of being written, only parse up to the last complete line
+        with open(self.debug, 'rb') as f:
+            return rfind_line_start(f, f.seek(0, os.SEEK_END))
+
+    def _find_debug_segment_start(self, end):
+        # byte offset of the last "tcp: listening on port" line before end, i.e. where the last manager run
+        # starts. The file is read backwards from end, so only the last run is read.
+        if self.debug_compression:
+            # a compressed log can only be read forward, from the beginning
+            segment_start = 0
+            offset = 0
+            with open_log(self.debug, self.debug_compression) as f:
+                for raw_line in f:
+                    if MANAGER_START_PATTERN in raw_line:
+                        segment_start = offset
+                    offset += len(raw_line)
+            return segment_start
+
+        with open(self.debug, 'rb') as f:
+            block_end = end
+            while block_end > 0:
+                block_start = max(block_end - DEBUG_SCAN_BLOCK_SIZE, 0)
+                f.seek(block_start)
+                # the blocks overlap so that a match across their boundary is not missed
+                block = f.read(min(block_end + len(MANAGER_START_PATTERN) - 1, end) - block_start)
+                pos = block.rfind(MANAGER_START_PATTERN)
+                if pos >= 0:
+                    return rfind_line_start(f, block_start + pos)
+                block_end = block_start
+        return 0
+
+    def _debug_range_contains(self, start, end, pattern):
+        with open(self.debug, 'rb') as f:
+            f.seek(start)
+            tail = b""
+            while start < end:
+                block = f.read(min(1 << 24, end - start))
+                if not block:
+                    break
+                if pattern in tail + block:
+                    return True
+                tail = block[-len(pattern):]
+                start += len(block)
+        return False
+
+    def _debug_fingerprint(self, offset):
+        # hashes of the head of the debug file and of the bytes right before the offset, used to tell whether the
+        # debug file is still the one a checkpoint was taken from (not rotated, truncated or rewritten)
+        with open(self.debug, 'rb') as f:
+            head = f.read(min(offset, RESUME_FINGERPRINT_BYTES))
+            f.seek(max(offset - RESUME_FINGERPRINT_BYTES, 0))
+            tail = f.read(offset - f.tell())
+        return hashlib.sha1(head).hexdigest(), hashlib.sha1(tail).hexdigest()
+
+    def checkpoint_resume_state(self):
+        # must run before postprocess_debug, which finalizes the state as if the log had ended
+        header = {
+            'version': RESUME_CHECKPOINT_VERSION,
+            'debug_segment_start': self.debug_segment_start,
+            'debug_parsed_offset': self.debug_parsed_offset,
+            'debug_fingerprint': self._debug_fingerprint(self.debug_parsed_offset),
+        }
+        state = {name: getattr(self, name) for name in self.RESUME_STATE_ATTRIBUTES}
+
+        tmp_file = self.resume_checkpoint_file + '.tmp'
+        with open(tmp_file, 'wb') as f:
+            cloudpickle.dump(header, f)
+            cloudpickle.dump(state, f)
+        os.replace(tmp_file, self.resume_checkpoint_file)
+
+    def restore_resume_state(self, end):
+        # returns True if the state of a previous run was restored and parsing can continue from debug_parsed_offset
+        if not os.path.exists(self.resume_checkpoint_file):
+            return False
+
+        with open(self.resume_checkpoint_file, 'rb') as f:
+            try:
+                header = cloudpickle.load(f)
+            except Exception:
+                header = {}
+
+            reason = None
+            if header.get('version') != RESUME_CHECKPOINT_VERSION:
+                reason = "it was written by a different version"
+            elif header['debug_parsed_offset'] > end:
+                reason = "the debug file is shorter than the parsed part"
+            elif header['debug_fingerprint'] != self._debug_fingerprint(header['debug_parsed_offset']):
+                reason = "the debug file has been replaced"
+            elif self._debug_range_contains(header['debug_parsed_offset'], end, MANAGER_START_PATTERN):
+                # a new manager run has started since the checkpoint, whatever run it was taken in: the state of
+                # that run cannot be continued into the new one, which _select_debug_segment picks up
+                reason = "the manager has restarted"
+            if reason:
+                print(f"Ignoring the resume checkpoint because {reason}, parsing from the beginning")
+                return False
+
+            state = cloudpickle.load(f)
+
+        for name in self.RESUME_STATE_ATTRIBUTES:
+            setattr(self, name, state[name])
+        self.debug_segment_start = header['debug_segment_start']
+        self.debug_parsed_offset = header['debug_parsed_offset']
+        self.debug_resumed_offset = self.debug_parsed_offset
+        self.timestamp_decoder = TimestampDecoder(self.manager.equivalent_tz)
+        return True
+
+    def _select_debug_segment(self, end):
+        # the whole debug file if the time zone matches its first manager run, otherwise only the last run.
+        # Nothing is copied, the range to parse is given in byte offsets.
+        try:
+            self.set_time_zone()
+            self.debug_segment_start = 0
+        except Exception as e:
+            self.debug_segment_start = self._find_debug_segment_start(end)
+            if self.debug_segment_start > 0:
+                print(f"The manager has restarted, only parsing its last run from byte {self.debug_segment_start} "
+                      f"(vine_parse --segments parses every run)")
+            self.set_time_zone(self.debug, self.debug_segment_start)
+        return self.debug_segment_start, end
+
+    def _select_debug_segment_range(self, end):
+        # the byte range of the manager run of a segment sub-template
+        start = self.debug_segment['start']
+        if self.debug_segment['end'] is not None:
+            if end is not None and self.debug_segment['end'] > end:
+                raise ValueError(f"the debug log of {self.runtime_template} is shorter than its manager runs, "
+                                 f"run vine_parse --segments on the parent log directory again")
+            end = self.debug_segment['end']
+        self.debug_segment_start = start
+        print(f"Parsing manager run {self.debug_segment['segment']} of {self.debug_segment['segments']} from byte {start}")
+        try:
+            self.set_time_zone(self.debug, start)
+        except Exception:
+            # the transactions log is rewritten by every run, it only has the start of the last one, whose
+            # time zone is also the one of the earlier runs
+            last_start = self._find_debug_segment_start(None if self.debug_compression else self._find_debug_end_offset())
+            self.set_time_zone(self.debug, last_start)
+        return start, end
+
+    def _prepare_incremental_parse(self):
+        end = self._find_debug_end_offset()
+        if self.restore_resume_state(end):
+            print(f"Resuming from byte {self.debug_parsed_offset} of the debug file")
+            return self.debug_parsed_offset, end
+        return self._select_debug_segment(end)
 
-        if self.debug_mode:
-            print("\n=== Handler Profiling Summary ===")
-            self._resort_debug_handlers()
-            print(f"{'Handler':<20} {'Hits':>10}")
-            print("-" * 30)
-            for cond_fn, handler_fn in self.debug_handlers:
-                name = getattr(handler_fn, "__name__", repr(handler_fn))
-                stats = self.debug_handler_profiling.get(handler_fn, {})
-                hits = stats.get("hits", 0)
-                print(f"{name:<20} {hits:>10}")
+    def parse_debug(self):
+        if self.incremental:
+            start, end = self._prepare_incremental_parse()
+        else:
+            # older versions copied the last manager run to debug.cleaned, which is no longer used
+            debug_cleaned = os.path.join(self.vine_logs_dir, 'debug.cleaned')
+            if os.path.exists(debug_cleaned):
+                os.remove(debug_cleaned)
+            # a compressed log is parsed up to its end, its decompressed size is not known ahead
+            end = None if self.debug_compression else os.path.getsize(self.debug)
+            if self.debug_segment is not None:
+                start, end = self._select_debug_segment_range(end)
+            else:
+                start, end = self._select_debug_segment(end)
+        self._parse_debug_range(start, end)
+
+    def _parse_debug_range(self, start, end, description="Parsing debug"):
+        # the progress is tracked in bytes of the file on disk, so the file does not need to be read ahead
+        # to count its lines. A compressed log is tracked in compressed bytes, from the beginning.
+        progress_total = os.path.getsize(self.debug) if self.debug_compression else end - start
+        debug_file_size_mb = floor_decimal(progress_total / 1024 / 1024, 2)
+        unit, scale = get_size_unit_and_scale(debug_file_size_mb)
+        debug_file_size_str = f"{floor_decimal(debug_file_size_mb * scale, 2)} {unit}"
+        if self.debug_compression:
+            debug_file_size_str += f" {self.debug_compression}"
+
+        time_parse_start = time.time()
+        if self.profiler is not None:
+            self.profiler.start()
+        with create_progress_bar(track_bytes=True) as progress:
+            task_id = progress.add_task(f"[green]{description} ({debug_file_size_str})", total=progress_total)
+            if self.jobs > 1:
+                total_lines = self._parse_debug_parallel(self.debug, start, end, progress, task_id)
+            else:
+                total_lines = self._parse_debug_serial(self.debug, start, end, progress, task_id)
+        time_parse = time.time() - time_parse_start
+        self.debug_parsed_offset = end
+
+        if self.profiler is not None:
+            if self.debug_mode:
+                self.profiler.print_summary()
+                print(f"Parsed {total_lines} lines in {time_parse:.2f}s ({int(total_lines / max(time_parse, 1e-6))} lines/s)")
+            json_file, collapsed_file = self.profiler.export(self.json_files_dir)
+            print(f"Parse profile written to {json_file} and {collapsed_file}")
+
+    def parse_debug_appended(self):
+        # parse the complete lines appended since the last parse, returns the number of bytes parsed,
+        # or None if the manager has restarted and only the last run is being followed
+        start = self.debug_parsed_offset
+        end = self._find_debug_end_offset()
+        if end < start:
+            raise ValueError(f"debug file {self.debug} has been truncated")
+        if end == start or (self.debug_segment is not None and self.debug_segment['end'] is not None):
+            # a manager run that is followed by another one does not grow
+            return 0
+        if self._debug_range_contains(start, end, MANAGER_START_PATTERN):
+            # a new run, also when the whole log was parsed so far: its lines cannot go into the state of the last run
+            return None
+        self._parse_debug_serial(self.debug, start, end)
+        self.debug_parsed_offset = end
+        return end - start
+
+    def parse_transactions(self):
+        """
+        The transactions backend: the tasks, the workers and the manager times are built from the transactions
+        log, read in one go by TransactionsLog. If there is a debug log, its last manager run is then parsed
+        with only the handlers of TRANSACTIONS_DEBUG_HANDLERS, for the file transfers and the details the
+        transactions log does not have (exit status, output sizes, worker machine names, transfer ports).
+        Without a debug log the files come from the TRANSFER and CACHE_UPDATE events, and times are in UTC.
+        """
+        time_parse_start = time.time()
+        transactions = TransactionsLog(self.transactions)
+        print(f"Read {len(transactions.events)} transactions in {time.time() - time_parse_start:.2f}s")
+
+        debug_end = None
+        if self.debug is not None:
+            debug_end = None if self.debug_compression else os.path.getsize(self.debug)
+            self.debug_segment_start = self._find_debug_segment_start(debug_end)
+            self.set_time_zone(self.debug, self.debug_segment_start)
+        else:
+            self.manager.time_zone_offset_hours = 0
+            self.manager.equivalent_tz = timezone.utc
+            self.timestamp_decoder = TimestampDecoder(self.manager.equivalent_tz)
+            print(f"No debug log, times are shown in UTC")
+
+        time_start, time_end, last_time = transactions.manager_times()
+        if time_start is not None:
+            self.manager.set_time_start(time_start)
+        workers_by_hash = self._build_workers_from_transactions(transactions.worker_events())
+        self._build_tasks_from_transactions(transactions.task_tries())
+
+        if self.debug is not None:
+            self._parse_debug_supplement(debug_end)
+        else:
+            self._build_files_from_transactions(transactions.file_events(), workers_by_hash)
+
+        if time_end is not None:
+            self.manager.set_time_end(time_end)
+        if last_time is not None and (self.manager.current_max_time is None or last_time > self.manager.current_max_time):
+            self.manager.set_current_max_time(last_time)
+        print(f"Parsed the transactions backend in {time.time() - time_parse_start:.2f}s")
+
+    def _build_workers_from_transactions(self, worker_events):
+        # returns the workers by the id the transactions log refers to them with
+        workers_by_hash = {}
+        for event in worker_events.iter_rows(named=True):
+            timestamp = event['time']
+            if event['event'] == 'CONNECTION':
+                worker = self.add_new_worker(event['ip'], event['port'], timestamp)
+                worker.set_hash(event['worker_hash'])
+                workers_by_hash[event['worker_hash']] = worker
+                self.manager.set_when_first_worker_connect(timestamp)
+                continue
+            worker = workers_by_hash.get(event['worker_hash'])
+            if worker is None:
+                continue
+            if event['event'] == 'DISCONNECTION':
+                if len(worker.time_disconnected) < len(worker.time_connected):
+                    worker.add_disconnection(timestamp)
+                    self.manager.update_when_last_worker_disconnect(timestamp)
+            else:
+                if event['cores'] is not None:
+                    worker.set_cores(int(event['cores']))
+                if event['memory'] is not None:
+                    worker.set_memory_mb(int(event['memory']))
+                if event['disk'] is not None:
+                    worker.set_disk_mb(int(event['disk']))
+                if event['gpus'] is not None:
+                    worker.set_gpus(int(event['gpus']))
+        return workers_by_hash
+
+    def _build_tasks_from_transactions(self, task_tries):
+        # the connections of every ip:port in log order, a try ran on the last one made before it was dispatched
+        connections = defaultdict(lambda: ([], []))     # key: (ip, port), value: (connection times, worker ids)
+        for worker in self.workers.values():
+            times, worker_ids = connections[(worker.ip, worker.port)]
+            times.append(worker.time_connected[0])
+            worker_ids.append(worker.id)
+
+        previous_try = {}   # key: task_id, value: its last TaskInfo so far
+        dispatched = []
+        for row in task_tries.iter_rows(named=True):
+            task_id = row['task_id']
+            task = TaskInfo(task_id, row['task_try_id'])
+            task.set_when_ready(row['when_ready'])
+            if row['category'] is not None:
+                task.set_category(row['category'])
+            if row['cores'] is not None:
+                task.set_cores_requested(int(row['cores']))
+            if row['gpus'] is not None:
+                task.set_gpus_requested(int(row['gpus']))
+            if row['memory'] is not None:
+                task.set_memory_requested_mb(int(row['memory']))
+            if row['disk'] is not None:
+                task.set_disk_requested_mb(int(row['disk']))
+
+            if row['when_running'] is not None:
+                task.set_when_running(row['when_running'])
+                times, worker_ids = connections.get((row['ip'], row['port']), ((), ()))
+                idx = bisect_right(times, row['when_running']) - 1
+                if idx >= 0:
+                    task.set_worker_id(worker_ids[idx])
+                    dispatched.append((row['running_seq'], task))
+                self.manager.set_when_first_task_start_commit(row['when_running'])
+            if row['when_waiting_retrieval'] is not None:
+                task.set_when_waiting_retrieval(row['when_waiting_retrieval'])
+            if row['when_retrieved'] is not None:
+                task.set_when_retrieved(row['when_retrieved'])
+                task.set_task_status(row['when_retrieved'], row['result_code'])
+                if row['measured_start'] is not None and row['measured_end'] is not None:
+                    task.set_time_worker_start(centiseconds_to_seconds(microseconds_to_centiseconds(int(row['measured_start']))))
+                    task.set_time_worker_end(centiseconds_to_seconds(microseconds_to_centiseconds(int(row['measured_end']))))
+            if row['when_done'] is not None:
+                task.set_when_done(row['when_done'])
+                if row['exit_code'] is not None:
+                    task.set_exit_status(row['exit_code'])
+                if task.worker_id:
+                    self.manager.set_when_last_task_done(row['when_done'])
+                    self.workers[task.worker_id].tasks_completed.append(task)
+            self.add_task(task)
+
+            if task_id in previous_try:
+                self._fail_transactions_task_try(previous_try[task_id], task.when_ready)
+                self.transactions_try_starts.append((task.when_running or task.when_ready, task_id, task.task_try_id))
+            previous_try[task_id] = task
+            self.current_try_id[task_id] = task.task_try_id
+
+        # the cores are assigned in the order the tries were dispatched, as the debug parser does
+        dispatched.sort(key=lambda item: item[0])
+        for _, task in dispatched:
+            worker = self.workers[task.worker_id]
+            task.committed_worker_hash = worker.hash
+            if worker.coremap is None:
+                continue
+            if worker.run_task(task) == -1:
+                print(f"Warning: worker {worker.worker_entry} has no enough cores to run task {task.task_id}")
+        self.transactions_try_starts.sort(key=lambda item: item[0])
+
+    def _fail_transactions_task_try(self, task, when_retried):
+        # a try that was followed by another one, as the debug parser records a task going back to READY
+        if task.worker_id:
+            self.workers[task.worker_id].tasks_failed.append(task)
+        if task.task_status is not None:
+            return
+        if task.worker_id:
+            worker = self.workers[task.worker_id]
+            if worker.time_disconnected and worker.time_disconnected[-1] <= when_retried:
+                task.set_task_status(worker.time_disconnected[-1], 15 << 3)   # the worker disconnected
+            else:
+                task.set_task_status(when_retried, 4 << 3)                    # unknown
+        else:
+            task.set_task_status(when_retried, 42 << 3)                       # undispatched
+
+    def _build_files_from_transactions(self, file_events, workers_by_hash):
+        # without a debug log, a replica starts with the event that reports it and stays until the end
+        for event in file_events.iter_rows(named=True):
+            worker = workers_by_hash.get(event['worker_hash'])
+            if worker is None:
+                continue
+            timestamp = event['time']
+            time_start = event['time_start']
+            file = self.ensure_file_info_entry(event['file_name'], event['size_mb'], time_start)
+            row = self.transfers.add(file.file_id, worker.id, min(time_start, timestamp))
+            self.transfers.stage_in(row, timestamp)
+            worker.add_active_file_or_transfer(file.file_id)
+
+    def _parse_debug_supplement(self, end):
+        # parse the last manager run of the debug log for what the transactions log lacks, the ip:port of the
+        # workers and the tries of the tasks are replayed from the transactions log along the way
+        final_connect_id = self.current_worker_connect_id
+        final_try_id = self.current_try_id
+        self.current_worker_connect_id = defaultdict(int)
+        self.current_try_id = defaultdict(int, {task_id: 1 for task_id in final_try_id})
+        self.transactions_try_index = 0
+        self.transactions_skipped_debug_lines = 0
+
+        handlers = self.debug_dispatch
+        self._init_transactions_debug_handlers()
+        try:
+            self._parse_debug_range(self.debug_segment_start, end, "Parsing debug details")
+        finally:
+            self.debug_dispatch = handlers
+
+        self.current_worker_connect_id = final_connect_id
+        self.current_try_id = final_try_id
+        if self.transactions_skipped_debug_lines:
+            print(f"Skipped {self.transactions_skipped_debug_lines} debug lines about tasks or workers "
+                  f"that are not in the transactions log")
+
+    def snapshot(self):
+        # a copy whose state can be finalized by postprocess_debug while this parser keeps parsing
+        snapshot = copy.copy(self)
+        state = cloudpickle.loads(cloudpickle.dumps({name: getattr(self, name) for name in self.RESUME_STATE_ATTRIBUTES}))
+        for name, value in state.items():
+            setattr(snapshot, name, value)
+        return snapshot
 
     def parse_logs(self):
-        # parse the debug file
-        self.parse_debug()
-        
+        # parse the debug file, or the transactions file
+        if self.backend == 'transactions':
+            self.parse_transactions()
+        else:
+            self.parse_debug()
+
+        # save the parser state before it is finalized, so that the next run only parses what is appended
+        if self.incremental and self.debug_parsed_offset != self.debug_resumed_offset:
+            self.checkpoint_resume_state()
+
         # postprocess the debug
         self.postprocess_debug()
 
@@ -932,33 +1588,22 @@ class DataParser:
             self.checkpoint_pkl_files()
 
     def checkpoint_pkl_files(self):
+        # the parsed state is stored as typed Parquet tables, see ColumnarCheckpoint
+        checkpoint = ColumnarCheckpoint(self.pkl_files_dir)
+        writers = [
+            ('manager', lambda: checkpoint.write_manager(self.manager)),
+            ('tasks', lambda: checkpoint.write_tasks(self.tasks)),
+            ('workers', lambda: checkpoint.write_workers(self.workers)),
+            ('files', lambda: checkpoint.write_files(self.files)),
+            ('transfers', lambda: checkpoint.write_transfers(self.transfers)),
+            ('subgraphs', lambda: checkpoint.write_subgraphs(self.subgraphs)),
+        ]
         with create_progress_bar() as progress:
-            pbar = progress.add_task(f"[green]Checkpointing pkl files", total=5)
-
-            progress.update(pbar, description=f"[green]Checkpointing workers.pkl")
-            with open(os.path.join(self.pkl_files_dir, 'workers.pkl'), 'wb') as f:
-                cloudpickle.dump(self.workers, f)
-            progress.advance(pbar)
-
-            progress.update(pbar, description=f"[green]Checkpointing files.pkl")
-            with open(os.path.join(self.pkl_files_dir, 'files.pkl'), 'wb') as f:
-                cloudpickle.dump(self.files, f)
-            progress.advance(pbar)
-
-            progress.update(pbar, description=f"[green]Checkpointing tasks.pkl")
-            with open(os.path.join(self.pkl_files_dir, 'tasks.pkl'), 'wb') as f:
-                cloudpickle.dump(self.tasks, f)
-            progress.advance(pbar)
-            
-            progress.update(pbar, description=f"[green]Checkpointing manager.pkl")
-            with open(os.path.join(self.pkl_files_dir, 'manager.pkl'), 'wb') as f:
-                cloudpickle.dump(self.manager, f)
-            progress.advance(pbar)
-
-            progress.update(pbar, description=f"[green]Checkpointing subgraphs.pkl")
-            with open(os.path.join(self.pkl_files_dir, 'subgraphs.pkl'), 'wb') as f:
-                cloudpickle.dump(self.subgraphs, f)
-            progress.advance(pbar)
+            pbar = progress.add_task(f"[green]Checkpointing tables", total=len(writers))
+            for name, write in writers:
+                progress.update(pbar, description=f"[green]Checkpointing {name}.parquet")
+                write()
+                progress.advance(pbar)
 
     def postprocess_debug(self):
         # some post-processing in case the manager does not exit normally or has not finished yet
@@ -1011,10 +1656,24 @@ class DataParser:
         # append file_idx
         for idx, file in enumerate(self.files.values(), start=1):
             file.file_idx = idx
-            file.unlink_all(self.manager.time_end)
+            self.transfers.unlink_all(file.file_id, self.manager.time_end)
+
+    def load_pkl_files(self, tables=None):
+        # tables can be restricted to what the caller needs, e.g. ('manager', 'tasks')
+        checkpoint = ColumnarCheckpoint(self.pkl_files_dir)
+        if not checkpoint.exists():
+            self._load_legacy_pkl_files()
+            return
 
-    def load_pkl_files(self):
-        # manually load every thing like checkpoint_pkl_files, rathan than using self.pkl_files in a loop
+        tables = tables or TABLE_NAMES
+        with create_progress_bar() as progress:
+            pbar = progress.add_task(f"[green]Loading tables", total=1)
+            progress.update(pbar, description=f"[green]Loading {', '.join(tables)}")
+            checkpoint.load_into(self, tables)
+            progress.advance(pbar)
+
+    def _load_legacy_pkl_files(self):
+        # directories checkpointed by older versions only have cloudpickle files
         with create_progress_bar() as progress:
             pbar = progress.add_task(f"[green]Loading pkl files", total=5)
 
@@ -1025,7 +1684,8 @@ class DataParser:
             
             progress.update(pbar, description=f"[green]Loading files.pkl")
             with open(os.path.join(self.pkl_files_dir, 'files.pkl'), 'rb') as f:
-                self.files = cloudpickle.load(f)
+                # with their transfers, which _convert_legacy_state moves to the transfer table
+                self.files = LegacyUnpickler(f).load()
             progress.advance(pbar)
             
             progress.update(pbar, description=f"[green]Loading tasks.pkl")
@@ -1042,3 +1702,54 @@ class DataParser:
             with open(os.path.join(self.pkl_files_dir, 'subgraphs.pkl'), 'rb') as f:
                 self.subgraphs = cloudpickle.load(f)
             progress.advance(pbar)
+
+        self._convert_legacy_state()
+
+    def _convert_legacy_state(self):
+        # the legacy pickles key files by name and workers by (ip, port, connect_id), and the records refer to
+        # them the same way, rebuild the symbol tables in the original order and switch everything to ids
+        self.file_symbols = SymbolTable()
+        self.worker_symbols = SymbolTable(first_id=1)
+
+        workers = {}
+        for worker_entry, worker in self.workers.items():
+            worker.id = self.worker_symbols.intern(worker_entry)
+            workers[worker.id] = worker
+        self.workers = workers
+
+        legacy_files = self.files
+        files = {}
+        for file_name, legacy_file in legacy_files.items():
+            file_id = self.file_symbols.intern(file_name)
+            file = FileInfo(file_id, legacy_file.filename, legacy_file.size_mb, legacy_file.created_time)
+            for name in ('file_idx', 'consumers', 'producers', 'penalty'):
+                if hasattr(legacy_file, name):
+                    setattr(file, name, getattr(legacy_file, name))
+            files[file_id] = file
+        self.files = files
+
+        def to_file_id(value):
+            return self.file_symbols.intern(value) if isinstance(value, str) else value
+
+        def to_worker_id(value):
+            return self.worker_symbols.lookup(value) if isinstance(value, tuple) else value
+
+        for task in self.tasks.values():
+            task.input_files = small_set(map(to_file_id, task.input_files))
+            task.output_files = small_set(map(to_file_id, task.output_files))
+            task.worker_id = to_worker_id(task.worker_id)
+        for worker in self.workers.values():
+            worker.current_replicas = set(map(to_file_id, worker.current_replicas))
+        self.transfers = TransferTable()
+        for file_name, legacy_file in legacy_files.items():
+            file_id = self.file_symbols[file_name]
+            for transfer in legacy_file.get_flattened_transfers():
+                if isinstance(transfer, IndexedTransferEvent):
+                    row = self.transfers.add(file_id, to_worker_id(transfer.dest_worker_id), transfer.time_start_stage_in,
+                                             transfer.transfer_id, to_worker_id(transfer.source))
+                else:
+                    row = self.transfers.add(file_id, to_worker_id(transfer.dest_worker_id), transfer.time_start_stage_in)
+                if transfer.time_stage_in is not None:
+                    self.transfers.stage_in(row, transfer.time_stage_in)
+                if transfer.time_stage_out is not None:
+                    self.transfers.stage_out(row, transfer.time_stage_out)
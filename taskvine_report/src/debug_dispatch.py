@@ -0,0 +1,161 @@
+import re
+import time
+from collections import defaultdict
+
+
+class DebugHandler:
+    """
+    A debug line handler.
+
+    `cond` and `action` keep the (line, parts, ctx) signature used by the parser. `tokens` and `phrases`
+    are the keywords the handler is indexed on: `cond` may only return True when at least one of the
+    tokens is an element of `parts` or one of the phrases is a substring of `line`. A phrase test such as
+    `" info " in l` implies the token "info", so prefer indexing on such a token, a set lookup is much
+    cheaper than a substring search. `state` is an optional predicate on the parser that makes the
+    handler a candidate for every line while it holds (e.g. the multi-line resources report of a worker),
+    and `state_tokens` lists the tokens without which its action is a no-op on such lines.
+    """
+    def __init__(self, name, cond, action, tokens=(), phrases=(), state=None, state_tokens=()):
+        if not tokens and not phrases and state is None:
+            raise ValueError(f"handler {name} must be indexed on at least one token, phrase or state")
+        self.name = name
+        self.cond = cond
+        self.action = action
+        self.tokens = tuple(tokens)
+        self.phrases = tuple(phrases)
+        self.state = state
+        self.state_tokens = tuple(state_tokens)
+        self.priority = None
+
+
+class DebugLineClassifier:
+    """
+    The stateless part of the dispatch: map a line to the priorities of the handlers whose keywords it
+    contains. It only holds plain sets, tuples and a compiled pattern so it can be shipped to worker processes.
+
+    `line_filter` is a bytes pattern that finds the lines worth decoding on the raw log. Every relevant line
+    matches it, a line that matches may still turn out to have no candidates.
+    """
+    def __init__(self, index, token_keys, phrase_keys, state_keys):
+        self.index = index                  # key: token or phrase, value: candidate priorities in ascending order
+        self.token_keys = token_keys
+        self.phrase_keys = phrase_keys
+        self.state_keys = state_keys        # tokens a stateful handler may act on
+        self.line_filter = self._compile_line_filter()
+
+    def _compile_line_filter(self):
+        # on a timestamped line every token, state tokens included, follows a space (the date and the time
+        # come first), and a phrase with a space in it contains a space followed by the rest of the phrase.
+        # Starting every alternative with a space lets the regex engine jump from space to space.
+        def alternation(keys):
+            keys = sorted(keys, key=lambda key: (-len(key), key))
+            return b"|".join(re.escape(key.encode()) for key in keys)
+
+        anchored = []
+        unanchored = []
+        for phrase in self.phrase_keys:
+            if " " in phrase:
+                anchored.append(phrase[phrase.index(" ") + 1:])
+            else:
+                unanchored.append(phrase)
+        following_space = []
+        if self.token_keys or self.state_keys:
+            following_space.append(b"(?:" + alternation(self.token_keys | self.state_keys) + rb")(?!\S)")
+        if anchored:
+            following_space.append(alternation(set(anchored)))
+        alternatives = [b" (?:" + b"|".join(following_space) + b")"] if following_space else []
+        if unanchored:
+            alternatives.append(alternation(set(unanchored)))
+        return re.compile(b"|".join(alternatives))
+
+    def classify(self, line, parts):
+        keys = [phrase for phrase in self.phrase_keys if phrase in line]
+        keys.extend(self.token_keys.intersection(parts))
+        if not keys:
+            return ()
+        if len(keys) == 1:
+            return self.index[keys[0]]
+        candidates = set()
+        for key in keys:
+            candidates.update(self.index[key])
+        return tuple(sorted(candidates))
+
+    def is_relevant(self, candidates, parts):
+        # whether any handler could act on the line, whatever the parser state is
+        return bool(candidates) or not self.state_keys.isdisjoint(parts)
+
+
+class DebugDispatchTable(DebugLineClassifier):
+    """
+    Classify a debug line once against all handler keywords and jump straight to the handler.
+
+    Handlers are given in precedence order. A line is first mapped to the handlers whose keywords it
+    contains (one set intersection for the tokens and a substring test per phrase), then only those
+    candidates' conditions are evaluated in precedence order, so the handler picked is always the one a
+    linear scan over all conditions would pick.
+    """
+    def __init__(self, handlers):
+        self.handlers = list(handlers)
+
+        index = defaultdict(set)
+        phrases = []
+        self.stateful_handlers = []
+        for priority, handler in enumerate(self.handlers):
+            handler.priority = priority
+            for key in handler.tokens + handler.phrases:
+                index[key].add(priority)
+            for phrase in handler.phrases:
+                if phrase not in phrases:
+                    phrases.append(phrase)
+            if handler.state is not None:
+                self.stateful_handlers.append(handler)
+
+        super().__init__(
+            {key: tuple(sorted(priorities)) for key, priorities in index.items()},
+            frozenset(key for handler in self.handlers for key in handler.tokens),
+            tuple(phrases),
+            frozenset(key for handler in self.stateful_handlers for key in handler.state_tokens),
+        )
+
+    def classifier(self):
+        return DebugLineClassifier(self.index, self.token_keys, self.phrase_keys, self.state_keys)
+
+    def match(self, line, parts, ctx, candidates=None):
+        # candidates can be passed in when the line was already classified, e.g. by a worker process
+        if candidates is None:
+            candidates = self.classify(line, parts)
+        for handler in self.stateful_handlers:
+            if handler.priority not in candidates and handler.state(ctx):
+                candidates = tuple(sorted(candidates + (handler.priority,)))
+        handlers = self.handlers
+        for priority in candidates:
+            handler = handlers[priority]
+            if handler.cond(line, parts, ctx):
+                return handler
+        return None
+
+    def match_timed(self, line, parts, ctx, candidates, profiler):
+        # match, with the time of the classification and of every condition tried added to the profiler
+        if candidates is None:
+            start = time.perf_counter_ns()
+            candidates = self.classify(line, parts)
+            profiler.add_sampled(('dispatch', 'classify'), time.perf_counter_ns() - start)
+        for handler in self.stateful_handlers:
+            if handler.priority not in candidates and handler.state(ctx):
+                candidates = tuple(sorted(candidates + (handler.priority,)))
+        handlers = self.handlers
+        for priority in candidates:
+            handler = handlers[priority]
+            start = time.perf_counter_ns()
+            matched = handler.cond(line, parts, ctx)
+            profiler.add_sampled(('dispatch', handler.name, 'condition'), time.perf_counter_ns() - start)
+            if matched:
+                return handler
+        return None
+
+    def match_linear(self, line, parts, ctx):
+        # reference scan over every condition, used to cross-check the index in debug mode
+        for handler in self.handlers:
+            if handler.cond(line, parts, ctx):
+                return handler
+        return None
@@ -0,0 +1,125 @@
+import json
+import mmap
+import os
+import re
+import shutil
+from .compressed_log import detect_compression, find_debug_log, open_log
+
+
+# every manager run starts by logging the port it listens on, a restarted manager appends to the same debug log
+MANAGER_START_PATTERN = b"tcp: listening on port"
+
+# a manager run of a template is parsed as the sub-template <template>/segment-<k>, k counting from 1
+SEGMENT_INFO_FILE = 'segment.json'
+SEGMENT_INFO_VERSION = 1
+SEGMENT_TEMPLATE_NAME = re.compile(r"segment-([0-9]+)")
+
+
+def _line_start(data, pos):
+    return data.rfind(b"\n", 0, pos) + 1
+
+
+def _manager_start_offsets(debug, compression=None):
+    # the offsets of the lines where a manager run starts, and the size of the log
+    starts = []
+    if compression:
+        # a compressed log can only be read forward
+        offset = 0
+        with open_log(debug, compression) as f:
+            for raw_line in f:
+                if MANAGER_START_PATTERN in raw_line:
+                    starts.append(offset)
+                offset += len(raw_line)
+        return starts, offset
+
+    size = os.path.getsize(debug)
+    if size > 0:
+        with open(debug, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            pos = data.find(MANAGER_START_PATTERN)
+            while pos >= 0:
+                starts.append(_line_start(data, pos))
+                pos = data.find(MANAGER_START_PATTERN, pos + len(MANAGER_START_PATTERN))
+    return starts, size
+
+
+def _segment_ranges(starts):
+    starts = [0] + starts[1:]
+    return list(zip(starts, starts[1:] + [None]))
+
+
+def find_debug_segments(debug, compression=None):
+    """
+    The byte ranges [start, end) of the manager runs in a debug log, in decompressed bytes for a compressed
+    log. A run starts at a "tcp: listening on port" line, the lines before the first one belong to the first
+    run. The end of the last run is None: it goes up to the end of the log, which may still be growing.
+    """
+    starts, _ = _manager_start_offsets(debug, compression)
+    return _segment_ranges(starts)
+
+
+def is_segment_template_name(name):
+    return SEGMENT_TEMPLATE_NAME.fullmatch(name) is not None
+
+
+def read_segment_info(template):
+    # the manager run a segment sub-template parses, None for a regular template
+    info_file = os.path.join(template, SEGMENT_INFO_FILE)
+    if not os.path.exists(info_file):
+        return None
+    with open(info_file) as f:
+        info = json.load(f)
+    if info.get('version') != SEGMENT_INFO_VERSION:
+        raise ValueError(f"{info_file} was written by a different version, run vine_parse --segments on the parent log directory again")
+    return info
+
+
+def list_segment_templates(template):
+    # the names of the segment sub-templates of a template, in run order
+    try:
+        names = [name for name in os.listdir(template)
+                 if is_segment_template_name(name) and os.path.exists(os.path.join(template, name, SEGMENT_INFO_FILE))]
+    except OSError:
+        return []
+    return sorted(names, key=lambda name: int(SEGMENT_TEMPLATE_NAME.fullmatch(name).group(1)))
+
+
+def create_segment_templates(template):
+    """
+    Index the manager runs in the debug log of a template and create a sub-template for each of them, returns
+    their paths, largest run first, or an empty list if the manager has not restarted.
+
+    A sub-template <template>/segment-<k> has a vine-logs symlink to the vine-logs of the template, nothing is
+    copied, and a segment.json with the byte range of its run in the debug log. DataParser only parses that
+    range, so the runs can be parsed independently, each into the pkl-files and report-files of its own
+    sub-template. Sub-templates left from a debug log that had more runs are removed.
+    """
+    vine_logs_dir = os.path.join(template, 'vine-logs')
+    debug = find_debug_log(vine_logs_dir)
+    if debug is None:
+        raise ValueError(f"no debug log in {vine_logs_dir}")
+    starts, size = _manager_start_offsets(debug, detect_compression(debug))
+    segments = _segment_ranges(starts)
+
+    stale = list_segment_templates(template)
+    if len(segments) < 2:
+        segments = []
+    segment_templates = []
+    for index, (start, end) in enumerate(segments, 1):
+        name = f"segment-{index}"
+        if name in stale:
+            stale.remove(name)
+        segment_template = os.path.join(template, name)
+        os.makedirs(segment_template, exist_ok=True)
+        link = os.path.join(segment_template, 'vine-logs')
+        if not os.path.lexists(link):
+            os.symlink(os.path.join('..', 'vine-logs'), link, target_is_directory=True)
+        info = {'version': SEGMENT_INFO_VERSION, 'segment': index, 'segments': len(segments),
+                'debug': os.path.basename(debug), 'start': start, 'end': end}
+        with open(os.path.join(segment_template, SEGMENT_INFO_FILE), 'w') as f:
+            json.dump(info, f, indent=2)
+        segment_templates.append((segment_template, (size if end is None else end) - start))
+
+    for name in stale:
+        shutil.rmtree(os.path.join(template, name))
+    # the largest runs first, so that a pool does not end up waiting on a large one started last
+    return [segment_template for segment_template, _ in sorted(segment_templates, key=lambda item: -item[1])]
@@ -0,0 +1,181 @@
+import numpy as np
+
+
+# extremes: the first and last points and the highest one, and points evenly spread between them (the default)
+# lttb:     Largest-Triangle-Three-Buckets, the point of every bucket that keeps the shape of the line best
+# m4:       the first, last, lowest and highest point of every pixel column, a line drawn from them looks the same
+DOWNSAMPLING_METHODS = ('extremes', 'lttb', 'm4')
+
+# with fewer target points than this, a series of more points is still downsampled to this many
+MIN_POINT_COUNT = 10
+
+
+def as_float_array(values):
+    """
+    A float64 array of a numpy array, a polars or Arrow column or a list, with NaN for a missing value.
+    A polars or Arrow float column without nulls is not copied.
+    """
+    if hasattr(values, 'to_numpy') and not isinstance(values, np.ndarray):
+        values = values.to_numpy()
+    values = np.asarray(values)
+    if values.dtype == object:
+        values = np.array([np.nan if v is None else v for v in values.tolist()], dtype=np.float64)
+    return values.astype(np.float64, copy=False)
+
+
+def _spread(start, stop, count):
+    # count of the indices start..stop-1, evenly spread from start, all of them if there are not more
+    available = stop - start
+    if available <= count:
+        return np.arange(start, stop, dtype=np.int64)
+    step = available / count
+    return start + (np.arange(count) * step).astype(np.int64)
+
+
+def _extremes_indices(x, y, target):
+    n = len(y)
+    valid = ~np.isnan(y)
+    if not valid.any():
+        return np.arange(target, dtype=np.int64)
+
+    def lowest_where(mask, default):
+        # the first of the lowest valid points where mask is set
+        candidates = np.flatnonzero(mask & valid)
+        if not len(candidates):
+            return default
+        return int(candidates[np.argmin(y[candidates])])
+
+    start_idx = lowest_where(x == x[0], 0)
+    end_idx = lowest_where(x == x[-1], n - 1)
+    y_max_idx = int(np.argmax(np.where(valid, y, -np.inf)))
+    keep = np.unique([start_idx, end_idx, y_max_idx])
+
+    remaining = target - len(keep)
+    if remaining <= 0:
+        return keep
+
+    # the remaining points are shared between the gaps between the kept points, the first gaps get the rest
+    if len(keep) > 1:
+        gaps = len(keep) - 1
+        points_per_gap, extra = divmod(remaining, gaps)
+        sampled = [keep]
+        for start, end in zip(keep[:-1].tolist(), keep[1:].tolist()):
+            if end - start - 1 <= 0:
+                continue
+            count = points_per_gap + (1 if extra > 0 else 0)
+            if extra > 0:
+                extra -= 1
+            if count > 0:
+                sampled.append(_spread(start + 1, end, count))
+        keep = np.unique(np.concatenate(sampled))
+
+    # and what is still missing is spread over all the points that are not kept yet
+    needed = target - len(keep)
+    if needed > 0:
+        available = np.setdiff1d(np.arange(n, dtype=np.int64), keep, assume_unique=True)
+        keep = np.union1d(keep, available[_spread(0, len(available), needed)])
+    return keep
+
+
+def _lttb_indices(x, y, target):
+    """
+    Largest-Triangle-Three-Buckets (Steinarsson, 2013): the first and last points, and from every one of
+    the target - 2 buckets in between the point that makes the largest triangle with the point kept from
+    the bucket before and the average of the bucket after. The loop is over the buckets, the points of a
+    bucket are compared at once.
+    """
+    n = len(y)
+    # the buckets of the points between the first and the last one
+    edges = (1 + np.arange(target - 1) * ((n - 2) / (target - 2))).astype(np.int64)
+    edges[-1] = n - 1
+    valid = ~np.isnan(y)
+    # the means of every bucket, of its valid points, from prefix sums
+    y_filled = np.where(valid, y, 0.0)
+    cum_x = np.concatenate(([0.0], np.cumsum(np.where(valid, x, 0.0))))
+    cum_y = np.concatenate(([0.0], np.cumsum(y_filled)))
+    cum_n = np.concatenate(([0], np.cumsum(valid)))
+    counts = np.maximum(cum_n[edges[1:]] - cum_n[edges[:-1]], 1)
+    mean_x = (cum_x[edges[1:]] - cum_x[edges[:-1]]) / counts
+    mean_y = (cum_y[edges[1:]] - cum_y[edges[:-1]]) / counts
+    # the last bucket is followed by the last point
+    mean_x = np.append(mean_x, x[-1])
+    mean_y = np.append(mean_y, y_filled[-1])
+
+    keep = np.empty(target, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for bucket in range(target - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        bx, by = x[start:stop], y[start:stop]
+        area = np.abs((x[a] - mean_x[bucket + 1]) * (by - y_filled[a]) - (x[a] - bx) * (mean_y[bucket + 1] - y_filled[a]))
+        a = start + int(np.argmax(np.where(np.isnan(area), -1.0, area)))
+        keep[bucket + 1] = a
+    return keep
+
+
+def _m4_indices(x, y, target):
+    """
+    M4 (Jugel et al., 2014): the x range is split into target // 4 columns of the same width, and the first,
+    last, lowest and highest point of every column are kept.
+    """
+    n = len(y)
+    columns = max(target // 4, 1)
+    order = None
+    if np.any(x[1:] < x[:-1]):
+        order = np.argsort(x, kind='stable')
+        x, y = x[order], y[order]
+
+    width = x[-1] - x[0]
+    if width > 0:
+        column = np.minimum(((x - x[0]) * (columns / width)).astype(np.int64), columns - 1)
+    else:
+        column = np.zeros(n, dtype=np.int64)
+    # the columns are runs of the sorted points
+    starts = np.flatnonzero(np.concatenate(([True], column[1:] != column[:-1])))
+    ends = np.append(starts[1:], n) - 1
+    run = np.repeat(np.arange(len(starts)), np.diff(np.append(starts, n)))
+
+    positions = np.arange(n, dtype=np.int64)
+    valid = ~np.isnan(y)
+    low = np.where(valid, y, np.inf)
+    high = np.where(valid, y, -np.inf)
+    # the first point of a column at its lowest and at its highest value, its first point if it has no value
+    lowest = np.minimum.reduceat(np.where(low == np.minimum.reduceat(low, starts)[run], positions, n), starts)
+    highest = np.minimum.reduceat(np.where(high == np.maximum.reduceat(high, starts)[run], positions, n), starts)
+
+    keep = np.unique(np.concatenate((starts, ends, lowest, highest)))
+    if order is not None:
+        keep = np.sort(order[keep])
+    return keep
+
+
+def downsample_indices(x, y, target_point_count=10000, method='extremes'):
+    """
+    The sorted indices of the points a series of `x` and `y` is downsampled to, about `target_point_count`
+    of them (M4 keeps up to that many), all the points if there are not more. A NaN `y` is a missing
+    value: `extremes` keeps some to fill up the target, LTTB and M4 only as the first or last point of the
+    series, or of an M4 column.
+
+    The points are arrays, see `as_float_array`, the selection is done on them with numpy instead of
+    going through the points in Python, a few million points take a fraction of a second. `extremes` keeps
+    exactly the points it always has: the lowest of the first points at the first x, the lowest of the last
+    points at the last x, the first highest point, and evenly spread points in between. LTTB and M4 expect
+    `x` to be increasing, M4 sorts it otherwise.
+    """
+    x = as_float_array(x)
+    y = as_float_array(y)
+    n = len(y)
+    if n <= target_point_count:
+        return np.arange(n, dtype=np.int64)
+    if n > MIN_POINT_COUNT and target_point_count < MIN_POINT_COUNT:
+        target_point_count = MIN_POINT_COUNT
+
+    if method == 'extremes':
+        return _extremes_indices(x, y, target_point_count)
+    if method == 'lttb':
+        if target_point_count < 3:
+            return np.array([0, n - 1], dtype=np.int64)
+        return _lttb_indices(x, y, target_point_count)
+    if method == 'm4':
+        return _m4_indices(x, y, target_point_count)
+    raise ValueError(f"Unknown downsampling method: {method}, expected one of {', '.join(DOWNSAMPLING_METHODS)}")
@@ -1,134 +1,33 @@
-from collections import defaultdict
+import pickle
+from .compact import SlottedRecord, small_set_add
 
 
-class TransferEvent():
-    def __init__(self, file_name, dest_worker_entry, time_start_stage_in):
-        self.file_name = file_name
-        self.dest_worker_entry = dest_worker_entry
+class FileInfo(SlottedRecord):
+    # the transfers of a file are rows of DataParser.transfers, see TransferTable
+    __slots__ = ('file_id', 'filename', 'size_mb', 'created_time', 'file_idx', 'consumers', 'producers', 'penalty')
 
-        self.time_start_stage_in = time_start_stage_in
-        self.time_stage_in = None
-        self.time_stage_out = None
-
-    def cache_update(self, time_stage_in):
-        # note that the cache-update might be received after the unlink, in this case we simply skip it
-        if self.time_stage_out is not None:
-            return
-        self.time_stage_in = time_stage_in
-
-    def cache_invalid(self, time_stage_out):
-        if self.time_stage_out is not None:
-            return
-        self.time_stage_out = time_stage_out
-
-    def unlink(self, time_stage_out):
-        if self.time_stage_out is not None:
-            return
-        self.time_stage_out = time_stage_out
-
-
-class IndexedTransferEvent(TransferEvent):
-    def __init__(self, file_name, dest_worker_entry, time_start_stage_in, transfer_id, source):
-        super().__init__(file_name, dest_worker_entry, time_start_stage_in)
-        self.transfer_id = transfer_id
-        self.source = source   # the source can be a url or an ip:port format
-
-
-class UnindexedTransferEvent(TransferEvent):
-    def __init__(self, file_name, dest_worker, time_start_stage_in):
-        super().__init__(file_name, dest_worker, time_start_stage_in)
-
-
-class FileInfo():
-    def __init__(self, filename, size_mb, timestamp):
+    def __init__(self, file_id, filename, size_mb, timestamp):
+        self.file_id = file_id      # see DataParser.file_symbols
         self.filename = filename
         self.size_mb = size_mb
         self.created_time = timestamp
         self.file_idx = None
 
-        self.indexed_transfers = {}  # key: transfer_id, value: IndexedTransferEvent
-        self.unindexed_transfers = defaultdict(list)  # key: dest_worker_entry, value: list of UnindexedTransferEvent
-
-        self.consumers = set()
-        self.producers = set()
-
-        self.worker_retentions = {}      # key: worker_entry, value: list of [time_retention_start, time_retention_end]
-    
-    def get_flattened_transfers(self):
-        all_transfers = []
-        for transfer in self.indexed_transfers.values():
-            all_transfers.append(transfer)
-        for transfer_list in self.unindexed_transfers.values():
-            all_transfers.extend(transfer_list)
-        return all_transfers
-    
-    def unlink_all(self, timestamp):
-        for transfer in self.indexed_transfers.values():
-            transfer.unlink(timestamp)
-            assert transfer.time_stage_out is not None, f"Transfer {transfer.transfer_id} for file {self.filename} did not unlink properly"
-        for transfer_list in self.unindexed_transfers.values():
-            for transfer in transfer_list:
-                transfer.unlink(timestamp)
-                assert transfer.time_stage_out is not None, f"Transfer {transfer.transfer_id} for file {self.filename} did not unlink properly"
+        # small sets of (task_id, task_try_id), see compact.small_set
+        self.consumers = ()
+        self.producers = ()
 
     def add_consumer(self, consumer_task):
-        self.consumers.add((consumer_task.task_id, consumer_task.task_try_id))
+        self.consumers = small_set_add(self.consumers, consumer_task.task_entry)
 
     def is_consumer(self, consumer_task):
-        return (consumer_task.task_id, consumer_task.task_try_id) in self.consumers
+        return consumer_task.task_entry in self.consumers
 
     def is_producer(self, producer_task):
-        return (producer_task.task_id, producer_task.task_try_id) in self.producers
+        return producer_task.task_entry in self.producers
 
     def add_producer(self, producer_task):
-        self.producers.add((producer_task.task_id, producer_task.task_try_id))
-
-    def cache_update(self, worker, time_stage_in, transfer_id):
-        worker_entry = worker.worker_entry
-        if transfer_id == 'X':
-            if len(self.producers) > 0:
-                new_transfer = UnindexedTransferEvent(self.filename, worker_entry, time_stage_in)
-                new_transfer.cache_update(time_stage_in)
-                self.unindexed_transfers[worker_entry].append(new_transfer)
-            else:
-                for transfer in self.unindexed_transfers[worker_entry]:
-                    transfer.cache_update(time_stage_in)
-        else:
-            # note: the transfer id can be stale from a previous manager
-            if transfer_id not in self.indexed_transfers:
-                print(f"Warning: transfer id {transfer_id} not found for file {self.filename} on worker {worker_entry}")
-                return
-            transfer = self.indexed_transfers[transfer_id]
-            transfer.cache_update(time_stage_in)
-
-        worker.add_active_file_or_transfer(self.filename)
-
-    def cache_invalid(self, worker, time_stage_out, transfer_id):
-        worker_entry = worker.worker_entry
-
-        if transfer_id is None:
-            for transfer in self.unindexed_transfers[worker_entry]:
-                transfer.cache_invalid(time_stage_out)
-        else:
-            # note: the transfer id can be stale from a previous manager
-            if transfer_id not in self.indexed_transfers:
-                print(f"Warning: transfer id {transfer_id} not found for file {self.filename} on worker {worker_entry}")
-                return
-            transfer = self.indexed_transfers[transfer_id]
-            transfer.cache_invalid(time_stage_out)
-
-        worker.remove_active_file_or_transfer(self.filename)
-
-    def unlink(self, worker, time_stage_out):
-        worker_entry = worker.worker_entry
-
-        for transfer in self.unindexed_transfers[worker_entry]:
-            transfer.unlink(time_stage_out)
-        for transfer in self.indexed_transfers.values():
-            if transfer.dest_worker_entry == worker_entry:
-                transfer.unlink(time_stage_out)
-
-        worker.remove_active_file_or_transfer(self.filename)
+        self.producers = small_set_add(self.producers, producer_task.task_entry)
 
     def set_size_mb(self, size_mb):
         size_mb = float(size_mb)
@@ -148,3 +47,55 @@ class FileInfo():
         print(f"producers: {self.producers}")
         print(f"penalty: {self.penalty}")
         print("\n")
+
+
+# The records of the transfers before they moved to TransferTable, only pickles written by older versions
+# still hold them, see DataParser._convert_legacy_state.
+
+class TransferEvent(SlottedRecord):
+    # one record per replica, the file and the destination worker are referred to by their ids
+    __slots__ = ('file_id', 'dest_worker_id', 'time_start_stage_in', 'time_stage_in', 'time_stage_out')
+    LEGACY_ATTRIBUTES = {'file_name': 'file_id', 'dest_worker_entry': 'dest_worker_id'}
+
+    def __init__(self, file_id, dest_worker_id, time_start_stage_in):
+        self.file_id = file_id
+        self.dest_worker_id = dest_worker_id
+
+        self.time_start_stage_in = time_start_stage_in
+        self.time_stage_in = None
+        self.time_stage_out = None
+
+
+class IndexedTransferEvent(TransferEvent):
+    __slots__ = ('transfer_id', 'source')
+
+    def __init__(self, file_id, dest_worker_id, time_start_stage_in, transfer_id, source):
+        super().__init__(file_id, dest_worker_id, time_start_stage_in)
+        self.transfer_id = transfer_id
+        self.source = source   # the source can be a url (str) or a worker id (int)
+
+
+class UnindexedTransferEvent(TransferEvent):
+    __slots__ = ()
+
+    def __init__(self, file_id, dest_worker_id, time_start_stage_in):
+        super().__init__(file_id, dest_worker_id, time_start_stage_in)
+
+
+class LegacyFileInfo:
+    """
+    A FileInfo of an older pickle, with its transfers in `indexed_transfers` (key: transfer id) and
+    `unindexed_transfers` (key: destination worker). Loaded in place of FileInfo by LegacyUnpickler.
+    """
+    def get_flattened_transfers(self):
+        all_transfers = list(getattr(self, 'indexed_transfers', {}).values())
+        for transfer_list in getattr(self, 'unindexed_transfers', {}).values():
+            all_transfers.extend(transfer_list)
+        return all_transfers
+
+
+class LegacyUnpickler(pickle.Unpickler):
+    def find_class(self, module, name):
+        if module == __name__ and name == 'FileInfo':
+            return LegacyFileInfo
+        return super().find_class(module, name)
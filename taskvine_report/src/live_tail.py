@@ -0,0 +1,145 @@
+import os
+import json
+import time
+import zlib
+from .data_parser import DataParser
+from .csv_manager import CSVManager
+from .report_store import TABLE_SUFFIX
+
+
+LIVE_STATUS_FILE_NAME = 'live_status.json'
+
+# while nothing is appended, the time of the status is still renewed this often, which tells vine_report that the
+# log is followed (the seq is unchanged, so no update is pushed)
+STATUS_HEARTBEAT_INTERVAL = 60.0
+
+
+def read_live_status(report_files_dir):
+    try:
+        with open(os.path.join(report_files_dir, LIVE_STATUS_FILE_NAME), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class LiveTail:
+    """
+    Follow the debug log of a running manager.
+
+    New lines are parsed into the in-memory state as they are appended. The plotting data is regenerated from a
+    snapshot of that state at a bounded rate: at most every `refresh_interval` seconds, and never spending more
+    than `max_refresh_share` of the time on regenerating, however large the state gets. After each refresh the
+    status file `report-files/live_status.json` is rewritten with what changed, which is what vine_report pushes
+    to the browsers. When following stops, also on Ctrl-C, the status says the manager is no longer running so
+    that the browsers stop waiting for updates.
+    """
+    def __init__(self, runtime_template,
+                 jobs=1,
+                 debug_mode=False,
+                 poll_interval=1.0,
+                 refresh_interval=5.0,
+                 max_refresh_share=0.2,
+                 **csv_manager_kwargs):
+        self.runtime_template = runtime_template
+        self.jobs = jobs
+        self.debug_mode = debug_mode
+        self.poll_interval = poll_interval
+        self.refresh_interval = refresh_interval
+        self.max_refresh_share = max_refresh_share
+        self.csv_manager_kwargs = csv_manager_kwargs
+
+        self.dp = None
+        self.seq = 0
+        self.metadata = {}
+        self.table_checksums = {}   # key: table file name, value: crc32 of its content
+        self.next_refresh_time = 0
+        self.status = None
+        self.status_file = None
+
+    def _start_parser(self):
+        # the first parse resumes from the checkpoint of a previous incremental run if there is one
+        self.dp = DataParser(self.runtime_template, debug_mode=self.debug_mode, jobs=self.jobs, incremental=True)
+        if self.dp.debug_compression:
+            raise ValueError(f"{self.dp.debug} is compressed, only a plain debug log can be followed")
+        self.dp.parse_debug()
+
+    def _collect_changed_tables(self, report_files_dir):
+        changed = []
+        for entry in os.scandir(report_files_dir):
+            if not entry.name.endswith(TABLE_SUFFIX):
+                continue
+            with open(entry.path, 'rb') as f:
+                checksum = zlib.crc32(f.read())
+            if self.table_checksums.get(entry.name) != checksum:
+                self.table_checksums[entry.name] = checksum
+                changed.append(entry.name[:-len(TABLE_SUFFIX)])
+        return sorted(changed)
+
+    def refresh(self):
+        time_refresh_start = time.time()
+
+        snapshot = self.dp.snapshot()
+        snapshot.postprocess_debug()
+        csv_manager = CSVManager(self.runtime_template, data_parser=snapshot, **self.csv_manager_kwargs)
+        csv_manager.generate_csv_files()
+
+        metadata = csv_manager.load_metadata_to_dict() if csv_manager.store.exists('metadata') else {}
+        metadata_delta = {k: v for k, v in metadata.items() if self.metadata.get(k) != v}
+        self.metadata = metadata
+
+        self.status_file = os.path.join(csv_manager.store.directory, LIVE_STATUS_FILE_NAME)
+        self._write_status(self.dp.manager.time_end is None, metadata_delta,
+                           self._collect_changed_tables(csv_manager.store.directory))
+
+        # the refresh cost grows with the state, back off so that it stays a bounded share of the time
+        time_refresh = time.time() - time_refresh_start
+        self.next_refresh_time = time.time() + max(self.refresh_interval, time_refresh / self.max_refresh_share)
+
+    def _write_status(self, manager_running, metadata_delta, changed_tables):
+        self.seq += 1
+        self.status = {
+            'seq': self.seq,
+            'time': time.time(),
+            'debug_parsed_offset': self.dp.debug_parsed_offset,
+            'manager_running': manager_running,
+            'metadata_delta': metadata_delta,
+            'changed_tables': changed_tables,
+        }
+        self._save_status()
+
+    def _save_status(self):
+        with open(self.status_file + '.tmp', 'w') as f:
+            json.dump(self.status, f)
+        os.replace(self.status_file + '.tmp', self.status_file)
+
+    def run(self):
+        self._start_parser()
+        self.refresh()
+
+        pending = False
+        try:
+            while self.dp.manager.time_end is None:
+                time.sleep(self.poll_interval)
+                parsed = self.dp.parse_debug_appended()
+                if parsed is None:
+                    print("Manager restarted, following the new run")
+                    self._start_parser()
+                    parsed = 1
+                pending = pending or parsed > 0
+                if pending and time.time() >= self.next_refresh_time:
+                    self.refresh()
+                    pending = False
+                elif time.time() - self.status['time'] >= STATUS_HEARTBEAT_INTERVAL:
+                    self.status['time'] = time.time()
+                    self._save_status()
+            # the manager has exited, publish its final state right away
+            if pending:
+                self.refresh()
+        except KeyboardInterrupt:
+            print("Stopped following the debug log")
+        finally:
+            # the next run, live or not, continues from here
+            self.dp.checkpoint_resume_state()
+            # nothing updates the tables anymore, the streams of the browsers end on this status
+            if self.status is not None and self.status['manager_running']:
+                self._write_status(False, {}, [])
@@ -0,0 +1,191 @@
+import multiprocessing
+import time
+from array import array
+from collections import deque
+
+
+# chunks are sized so that every worker gets several of them, which keeps the pool busy while the
+# parent replays the records of the chunks that are already done
+MIN_CHUNK_BYTES = 1 << 20
+MAX_CHUNK_BYTES = 64 << 20
+CHUNKS_PER_JOB = 8
+
+# a stream, such as a compressed log, is read in chunks of this size as the pool needs them
+STREAM_CHUNK_BYTES = 8 << 20
+STREAM_CHUNKS_IN_FLIGHT_PER_JOB = 2
+
+
+def split_file_at_newlines(file_name, start, end, jobs):
+    """
+    Split the byte range [start, end) of a file into chunks whose boundaries fall right after a newline.
+    """
+    chunk_bytes = (end - start) // (jobs * CHUNKS_PER_JOB) + 1
+    chunk_bytes = min(max(chunk_bytes, MIN_CHUNK_BYTES), MAX_CHUNK_BYTES)
+
+    chunks = []
+    with open(file_name, 'rb') as f:
+        chunk_start = start
+        while chunk_start < end:
+            chunk_end = chunk_start + chunk_bytes
+            if chunk_end >= end:
+                chunk_end = end
+            else:
+                f.seek(chunk_end)
+                f.readline()
+                chunk_end = min(f.tell(), end)
+            chunks.append((chunk_start, chunk_end))
+            chunk_start = chunk_end
+    return chunks
+
+
+def split_stream_at_newlines(f, chunk_bytes, limit=None):
+    # chunks of about chunk_bytes read from a stream, each ending right after a newline. With a limit, at
+    # most that many bytes are read, it must fall right after a newline.
+    while limit is None or limit > 0:
+        data = f.read(chunk_bytes if limit is None else min(chunk_bytes, limit))
+        if not data:
+            return
+        if not data.endswith(b"\n") and (limit is None or len(data) < limit):
+            data += f.readline()
+        if limit is not None:
+            limit -= len(data)
+        yield data
+
+
+class ClassifiedChunk:
+    """
+    The records of the lines in a chunk that a handler may act on, stored column-wise.
+    `line_indices` are relative to the first line of the chunk. `stage_ns` is the CPU time the worker spent
+    in each stage, for the parse profiler.
+    """
+    def __init__(self):
+        self.line_indices = array('q')
+        self.timestamps = array('d')
+        self.lines = []
+        self.candidates = []
+        self.num_lines = 0
+        self.num_bytes = 0
+        self.last_timestamp = None
+        self.stage_ns = {}
+
+
+def classify_chunk(args):
+    """
+    Decode, timestamp and classify the lines of a chunk. Runs in a worker process, it must not depend on
+    any parser state.
+    """
+    file_name, start, end, timestamp_decoder, classifier = args
+
+    with open(file_name, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    return classify_data(data, timestamp_decoder, classifier)
+
+
+def classify_stream_chunk(args):
+    # like classify_chunk, for the bytes of a chunk read from a stream by the parent
+    data, timestamp_decoder, classifier = args
+    return classify_data(data, timestamp_decoder, classifier)
+
+
+def _decode_line(raw_line):
+    try:
+        line = raw_line.decode('utf-8').strip()
+    except UnicodeDecodeError:
+        return None, None
+    parts = line.split(" ")
+    if len(parts) < 2:
+        return None, None
+    return line, parts
+
+
+def _floor_timestamps(timestamp_decoder, datestrings):
+    # lines without a timestamp give NaN, the flooring matches decode_seconds of the serial parser
+    return timestamp_decoder.decode_batch_seconds(datestrings)
+
+
+def classify_data(data, timestamp_decoder, classifier):
+    raw_lines = data.split(b"\n")
+    if raw_lines and not raw_lines[-1]:
+        raw_lines.pop()
+
+    chunk = ClassifiedChunk()
+    chunk.num_lines = len(raw_lines)
+    chunk.num_bytes = len(data)
+
+    # only the lines the line filter matches on their raw bytes are decoded
+    stage_start = time.process_time_ns()
+    search = classifier.line_filter.search
+    decoded = []
+    datestrings = []
+    for i, raw_line in enumerate(raw_lines):
+        if search(raw_line) is None:
+            continue
+        line, parts = _decode_line(raw_line)
+        if line is None:
+            continue
+        decoded.append((i, line, parts))
+        datestrings.append(parts[0] + " " + parts[1])
+
+    decoded_time = time.process_time_ns()
+    chunk.stage_ns['filter_decode'] = decoded_time - stage_start
+
+    # the timestamps of the whole chunk are decoded in one call, lines without one are dropped
+    timestamps = _floor_timestamps(timestamp_decoder, datestrings)
+    timestamped_time = time.process_time_ns()
+    chunk.stage_ns['timestamp'] = timestamped_time - decoded_time
+
+    classify = classifier.classify
+    is_relevant = classifier.is_relevant
+    for (i, line, parts), timestamp in zip(decoded, timestamps.tolist()):
+        if timestamp != timestamp:
+            continue
+        candidates = classify(line, parts)
+        if not is_relevant(candidates, parts):
+            continue
+        chunk.line_indices.append(i)
+        chunk.timestamps.append(timestamp)
+        chunk.lines.append(line)
+        chunk.candidates.append(candidates)
+    chunk.stage_ns['classify'] = time.process_time_ns() - timestamped_time
+
+    # the skipped lines still advance the manager's clock, to the last timestamp of the chunk
+    for raw_line in reversed(raw_lines):
+        line, parts = _decode_line(raw_line)
+        if line is None:
+            continue
+        timestamp = _floor_timestamps(timestamp_decoder, [parts[0] + " " + parts[1]])[0]
+        if timestamp == timestamp:
+            chunk.last_timestamp = float(timestamp)
+            break
+
+    return chunk
+
+
+def iter_classified_chunks(file_name, start, end, jobs, timestamp_decoder, classifier):
+    """
+    Classify [start, end) of a debug file with a pool of `jobs` processes, yielding the chunks in file
+    order as soon as they are ready.
+    """
+    chunks = split_file_at_newlines(file_name, start, end, jobs)
+    tasks = [(file_name, chunk_start, chunk_end, timestamp_decoder, classifier) for chunk_start, chunk_end in chunks]
+
+    with multiprocessing.Pool(processes=min(jobs, max(len(tasks), 1))) as pool:
+        for chunk in pool.imap(classify_chunk, tasks):
+            yield chunk
+
+
+def iter_classified_stream_chunks(f, jobs, timestamp_decoder, classifier, limit=None):
+    """
+    Like iter_classified_chunks, for a stream that can only be read forward, such as a compressed log.
+    Chunks are read as the pool needs them, at most a few per job are in flight. With a limit, only that
+    many bytes of the stream are classified.
+    """
+    pending = deque()
+    with multiprocessing.Pool(processes=jobs) as pool:
+        for data in split_stream_at_newlines(f, STREAM_CHUNK_BYTES, limit):
+            pending.append(pool.apply_async(classify_stream_chunk, ((data, timestamp_decoder, classifier),)))
+            while len(pending) >= jobs * STREAM_CHUNKS_IN_FLIGHT_PER_JOB:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
@@ -0,0 +1,147 @@
+import json
+import os
+import time
+from collections import defaultdict
+
+
+# one line in this many is timed stage by stage, which keeps the overhead low enough to leave profiling on
+DEFAULT_SAMPLE_EVERY = 64
+
+# the throughput timeline gets at most one point per interval
+TIMELINE_INTERVAL_SECONDS = 0.5
+
+
+class ParseProfiler:
+    """
+    Where the time of a debug log parse goes, cheap enough to stay on for production runs.
+
+    Every line is counted (hits per handler, lines no handler matched, lines never dispatched because the
+    line filter skipped them or they have no timestamp), but only one line in `sample_every` is timed: the
+    line filter, decoding, timestamp parsing, and the condition and action of each handler that is tried.
+    The sampled times are scaled by `sample_every` to estimate the totals. Stages that the parallel workers
+    time as a whole for every chunk are added as measured, without scaling.
+
+    The result is exported as JSON and as a collapsed-stack file (one `frame;frame;frame value` line per
+    stack) that flamegraph.pl, speedscope or inferno can render.
+    """
+    def __init__(self, sample_every=DEFAULT_SAMPLE_EVERY):
+        self.sample_every = max(int(sample_every), 1)
+        self._countdown = 1
+
+        self.lines = 0
+        self.bytes = 0
+        self.unmatched_lines = 0        # decoded and dispatched, but no handler acted on them
+        self.handler_hits = defaultdict(int)
+        self.sampled_lines = 0
+
+        self.sampled_ns = defaultdict(int)      # key: stack tuple, value: time of the sampled lines
+        self.measured_ns = defaultdict(int)     # key: stack tuple, value: time measured on every line
+
+        self.start_time = time.perf_counter()
+        self.timeline = []              # [elapsed seconds, lines, bytes]
+
+    def start(self):
+        # the elapsed time and the timeline are measured from here
+        self.start_time = time.perf_counter()
+
+    def sample(self):
+        # True for one call in sample_every
+        self._countdown -= 1
+        if self._countdown:
+            return False
+        self._countdown = self.sample_every
+        self.sampled_lines += 1
+        return True
+
+    def add_sampled(self, stack, ns):
+        self.sampled_ns[stack] += ns
+
+    def add_measured(self, stack, ns):
+        self.measured_ns[stack] += ns
+
+    def record_progress(self, lines, num_bytes):
+        # lines and bytes parsed since the last call
+        self.lines += lines
+        self.bytes += num_bytes
+        elapsed = time.perf_counter() - self.start_time
+        if not self.timeline or elapsed - self.timeline[-1][0] >= TIMELINE_INTERVAL_SECONDS:
+            self.timeline.append([elapsed, self.lines, self.bytes])
+        else:
+            self.timeline[-1][1:] = [self.lines, self.bytes]
+
+    def estimated_ns(self):
+        # key: stack tuple, value: estimated total time
+        estimated = defaultdict(int)
+        for stack, ns in self.sampled_ns.items():
+            estimated[stack] += ns * self.sample_every
+        for stack, ns in self.measured_ns.items():
+            estimated[stack] += ns
+        return estimated
+
+    def to_dict(self):
+        estimated = self.estimated_ns()
+        handlers = defaultdict(lambda: {'hits': 0, 'condition_seconds': 0.0, 'action_seconds': 0.0})
+        stages = defaultdict(float)
+        for stack, ns in estimated.items():
+            if len(stack) == 3 and stack[0] == 'dispatch':
+                handlers[stack[1]][f"{stack[2]}_seconds"] += ns / 1e9
+            else:
+                stages[';'.join(stack)] += ns / 1e9
+        for name, hits in self.handler_hits.items():
+            handlers[name]['hits'] = hits
+
+        elapsed = time.perf_counter() - self.start_time
+        timeline = []
+        previous = [0.0, 0, 0]
+        for point in self.timeline:
+            interval = max(point[0] - previous[0], 1e-9)
+            timeline.append({'elapsed_seconds': round(point[0], 3), 'lines': point[1], 'bytes': point[2],
+                             'lines_per_second': round((point[1] - previous[1]) / interval)})
+            previous = point
+
+        return {
+            'sample_every': self.sample_every,
+            'sampled_lines': self.sampled_lines,
+            'elapsed_seconds': elapsed,
+            'lines': self.lines,
+            'bytes': self.bytes,
+            'lines_per_second': self.lines / max(elapsed, 1e-9),
+            'skipped_lines': self.lines - sum(self.handler_hits.values()) - self.unmatched_lines,
+            'unmatched_lines': self.unmatched_lines,
+            'stages': dict(sorted(stages.items(), key=lambda item: -item[1])),
+            'handlers': dict(sorted(handlers.items(), key=lambda item: -(item[1]['condition_seconds'] + item[1]['action_seconds']))),
+            'timeline': timeline,
+        }
+
+    def write_json(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def write_collapsed_stacks(self, path):
+        # values are in microseconds, stacks that round to zero are left out
+        with open(path, 'w') as f:
+            for stack, ns in sorted(self.estimated_ns().items()):
+                us = ns // 1000
+                if us > 0:
+                    f.write(f"{';'.join(('parse_debug',) + stack)} {us}\n")
+
+    def export(self, directory, name='parse-profile'):
+        json_file = os.path.join(directory, f"{name}.json")
+        collapsed_file = os.path.join(directory, f"{name}.folded")
+        self.write_json(json_file)
+        self.write_collapsed_stacks(collapsed_file)
+        return json_file, collapsed_file
+
+    def print_summary(self):
+        report = self.to_dict()
+        print("\n=== Parse Profile ===")
+        print(f"{'Handler':<24} {'Hits':>10} {'Condition (s)':>14} {'Action (s)':>12}")
+        print("-" * 63)
+        for name, handler in report['handlers'].items():
+            print(f"{name:<24} {handler['hits']:>10} {handler['condition_seconds']:>14.3f} {handler['action_seconds']:>12.3f}")
+        print("-" * 63)
+        for stage, seconds in report['stages'].items():
+            print(f"{stage:<36} {seconds:>10.3f}s")
+        print(f"{report['lines']} lines, {report['skipped_lines']} never dispatched, "
+              f"{report['unmatched_lines']} matched by no handler, {int(report['lines_per_second'])} lines/s "
+              f"(one line in {report['sample_every']} timed)")
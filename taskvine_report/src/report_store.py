@@ -0,0 +1,82 @@
+import os
+import polars as pl
+
+
+# the tables the report is drawn from, one Arrow IPC file each
+REPORT_FILES_DIR = 'report-files'
+TABLE_SUFFIX = '.arrow'
+# where `archive` writes a compressed Parquet copy of every table, inside REPORT_FILES_DIR
+ARCHIVE_DIR = 'parquet'
+# templates generated by older versions only have their tables as CSV files
+LEGACY_CSV_FILES_DIR = 'csv-files'
+
+
+def _csv_compatible(df):
+    # CSV has no nested types, a list is written the way Python prints it, e.g. [0.0, 12.5]
+    lists = [name for name, dtype in df.schema.items() if isinstance(dtype, pl.List)]
+    return df.with_columns(
+        ('[' + pl.col(name).list.eval(pl.element().cast(pl.String)).list.join(', ') + ']').alias(name)
+        for name in lists
+    )
+
+
+class ReportStore:
+    """
+    The typed tables of a template that the routes draw the report from, in <template>/report-files.
+
+    CSVManager writes every table with `write` as an uncompressed Arrow IPC file, so that a route reads it
+    memory-mapped with `read` instead of parsing it: the columns keep their types, including lists such as
+    the connection times of a worker, and nothing is copied until a column is used. A table is written to a
+    temporary file and renamed, a route reading the previous version while `vine_parse --follow` refreshes
+    it keeps a valid mapping.
+
+    CSV is only produced on demand, by `to_csv` for the export endpoint, and `archive` writes a zstd
+    compressed Parquet copy of the tables for keeping them. A template that was generated before the store
+    existed still has its csv-files, they are read when a table is missing.
+    """
+    def __init__(self, runtime_template):
+        self.directory = os.path.join(runtime_template, REPORT_FILES_DIR)
+        self.legacy_csv_dir = os.path.join(runtime_template, LEGACY_CSV_FILES_DIR)
+
+    def path(self, name):
+        return os.path.join(self.directory, name + TABLE_SUFFIX)
+
+    def _legacy_csv_path(self, name):
+        return os.path.join(self.legacy_csv_dir, name + '.csv')
+
+    def names(self):
+        # the tables in the store, without the legacy ones
+        try:
+            return sorted(entry.name[:-len(TABLE_SUFFIX)] for entry in os.scandir(self.directory)
+                          if entry.name.endswith(TABLE_SUFFIX))
+        except OSError:
+            return []
+
+    def exists(self, name):
+        return os.path.exists(self.path(name)) or os.path.exists(self._legacy_csv_path(name))
+
+    def write(self, name, df):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path(name)
+        df.write_ipc(path + '.tmp', compression='uncompressed')
+        os.replace(path + '.tmp', path)
+
+    def read(self, name, columns=None):
+        path = self.path(name)
+        if os.path.exists(path):
+            return pl.read_ipc(path, columns=columns, memory_map=True)
+        legacy_path = self._legacy_csv_path(name)
+        if os.path.exists(legacy_path):
+            return pl.read_csv(legacy_path, columns=columns, infer_schema_length=None)
+        raise FileNotFoundError(f"Report table not found: {path}")
+
+    def to_csv(self, name):
+        return _csv_compatible(self.read(name)).write_csv()
+
+    def archive(self):
+        # returns the directory the Parquet files were written to
+        archive_dir = os.path.join(self.directory, ARCHIVE_DIR)
+        os.makedirs(archive_dir, exist_ok=True)
+        for name in self.names():
+            self.read(name).write_parquet(os.path.join(archive_dir, name + '.parquet'), compression='zstd')
+        return archive_dir
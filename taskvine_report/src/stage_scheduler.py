@@ -0,0 +1,99 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+class Stage:
+    """
+    A step of a pipeline: `run()` reads the data named in `inputs` and writes the data named in `outputs`.
+    An input that no stage writes, such as a table of the parsed state, is there from the start.
+    """
+    def __init__(self, name, run, inputs=(), outputs=()):
+        self.name = name
+        self.run = run
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+
+
+class StageScheduler:
+    """
+    Run stages once the stages that write their inputs are done, the independent ones at the same time in a
+    pool of `jobs` threads.
+
+    The stages share what they read, nothing is copied, so a stage must not modify its inputs and an output
+    can only have one writer. They run in threads rather than processes: most of their time goes to polars
+    and numpy, which release the GIL, and a forked process can deadlock in polars once the parent has used
+    its thread pool. `run` returns the wall time of every stage in seconds, by name, in declaration order.
+    """
+    def __init__(self, stages, jobs=1):
+        self.stages = list(stages)
+        self.jobs = max(1, jobs)
+        self.dependencies = self._resolve_dependencies()
+
+    def _resolve_dependencies(self):
+        names = [stage.name for stage in self.stages]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Duplicate stage names: {', '.join(sorted({n for n in names if names.count(n) > 1}))}")
+
+        writers = {}
+        for stage in self.stages:
+            for output in stage.outputs:
+                if output in writers:
+                    raise ValueError(f"{output} is written by both {writers[output]} and {stage.name}")
+                writers[output] = stage.name
+
+        dependencies = {
+            stage.name: {writers[i] for i in stage.inputs if i in writers and writers[i] != stage.name}
+            for stage in self.stages
+        }
+
+        # stages that wait for each other would never start
+        done = set()
+        remaining = dict(dependencies)
+        while remaining:
+            ready = [name for name, names in remaining.items() if names <= done]
+            if not ready:
+                raise ValueError(f"Stages with circular inputs: {', '.join(sorted(remaining))}")
+            done.update(ready)
+            for name in ready:
+                del remaining[name]
+        return dependencies
+
+    def _ready(self, pending, done):
+        # in declaration order
+        return [stage for stage in pending if self.dependencies[stage.name] <= done]
+
+    @staticmethod
+    def _timed(stage):
+        start = time.perf_counter()
+        stage.run()
+        return time.perf_counter() - start
+
+    def run(self, on_stage_done=None):
+        wall_times = {}
+        done = set()
+        pending = list(self.stages)
+
+        def finish(stage, seconds):
+            wall_times[stage.name] = seconds
+            done.add(stage.name)
+            if on_stage_done is not None:
+                on_stage_done(stage)
+
+        if self.jobs == 1:
+            while pending:
+                stage = self._ready(pending, done)[0]
+                pending.remove(stage)
+                finish(stage, self._timed(stage))
+        else:
+            with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+                running = {}
+                while pending or running:
+                    for stage in self._ready(pending, done)[:self.jobs - len(running)]:
+                        pending.remove(stage)
+                        running[executor.submit(self._timed, stage)] = stage
+                    finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        # the error of a stage is raised here, once the running stages are done
+                        finish(running.pop(future), future.result())
+
+        return {stage.name: wall_times[stage.name] for stage in self.stages}
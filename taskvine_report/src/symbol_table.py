@@ -0,0 +1,50 @@
+import numpy as np
+
+
+# ids are stored as int32 wherever they end up in arrays or tables
+SYMBOL_ID_DTYPE = np.int32
+SYMBOL_ID_MAX = np.iinfo(SYMBOL_ID_DTYPE).max
+
+
+class SymbolTable:
+    """
+    Dense integer ids for values that recur all over the parsed state: file names and worker entries.
+
+    Ids are handed out in order of first appearance, starting at `first_id`, and never change. Records refer to
+    a value by its id, so that sets, joins and group-bys work on small integers, and the value itself is only
+    looked up again with `resolve` when CSV or JSON output is written.
+    """
+    def __init__(self, first_id=0):
+        self.first_id = first_id
+        self.ids = {}       # key: value, value: id
+        self.values = []    # index: id - first_id, value: value
+
+    def __len__(self):
+        return len(self.values)
+
+    def __contains__(self, value):
+        return value in self.ids
+
+    def __getitem__(self, value):
+        # the id of a value that must have been interned already, raises KeyError otherwise
+        return self.ids[value]
+
+    def intern(self, value):
+        symbol_id = self.ids.get(value)
+        if symbol_id is None:
+            symbol_id = len(self.values) + self.first_id
+            if symbol_id > SYMBOL_ID_MAX:
+                raise OverflowError(f"more than {SYMBOL_ID_MAX} symbols")
+            self.ids[value] = symbol_id
+            self.values.append(value)
+        return symbol_id
+
+    def lookup(self, value):
+        return self.ids.get(value)
+
+    def resolve(self, symbol_id):
+        return self.values[symbol_id - self.first_id]
+
+    def resolve_many(self, symbol_ids):
+        values, first_id = self.values, self.first_id
+        return [values[symbol_id - first_id] for symbol_id in symbol_ids]
@@ -1,13 +1,28 @@
 from taskvine_report.utils import TASK_STATUS_NAMES
+from .compact import SlottedRecord, small_set_add
+
+class TaskInfo(SlottedRecord):
+    # one record per task try, slotted to keep millions of them affordable
+    __slots__ = (
+        'task_id', 'task_try_id', 'task_entry', 'category', 'input_files', 'output_files', 'is_recovery_task', 'exhausted_resources',
+        'task_status', 'task_status_name', 'exit_status', 'output_length', 'bytes_sent', 'sandbox_used', 'stdout_size_mb',
+        'when_ready', 'when_running', 'time_worker_start', 'time_worker_end', 'when_waiting_retrieval', 'when_retrieved',
+        'when_done', 'when_failure_happens',
+        'worker_id', 'core_id', 'committed_worker_hash', 'cores_requested', 'gpus_requested',
+        'memory_requested_mb', 'disk_requested_mb', 'execution_time',
+        'is_library_task', 'function_slots',
+    )
+    LEGACY_ATTRIBUTES = {'worker_entry': 'worker_id'}
 
-class TaskInfo:
     def __init__(self, task_id: int, task_try_id: int):
         # basic info
         self.task_id = task_id
         self.task_try_id = task_try_id
+        # the key in DataParser.tasks, shared with the producers and consumers of files
+        self.task_entry = (task_id, task_try_id)
         self.category = None
-        self.input_files = set()
-        self.output_files = set()
+        self.input_files = ()       # small sets of file ids, see compact.small_set
+        self.output_files = ()
         self.is_recovery_task = False
         self.exhausted_resources = False
 
@@ -58,9 +73,8 @@ class TaskInfo:
         self.when_failure_happens = None
 
         # worker info
-        self.worker_entry = None
-        self.worker_id = None
-        self.core_id = []       # a task can be assigned to multiple cores
+        self.worker_id = None   # the worker the task is committed to, see DataParser.worker_symbols
+        self.core_id = ()       # a task can be assigned to multiple cores
         self.committed_worker_hash = None
         self.cores_requested = 1
         self.gpus_requested = None
@@ -71,8 +85,13 @@ class TaskInfo:
         self.is_library_task = False
         self.function_slots = None
 
-    def set_worker_entry(self, worker_entry):
-        self.worker_entry = worker_entry
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        if not hasattr(self, 'task_entry'):
+            self.task_entry = (self.task_id, self.task_try_id)
+
+    def set_worker_id(self, worker_id):
+        self.worker_id = worker_id
 
     def set_when_ready(self, when_ready):
         self.when_ready = float(when_ready)
@@ -187,10 +206,10 @@ class TaskInfo:
         self.disk_requested_mb = disk_requested_mb
 
     def add_input_file(self, input_file):
-        self.input_files.add(input_file)
+        self.input_files = small_set_add(self.input_files, input_file)
 
     def add_output_file(self, output_file):
-        self.output_files.add(output_file)
+        self.output_files = small_set_add(self.output_files, output_file)
 
     def set_category(self, category):
         if self.category and category != self.category:
@@ -222,7 +241,7 @@ class TaskInfo:
         print("when_done: ", self.when_done)
         print("when_failure_happens: ", self.when_failure_happens)
 
-        print("worker_entry: ", self.worker_entry)
+        print("worker_id: ", self.worker_id)
         print("cores_requested: ", self.cores_requested)
         print("gpus_requested: ", self.gpus_requested)
         print("memory_requested_mb: ", self.memory_requested_mb)
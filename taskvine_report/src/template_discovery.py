@@ -0,0 +1,169 @@
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from .compressed_log import DEBUG_LOG_NAMES
+
+
+# a runtime template is a directory with a vine-logs directory holding all of these and a debug log
+REQUIRED_LOG_FILES = {"performance", "taskgraph", "transactions", "workflow.json"}
+
+# listing a directory on a network file system is mostly waiting on metadata round trips
+DEFAULT_DISCOVERY_THREADS = 16
+
+DISCOVERY_CACHE_VERSION = 1
+
+# a directory modified this recently may still change within the same mtime tick, its listing is not cached
+DISCOVERY_CACHE_SETTLE_NS = 2_000_000_000
+
+
+def default_discovery_cache_file(root):
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    digest = hashlib.sha1(os.path.abspath(root).encode()).hexdigest()[:16]
+    return os.path.join(cache_home, 'taskvine-report', f"templates-{digest}.json")
+
+
+def is_complete_vine_logs(names):
+    names = set(names)
+    return REQUIRED_LOG_FILES.issubset(names) and not names.isdisjoint(DEBUG_LOG_NAMES)
+
+
+class TemplateDiscovery:
+    """
+    Find the runtime templates below a root directory.
+
+    The tree is walked with os.scandir, directory listings run on a thread pool, and the walk does not
+    descend into a directory that has a vine-logs directory: it is a template (if its vine-logs is complete)
+    and nothing below it is. Symlinks to directories are checked for being templates but not followed.
+
+    With a cache file, the listing of every directory is saved with its mtime. A later walk only stats a
+    directory whose mtime has not changed (and, for a template, its vine-logs directory) instead of listing
+    it again, adding or removing an entry changes the mtime of the directory that holds it.
+    """
+    def __init__(self, root, threads=DEFAULT_DISCOVERY_THREADS, cache_file=None):
+        self.root = os.path.abspath(root)
+        self.threads = max(int(threads), 1)
+        self.cache_file = cache_file
+        self.cached = {}        # key: directory path, value: its listing from the cache file
+        self.listings = {}      # key: directory path, value: its listing in this walk
+        self.listed = 0         # directories listed with scandir, the others came from the cache
+
+    def _load_cache(self):
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file) as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return
+        if cache.get('version') == DISCOVERY_CACHE_VERSION and cache.get('root') == self.root:
+            self.cached = cache.get('directories', {})
+
+    def _save_cache(self, walk_start_ns):
+        directories = {path: listing for path, listing in self.listings.items()
+                       if listing['mtime'] < walk_start_ns - DISCOVERY_CACHE_SETTLE_NS}
+        os.makedirs(os.path.dirname(os.path.abspath(self.cache_file)), exist_ok=True)
+        tmp_file = f"{self.cache_file}.{os.getpid()}.tmp"
+        with open(tmp_file, 'w') as f:
+            json.dump({'version': DISCOVERY_CACHE_VERSION, 'root': self.root, 'directories': directories}, f)
+        os.replace(tmp_file, self.cache_file)
+
+    def _vine_logs_mtime(self, path):
+        try:
+            return os.stat(os.path.join(path, 'vine-logs')).st_mtime_ns
+        except OSError:
+            return None
+
+    def _list(self, path, prune=True):
+        # the listing of a directory: whether it is a template, and the directories to walk into. Without
+        # prune, the directory is not a candidate and its subdirectories are walked even next to a vine-logs.
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+        cached = self.cached.get(path)
+        if cached is not None and cached['mtime'] == mtime and \
+           (cached['vine_logs_mtime'] is None or cached['vine_logs_mtime'] == self._vine_logs_mtime(path)):
+            return cached
+
+        listing = {'mtime': mtime, 'vine_logs_mtime': None, 'template': False, 'subdirs': [], 'links': []}
+        has_vine_logs = False
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    try:
+                        if entry.name == 'vine-logs':
+                            has_vine_logs = prune and entry.is_dir()
+                        elif entry.is_dir(follow_symlinks=False):
+                            listing['subdirs'].append(entry.name)
+                        elif entry.is_symlink() and entry.is_dir():
+                            listing['links'].append(entry.name)
+                    except OSError:
+                        continue
+        except OSError:
+            # unreadable directories are skipped, as rglob does
+            return None
+
+        if has_vine_logs:
+            vine_logs = os.path.join(path, 'vine-logs')
+            listing['vine_logs_mtime'] = self._vine_logs_mtime(path)
+            try:
+                listing['template'] = is_complete_vine_logs(os.listdir(vine_logs))
+            except OSError:
+                pass
+            # nothing below a template is walked
+            listing['subdirs'] = []
+            listing['links'] = []
+        return listing
+
+    def _visit(self, path, follow):
+        listing = self._list(path)
+        if listing is None:
+            return path, None, []
+        children = []
+        if follow:
+            children = [(os.path.join(path, name), True) for name in listing['subdirs']]
+            children += [(os.path.join(path, name), False) for name in listing['links']]
+        return path, listing, children
+
+    def _add_listing(self, path, listing):
+        self.listings[path] = listing
+        if listing is not self.cached.get(path):
+            self.listed += 1
+
+    def find(self):
+        """
+        The sorted paths of the templates below the root, the root itself excluded.
+        """
+        walk_start_ns = time.time_ns()
+        self._load_cache()
+
+        root_listing = self._list(self.root, prune=False)
+        if root_listing is None:
+            return []
+        self._add_listing(self.root, root_listing)
+
+        templates = []
+        with ThreadPoolExecutor(max_workers=self.threads) as executor:
+            pending = {executor.submit(self._visit, os.path.join(self.root, name), True) for name in root_listing['subdirs']}
+            pending |= {executor.submit(self._visit, os.path.join(self.root, name), False) for name in root_listing['links']}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path, listing, children = future.result()
+                    if listing is None:
+                        continue
+                    self._add_listing(path, listing)
+                    if listing['template']:
+                        templates.append(path)
+                    for child, follow in children:
+                        pending.add(executor.submit(self._visit, child, follow))
+
+        if self.cache_file:
+            try:
+                self._save_cache(walk_start_ns)
+            except OSError as e:
+                print(f"⚠️  Could not write the discovery cache {self.cache_file}: {e}")
+        return sorted(templates)
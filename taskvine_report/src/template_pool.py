@@ -0,0 +1,109 @@
+import contextlib
+import io
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+from taskvine_report.utils import create_progress_bar
+
+
+# how often the memory is checked again while a template is held back
+MEMORY_POLL_INTERVAL = 2.0
+
+
+def available_memory_mb():
+    # MemAvailable counts the page cache that can be reclaimed, which is what a new job can really use
+    try:
+        with open('/proc/meminfo') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+class TemplateResult:
+    def __init__(self, template, succeeded, elapsed, output='', error=''):
+        self.template = template
+        self.succeeded = succeeded
+        self.elapsed = elapsed
+        self.output = output    # what the job printed, only kept for failures
+        self.error = error
+
+
+def _run_captured(process, template, options):
+    # runs in a worker process, the output is captured so that concurrent jobs do not interleave
+    start = time.time()
+    output = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+            process(template, options)
+    except Exception:
+        return TemplateResult(template, False, time.time() - start, output.getvalue(), traceback.format_exc())
+    return TemplateResult(template, True, time.time() - start)
+
+
+class TemplatePool:
+    """
+    Process runtime templates in a pool of worker processes, one template per job.
+
+    At most `jobs` templates are processed at a time, and a new one is only started while the available
+    memory is at least `min_free_memory_mb` (unless nothing is running, so that the pool never stalls).
+    `process(template, options)` must be a module-level function. Results are reported as the templates
+    finish, in completion order.
+    """
+    def __init__(self, process, jobs, min_free_memory_mb=0):
+        self.process = process
+        self.jobs = max(1, jobs)
+        self.min_free_memory_mb = min_free_memory_mb
+
+    def _has_memory_for_another_job(self, running):
+        if not running or not self.min_free_memory_mb:
+            return True
+        available = available_memory_mb()
+        return available is None or available >= self.min_free_memory_mb
+
+    def run(self, templates, options, on_result):
+        pending = list(templates)
+        running = {}    # key: future, value: template
+        executor = ProcessPoolExecutor(max_workers=self.jobs)
+        held_back = False
+
+        with create_progress_bar() as progress:
+            pbar = progress.add_task("[green]Processing templates", total=len(pending))
+            try:
+                while pending or running:
+                    while pending and len(running) < self.jobs and self._has_memory_for_another_job(running):
+                        template = pending.pop(0)
+                        running[executor.submit(_run_captured, self.process, template, options)] = template
+                        held_back = False
+                    if pending and len(running) < self.jobs and not held_back:
+                        progress.console.print(f"⏳ Less than {self.min_free_memory_mb} MB of memory available, "
+                                               f"waiting for a running template to finish")
+                        held_back = True
+
+                    done, _ = wait(running, timeout=MEMORY_POLL_INTERVAL, return_when=FIRST_COMPLETED)
+                    results = []
+                    for future in done:
+                        template = running.pop(future)
+                        try:
+                            results.append(future.result())
+                        except BrokenProcessPool:
+                            # a worker was killed, most likely by the kernel for running out of memory, which
+                            # takes down every template running on the pool
+                            for template in [template, *running.values()]:
+                                results.append(TemplateResult(template, False, 0, error="the worker process died unexpectedly\n"))
+                            running.clear()
+                            executor.shutdown(wait=False)
+                            executor = ProcessPoolExecutor(max_workers=self.jobs)
+                            break
+                    for result in results:
+                        progress.advance(pbar)
+                        on_result(result, progress.console)
+            finally:
+                executor.shutdown(wait=False, cancel_futures=True)
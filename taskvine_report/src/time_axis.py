@@ -0,0 +1,67 @@
+import numpy as np
+import polars as pl
+
+
+# every time in the reports has a resolution of a hundredth of a second
+CENTISECONDS_PER_SECOND = 100
+MICROSECONDS_PER_CENTISECOND = 10_000
+
+
+def microseconds_to_centiseconds(microseconds):
+    """
+    Floor epoch microseconds, an int or an int64 array, to centiseconds. This is the only place a parsed time
+    is rounded, on integers, so the same instant floors to the same centisecond whichever log it comes from.
+    """
+    return microseconds // MICROSECONDS_PER_CENTISECOND
+
+
+def centiseconds_to_seconds(centiseconds):
+    """
+    Seconds of an int, an int64 array or an Int64 polars series of centiseconds, nulls stay nulls. Dividing
+    by 100 (polars would multiply by the reciprocal) gives the float closest to the decimal value, which is
+    what ends up in the CSV files.
+    """
+    if isinstance(centiseconds, pl.Series):
+        seconds = centiseconds.cast(pl.Float64).to_numpy() / CENTISECONDS_PER_SECOND
+        return pl.Series(centiseconds.name, seconds, nan_to_null=True)
+    if isinstance(centiseconds, (int, np.integer)):
+        return int(centiseconds) / CENTISECONDS_PER_SECOND
+    return np.asarray(centiseconds) / CENTISECONDS_PER_SECOND
+
+
+class TimeAxis:
+    """
+    Times as int64 centiseconds relative to a base time, usually MIN_TIME.
+
+    The parser floors every timestamp to a hundredth of a second, so a parsed time is a multiple of 0.01
+    up to the float error and is rounded, not floored, to its centisecond. Differences, sorting and
+    group-bys on the integers are exact, and the times are converted back to seconds only when they are
+    written out, see `centiseconds_to_seconds`. A missing time, None or 0 as TaskInfo leaves it, is null.
+    """
+    def __init__(self, base_time):
+        self.base_cs = round(float(base_time or 0) * CENTISECONDS_PER_SECOND)
+
+    def scalar(self, t):
+        # the centiseconds of a single time
+        return round(t * CENTISECONDS_PER_SECOND) - self.base_cs
+
+    def array(self, times):
+        # an int64 array of the centiseconds of a list of times, none of them missing
+        times = np.asarray(times, dtype=np.float64)
+        return np.rint(times * CENTISECONDS_PER_SECOND).astype(np.int64) - self.base_cs
+
+    def expr(self, column):
+        # a polars expression of the centiseconds of a Float64 column of times, null stays null
+        return (column * CENTISECONDS_PER_SECOND).round(0).cast(pl.Int64) - self.base_cs
+
+    def series(self, name, times):
+        # an Int64 series of the centiseconds of a list of times, null where a time is missing
+        times = np.array([t if t else np.nan for t in times], dtype=np.float64)
+        centiseconds = np.rint(times * CENTISECONDS_PER_SECOND) - self.base_cs
+        return pl.Series(name, centiseconds, nan_to_null=True).cast(pl.Int64)
+
+    def frame(self, records, fields):
+        """
+        A frame with an Int64 column of centiseconds for every time attribute in `fields` of the records.
+        """
+        return pl.DataFrame([self.series(field, [getattr(record, field) for record in records]) for field in fields])
@@ -0,0 +1,160 @@
+import re
+import numpy as np
+from datetime import datetime, timezone
+from .time_axis import microseconds_to_centiseconds, centiseconds_to_seconds
+
+
+DATESTRING_FORMAT = "%Y/%m/%d %H:%M:%S.%f"
+DATESTRING_LENGTH = len("YYYY/MM/DD HH:MM:SS.ffffff")
+HOUR_PREFIX_LENGTH = len("YYYY/MM/DD HH")
+
+HOUR_PREFIX_PATTERN = re.compile(r"\d{4}/\d{2}/\d{2} \d{2}", re.ASCII)
+MINUTE_SUFFIX_PATTERN = re.compile(r":([0-5]\d):([0-5]\d)\.(\d{6})", re.ASCII)
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+class TimestampDecoder:
+    """
+    Decode the fixed `YYYY/MM/DD HH:MM:SS.ffffff` datestrings of the debug log into unix timestamps.
+
+    The epoch of each `YYYY/MM/DD HH` prefix is cached (a log spans few distinct hours) and the minutes,
+    seconds and microseconds are added arithmetically. The result is built from integer microseconds
+    and divided once, exactly like `datetime.timestamp()`, so it is bit-identical to
+    `datetime.strptime(datestring, DATESTRING_FORMAT).replace(tzinfo=tz).timestamp()`. Datestrings that
+    do not have the fixed layout go through strptime, and so does everything in a time zone without a fixed
+    offset (the parser always has one), whose offset may change in the middle of an hour.
+    """
+    def __init__(self, tz):
+        self.tz = tz
+        self.utc_offset_us = _utc_offset_us(tz)
+        self.hour_epoch_us = {}     # key: "YYYY/MM/DD HH", value: epoch of the hour in microseconds
+
+    def _get_hour_epoch_us(self, prefix):
+        hour_epoch_us = self.hour_epoch_us.get(prefix)
+        if hour_epoch_us is None:
+            if not HOUR_PREFIX_PATTERN.fullmatch(prefix):
+                return None
+            dt = datetime.strptime(prefix, "%Y/%m/%d %H").replace(tzinfo=self.tz)
+            hour_epoch_us = (dt - EPOCH) // datetime.resolution
+            self.hour_epoch_us[prefix] = hour_epoch_us
+        return hour_epoch_us
+
+    def decode_us(self, datestring):
+        if self.utc_offset_us is not None and len(datestring) == DATESTRING_LENGTH:
+            hour_epoch_us = self._get_hour_epoch_us(datestring[:HOUR_PREFIX_LENGTH])
+            if hour_epoch_us is not None:
+                match = MINUTE_SUFFIX_PATTERN.fullmatch(datestring, HOUR_PREFIX_LENGTH)
+                if match:
+                    minutes, seconds, microseconds = match.groups()
+                    return hour_epoch_us + int(minutes) * 60_000_000 + int(seconds) * 1_000_000 + int(microseconds)
+        dt = datetime.strptime(datestring, DATESTRING_FORMAT).replace(tzinfo=self.tz)
+        if self.tz is None:
+            # naive datetimes are local time, only strptime knows how to resolve them
+            return round(dt.timestamp() * 1_000_000)
+        return (dt - EPOCH) // datetime.resolution
+
+    def decode(self, datestring):
+        if self.tz is None:
+            return datetime.strptime(datestring, DATESTRING_FORMAT).timestamp()
+        return self.decode_us(datestring) / 1_000_000
+
+    def decode_seconds(self, datestring):
+        # the timestamp floored to a hundredth of a second, the resolution every parsed time is kept at
+        return centiseconds_to_seconds(microseconds_to_centiseconds(self.decode_us(datestring)))
+
+    def decode_batch_us(self, datestrings):
+        """
+        Decode a column of datestrings into an int64 array of epoch microseconds and a boolean array
+        telling which entries were valid (invalid entries are 0).
+        """
+        n = len(datestrings)
+        result = np.zeros(n, dtype=np.int64)
+        valid = np.zeros(n, dtype=bool)
+        if n == 0:
+            return result, valid
+
+        raw = np.asarray(datestrings, dtype=object)
+        fixed = np.fromiter((isinstance(s, str) and len(s) == DATESTRING_LENGTH and s.isascii() for s in raw), dtype=bool, count=n)
+
+        fixed_idx = np.flatnonzero(fixed)
+        if fixed_idx.size and self.utc_offset_us is not None:
+            buffer = "".join(raw[fixed_idx]).encode('ascii')
+            chars = np.frombuffer(buffer, dtype=np.uint8).reshape(-1, DATESTRING_LENGTH).astype(np.int64)
+            digits = chars - ord('0')
+
+            digit_columns = [0, 1, 2, 3, 5, 6, 8, 9, 11, 12, 14, 15, 17, 18] + list(range(20, 26))
+            layout_ok = (
+                np.all((digits[:, digit_columns] >= 0) & (digits[:, digit_columns] <= 9), axis=1)
+                & (chars[:, 4] == ord('/')) & (chars[:, 7] == ord('/')) & (chars[:, 10] == ord(' '))
+                & (chars[:, 13] == ord(':')) & (chars[:, 16] == ord(':')) & (chars[:, 19] == ord('.'))
+            )
+
+            def field(start, end):
+                value = np.zeros(len(digits), dtype=np.int64)
+                for col in range(start, end):
+                    value = value * 10 + digits[:, col]
+                return value
+
+            year, month, day = field(0, 4), field(5, 7), field(8, 10)
+            hour, minute, second, microsecond = field(11, 13), field(14, 16), field(17, 19), field(20, 26)
+            ok = layout_ok & (month >= 1) & (month <= 12) & (day >= 1) & (hour <= 23) & (minute <= 59) & (second <= 59)
+            ok &= day <= _days_in_month(year, month)
+
+            days = _days_from_civil(year, month, day)
+            epoch_us = (((days * 24 + hour) * 60 + minute) * 60 + second) * 1_000_000 + microsecond - self.utc_offset_us
+
+            good = fixed_idx[ok]
+            result[good] = epoch_us[ok]
+            valid[good] = True
+
+        # anything the vectorized path could not decode goes through the scalar decoder
+        for i in np.flatnonzero(~valid):
+            try:
+                result[i] = self.decode_us(raw[i])
+                valid[i] = True
+            except Exception:
+                pass
+        return result, valid
+
+    def decode_batch(self, datestrings):
+        """
+        Decode a column of datestrings into a float64 array of unix timestamps, NaN for invalid entries.
+        """
+        epoch_us, valid = self.decode_batch_us(datestrings)
+        timestamps = epoch_us / 1_000_000
+        timestamps[~valid] = np.nan
+        return timestamps
+
+    def decode_batch_seconds(self, datestrings):
+        """
+        Like decode_batch, with the timestamps floored to a hundredth of a second as decode_seconds does.
+        """
+        epoch_us, valid = self.decode_batch_us(datestrings)
+        timestamps = centiseconds_to_seconds(microseconds_to_centiseconds(epoch_us)).astype(np.float64)
+        timestamps[~valid] = np.nan
+        return timestamps
+
+
+def _utc_offset_us(tz):
+    # the offset of a fixed-offset time zone, None for naive local time and for a zone with daylight saving time
+    offset = tz.utcoffset(None) if tz is not None else None
+    if offset is None:
+        return None
+    return offset // datetime.resolution
+
+
+def _days_from_civil(year, month, day):
+    # days since 1970-01-01 of a proleptic Gregorian date (H. Hinnant's algorithm), vectorized
+    year = year - (month <= 2)
+    era = np.floor_divide(year, 400)
+    year_of_era = year - era * 400
+    day_of_year = (153 * (month + np.where(month > 2, -3, 9)) + 2) // 5 + day - 1
+    day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+    return era * 146097 + day_of_era - 719468
+
+
+def _days_in_month(year, month):
+    leap = ((year % 4 == 0) & (year % 100 != 0)) | (year % 400 == 0)
+    days = np.array([0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31], dtype=np.int64)[np.clip(month, 0, 12)]
+    return days + ((month == 2) & leap)
@@ -0,0 +1,201 @@
+import numpy as np
+import polars as pl
+from .time_axis import microseconds_to_centiseconds, centiseconds_to_seconds
+
+
+# the result names of the transactions log and their vine_result_t codes, see TaskInfo
+TRANSACTIONS_RESULT_CODES = {
+    'SUCCESS': 0,
+    'INPUT_MISSING': 1,
+    'INPUT_MISS': 1,
+    'OUTPUT_MISSING': 2,
+    'OUTPUT_MISS': 2,
+    'STDOUT_MISSING': 4,
+    'STDOUT_MISS': 4,
+    'SIGNAL': 1 << 3,
+    'RESOURCE_EXHAUSTION': 2 << 3,
+    'END_TIME': 3 << 3,
+    'MAX_END_TIME': 3 << 3,
+    'UNKNOWN': 4 << 3,
+    'FORSAKEN': 5 << 3,
+    'MAX_RETRIES': 6 << 3,
+    'MAX_WALLTIME': 7 << 3,
+    'MAX_WALL_TIME': 7 << 3,
+    'MONITOR_ERROR': 8 << 3,
+    'RMONITOR_ERROR': 8 << 3,
+    'OUTPUT_TRANSFER_ERROR': 9 << 3,
+    'FIXED_LOCATION_MISSING': 10 << 3,
+    'CANCELLED': 11 << 3,
+    'LIBRARY_EXIT': 12 << 3,
+    'SANDBOX_EXHAUSTION': 13 << 3,
+    'MISSING_LIBRARY': 14 << 3,
+}
+
+# a transactions line is "time manager_pid kind id event rest", rest depends on the event
+TRANSACTIONS_FIELDS = ['time_us', 'manager_pid', 'kind', 'id', 'event', 'rest']
+
+# the resources of a task or a worker are logged as {"cores":[4,"cores"],"memory":[4096,"MB"],...}
+RESOURCES_OBJECT_PATTERN = r"\{[^{}]*\}"
+
+
+def _resource(column, name):
+    return column.str.extract(rf'"{name}":\s*\[?\s*(-?[0-9.]+)', 1).cast(pl.Float64, strict=False)
+
+
+def _last_object(column):
+    # the last {...} of a line, e.g. the measured resources after the exceeded limits of RETRIEVED
+    return column.str.extract_all(RESOURCES_OBJECT_PATTERN).list.last()
+
+
+def _floor_seconds(time_us):
+    # the timestamps of the debug parser, floored to a hundredth of a second on the integers
+    return centiseconds_to_seconds(microseconds_to_centiseconds(time_us.to_numpy().astype(np.int64)))
+
+
+def _word(column, index):
+    return column.str.split(" ").list.get(index, null_on_oob=True)
+
+
+class TransactionsLog:
+    """
+    The events of the last manager run in a transactions log, read column-wise with polars.
+
+    Unlike the debug log, every line of the transactions log is "time manager_pid kind id event ...", with
+    the time in microseconds since the epoch, so the whole file is read in one call and split into frames
+    with vectorized string expressions. Timestamps are floored to hundredths of a second, as the debug
+    parser does.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.events = self._read()
+
+    def _read(self):
+        # a separator that never appears in a line, so that every line comes back whole
+        lines = pl.read_csv(self.path, separator='\x1f', has_header=False, quote_char=None,
+                            comment_prefix='#', new_columns=['line'], infer_schema=False,
+                            truncate_ragged_lines=True)
+        events = (
+            lines.lazy()
+            .select(pl.col('line').str.strip_chars().str.splitn(" ", len(TRANSACTIONS_FIELDS))
+                    .struct.rename_fields(TRANSACTIONS_FIELDS).alias('fields'))
+            .unnest('fields')
+            .with_columns(pl.col('time_us').cast(pl.Int64, strict=False))
+            .drop_nulls('time_us')
+            .with_row_index('seq')
+            .collect()
+        )
+        events = events.with_columns(pl.Series('time', _floor_seconds(events['time_us'])))
+        # the log is rewritten by every manager run, but keep only the last run in case it was appended to
+        starts = events.filter((pl.col('kind') == 'MANAGER') & (pl.col('event') == 'START'))['seq']
+        if len(starts) > 1:
+            events = events.filter(pl.col('seq') >= starts[-1])
+        return events
+
+    def _of_kind(self, kind):
+        return self.events.filter(pl.col('kind') == kind)
+
+    def manager_times(self):
+        # (time_start, time_end, last event time), None where missing
+        manager = self._of_kind('MANAGER')
+        start = manager.filter(pl.col('event') == 'START')['time']
+        end = manager.filter(pl.col('event') == 'END')['time']
+        return (start[0] if len(start) else None,
+                end[-1] if len(end) else None,
+                self.events['time'].max() if len(self.events) else None)
+
+    def worker_events(self):
+        """
+        The CONNECTION, DISCONNECTION and RESOURCES events in log order, with the address of a connection
+        split into ip and port and the resources of a RESOURCES event extracted.
+        """
+        workers = self._of_kind('WORKER').filter(pl.col('event').is_in(['CONNECTION', 'DISCONNECTION', 'RESOURCES']))
+        address = _word(pl.col('rest'), 0)
+        return workers.select(
+            'seq', 'time', pl.col('id').alias('worker_hash'), 'event',
+            pl.when(pl.col('event') == 'CONNECTION').then(address.str.extract(r"^(.*):[0-9]+$", 1)).alias('ip'),
+            pl.when(pl.col('event') == 'CONNECTION').then(address.str.extract(r":([0-9]+)$", 1).cast(pl.Int64, strict=False)).alias('port'),
+            *[pl.when(pl.col('event') == 'RESOURCES').then(_resource(pl.col('rest'), name)).alias(name)
+              for name in ('cores', 'memory', 'disk', 'gpus')],
+        )
+
+    def task_tries(self):
+        """
+        One row per task try, in the order the tries were submitted.
+
+        A try starts at a WAITING event of its task, the attempts are counted per task. The address of the
+        worker a try ran on is the one of its RUNNING event, the result and the measured resources are the
+        ones of RETRIEVED, and the exit code is the one of DONE.
+        """
+        tasks = (
+            self._of_kind('TASK')
+            .with_columns(pl.col('id').cast(pl.Int64, strict=False).alias('task_id'))
+            .drop_nulls('task_id')
+            .with_columns((pl.col('event') == 'WAITING').cum_sum().over('task_id').alias('task_try_id'))
+            # events of a task that was never WAITING, such as a library started by the manager, are not tries
+            .filter(pl.col('task_try_id') > 0)
+        )
+        event = pl.col('event')
+        rest = pl.col('rest')
+
+        def at(name, value):
+            return pl.when(event == name).then(value)
+
+        def first(value):
+            return value.drop_nulls().first()
+
+        waiting_resources = at('WAITING', rest)
+        measured = at('RETRIEVED', _last_object(rest))
+        return (
+            tasks.group_by('task_id', 'task_try_id', maintain_order=True)
+            .agg(
+                first(at('WAITING', pl.col('seq'))).alias('seq'),
+                first(at('WAITING', pl.col('time'))).alias('when_ready'),
+                first(at('WAITING', _word(rest, 0))).alias('category'),
+                first(_resource(waiting_resources, 'cores')).alias('cores'),
+                first(_resource(waiting_resources, 'gpus')).alias('gpus'),
+                first(_resource(waiting_resources, 'memory')).alias('memory'),
+                first(_resource(waiting_resources, 'disk')).alias('disk'),
+                first(at('RUNNING', pl.col('seq'))).alias('running_seq'),
+                first(at('RUNNING', pl.col('time'))).alias('when_running'),
+                first(at('RUNNING', _word(rest, 0))).alias('address'),
+                first(at('WAITING_RETRIEVAL', pl.col('time'))).alias('when_waiting_retrieval'),
+                first(at('RETRIEVED', pl.col('time'))).alias('when_retrieved'),
+                first(at('RETRIEVED', _word(rest, 0))).alias('result'),
+                first(_resource(measured, 'start')).alias('measured_start'),
+                first(_resource(measured, 'end')).alias('measured_end'),
+                first(at('DONE', pl.col('time'))).alias('when_done'),
+                first(at('DONE', _word(rest, 1)).cast(pl.Int64, strict=False)).alias('exit_code'),
+            )
+            .with_columns(
+                pl.col('result').replace_strict(TRANSACTIONS_RESULT_CODES, default=4 << 3, return_dtype=pl.Int64).alias('result_code'),
+                pl.col('address').str.extract(r"^(.*):[0-9]+$", 1).alias('ip'),
+                pl.col('address').str.extract(r":([0-9]+)$", 1).cast(pl.Int64, strict=False).alias('port'),
+            )
+            .sort('seq')
+        )
+
+    def file_events(self):
+        """
+        The replicas of the files on the workers in log order, one per file and worker: the first TRANSFER
+        INPUT or CACHE_UPDATE that reports it, the transactions log has nothing that removes a replica.
+        TRANSFER OUTPUT, a file brought back to the manager, does not leave a replica behind and is left out.
+        """
+        files = self._of_kind('WORKER').filter(
+            (pl.col('event') == 'CACHE_UPDATE') |
+            ((pl.col('event') == 'TRANSFER') & pl.col('rest').str.starts_with('INPUT ')))
+        # CACHE_UPDATE name size_mb wall_us start_us, TRANSFER INPUT name size_mb wall_us start_us
+        rest = pl.when(pl.col('event') == 'TRANSFER').then(pl.col('rest').str.splitn(" ", 2).struct.field('field_1')).otherwise(pl.col('rest'))
+        files = (
+            files.with_columns(rest.alias('rest'))
+            .select(
+                'seq', 'time_us', 'time', pl.col('id').alias('worker_hash'), 'event',
+                _word(pl.col('rest'), 0).alias('file_name'),
+                _word(pl.col('rest'), 1).cast(pl.Float64, strict=False).fill_null(0).alias('size_mb'),
+                _word(pl.col('rest'), 3).cast(pl.Int64, strict=False).alias('start_us'),
+            )
+            .drop_nulls('file_name')
+            .unique(['file_name', 'worker_hash'], keep='first', maintain_order=True)
+        )
+        # a transfer without a start time started when it was reported
+        start_us = files['start_us'].fill_null(files['time_us'])
+        return files.with_columns(pl.Series('time_start', _floor_seconds(start_us)))
@@ -0,0 +1,279 @@
+import hashlib
+import math
+import numpy as np
+import polars as pl
+from array import array
+from .symbol_table import SymbolTable
+
+
+# a time that is not known yet, such as the stage-out of a replica that is still on its worker
+NO_TIME = math.nan
+
+
+def _time(value):
+    return None if value != value else value
+
+
+def _time_column(name, values):
+    return pl.Series(name, np.frombuffer(values, dtype=np.float64), nan_to_null=True)
+
+
+def _digest(transfer_id):
+    # a 64-bit digest of a logged transfer id that does not change between processes, unlike hash(), as the
+    # table is pickled in the resume checkpoint; never 0, which stands for no id
+    digest = int.from_bytes(hashlib.blake2b(transfer_id.encode(), digest_size=8).digest(), 'little', signed=True)
+    return digest or 1
+
+
+class TransferTable:
+    """
+    Every transfer of every file, one row per replica, in append-only typed columns shared by all files.
+
+    A row is never removed, a replica that goes away only gets its stage-out time. The columns are
+    `file_id`, `dest_worker_id`, `source_worker_id` and `source_url` (the id of the source worker or of the
+    url in `url_symbols`, 0 for a file created on its worker or put there by the manager), `transfer_id`,
+    `t_start`, `t_stage_in` and `t_stage_out`, with NaN for a time that is not known. Ids are int32, as in
+    the symbol tables, and only times and `transfer_key` are 64-bit, so a row takes a few dozen bytes.
+
+    A transfer the manager started gets a dense id in the order of the transfers, 0 for the other replicas.
+    The id the manager logged (a uuid) is only kept in `open_transfers` while its replica is open, to find
+    the row of the cache-update or cache-invalid that refers to it: once the replica is staged out no line
+    can change it anymore. A row keeps a 64-bit digest of it in `transfer_key` instead, so that a transfer
+    id the manager logs again for the same file starts over the transfer it had, open or not.
+
+    `file_rows` is the per-file offset index, the rows of a file in the order they were added. The replicas
+    that are still open, without a stage-out time, are also indexed by file and destination in `open_rows`
+    and by file in `open_file_rows`, and a row leaves both when it is staged out. An unlink, a cache-invalid
+    or the teardown of a file thus only touches the replicas it closes, even for a file replicated to
+    thousands of workers. `frame` gives the whole table as a polars frame for the metrics.
+    """
+    def __init__(self):
+        self.file_id = array('i')
+        self.dest_worker_id = array('i')
+        self.source_worker_id = array('i')
+        self.source_url = array('i')
+        self.transfer_id = array('i')
+        self.transfer_key = array('q')
+        self.t_start = array('d')
+        self.t_stage_in = array('d')
+        self.t_stage_out = array('d')
+
+        self.url_symbols = SymbolTable(first_id=1)
+        self.num_transfer_ids = 0
+        self.open_transfers = {}   # key: (file id, transfer id as logged), value: row, while the row is open
+        self.open_transfer_ids = {}   # key: row, value: the key of the row in open_transfers
+        self.file_rows = {}        # key: file id, value: array of rows
+        self.open_rows = {}        # key: (file id, dest worker id), value: dict of open rows, used as an ordered set
+        self.open_file_rows = {}   # key: file id, value: dict of open rows
+
+    def __len__(self):
+        return len(self.file_id)
+
+    def add(self, file_id, dest_worker_id, t_start, transfer_id=None, source=None):
+        # source is a url, the id of the source worker, or None
+        if transfer_id is None:
+            return self._append(file_id, dest_worker_id, t_start, 0, 0, source)
+        key = (file_id, transfer_id)
+        digest = _digest(transfer_id)
+        row = self.open_transfers.get(key)
+        if row is None:
+            row = self._closed_transfer_row(file_id, digest)
+        if row is not None:
+            # a transfer id the manager reused for the same file starts over the transfer it had
+            row = self._restart(row, dest_worker_id, t_start, source)
+        else:
+            self.num_transfer_ids += 1
+            row = self._append(file_id, dest_worker_id, t_start, self.num_transfer_ids, digest, source)
+        self.open_transfers[key] = row
+        self.open_transfer_ids[row] = key
+        return row
+
+    def _closed_transfer_row(self, file_id, digest):
+        rows = self.file_rows.get(file_id)
+        if rows is None:
+            return None
+        rows = np.frombuffer(rows, dtype=np.int64)
+        rows = rows[np.frombuffer(self.transfer_key, dtype=np.int64)[rows] == digest]
+        return int(rows[-1]) if len(rows) else None
+
+    def _append(self, file_id, dest_worker_id, t_start, transfer_id, transfer_key, source):
+        row = len(self.file_id)
+        self.file_id.append(file_id)
+        self.dest_worker_id.append(dest_worker_id)
+        self.source_worker_id.append(0)
+        self.source_url.append(0)
+        self._set_source(row, source)
+        self.transfer_id.append(transfer_id)
+        self.transfer_key.append(transfer_key)
+        self.t_start.append(t_start)
+        self.t_stage_in.append(NO_TIME)
+        self.t_stage_out.append(NO_TIME)
+
+        rows = self.file_rows.get(file_id)
+        if rows is None:
+            rows = self.file_rows[file_id] = array('q')
+        rows.append(row)
+        self._open(row)
+        return row
+
+    def _set_source(self, row, source):
+        if isinstance(source, str):
+            self.source_worker_id[row] = 0
+            self.source_url[row] = self.url_symbols.intern(source)
+        else:
+            self.source_worker_id[row] = source or 0
+            self.source_url[row] = 0
+
+    def _restart(self, row, dest_worker_id, t_start, source):
+        if self._is_open(row):
+            self._close(row)
+        self.dest_worker_id[row] = dest_worker_id
+        self._set_source(row, source)
+        self.t_start[row] = t_start
+        self.t_stage_in[row] = NO_TIME
+        self.t_stage_out[row] = NO_TIME
+        self._open(row)
+        return row
+
+    def _is_open(self, row):
+        return self.t_stage_out[row] != self.t_stage_out[row]
+
+    def _open(self, row):
+        file_id = self.file_id[row]
+        self.open_rows.setdefault((file_id, self.dest_worker_id[row]), {})[row] = None
+        self.open_file_rows.setdefault(file_id, {})[row] = None
+
+    def _close(self, row):
+        # drop a row from the open indexes, and the indexes that become empty, so that they do not grow with the log
+        file_id = self.file_id[row]
+        key = (file_id, self.dest_worker_id[row])
+        rows = self.open_rows[key]
+        del rows[row]
+        if not rows:
+            del self.open_rows[key]
+        rows = self.open_file_rows[file_id]
+        del rows[row]
+        if not rows:
+            del self.open_file_rows[file_id]
+
+    def rows_of(self, file_id):
+        return self.file_rows.get(file_id, ())
+
+    def has_transfers(self, file_id):
+        return file_id in self.file_rows
+
+    def time_start(self, row):
+        return _time(self.t_start[row])
+
+    def time_stage_in(self, row):
+        return _time(self.t_stage_in[row])
+
+    def time_stage_out(self, row):
+        return _time(self.t_stage_out[row])
+
+    # the life of a replica
+
+    def stage_in(self, row, timestamp):
+        # note that the cache-update might be received after the unlink, in this case we simply skip it
+        if self._is_open(row):
+            self.t_stage_in[row] = timestamp
+
+    def stage_out(self, row, timestamp):
+        if self._is_open(row):
+            self.t_stage_out[row] = timestamp
+            self._close(row)
+            # the logged id of a transfer is not needed anymore once its replica is gone
+            key = self.open_transfer_ids.pop(row, None)
+            if key is not None:
+                del self.open_transfers[key]
+
+    def _open_rows_of(self, file_id, dest_worker_id):
+        # a copy, staging out a row changes the index
+        return list(self.open_rows.get((file_id, dest_worker_id), ()))
+
+    def _indexed_row(self, file, transfer_id):
+        # None for a replica that is gone already (a cache-update may come after the unlink), or an id from a
+        # previous manager
+        return self.open_transfers.get((file.file_id, transfer_id))
+
+    def cache_update(self, file, worker, time_stage_in, transfer_id):
+        if transfer_id == 'X':
+            if len(file.producers) > 0:
+                row = self.add(file.file_id, worker.id, time_stage_in)
+                self.stage_in(row, time_stage_in)
+            else:
+                for row in self._open_rows_of(file.file_id, worker.id):
+                    if not self.transfer_id[row]:
+                        self.stage_in(row, time_stage_in)
+        else:
+            row = self._indexed_row(file, transfer_id)
+            if row is None:
+                return
+            self.stage_in(row, time_stage_in)
+
+        worker.add_active_file_or_transfer(file.file_id)
+
+    def cache_invalid(self, file, worker, time_stage_out, transfer_id):
+        if transfer_id is None:
+            for row in self._open_rows_of(file.file_id, worker.id):
+                if not self.transfer_id[row]:
+                    self.stage_out(row, time_stage_out)
+        else:
+            row = self._indexed_row(file, transfer_id)
+            if row is None:
+                return
+            self.stage_out(row, time_stage_out)
+
+        worker.remove_active_file_or_transfer(file.file_id)
+
+    def unlink(self, file, worker, time_stage_out):
+        # every replica of the file on the worker, whether the manager started its transfer or not
+        for row in self._open_rows_of(file.file_id, worker.id):
+            self.stage_out(row, time_stage_out)
+
+        worker.remove_active_file_or_transfer(file.file_id)
+
+    def unlink_all(self, file_id, timestamp):
+        for row in list(self.open_file_rows.get(file_id, ())):
+            self.stage_out(row, timestamp)
+
+    # bulk access
+
+    def frame(self):
+        """
+        The table as a polars frame, with null for an unknown time and for the ids that are 0. The ids are
+        Int64, the source url is resolved to its string.
+        """
+        def id_column(name, values, nulls=True):
+            ids = np.frombuffer(values, dtype=np.int32).astype(np.int64)
+            if not nulls:
+                return pl.Series(name, ids)
+            return pl.Series(name, ids).replace(0, None)
+
+        urls = [None] + self.url_symbols.values
+        return pl.DataFrame([
+            pl.Series('row', np.arange(len(self), dtype=np.int64)),
+            id_column('file_id', self.file_id, nulls=False),
+            id_column('dest_worker_id', self.dest_worker_id, nulls=False),
+            id_column('source_worker_id', self.source_worker_id),
+            pl.Series('source_url', [urls[url_id] for url_id in self.source_url], dtype=pl.String),
+            id_column('transfer_id', self.transfer_id),
+            _time_column('t_start', self.t_start),
+            _time_column('t_stage_in', self.t_stage_in),
+            _time_column('t_stage_out', self.t_stage_out),
+        ])
+
+    def append_columns(self, file_id, dest_worker_id, source, transfer_id, t_start, t_stage_in, t_stage_out):
+        """
+        Rows in bulk, e.g. from a checkpoint, with None for an unknown time. `transfer_id` are the dense ids
+        of `frame`, None for a replica the manager did not transfer: the logged ids are not known, so a row
+        added here cannot be found by the transfer id of a later cache-update or cache-invalid.
+        """
+        for i in range(len(file_id)):
+            row = self._append(file_id[i], dest_worker_id[i], NO_TIME if t_start[i] is None else t_start[i],
+                               transfer_id[i] or 0, 0, source[i])
+            self.num_transfer_ids = max(self.num_transfer_ids, transfer_id[i] or 0)
+            if t_stage_in[i] is not None:
+                self.stage_in(row, t_stage_in[i])
+            if t_stage_out[i] is not None:
+                self.stage_out(row, t_stage_out[i])
@@ -1,9 +1,17 @@
 import re
 import json
 from bitarray import bitarray
+from .compact import SlottedRecord
 
 
-class WorkerInfo:
+class WorkerInfo(SlottedRecord):
+    __slots__ = (
+        'ip', 'port', 'connect_id', 'worker_entry',
+        'id', 'hash', 'machine_name', 'transfer_port', 'cores', 'gpus', 'memory_mb', 'disk_mb',
+        'time_connected', 'time_disconnected', 'coremap', 'is_checkpoint_worker',
+        'tasks_completed', 'tasks_failed', 'tasks_running', 'current_replicas',
+    )
+
     def __init__(self, ip: str, port: int, connect_id: int):
         # basic info
         self.ip = ip
@@ -12,7 +20,7 @@ class WorkerInfo:
 
         self.worker_entry = (self.ip, self.port, self.connect_id)
 
-        self.id = None
+        self.id = None      # the id of worker_entry in DataParser.worker_symbols, counting from 1
         self.hash = None
         self.machine_name = None
         self.transfer_port = None
@@ -30,16 +38,16 @@ class WorkerInfo:
         self.tasks_failed = []
         self.tasks_running = set()
 
-        # active files or transfers, set of filenames
+        # active files or transfers, set of file ids
         self.current_replicas = set()
 
-    def add_active_file_or_transfer(self, filename: str):
-        # allow double adding the same filename because we add upon "puturl" and then the subsequent "cache-update"
-        self.current_replicas.add(filename)
+    def add_active_file_or_transfer(self, file_id: int):
+        # allow double adding the same file because we add upon "puturl" and then the subsequent "cache-update"
+        self.current_replicas.add(file_id)
 
-    def remove_active_file_or_transfer(self, filename: str):
-        # allow double removing the same filename (is this correct?)
-        self.current_replicas.discard(filename)
+    def remove_active_file_or_transfer(self, file_id: int):
+        # allow double removing the same file (is this correct?)
+        self.current_replicas.discard(file_id)
 
     def set_checkpoint_worker(self):
         self.is_checkpoint_worker = True
@@ -75,7 +83,7 @@ class WorkerInfo:
         for i in range(1, len(self.coremap)):
             if self.coremap[i] == 0:
                 self.coremap[i] = 1
-                task.core_id.append(i)
+                task.core_id += (i,)
                 cores_found += 1
                 if cores_found == task.cores_requested:
                     self.tasks_running.add(task.task_id)
@@ -1,5 +1,6 @@
 import { moduleClasses, moduleConfigs } from './modules/configs.js';
 import { LogManager } from './modules/log_manager.js';
+import { LiveUpdates } from './modules/live_updates.js';
 import { updateSidebarButtons } from './modules/utils.js';
 
 const moduleObjects = {};
@@ -41,6 +42,20 @@ async function fetchAllModulesData(folder) {
     }
 }
 
+async function refetchUpdatedModules(status) {
+    /* the report tables are named after the module ids, a new time domain affects every module */
+    const changed = new Set(status.changed_tables || []);
+    const refetchAll = changed.has('time_domain');
+
+    const tasks = moduleConfigs
+        .filter(({ id }) => refetchAll || changed.has(id.replaceAll('-', '_')))
+        .map(({ id }) => moduleObjects[id].fetchDataAndPlot().catch((err) => {
+            console.error('Error during module data fetch:', err);
+        }));
+
+    await Promise.all(tasks);
+}
+
 document.addEventListener('DOMContentLoaded', () => {
     const root = document.getElementById('content');
     if (!root) {
@@ -65,6 +80,15 @@ document.addEventListener('DOMContentLoaded', () => {
         return fetchAllModulesData(folder);
     });
 
+    /* while the log is followed by vine_parse --follow -> refetch the modules whose data changed */
+    const liveUpdates = new LiveUpdates();
+    liveUpdates.registerUpdateCallback((folder, status) => {
+        return refetchUpdatedModules(status);
+    });
+    logManager.registerLogChangeCallback((folder) => {
+        liveUpdates.follow(folder);
+    });
+
     /* update sidebar buttons */
     updateSidebarButtons();
 
@@ -0,0 +1,50 @@
+/* follows the updates pushed by the server while `vine_parse --follow` tails a running manager */
+export class LiveUpdates {
+    constructor() {
+        this.liveUpdatesAPI = '/api/live-updates';
+
+        this._eventSource = null;
+        this._updateCallbacks = [];
+        this._folder = null;
+    }
+
+    registerUpdateCallback(callback) {
+        if (typeof callback === 'function') {
+            this._updateCallbacks.push(callback);
+        }
+    }
+
+    follow(folder) {
+        this.close();
+        this._folder = folder;
+
+        this._eventSource = new EventSource(`${this.liveUpdatesAPI}?folder=${encodeURIComponent(folder)}`);
+
+        this._eventSource.addEventListener('update', async (event) => {
+            let status;
+            try {
+                status = JSON.parse(event.data);
+            } catch (err) {
+                console.warn('Invalid live update:', err);
+                return;
+            }
+            for (const cb of this._updateCallbacks) {
+                try {
+                    await Promise.resolve(cb(folder, status));
+                } catch (err) {
+                    console.warn('Live update callback failed:', err);
+                }
+            }
+        });
+
+        /* the log is not followed (anymore), do not let the browser reconnect */
+        this._eventSource.addEventListener('end', () => this.close());
+    }
+
+    close() {
+        if (this._eventSource) {
+            this._eventSource.close();
+            this._eventSource = null;
+        }
+    }
+}
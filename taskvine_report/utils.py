@@ -6,7 +6,7 @@ import hashlib
 import math
 import random
 import bisect
-from rich.progress import Progress, SpinnerColumn, TimeElapsedColumn, TimeRemainingColumn, MofNCompleteColumn, BarColumn
+from rich.progress import Progress, SpinnerColumn, TimeElapsedColumn, TimeRemainingColumn, MofNCompleteColumn, BarColumn, DownloadColumn
 import polars as pl
 import numpy as np
 import functools
@@ -17,6 +17,7 @@ from flask import current_app
 import shutil
 import subprocess
 import sys
+from taskvine_report.src.downsampling import as_float_array, downsample_indices
 
 def check_pip_updates():
     try:
@@ -151,7 +152,7 @@ def _apply_start_point_zero_condition(points, y_index=1):
     x_val, y_val = first_point[0], first_point[y_index]
     
     # Only modify if both x > 0 and y > 0
-    if x_val > 0 and y_val > 0:
+    if x_val is not None and y_val is not None and x_val > 0 and y_val > 0:
         # Create new tuple with y set to 0
         modified_point = list(first_point)
         modified_point[y_index] = 0
@@ -159,7 +160,19 @@ def _apply_start_point_zero_condition(points, y_index=1):
     
     return points
 
-def downsample_points(points, target_point_count=10000, y_index=1):
+def _points_arrays(points, y_index):
+    # the x and y of a list of points as float arrays, with NaN for a missing value
+    try:
+        arr = np.asarray(points, dtype=np.float64)
+        return arr[:, 0], arr[:, y_index]
+    except (TypeError, ValueError):
+        return as_float_array([p[0] for p in points]), as_float_array([p[y_index] for p in points])
+
+def downsample_points(points, target_point_count=10000, y_index=1, method='extremes'):
+    """
+    Downsample a list of points, tuples whose first element is x, to about target_point_count of them with
+    one of DOWNSAMPLING_METHODS, see `downsample_indices`. The points are selected on numpy arrays of x and y.
+    """
     if not points:
         return []
 
@@ -170,67 +183,12 @@ def downsample_points(points, target_point_count=10000, y_index=1):
     if len(points) <= target_point_count:
         return points
 
-    MIN_POINT_COUNT = 10
-    if len(points) > MIN_POINT_COUNT and target_point_count < MIN_POINT_COUNT:
-        target_point_count = MIN_POINT_COUNT
-
-    non_null_points = [(i, p) for i, p in enumerate(points) if p[y_index] is not None]
-    if not non_null_points:
-        return points[:target_point_count]
-
-    x_index = 0
-    start_x = points[0][x_index]
-    start_candidates = [(i, p) for i, p in enumerate(points) if p[x_index] == start_x and p[y_index] is not None]
-    start_idx = min(start_candidates, key=lambda x: x[1][y_index])[0] if start_candidates else 0
-
-    end_x = points[-1][x_index]
-    end_candidates = [(i, p) for i, p in enumerate(points) if p[x_index] == end_x and p[y_index] is not None]
-    end_idx = min(end_candidates, key=lambda x: x[1][y_index])[0] if end_candidates else len(points) - 1
-
-    y_max_idx = max(non_null_points, key=lambda x: x[1][y_index])[0]
-    keep_indices = {start_idx, end_idx, y_max_idx}
-
-    remaining = target_point_count - len(keep_indices)
-    if remaining <= 0:
-        result_points = [points[i] for i in sorted(keep_indices)]
-        return _apply_start_point_zero_condition(result_points, y_index)
-
-    sorted_indices = sorted(keep_indices)
-    points_per_gap = remaining // (len(sorted_indices) - 1)
-    extra = remaining % (len(sorted_indices) - 1)
-
-    for i in range(len(sorted_indices) - 1):
-        start, end = sorted_indices[i], sorted_indices[i + 1]
-        gap = end - start - 1
-        if gap <= 0:
-            continue
-        n = points_per_gap + (1 if extra > 0 else 0)
-        if extra > 0:
-            extra -= 1
-        if n > 0:
-            available = list(range(start + 1, end))
-            if len(available) <= n:
-                sampled = available
-            else:
-                step = len(available) / n
-                sampled = [available[int(i * step)] for i in range(n)]
-            keep_indices.update(sampled)
-
-    if len(keep_indices) < target_point_count:
-        needed = target_point_count - len(keep_indices)
-        available = [i for i in range(len(points)) if i not in keep_indices]
-        if needed <= len(available):
-            step = len(available) / needed
-            sampled = [available[int(i * step)] for i in range(needed)]
-        else:
-            sampled = available
-        keep_indices.update(sampled)
-
-    result_points = [points[i] for i in sorted(keep_indices)]
+    x, y = _points_arrays(points, y_index)
+    result_points = [points[i] for i in downsample_indices(x, y, target_point_count, method).tolist()]
     return _apply_start_point_zero_condition(result_points, y_index)
 
 
-def downsample_series_points(series_points_dict, y_index=1):
+def downsample_series_points(series_points_dict, y_index=1, method='extremes'):
     # Quick check: if all series are already small, return as-is
     if all(len(points) <= 10000 for points in series_points_dict.values()):
         return series_points_dict
@@ -242,7 +200,8 @@ def downsample_series_points(series_points_dict, y_index=1):
                       for i in range(len(p)))
                 for p in points
             ],
-            y_index=y_index
+            y_index=y_index,
+            method=method
         )
         for series, points in series_points_dict.items()
     }
@@ -337,13 +296,13 @@ def prefer_zero_else_max(series):
     return series.max()
 
 def get_current_time_domain():
-    csv_file_time_domain = current_app.config["RUNTIME_STATE"].csv_file_time_domain
-    if not os.path.exists(csv_file_time_domain):
-        raise ValueError(f"Time domain file not found: {csv_file_time_domain}")
-    
-    df = pd.read_csv(csv_file_time_domain)
-    min_time = df['MIN_TIME'].iloc[0]
-    max_time = df['MAX_TIME'].iloc[0]
+    store = current_app.config["RUNTIME_STATE"].store
+    if not store.exists('time_domain'):
+        raise ValueError(f"Time domain table not found: {store.path('time_domain')}")
+
+    df = store.read('time_domain')
+    min_time = df['MIN_TIME'][0]
+    max_time = df['MAX_TIME'][0]
     return [0, max_time - min_time]
 
 def check_and_reload_data():
@@ -402,16 +361,15 @@ def get_size_unit_and_scale(max_file_size_mb) -> tuple[str, float]:
     else:
         return 'Bytes', 1024 * 1024
 
-def read_csv_to_fd(csv_path):
-    if not os.path.exists(csv_path):
-        raise FileNotFoundError(f"CSV file not found: {csv_path}")
-    
-    try:
-        df = pd.read_csv(csv_path)
-    except Exception as e:
-        raise RuntimeError(f"Failed to read CSV file {csv_path}: {e}")
+def read_report_table(name):
+    # a polars frame of a table of the current template, memory-mapped from its report-files
+    return current_app.config["RUNTIME_STATE"].store.read(name)
 
-    return df
+def _is_missing(col, dtype):
+    missing = pl.col(col).is_null()
+    if dtype.is_float():
+        missing = missing | pl.col(col).is_nan()
+    return missing
 
 def extract_points_from_df(df, x_col, *y_cols):
     cols = (x_col,) + y_cols
@@ -419,20 +377,55 @@ def extract_points_from_df(df, x_col, *y_cols):
     if missing:
         raise KeyError(f"Missing columns in DataFrame: {missing}")
 
-    points = df[list(cols)].dropna().itertuples(index=False, name=None)
-    return list(points)
+    df = df.select(cols)
+    return df.filter(~pl.any_horizontal(_is_missing(col, df.schema[col]) for col in cols)).rows()
 
 
 def extract_series_points_dict(df, x_col):
     if x_col not in df.columns:
         raise KeyError(f"{x_col} not found in DataFrame")
-    
-    melted = df.melt(id_vars=x_col, var_name='series', value_name='y').dropna()
-    
-    return {
-        series: group[[x_col, 'y']].values.tolist()
-        for series, group in melted.groupby('series')
-    }
+
+    series_points = {}
+    for series in sorted(col for col in df.columns if col != x_col):
+        points = df.filter(~_is_missing(x_col, df.schema[x_col]) & ~_is_missing(series, df.schema[series]))
+        if points.height:
+            series_points[series] = points.select(pl.col(x_col).cast(pl.Float64), pl.col(series).cast(pl.Float64)).to_numpy().tolist()
+    return series_points
+
+def _is_worker_key(column_name):
+    # a worker is named "<host>:<port>:<connect id>"
+    parts = column_name.rsplit(":", 2)
+    if len(parts) != 3:
+        return False
+    host, port, connect_id = parts
+    return bool(host) and port.isdigit() and connect_id.isdigit()
+
+def read_worker_series_table(name, value_col):
+    """
+    A per-worker series table of the current template, `worker`, `time` and `value_col` sorted by worker and
+    time. A template generated by an older version has one column per worker instead, it is turned into
+    the same long table here.
+    """
+    df = read_report_table(name)
+    if 'worker' in df.columns:
+        return df
+    workers = [col for col in df.columns if _is_worker_key(col)]
+    return (
+        df.unpivot(on=workers, index='time', variable_name='worker', value_name=value_col)
+        .with_columns(pl.col('time').cast(pl.Float64), pl.col(value_col).cast(pl.Float64))
+        .filter(~_is_missing('time', pl.Float64) & ~_is_missing(value_col, pl.Float64))
+        .select('worker', 'time', value_col)
+        .sort('worker', 'time', maintain_order=True)
+    )
+
+def extract_worker_series_points_dict(df, value_col):
+    # the rows of a worker are one slice of the table, its points are taken without grouping or pivoting
+    df = df.filter(~_is_missing('time', df.schema['time']) & ~_is_missing(value_col, df.schema[value_col]))
+    workers = df.group_by('worker', maintain_order=True).len()
+    points = df.select(pl.col('time').cast(pl.Float64), pl.col(value_col).cast(pl.Float64)).to_numpy()
+    ends = np.cumsum(workers['len'].to_numpy())
+    return {worker: points[end - length:end].tolist()
+            for worker, length, end in zip(workers['worker'].to_list(), workers['len'].to_list(), ends.tolist())}
 
 def scale_storage_series_points(storage_data):
     max_value = 0.0
@@ -643,15 +636,17 @@ def max_interval_overlap(intervals: list[tuple[float, float]]) -> int:
     sort_idx = np.argsort(arr[:, 0], kind='stable')
     return int(np.cumsum(arr[sort_idx, 1]).max())
 
-def downsample_np_rows(arr, downsample_point_count=10000, value_col=1):
+def downsample_np_rows(arr, downsample_point_count=10000, value_col=1, method='extremes'):
     if len(arr) <= downsample_point_count:
         return arr
-    
-    points = arr.tolist()
-    downsampled = downsample_points(points, target_point_count=downsample_point_count, y_index=value_col)
-    return np.array(downsampled)
 
-def downsample_df(df, downsample_point_count=10000, y_col=None, y_index=None):
+    downsampled = arr[downsample_indices(arr[:, 0], arr[:, value_col], downsample_point_count, method)]
+    x_val, y_val = downsampled[0, 0], downsampled[0, value_col]
+    if x_val is not None and y_val is not None and x_val > 0 and y_val > 0:
+        downsampled[0, value_col] = 0
+    return downsampled
+
+def downsample_df(df, downsample_point_count=10000, y_col=None, y_index=None, method='extremes'):
     """
     Downsample a DataFrame using the same logic as downsample_np_rows.
     
@@ -660,6 +655,7 @@ def downsample_df(df, downsample_point_count=10000, y_col=None, y_index=None):
         downsample_point_count: target number of rows after downsampling
         y_col: column name for y values (for preserving extremes)
         y_index: column index for y values (alternative to y_col)
+        method: one of DOWNSAMPLING_METHODS
         
     Returns:
         pandas DataFrame with downsampled data
@@ -677,7 +673,7 @@ def downsample_df(df, downsample_point_count=10000, y_col=None, y_index=None):
     
     # Convert to numpy array, downsample, then back to DataFrame
     arr = df.values
-    downsampled_arr = downsample_np_rows(arr, downsample_point_count=downsample_point_count, value_col=y_index)
+    downsampled_arr = downsample_np_rows(arr, downsample_point_count=downsample_point_count, value_col=y_index, method=method)
     
     # Create new DataFrame with same columns and preserve dtypes
     result = pd.DataFrame(downsampled_arr, columns=df.columns)
@@ -692,7 +688,8 @@ def downsample_df(df, downsample_point_count=10000, y_col=None, y_index=None):
             
     return result
 
-def downsample_df_polars(df: pl.DataFrame, downsample_point_count=10000, y_col=None, y_index=None) -> pl.DataFrame:
+def downsample_df_polars(df: pl.DataFrame, downsample_point_count=10000, y_col=None, y_index=None, method='extremes') -> pl.DataFrame:
+    # the rows are selected on the first column and the y column as arrays, the columns keep their types
     if not downsample_point_count or downsample_point_count <= 0:
         return df
     if df.height <= downsample_point_count:
@@ -703,19 +700,14 @@ def downsample_df_polars(df: pl.DataFrame, downsample_point_count=10000, y_col=N
     elif y_index is None:
         y_index = 1
 
-    arr = np.array([row for row in df.iter_rows()], dtype=object)
+    keep = downsample_indices(df.to_series(0), df.to_series(y_index), downsample_point_count, method)
+    downsampled = df[keep]
 
-    downsampled_arr = downsample_np_rows(arr, downsample_point_count=downsample_point_count, value_col=y_index)
-
-    new_cols = []
-    for i, name in enumerate(df.columns):
-        orig_dtype = df.schema[name]
-        try:
-            col = pl.Series(name, downsampled_arr[:, i]).cast(orig_dtype)
-        except:
-            col = pl.Series(name, downsampled_arr[:, i])
-        new_cols.append(col)
-    return pl.DataFrame(new_cols)
+    x_val, y_val = downsampled[0, 0], downsampled[0, y_index]
+    if x_val is not None and y_val is not None and x_val > 0 and y_val > 0:
+        y = downsampled.to_series(y_index).clone()
+        downsampled = downsampled.with_columns(y.scatter(0, 0))
+    return downsampled
 
 def count_elements_after(item, lst):
     try:
@@ -727,19 +719,13 @@ def count_elements_after(item, lst):
 def string_contains_any(text, substrings):
     return any(s in text for s in substrings)
 
-def write_df_to_csv(df, csv_file_path, **kwargs):
-    if hasattr(df, "to_pandas"):
-        df = df.to_pandas()
-    if "index" not in kwargs:
-        kwargs["index"] = False
-    df.to_csv(csv_file_path, **kwargs)
-
-def create_progress_bar():
+def create_progress_bar(track_bytes=False):
+    # with track_bytes, the completed and total amounts are byte counts and are shown as sizes
     return Progress(
         SpinnerColumn(),
         "[progress.description]{task.description}",
         BarColumn(),
-        MofNCompleteColumn(),
+        DownloadColumn() if track_bytes else MofNCompleteColumn(),
         "[progress.percentage]{task.percentage:>3.0f}%",
         TimeElapsedColumn(),
         TimeRemainingColumn(),
@@ -0,0 +1,28 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+
+from synthetic_logs import generate_template
+
+
+@pytest.fixture(scope='session')
+def synthetic_template(tmp_path_factory):
+    """
+    A synthetic runtime template written by benchmarks/synthetic_logs.py, one per set of parameters for the
+    whole session. Tests that write into the template copy it first.
+    """
+    templates = {}
+
+    def make(**parameters):
+        key = tuple(sorted(parameters.items()))
+        if key not in templates:
+            template = str(tmp_path_factory.mktemp('template'))
+            generate_template(template, **parameters)
+            templates[key] = template
+        return templates[key]
+
+    return make
@@ -0,0 +1,30 @@
+import os
+import shutil
+
+from taskvine_report.src.csv_manager import CSVManager
+from taskvine_report.src.data_parser import DataParser
+from taskvine_report.src.report_store import ReportStore
+
+
+def test_report_from_the_tables_the_stages_read(synthetic_template, tmp_path):
+    full_template = synthetic_template(tasks=500, workers=5, failure_rate=0.05, worker_failures=1, seed=4)
+    parsed = str(tmp_path / 'parsed')
+    loaded = str(tmp_path / 'loaded')
+    shutil.copytree(os.path.join(full_template, 'vine-logs'), os.path.join(parsed, 'vine-logs'))
+
+    data_parser = DataParser(parsed, enablee_checkpoint_pkl_files=True)
+    data_parser.parse_logs()
+    CSVManager(parsed, data_parser=data_parser).generate_csv_files()
+    shutil.copytree(parsed, loaded, ignore=shutil.ignore_patterns('report-files'))
+
+    assert 'subgraphs' not in CSVManager.parsed_state_tables()
+    data_parser = DataParser(loaded)
+    data_parser.load_pkl_files(tables=CSVManager.parsed_state_tables())
+    assert data_parser.subgraphs == {}
+    CSVManager(loaded, data_parser=data_parser).generate_csv_files()
+
+    parsed_store = ReportStore(parsed)
+    loaded_store = ReportStore(loaded)
+    assert loaded_store.names() == parsed_store.names()
+    for name in parsed_store.names():
+        assert loaded_store.read(name).equals(parsed_store.read(name)), name
@@ -0,0 +1,47 @@
+import os
+
+import pytest
+
+from taskvine_report.src.data_parser import DataParser
+
+
+@pytest.fixture(scope='module')
+def template(synthetic_template):
+    # noise lines the parser skips, failed tries, failed workers and a manager restart
+    return synthetic_template(tasks=500, workers=5, failure_rate=0.05, worker_failures=2, restarts=1, noise=4, seed=3)
+
+
+def test_indexed_dispatch_and_line_filter_agree_with_a_linear_scan(template):
+    data_parser = DataParser(template)
+    start, end = data_parser._select_debug_segment(os.path.getsize(data_parser.debug))
+    assert start > 0
+    dispatch = data_parser.debug_dispatch
+    search = dispatch.line_filter.search
+
+    handled = skipped = 0
+    with open(data_parser.debug, 'rb') as f:
+        f.seek(start)
+        for raw_line in f:
+            # every line is decoded and matched in the state the parse has reached, skipped by the filter or not
+            line = raw_line.decode('utf-8').strip()
+            parts = line.split(" ")
+            try:
+                timestamp = data_parser.datestring_to_timestamp(parts[0] + " " + parts[1])
+            except Exception:
+                continue
+            handler = dispatch.match(line, parts, data_parser)
+            reference = dispatch.match_linear(line, parts, data_parser)
+            assert handler is reference, line
+
+            if search(raw_line) is None:
+                assert reference is None, line
+                skipped += 1
+                continue
+            data_parser.debug_current_line = line
+            data_parser.debug_current_parts = parts
+            data_parser.debug_current_timestamp = timestamp
+            data_parser.parse_debug_line()
+            handled += reference is not None
+
+    assert handled > 0 and skipped > 0
+    assert len(data_parser.tasks) > 0
@@ -0,0 +1,129 @@
+import numpy as np
+import pytest
+
+from downsampling import python_extremes
+from taskvine_report.src.downsampling import DOWNSAMPLING_METHODS, MIN_POINT_COUNT, downsample_indices
+
+
+def random_walk(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.arange(n, dtype=np.float64) / 100, np.cumsum(rng.normal(size=n))
+
+
+def m4_columns(x, target):
+    # the pixel column of every point, as M4 splits the x range
+    columns = target // 4
+    return np.minimum(((x - x.min()) * (columns / (x.max() - x.min()))).astype(np.int64), columns - 1)
+
+
+@pytest.mark.parametrize('method', DOWNSAMPLING_METHODS)
+def test_first_and_last_points_are_kept(method):
+    x, y = random_walk(5000)
+    keep = downsample_indices(x, y, 100, method)
+    assert keep[0] == 0 and keep[-1] == len(y) - 1
+
+
+@pytest.mark.parametrize('method', DOWNSAMPLING_METHODS)
+def test_indices_are_sorted_and_unique(method):
+    x, y = random_walk(5000)
+    keep = downsample_indices(x, y, 100, method)
+    assert keep.dtype == np.int64
+    assert np.all(np.diff(keep) > 0)
+    assert len(keep) <= 100
+
+
+@pytest.mark.parametrize('method', DOWNSAMPLING_METHODS)
+def test_short_series_are_kept_whole(method):
+    x, y = random_walk(50)
+    assert downsample_indices(x, y, 50, method).tolist() == list(range(50))
+
+
+def test_m4_keeps_the_extremes_of_every_column():
+    x, y = random_walk(10000)
+    target = 200
+    keep = downsample_indices(x, y, target, 'm4')
+    columns = m4_columns(x, target)
+    for column in np.unique(columns):
+        in_column = np.flatnonzero(columns == column)
+        kept = np.intersect1d(keep, in_column)
+        assert y[kept].min() == y[in_column].min()
+        assert y[kept].max() == y[in_column].max()
+        assert in_column[0] in kept and in_column[-1] in kept
+
+
+def test_m4_sorts_unsorted_x():
+    x, y = random_walk(10000)
+    order = np.random.default_rng(1).permutation(len(x))
+    keep_sorted = downsample_indices(x, y, 200, 'm4')
+    keep_shuffled = downsample_indices(x[order], y[order], 200, 'm4')
+    # the same points, found at their shuffled positions, which are returned sorted
+    assert np.all(np.diff(keep_shuffled) > 0)
+    assert sorted(order[keep_shuffled].tolist()) == keep_sorted.tolist()
+
+
+@pytest.mark.parametrize('method', DOWNSAMPLING_METHODS)
+def test_missing_values(method):
+    x, y = random_walk(5000)
+    y[np.random.default_rng(2).choice(len(y), 500, replace=False)] = np.nan
+    y[[0, -1]] = 1.0
+    keep = downsample_indices(x, y, 100, method)
+    assert np.all(np.diff(keep) > 0)
+    assert keep[0] == 0 and keep[-1] == len(y) - 1
+    # the highest point is a valid one, and it is kept
+    assert np.nanargmax(y) in keep
+    missing = keep[np.isnan(y[keep])]
+    if method == 'lttb':
+        assert len(missing) == 0
+    elif method == 'm4':
+        # as the first or last point of a column
+        columns = m4_columns(x, 100)
+        boundaries = np.flatnonzero(np.diff(columns))
+        assert np.isin(missing, np.concatenate((boundaries, boundaries + 1))).all()
+
+
+@pytest.mark.parametrize('method', DOWNSAMPLING_METHODS)
+def test_only_missing_values(method):
+    x = np.arange(1000, dtype=np.float64)
+    y = np.full(1000, np.nan)
+    keep = downsample_indices(x, y, 100, method)
+    assert len(keep) > 0
+    assert np.all(np.diff(keep) > 0) and keep[0] >= 0 and keep[-1] < 1000
+
+
+@pytest.mark.parametrize('method', DOWNSAMPLING_METHODS)
+@pytest.mark.parametrize('target', [0, 1, 2])
+def test_tiny_targets(method, target):
+    # a short series keeps at least its first and last points
+    x, y = random_walk(8)
+    keep = downsample_indices(x, y, target, method)
+    assert keep[0] == 0 and keep[-1] == 7
+    assert np.all(np.diff(keep) > 0)
+    # a longer one is downsampled to MIN_POINT_COUNT points at least
+    x, y = random_walk(1000)
+    keep = downsample_indices(x, y, target, method)
+    assert keep[0] == 0 and keep[-1] == 999
+    assert len(keep) <= MIN_POINT_COUNT
+    if method == 'extremes':
+        assert len(keep) == MIN_POINT_COUNT
+
+
+def test_unknown_method():
+    x, y = random_walk(100)
+    with pytest.raises(ValueError):
+        downsample_indices(x, y, 10, 'mean')
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_extremes_keeps_the_points_of_the_python_implementation(seed):
+    x, y = random_walk(20000, seed)
+    # repeated x values at both ends, where the lowest point is kept
+    x[:3] = x[0]
+    x[-3:] = x[-1]
+    points = list(zip(x.tolist(), y.tolist()))
+    for target in (10, 100, 1234):
+        assert downsample_indices(x, y, target, 'extremes').tolist() == python_extremes(points, target)
+
+    # missing values
+    y[np.random.default_rng(seed).choice(len(y), 2000, replace=False)] = np.nan
+    points = [(px, None if np.isnan(py) else py) for px, py in zip(x.tolist(), y.tolist())]
+    assert downsample_indices(x, y, 100, 'extremes').tolist() == python_extremes(points, 100)
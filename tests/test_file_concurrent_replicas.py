@@ -0,0 +1,104 @@
+import os
+import shutil
+from types import SimpleNamespace
+
+import numpy as np
+
+from taskvine_report.src.csv_manager import CSVManager
+from taskvine_report.src.data_parser import DataParser
+from taskvine_report.src.file_info import FileInfo
+from taskvine_report.src.report_store import ReportStore
+from taskvine_report.src.task_info import TaskInfo
+from taskvine_report.src.transfer_table import TransferTable
+from taskvine_report.src.worker_info import WorkerInfo
+from taskvine_report.utils import max_interval_overlap
+
+
+T0 = 1_700_000_000.0
+
+
+def expected_max_replicas(dp):
+    # per file created by a task, max_interval_overlap over the replicas that were staged in and out
+    expected = {}
+    t_stage_in = np.frombuffer(dp.transfers.t_stage_in, dtype=np.float64)
+    t_stage_out = np.frombuffer(dp.transfers.t_stage_out, dtype=np.float64)
+    for file in dp.files.values():
+        if not file.producers or not dp.transfers.has_transfers(file.file_id):
+            continue
+        rows = np.frombuffer(dp.transfers.rows_of(file.file_id), dtype=np.int64)
+        stage_in, stage_out = t_stage_in[rows], t_stage_out[rows]
+        alive = ~np.isnan(stage_in) & ~np.isnan(stage_out)
+        expected[file.filename] = max_interval_overlap(list(zip(stage_in[alive].tolist(), stage_out[alive].tolist())))
+    return expected
+
+
+def file_concurrent_replicas(template, dp):
+    csv_manager = CSVManager(template, data_parser=dp, downsampling=False)
+    csv_manager.generate_file_metrics()
+    table = ReportStore(template).read('file_concurrent_replicas')
+    return dict(zip(table['file_name'].to_list(), table['max_simul_replicas'].to_list()))
+
+
+def test_matches_max_interval_overlap_on_a_parsed_template(synthetic_template, tmp_path):
+    full_template = synthetic_template(tasks=1000, workers=8, fan_out=4, worker_failures=2, seed=4)
+    template = str(tmp_path / 'template')
+    shutil.copytree(os.path.join(full_template, 'vine-logs'), os.path.join(template, 'vine-logs'))
+    dp = DataParser(template)
+    dp.parse_logs()
+
+    expected = expected_max_replicas(dp)
+    assert max(expected.values()) > 1
+    assert file_concurrent_replicas(template, dp) == expected
+
+
+def hand_built_state(template, replicas):
+    """
+    A parsed state with only files and transfers, `replicas` maps a file name to its (worker id, stage-in,
+    stage-out) rows, in centiseconds after T0 and None for a time that never came.
+    """
+    producer = TaskInfo(1, 1)
+    producer.set_when_ready(T0)
+    producer.set_when_done(T0 + 100)
+    producer.set_task_status(T0 + 100, 0)
+    files, transfers = {}, TransferTable()
+    for file_id, (name, rows) in enumerate(replicas.items()):
+        file = FileInfo(file_id, name, 1.0, T0)
+        file.file_idx = file_id + 1
+        file.add_producer(producer)
+        files[file_id] = file
+        for worker_id, stage_in, stage_out in rows:
+            row = transfers.add(file_id, worker_id, T0)
+            if stage_in is not None:
+                transfers.stage_in(row, T0 + stage_in / 100)
+            if stage_out is not None:
+                transfers.stage_out(row, T0 + stage_out / 100)
+    workers = {}
+    for worker_id in sorted({worker_id for rows in replicas.values() for worker_id, _, _ in rows}):
+        workers[worker_id] = WorkerInfo('10.0.0.1', 9000 + worker_id, 1)
+        workers[worker_id].id = worker_id
+        workers[worker_id].add_connection(T0)
+        workers[worker_id].add_disconnection(T0 + 100)
+    manager = SimpleNamespace(get_min_max_time=lambda: (T0, T0 + 100))
+    return SimpleNamespace(runtime_template=template, manager=manager, tasks={producer.task_entry: producer},
+                           files=files, transfers=transfers, workers=workers)
+
+
+def test_equal_times_and_unfinished_transfers(tmp_path):
+    template = str(tmp_path / 'template')
+    dp = hand_built_state(template, {
+        # events at the same time follow the order of the rows, as in max_interval_overlap: a replica that goes
+        # away when the next one arrives only overlaps it if its row comes after the row of the next one
+        'handover': [(1, 10, 20), (2, 20, 30), (3, 30, 40)],
+        'handover-reversed': [(3, 30, 40), (2, 20, 30), (1, 10, 20)],
+        # a replica staged in and out at the same time, inside and at the ends of another one
+        'instant': [(1, 10, 50), (2, 30, 30), (3, 10, 10), (4, 50, 50)],
+        'same-times': [(1, 10, 20), (2, 10, 20), (3, 10, 20)],
+        'nested': [(1, 0, 90), (2, 10, 80), (3, 20, 70), (4, 70, 75), (5, 80, 90)],
+        # replicas that were never staged in or never staged out do not count
+        'unfinished': [(1, 10, None), (2, None, 20), (3, None, None)],
+        'one-finished': [(1, 10, None), (2, 15, 25), (3, None, 20)],
+    })
+    expected = expected_max_replicas(dp)
+    assert expected == {'handover': 1, 'handover-reversed': 2, 'instant': 2, 'same-times': 3, 'nested': 3,
+                        'unfinished': 0, 'one-finished': 1}
+    assert file_concurrent_replicas(template, dp) == expected
@@ -0,0 +1,91 @@
+import calendar
+import os
+import shutil
+import time
+
+from taskvine_report.src.data_parser import DataParser
+from taskvine_report.src.debug_segments import MANAGER_START_PATTERN
+
+
+def first_run_template(full_template, template):
+    """
+    The template as it was while the first manager run of `full_template` was running: its debug log stops a
+    few lines before the restart and its transactions log has the start of the first run, so that the whole
+    debug log is parsed. Returns the lines of the complete debug log and where the copy stops.
+    """
+    vine_logs_dir = os.path.join(template, 'vine-logs')
+    shutil.copytree(os.path.join(full_template, 'vine-logs'), vine_logs_dir)
+    with open(os.path.join(vine_logs_dir, 'debug'), 'rb') as f:
+        lines = f.readlines()
+    starts = [i for i, line in enumerate(lines) if MANAGER_START_PATTERN in line]
+    assert len(starts) == 2
+    cut = starts[1] - 5
+    with open(os.path.join(vine_logs_dir, 'debug'), 'wb') as f:
+        f.writelines(lines[:cut])
+
+    # the synthetic logs are in UTC
+    date, clock = lines[starts[0]].split()[:2]
+    first_start = calendar.timegm(time.strptime(f"{date.decode()} {clock.decode()[:8]}", "%Y/%m/%d %H:%M:%S"))
+    with open(os.path.join(vine_logs_dir, 'transactions'), 'r') as f:
+        header = [line for line in f if line.startswith('#')]
+    with open(os.path.join(vine_logs_dir, 'transactions'), 'w') as f:
+        f.writelines(header)
+        f.write(f"{first_start * 1000000} 4242 MANAGER 1 START\n")
+    return lines, cut
+
+
+def restart_manager(full_template, template, lines, cut):
+    # the second run appends to the debug log and rewrites the transactions log
+    vine_logs_dir = os.path.join(template, 'vine-logs')
+    with open(os.path.join(vine_logs_dir, 'debug'), 'ab') as f:
+        f.writelines(lines[cut:])
+    shutil.copy(os.path.join(full_template, 'vine-logs', 'transactions'), os.path.join(vine_logs_dir, 'transactions'))
+
+
+def parsed_state(data_parser):
+    tasks = sorted((task.task_id, task.task_try_id, task.when_ready, task.when_done, task.task_status)
+                   for task in data_parser.tasks.values())
+    workers = sorted((worker.ip, worker.port, tuple(worker.time_connected)) for worker in data_parser.workers.values())
+    return tasks, workers
+
+
+def test_incremental_parse_restarts_on_a_new_manager_run(synthetic_template, tmp_path):
+    full_template = synthetic_template(tasks=300, workers=4, restarts=1, worker_failures=1, seed=1)
+    template = str(tmp_path / 'template')
+    lines, cut = first_run_template(full_template, template)
+
+    first = DataParser(template, incremental=True)
+    first.parse_logs()
+    assert first.debug_segment_start == 0
+
+    restart_manager(full_template, template, lines, cut)
+    resumed = DataParser(template, incremental=True)
+    resumed.parse_logs()
+
+    # the checkpoint of the first run is dropped and only the new run is parsed
+    assert resumed.debug_resumed_offset is None
+    assert resumed.debug_segment_start > 0
+    expected = DataParser(full_template)
+    expected.parse_logs()
+    assert parsed_state(resumed) == parsed_state(expected)
+
+
+def test_follow_stops_at_a_new_manager_run(synthetic_template, tmp_path):
+    full_template = synthetic_template(tasks=300, workers=4, restarts=1, worker_failures=1, seed=1)
+    template = str(tmp_path / 'template')
+    lines, cut = first_run_template(full_template, template)
+
+    followed = DataParser(template, incremental=True)
+    followed.parse_debug()
+    assert followed.debug_segment_start == 0
+
+    restart_manager(full_template, template, lines, cut)
+    # the lines of the new run are not parsed into the state of the first one, LiveTail starts a new parser
+    assert followed.parse_debug_appended() is None
+    restarted = DataParser(template, incremental=True)
+    restarted.parse_debug()
+    restarted.postprocess_debug()
+
+    expected = DataParser(full_template)
+    expected.parse_logs()
+    assert parsed_state(restarted) == parsed_state(expected)
@@ -0,0 +1,57 @@
+import json
+import os
+import shutil
+import time
+
+from taskvine_report.cli.report import create_app
+from taskvine_report.src.csv_manager import CSVManager
+from taskvine_report.src.data_parser import DataParser
+from taskvine_report.src.live_tail import LIVE_STATUS_FILE_NAME, LiveTail, read_live_status
+
+
+def running_manager_template(full_template, template):
+    # the template while its manager is running, half of its debug log is written
+    shutil.copytree(os.path.join(full_template, 'vine-logs'), os.path.join(template, 'vine-logs'))
+    debug = os.path.join(template, 'vine-logs', 'debug')
+    with open(debug, 'rb') as f:
+        lines = f.readlines()
+    with open(debug, 'wb') as f:
+        f.writelines(lines[:len(lines) // 2])
+
+
+def test_interrupted_follow_marks_the_manager_stopped(synthetic_template, tmp_path, monkeypatch):
+    template = str(tmp_path / 'template')
+    running_manager_template(synthetic_template(tasks=200, workers=4), template)
+
+    def interrupt(self):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(DataParser, 'parse_debug_appended', interrupt)
+    live_tail = LiveTail(template, poll_interval=0)
+    live_tail.run()
+
+    status = read_live_status(os.path.join(template, 'report-files'))
+    assert status['seq'] == 2
+    assert not status['manager_running']
+    assert os.path.exists(live_tail.dp.resume_checkpoint_file)
+
+
+def test_live_updates_end_on_a_stale_status(synthetic_template, tmp_path, monkeypatch):
+    # vine_report logs to the working directory
+    monkeypatch.chdir(tmp_path)
+    template = str(tmp_path / 'logs' / 'template')
+    running_manager_template(synthetic_template(tasks=200, workers=4), template)
+    data_parser = DataParser(template)
+    data_parser.parse_logs()
+    CSVManager(template, data_parser=data_parser).generate_csv_files()
+
+    # left by a follower that was killed two hours ago
+    status = {'seq': 7, 'time': time.time() - 7200, 'debug_parsed_offset': 0, 'manager_running': True,
+              'metadata_delta': {}, 'changed_tables': []}
+    with open(os.path.join(template, 'report-files', LIVE_STATUS_FILE_NAME), 'w') as f:
+        json.dump(status, f)
+
+    app = create_app(str(tmp_path / 'logs'))
+    response = app.test_client().get('/api/live-updates', query_string={'folder': 'template'})
+    events = response.get_data(as_text=True)
+    assert events.endswith("event: end\ndata: {}\n\n")
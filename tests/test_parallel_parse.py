@@ -0,0 +1,46 @@
+import gzip
+import os
+import shutil
+
+import pytest
+
+from taskvine_report.src import parallel_parse
+from taskvine_report.src.csv_manager import CSVManager
+from taskvine_report.src.data_parser import DataParser
+from taskvine_report.src.report_store import ReportStore
+
+
+def parse(full_template, template, compression, jobs):
+    shutil.copytree(os.path.join(full_template, 'vine-logs'), os.path.join(template, 'vine-logs'))
+    if compression == 'gzip':
+        debug = os.path.join(template, 'vine-logs', 'debug')
+        with open(debug, 'rb') as f, gzip.open(debug + '.gz', 'wb') as out:
+            shutil.copyfileobj(f, out)
+        os.remove(debug)
+
+    data_parser = DataParser(template, jobs=jobs)
+    data_parser.parse_logs()
+    assert data_parser.debug_compression == compression
+    CSVManager(template, data_parser=data_parser).generate_csv_files()
+    return data_parser
+
+
+@pytest.mark.parametrize('compression', [None, 'gzip'])
+def test_parallel_parse_matches_serial_parse(synthetic_template, tmp_path, monkeypatch, compression):
+    full_template = synthetic_template(tasks=1000, workers=6, failure_rate=0.05, worker_failures=2, seed=2)
+    # small chunks, so that the log of a small workflow is still split between the workers
+    monkeypatch.setattr(parallel_parse, 'MIN_CHUNK_BYTES', 1 << 14)
+    monkeypatch.setattr(parallel_parse, 'STREAM_CHUNK_BYTES', 1 << 14)
+    serial = parse(full_template, str(tmp_path / 'serial'), compression, jobs=1)
+    parallel = parse(full_template, str(tmp_path / 'parallel'), compression, jobs=3)
+
+    for name in ('tasks', 'workers', 'files'):
+        assert getattr(parallel, name).keys() == getattr(serial, name).keys()
+    assert parallel.transfers.frame().equals(serial.transfers.frame())
+
+    serial_store = ReportStore(str(tmp_path / 'serial'))
+    parallel_store = ReportStore(str(tmp_path / 'parallel'))
+    names = serial_store.names()
+    assert names and parallel_store.names() == names
+    for name in names:
+        assert parallel_store.read(name).equals(serial_store.read(name)), name
@@ -0,0 +1,86 @@
+import os
+import shutil
+import threading
+
+import pytest
+
+from taskvine_report.src.csv_manager import GENERATION_STAGES, CSVManager
+from taskvine_report.src.data_parser import DataParser
+from taskvine_report.src.report_store import ReportStore
+from taskvine_report.src.stage_scheduler import Stage, StageScheduler
+
+
+def generate(full_template, template, stage_jobs):
+    shutil.copytree(os.path.join(full_template, 'vine-logs'), os.path.join(template, 'vine-logs'))
+    data_parser = DataParser(template)
+    data_parser.parse_logs()
+    csv_manager = CSVManager(template, data_parser=data_parser, stage_jobs=stage_jobs)
+    csv_manager.generate_csv_files()
+    return csv_manager
+
+
+def test_parallel_stages_match_serial_stages(synthetic_template, tmp_path):
+    full_template = synthetic_template(tasks=1000, workers=6, failure_rate=0.05, worker_failures=2, seed=2)
+    serial = generate(full_template, str(tmp_path / 'serial'), stage_jobs=1)
+    parallel = generate(full_template, str(tmp_path / 'parallel'), stage_jobs=4)
+    assert list(parallel.stage_wall_times) == list(serial.stage_wall_times) == [stage[0] for stage in GENERATION_STAGES]
+
+    serial_store = ReportStore(str(tmp_path / 'serial'))
+    parallel_store = ReportStore(str(tmp_path / 'parallel'))
+    names = serial_store.names()
+    assert names and parallel_store.names() == names
+    for name in names:
+        assert parallel_store.read(name).equals(serial_store.read(name)), name
+
+    # every table is written by the stage that declares it, the time domain by the CSVManager itself
+    outputs = {output for _, _, _, stage_outputs in GENERATION_STAGES for output in stage_outputs}
+    assert set(names) - {'time_domain'} <= outputs
+
+
+def test_stages_wait_for_the_stages_they_read_from():
+    lock = threading.Lock()
+    events = []
+
+    def stage(name, inputs=(), outputs=()):
+        def run():
+            with lock:
+                events.append(('start', name))
+            with lock:
+                events.append(('end', name))
+        return Stage(name, run, inputs=inputs, outputs=outputs)
+
+    stages = [
+        stage('report', inputs=('a', 'b', 'tasks'), outputs=('report',)),
+        stage('a', inputs=('tasks',), outputs=('a',)),
+        stage('b', inputs=('a', 'files'), outputs=('b',)),
+        stage('c', inputs=('files',), outputs=('c',)),
+    ]
+    for jobs in (1, 4):
+        events.clear()
+        wall_times = StageScheduler(stages, jobs=jobs).run()
+        assert list(wall_times) == ['report', 'a', 'b', 'c']
+        assert sorted(events) == sorted([(event, s.name) for s in stages for event in ('start', 'end')])
+        for name, inputs in (('b', ('a',)), ('report', ('a', 'b'))):
+            for input_name in inputs:
+                assert events.index(('end', input_name)) < events.index(('start', name)), (jobs, name)
+
+
+def test_stages_that_cannot_be_scheduled():
+    def noop():
+        pass
+
+    with pytest.raises(ValueError, match='Duplicate stage names: a'):
+        StageScheduler([Stage('a', noop), Stage('a', noop)])
+    with pytest.raises(ValueError, match='x is written by both a and b'):
+        StageScheduler([Stage('a', noop, outputs=('x',)), Stage('b', noop, outputs=('x',))])
+    with pytest.raises(ValueError, match='Stages with circular inputs: a, b'):
+        StageScheduler([Stage('a', noop, inputs=('y',), outputs=('x',)), Stage('b', noop, inputs=('x',), outputs=('y',))])
+
+
+def test_the_error_of_a_stage_is_raised():
+    def fail():
+        raise RuntimeError('stage failed')
+
+    for jobs in (1, 4):
+        with pytest.raises(RuntimeError, match='stage failed'):
+            StageScheduler([Stage('a', fail)], jobs=jobs).run()
@@ -0,0 +1,124 @@
+import math
+import random
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pytest
+
+from taskvine_report.src.timestamp_decoder import DATESTRING_FORMAT, TimestampDecoder
+from taskvine_report.utils import floor_decimal
+
+
+TIME_ZONES = [
+    timezone.utc,
+    timezone(timedelta(hours=-5)),
+    timezone(timedelta(hours=5, minutes=30)),
+    timezone(timedelta(hours=14)),
+    ZoneInfo('America/New_York'),
+    ZoneInfo('Australia/Lord_Howe'),     # daylight saving time shifts the clock by half an hour
+]
+
+EDGE_DATESTRINGS = [
+    # daylight saving time in New York, the clock skips 02:00-03:00 and then repeats 01:00-02:00
+    "2024/03/10 01:59:59.999999", "2024/03/10 02:30:00.000000", "2024/03/10 03:00:00.000000",
+    "2024/11/03 00:59:59.999999", "2024/11/03 01:30:00.000000", "2024/11/03 02:00:00.000000",
+    # and on Lord Howe Island, at 02:00 by half an hour
+    "2024/10/06 01:59:59.999999", "2024/10/06 02:15:00.000000", "2024/10/06 02:45:00.000000",
+    "2024/04/07 01:45:00.000000", "2024/04/07 02:15:00.000000",
+    # leap days
+    "2024/02/28 23:59:59.999999", "2024/02/29 00:00:00.000000", "2024/02/29 23:59:59.999999",
+    "2024/03/01 00:00:00.000000", "2000/02/29 12:00:00.000000", "2023/02/28 23:59:59.999999",
+    # month and year ends, and the epoch
+    "2023/04/30 23:59:59.999999", "2023/05/01 00:00:00.000000", "2023/12/31 23:59:59.999999",
+    "2024/01/01 00:00:00.000000", "1969/12/31 23:59:59.999999", "1970/01/01 00:00:00.000000",
+]
+
+INVALID_DATESTRINGS = [
+    "2024/02/30 12:00:00.000000", "2023/02/29 12:00:00.000000", "1900/02/29 12:00:00.000000",
+    "2024/04/31 12:00:00.000000", "2024/13/01 12:00:00.000000", "2024/00/10 12:00:00.000000",
+    "2024/01/00 12:00:00.000000", "2024/01/01 24:00:00.000000", "2024/01/01 12:60:00.000000",
+    "2024/01/01 12:00:60.000000", "2024-01-01 12:00:00.000000", "2024/01/01 12:00:00",
+]
+
+
+def random_datestrings(count, seed=0):
+    # microseconds off a centisecond boundary, see test_decode_seconds_on_centisecond_boundaries
+    rng = random.Random(seed)
+    datestrings = []
+    for _ in range(count):
+        t = datetime(2000, 1, 1) + timedelta(seconds=rng.randrange(40 * 365 * 86400))
+        microsecond = rng.randrange(100) * 10_000 + rng.randrange(1, 10_000)
+        datestrings.append(t.replace(microsecond=microsecond).strftime(DATESTRING_FORMAT))
+    return datestrings
+
+
+def reference(datestring, tz):
+    return datetime.strptime(datestring, DATESTRING_FORMAT).replace(tzinfo=tz).timestamp()
+
+
+@pytest.mark.parametrize('tz', TIME_ZONES, ids=str)
+def test_decode_matches_strptime(tz):
+    decoder = TimestampDecoder(tz)
+    for datestring in EDGE_DATESTRINGS + random_datestrings(2000):
+        assert decoder.decode(datestring) == reference(datestring, tz), datestring
+        assert decoder.decode_us(datestring) / 1_000_000 == reference(datestring, tz), datestring
+
+
+@pytest.mark.parametrize('tz', TIME_ZONES, ids=str)
+def test_decode_seconds_matches_floor_decimal(tz):
+    decoder = TimestampDecoder(tz)
+    for datestring in random_datestrings(2000):
+        assert decoder.decode_seconds(datestring) == floor_decimal(reference(datestring, tz), 2), datestring
+
+
+@pytest.mark.parametrize('tz', TIME_ZONES, ids=str)
+def test_decode_seconds_on_centisecond_boundaries(tz):
+    # floor_decimal of the float timestamp can fall to the previous centisecond, e.g. 2040/02/01 22:43:35.490000
+    # UTC is 2211749015.49 but floor_decimal gives 2211749015.48; decode_seconds floors the exact microseconds
+    decoder = TimestampDecoder(tz)
+    datestrings = ["2040/02/01 22:43:35.490000"] + [
+        datestring[:-4] + "0000" for datestring in random_datestrings(2000, seed=1)]
+    for datestring in datestrings:
+        assert decoder.decode_seconds(datestring) == round(reference(datestring, tz), 2), datestring
+
+
+@pytest.mark.parametrize('tz', TIME_ZONES, ids=str)
+def test_decode_batch_matches_scalar_decode(tz):
+    decoder = TimestampDecoder(tz)
+    datestrings = EDGE_DATESTRINGS + random_datestrings(2000, seed=2)
+    expected = [reference(datestring, tz) for datestring in datestrings]
+    assert decoder.decode_batch(datestrings).tolist() == expected
+    assert decoder.decode_batch_seconds(datestrings).tolist() == [decoder.decode_seconds(s) for s in datestrings]
+
+    epoch_us, valid = decoder.decode_batch_us(datestrings)
+    assert epoch_us.dtype == np.int64 and valid.all()
+    assert epoch_us.tolist() == [decoder.decode_us(datestring) for datestring in datestrings]
+
+
+@pytest.mark.parametrize('datestring', INVALID_DATESTRINGS)
+def test_invalid_dates_are_rejected(datestring):
+    decoder = TimestampDecoder(timezone.utc)
+    with pytest.raises(ValueError):
+        decoder.decode(datestring)
+    with pytest.raises(ValueError):
+        datetime.strptime(datestring, DATESTRING_FORMAT)
+
+    # the valid neighbours in the same column are still decoded
+    datestrings = ["2024/02/29 12:00:00.000000", datestring, "2024/03/01 12:00:00.000000"]
+    epoch_us, valid = decoder.decode_batch_us(datestrings)
+    assert valid.tolist() == [True, False, True]
+    assert epoch_us[1] == 0
+    timestamps = decoder.decode_batch(datestrings)
+    assert math.isnan(timestamps[1])
+    assert timestamps[[0, 2]].tolist() == [reference(datestrings[0], timezone.utc), reference(datestrings[2], timezone.utc)]
+    assert math.isnan(decoder.decode_batch_seconds(datestrings)[1])
+
+
+def test_batch_falls_back_to_strptime_for_other_layouts():
+    # unpadded fields are accepted by strptime, entries that are not strings are invalid
+    decoder = TimestampDecoder(timezone(timedelta(hours=-5)))
+    datestrings = ["2024/1/5 3:04:05.000006", None, "", "2024/01/05 03:04:05.000006"]
+    timestamps = decoder.decode_batch(datestrings)
+    assert timestamps[0] == timestamps[3] == reference(datestrings[3], decoder.tz)
+    assert math.isnan(timestamps[1]) and math.isnan(timestamps[2])
@@ -0,0 +1,183 @@
+import math
+import os
+import shutil
+from datetime import timezone
+
+import pytest
+
+from taskvine_report.src.csv_manager import CSVManager
+from taskvine_report.src.data_parser import DataParser
+from taskvine_report.src.debug_segments import create_segment_templates
+from taskvine_report.src.report_store import ReportStore
+from taskvine_report.src.task_info import TaskInfo
+from taskvine_report.src.transactions_log import TRANSACTIONS_RESULT_CODES, TransactionsLog
+
+
+# what the transactions log has and the debug log does not: the category and the requested resources of a task
+TRANSACTIONS_ONLY_TASK_FIELDS = ('category', 'gpus_requested', 'memory_requested_mb', 'disk_requested_mb')
+# the debug backend adds a try to the completed tasks of its worker when it is done, the transactions backend
+# when it is read, in the order the tries were submitted
+UNORDERED_WORKER_FIELDS = ('tasks_completed', 'tasks_failed')
+
+
+def parse(full_template, template, backend, debug=True):
+    shutil.copytree(os.path.join(full_template, 'vine-logs'), os.path.join(template, 'vine-logs'))
+    if not debug:
+        os.remove(os.path.join(template, 'vine-logs', 'debug'))
+    data_parser = DataParser(template, backend=backend)
+    data_parser.parse_logs()
+    CSVManager(template, data_parser=data_parser).generate_csv_files()
+    return data_parser
+
+
+def fields(record, skip=()):
+    names = [name for cls in type(record).__mro__ for name in getattr(cls, '__slots__', ())]
+    values = {name: getattr(record, name, None) for name in names if name not in skip}
+    for name in UNORDERED_WORKER_FIELDS:
+        if name in values:
+            values[name] = sorted(task.task_entry for task in values[name])
+    return values
+
+
+@pytest.fixture(scope='module')
+def full_template(synthetic_template):
+    return synthetic_template(tasks=600, workers=5, failure_rate=0.05, worker_failures=1, seed=3)
+
+
+def test_transactions_backend_matches_debug_backend(full_template, tmp_path):
+    debug = parse(full_template, str(tmp_path / 'debug'), 'debug')
+    transactions = parse(full_template, str(tmp_path / 'transactions'), 'transactions')
+    assert transactions.backend == 'transactions'
+
+    assert transactions.tasks.keys() == debug.tasks.keys()
+    for key, task in debug.tasks.items():
+        assert fields(transactions.tasks[key], TRANSACTIONS_ONLY_TASK_FIELDS) == fields(task, TRANSACTIONS_ONLY_TASK_FIELDS), key
+        assert task.category is None and transactions.tasks[key].category in ('default', 'recovery')
+    assert transactions.workers.keys() == debug.workers.keys()
+    for key, worker in debug.workers.items():
+        assert fields(transactions.workers[key]) == fields(worker), key
+    assert transactions.files.keys() == debug.files.keys()
+    for key, file in debug.files.items():
+        assert fields(transactions.files[key]) == fields(file), key
+    assert transactions.transfers.frame().equals(debug.transfers.frame())
+    assert vars(transactions.manager) == vars(debug.manager)
+
+    # the report tables are the same but for the task category
+    debug_store = ReportStore(str(tmp_path / 'debug'))
+    transactions_store = ReportStore(str(tmp_path / 'transactions'))
+    names = debug_store.names()
+    assert names and transactions_store.names() == names
+    for name in names:
+        expected, table = debug_store.read(name), transactions_store.read(name)
+        if 'category' in expected.columns:
+            assert expected['category'].null_count() == len(expected) > table['category'].null_count()
+            expected, table = expected.drop('category'), table.drop('category')
+        assert table.equals(expected), name
+
+
+def replicas_of_transactions_log(path):
+    # the first TRANSFER INPUT or CACHE_UPDATE of every file on every worker, and the time it was logged at
+    replicas = {}
+    with open(path) as f:
+        for line in f:
+            parts = line.split()
+            if line.startswith('#') or len(parts) < 6 or parts[2] != 'WORKER':
+                continue
+            if parts[4] == 'CACHE_UPDATE':
+                name = parts[5]
+            elif parts[4] == 'TRANSFER' and parts[5] == 'INPUT':
+                name = parts[6]
+            else:
+                continue
+            replicas.setdefault((name, parts[3]), math.floor(int(parts[0]) / 10_000) / 100)
+    return replicas
+
+
+def test_transactions_backend_without_debug_log(full_template, tmp_path):
+    debug = parse(full_template, str(tmp_path / 'debug'), 'debug')
+    transactions = parse(full_template, str(tmp_path / 'transactions'), 'transactions', debug=False)
+    assert transactions.debug is None
+
+    # times are in UTC, as the synthetic logs, so they match the debug log
+    assert transactions.manager.equivalent_tz == timezone.utc
+    assert transactions.manager.time_zone_offset_hours == 0
+    times = ('when_ready', 'when_running', 'when_waiting_retrieval', 'when_retrieved', 'when_done', 'worker_id')
+    assert transactions.tasks.keys() == debug.tasks.keys()
+    for key, task in debug.tasks.items():
+        assert [getattr(transactions.tasks[key], name) for name in times] == [getattr(task, name) for name in times], key
+    assert sorted(w.time_connected for w in transactions.workers.values()) == \
+        sorted(w.time_connected for w in debug.workers.values())
+
+    # one replica per file and worker that the transactions log reports, staged in when it was reported
+    expected = replicas_of_transactions_log(os.path.join(full_template, 'vine-logs', 'transactions'))
+    frame = transactions.transfers.frame()
+    replicas = {}
+    for row in frame.iter_rows(named=True):
+        name = transactions.file_symbols.resolve(row['file_id'])
+        worker_hash = transactions.workers[row['dest_worker_id']].hash
+        assert (name, worker_hash) not in replicas
+        assert row['t_start'] <= row['t_stage_in'] and row['transfer_id'] is None
+        replicas[(name, worker_hash)] = row['t_stage_in']
+    assert expected and replicas == expected
+    assert {transactions.file_symbols.resolve(file_id) for file_id in transactions.files} == {name for name, _ in expected}
+
+
+def test_segment_templates_fall_back_to_debug_backend(synthetic_template, tmp_path):
+    # the transactions log only has the last manager run, a segment is parsed from the debug log whichever run it is
+    template = str(tmp_path / 'template')
+    shutil.copytree(os.path.join(synthetic_template(tasks=300, workers=4, restarts=1, seed=1), 'vine-logs'),
+                    os.path.join(template, 'vine-logs'))
+    segments = sorted(create_segment_templates(template))
+    assert len(segments) == 2
+    for segment in segments:
+        transactions = DataParser(segment, backend='transactions')
+        assert transactions.backend == 'debug'
+        transactions.parse_logs()
+        debug = DataParser(segment)
+        debug.parse_logs()
+        assert transactions.tasks.keys() == debug.tasks.keys()
+        assert [fields(task) for task in transactions.tasks.values()] == [fields(task) for task in debug.tasks.values()]
+        assert transactions.transfers.frame().equals(debug.transfers.frame())
+
+
+def test_transactions_result_codes(tmp_path):
+    # the status every result name of the transactions log stands for, and a name it does not know
+    expected = {
+        'SUCCESS': 'successful',
+        'INPUT_MISSING': 'unsuccessful-input-missing', 'INPUT_MISS': 'unsuccessful-input-missing',
+        'OUTPUT_MISSING': 'unsuccessful-output-missing', 'OUTPUT_MISS': 'unsuccessful-output-missing',
+        'STDOUT_MISSING': 'unsuccessful-stdout-missing', 'STDOUT_MISS': 'unsuccessful-stdout-missing',
+        'SIGNAL': 'unsuccessful-signal',
+        'RESOURCE_EXHAUSTION': 'unsuccessful-resource-exhaustion',
+        'END_TIME': 'unsuccessful-max-end-time', 'MAX_END_TIME': 'unsuccessful-max-end-time',
+        'UNKNOWN': 'unsuccessful-unknown',
+        'FORSAKEN': 'unsuccessful-forsaken',
+        'MAX_RETRIES': 'unsuccessful-max-retries',
+        'MAX_WALLTIME': 'unsuccessful-max-wall-time', 'MAX_WALL_TIME': 'unsuccessful-max-wall-time',
+        'MONITOR_ERROR': 'unsuccessful-monitor-error', 'RMONITOR_ERROR': 'unsuccessful-monitor-error',
+        'OUTPUT_TRANSFER_ERROR': 'unsuccessful-output-transfer-error',
+        'FIXED_LOCATION_MISSING': 'unsuccessful-location-missing',
+        'CANCELLED': 'unsuccessful-cancelled',
+        'LIBRARY_EXIT': 'unsuccessful-library-exit',
+        'SANDBOX_EXHAUSTION': 'unsuccessful-sandbox-exhaustion',
+        'MISSING_LIBRARY': 'unsuccessful-missing-library',
+        'NOT_A_RESULT': 'unsuccessful-unknown',
+    }
+    assert set(expected) == set(TRANSACTIONS_RESULT_CODES) | {'NOT_A_RESULT'}
+
+    lines = ["# time manager_pid MANAGER START|END", "1700000000000000 4242 MANAGER 1 START"]
+    for task_id, name in enumerate(expected, 1):
+        t = 1700000000000000 + task_id * 1000
+        lines += [f'{t} 4242 TASK {task_id} WAITING default FIRST_RESOURCES 1 {{"cores":[1,"cores"]}}',
+                  f'{t + 100} 4242 TASK {task_id} RETRIEVED {name} {{}} {{}}',
+                  f'{t + 200} 4242 TASK {task_id} DONE {name} 1']
+    path = tmp_path / 'transactions'
+    path.write_text("\n".join(lines) + "\n")
+
+    tries = TransactionsLog(str(path)).task_tries()
+    assert tries['result'].to_list() == list(expected)
+    for name, code in zip(tries['result'], tries['result_code']):
+        task = TaskInfo(1, 1)
+        task.set_when_ready(1700000000)
+        task.set_task_status(1700000001, code)
+        assert task.task_status_name == expected[name], name
@@ -0,0 +1,339 @@
+import random
+
+import pytest
+
+from taskvine_report.src.file_info import FileInfo
+from taskvine_report.src.task_info import TaskInfo
+from taskvine_report.src.transfer_table import TransferTable
+from taskvine_report.src.worker_info import WorkerInfo
+
+
+COLUMNS = ('row', 'file_id', 'dest_worker_id', 'source_worker_id', 'source_url', 'transfer_id',
+           't_start', 't_stage_in', 't_stage_out')
+
+
+def rows(transfers):
+    frame = transfers.frame()
+    assert frame.columns == list(COLUMNS)
+    return frame.rows()
+
+
+def make_file(file_id, produced=False):
+    file = FileInfo(file_id, f"file-{file_id}", 1.0, 0.0)
+    if produced:
+        file.add_producer(TaskInfo(file_id, 1))
+    return file
+
+
+@pytest.fixture
+def workers():
+    workers = {}
+    for worker_id in (1, 2, 3):
+        workers[worker_id] = WorkerInfo('10.0.0.1', 9000 + worker_id, 1)
+        workers[worker_id].id = worker_id
+    return workers
+
+
+def test_transfers_started_by_the_manager(workers):
+    transfers = TransferTable()
+    url, peer = make_file(0), make_file(1)
+    transfers.add(url.file_id, 1, 10.0, 'uuid-a', 'https://example.org/a')
+    transfers.add(peer.file_id, 2, 11.0, 'uuid-b', 3)
+    transfers.add(url.file_id, 3, 12.0, 'uuid-c', 'https://example.org/a')
+    assert rows(transfers) == [
+        (0, 0, 1, None, 'https://example.org/a', 1, 10.0, None, None),
+        (1, 1, 2, 3, None, 2, 11.0, None, None),
+        (2, 0, 3, None, 'https://example.org/a', 3, 12.0, None, None),
+    ]
+    assert transfers.url_symbols.values == ['https://example.org/a']
+
+    transfers.cache_update(url, workers[1], 13.0, 'uuid-a')
+    transfers.cache_update(peer, workers[2], 14.0, 'uuid-b')
+    transfers.cache_invalid(url, workers[3], 15.0, 'uuid-c')
+    assert rows(transfers) == [
+        (0, 0, 1, None, 'https://example.org/a', 1, 10.0, 13.0, None),
+        (1, 1, 2, 3, None, 2, 11.0, 14.0, None),
+        (2, 0, 3, None, 'https://example.org/a', 3, 12.0, None, 15.0),
+    ]
+    assert workers[1].current_replicas == {0} and workers[2].current_replicas == {1}
+    assert workers[3].current_replicas == set()
+
+
+def test_updates_that_do_not_match_an_open_transfer_are_ignored(workers):
+    transfers = TransferTable()
+    file, other = make_file(0), make_file(1)
+    transfers.add(file.file_id, 1, 10.0, 'uuid-a', 2)
+    transfers.cache_update(file, workers[1], 11.0, 'uuid-a')
+    transfers.unlink(file, workers[1], 12.0)
+    expected = [(0, 0, 1, 2, None, 1, 10.0, 11.0, 12.0)]
+    assert rows(transfers) == expected
+
+    # a cache-update or a cache-invalid after the unlink, of another file, or with an id from a previous manager
+    transfers.cache_update(file, workers[1], 13.0, 'uuid-a')
+    transfers.cache_invalid(file, workers[1], 14.0, 'uuid-a')
+    transfers.cache_update(other, workers[1], 15.0, 'uuid-a')
+    transfers.cache_update(file, workers[1], 16.0, 'uuid-stale')
+    transfers.cache_invalid(file, workers[1], 17.0, 'uuid-stale')
+    assert rows(transfers) == expected
+
+
+def test_a_reused_transfer_id_restarts_its_row(workers):
+    transfers = TransferTable()
+    file, other = make_file(0), make_file(1)
+    transfers.add(file.file_id, 1, 10.0, 'uuid-a', 2)
+    transfers.cache_update(file, workers[1], 11.0, 'uuid-a')
+
+    # the same id for the same file while the replica is open: the row starts over, at its new destination
+    transfers.add(file.file_id, 3, 12.0, 'uuid-a', 'https://example.org/a')
+    assert rows(transfers) == [(0, 0, 3, None, 'https://example.org/a', 1, 12.0, None, None)]
+    transfers.cache_update(file, workers[3], 13.0, 'uuid-a')
+    transfers.cache_invalid(file, workers[3], 14.0, 'uuid-a')
+    assert rows(transfers) == [(0, 0, 3, None, 'https://example.org/a', 1, 12.0, 13.0, 14.0)]
+
+    # and after it is gone
+    transfers.add(file.file_id, 2, 15.0, 'uuid-a', 1)
+    transfers.cache_update(file, workers[2], 16.0, 'uuid-a')
+    # the same id for another file is another transfer
+    transfers.add(other.file_id, 2, 17.0, 'uuid-a', 1)
+    assert rows(transfers) == [
+        (0, 0, 2, 1, None, 1, 15.0, 16.0, None),
+        (1, 1, 2, 1, None, 2, 17.0, None, None),
+    ]
+    assert transfers.num_transfer_ids == 2
+
+
+def test_replicas_cached_without_a_transfer_id(workers):
+    transfers = TransferTable()
+    temp, put = make_file(0, produced=True), make_file(1)
+
+    # an output of a task: every cache-update is a new replica, staged in when it is reported
+    transfers.cache_update(temp, workers[1], 10.0, 'X')
+    transfers.cache_update(temp, workers[2], 11.0, 'X')
+    # a file put by the manager: its replicas are added without an id first, the cache-update stages them in
+    transfers.add(put.file_id, 1, 12.0)
+    transfers.add(put.file_id, 2, 12.5)
+    transfers.add(put.file_id, 1, 13.0, 'uuid-a', 3)
+    transfers.cache_update(put, workers[1], 14.0, 'X')
+    assert rows(transfers) == [
+        (0, 0, 1, None, None, None, 10.0, 10.0, None),
+        (1, 0, 2, None, None, None, 11.0, 11.0, None),
+        (2, 1, 1, None, None, None, 12.0, 14.0, None),
+        (3, 1, 2, None, None, None, 12.5, None, None),
+        (4, 1, 1, 3, None, 1, 13.0, None, None),
+    ]
+
+    # a cache-invalid without an id only closes the replicas without one, on its worker
+    transfers.cache_invalid(put, workers[1], 15.0, None)
+    transfers.cache_invalid(temp, workers[2], 16.0, None)
+    assert rows(transfers) == [
+        (0, 0, 1, None, None, None, 10.0, 10.0, None),
+        (1, 0, 2, None, None, None, 11.0, 11.0, 16.0),
+        (2, 1, 1, None, None, None, 12.0, 14.0, 15.0),
+        (3, 1, 2, None, None, None, 12.5, None, None),
+        (4, 1, 1, 3, None, 1, 13.0, None, None),
+    ]
+    assert workers[1].current_replicas == {0} and workers[2].current_replicas == set()
+
+
+def test_unlink_and_unlink_all(workers):
+    transfers = TransferTable()
+    file, other = make_file(0, produced=True), make_file(1)
+    transfers.cache_update(file, workers[1], 10.0, 'X')
+    transfers.add(file.file_id, 1, 11.0, 'uuid-a', 2)
+    transfers.add(file.file_id, 2, 12.0, 'uuid-b', 1)
+    transfers.add(file.file_id, 3, 13.0, 'uuid-c', 1)
+    transfers.add(other.file_id, 1, 14.0, 'uuid-d', 2)
+
+    # every open replica of the file on the worker, whether the manager started its transfer or not
+    transfers.unlink(file, workers[1], 15.0)
+    transfers.cache_invalid(file, workers[3], 16.0, 'uuid-c')
+    assert rows(transfers) == [
+        (0, 0, 1, None, None, None, 10.0, 10.0, 15.0),
+        (1, 0, 1, 2, None, 1, 11.0, None, 15.0),
+        (2, 0, 2, 1, None, 2, 12.0, None, None),
+        (3, 0, 3, 1, None, 3, 13.0, None, 16.0),
+        (4, 1, 1, 2, None, 4, 14.0, None, None),
+    ]
+
+    # every open replica of the file, the closed ones keep their stage-out
+    transfers.unlink_all(file.file_id, 17.0)
+    transfers.unlink_all(make_file(2).file_id, 18.0)
+    assert rows(transfers) == [
+        (0, 0, 1, None, None, None, 10.0, 10.0, 15.0),
+        (1, 0, 1, 2, None, 1, 11.0, None, 15.0),
+        (2, 0, 2, 1, None, 2, 12.0, None, 17.0),
+        (3, 0, 3, 1, None, 3, 13.0, None, 16.0),
+        (4, 1, 1, 2, None, 4, 14.0, None, None),
+    ]
+    assert list(transfers.rows_of(file.file_id)) == [0, 1, 2, 3]
+    assert transfers.has_transfers(other.file_id) and not transfers.has_transfers(2)
+
+
+def test_append_columns_round_trips_the_frame(workers):
+    transfers = TransferTable()
+    file = make_file(0, produced=True)
+    transfers.cache_update(file, workers[1], 10.0, 'X')
+    transfers.add(file.file_id, 2, 11.0, 'uuid-a', 'https://example.org/a')
+    transfers.add(file.file_id, 3, 12.0, 'uuid-b', 1)
+    transfers.cache_update(file, workers[3], 13.0, 'uuid-b')
+    transfers.unlink(file, workers[1], 14.0)
+
+    frame = transfers.frame()
+    copy = TransferTable()
+    sources = [url if url is not None else worker_id
+               for url, worker_id in zip(frame['source_url'], frame['source_worker_id'])]
+    copy.append_columns(frame['file_id'].to_list(), frame['dest_worker_id'].to_list(), sources,
+                        frame['transfer_id'].to_list(), frame['t_start'].to_list(), frame['t_stage_in'].to_list(),
+                        frame['t_stage_out'].to_list())
+    assert copy.frame().equals(frame)
+    assert copy.num_transfer_ids == 2
+
+
+def check_open_indexes(transfers):
+    # the open indexes hold exactly the rows without a stage-out, and no empty entries
+    frame = transfers.frame()
+    open_rows, open_file_rows = {}, {}
+    for row, file_id, dest_worker_id, t_stage_out in frame.select('row', 'file_id', 'dest_worker_id', 't_stage_out').rows():
+        if t_stage_out is None:
+            open_rows.setdefault((file_id, dest_worker_id), []).append(row)
+            open_file_rows.setdefault(file_id, []).append(row)
+    # a restarted row is indexed again after the rows that stayed open, the order within an entry does not matter
+    assert {key: sorted(rows) for key, rows in transfers.open_rows.items()} == open_rows
+    assert {key: sorted(rows) for key, rows in transfers.open_file_rows.items()} == open_file_rows
+    for row in transfers.open_transfers.values():
+        assert frame['t_stage_out'][row] is None and frame['transfer_id'][row] is not None
+    assert {row: key for key, row in transfers.open_transfers.items()} == transfers.open_transfer_ids
+
+
+def test_open_indexes_follow_interleaved_events(workers):
+    transfers = TransferTable()
+    file, temp = make_file(0), make_file(1, produced=True)
+    transfers.add(file.file_id, 1, 10.0, 'uuid-a', 3)
+    transfers.add(file.file_id, 2, 10.5, 'uuid-b', 3)
+    transfers.cache_update(temp, workers[1], 11.0, 'X')
+    transfers.cache_update(temp, workers[2], 11.5, 'X')
+    transfers.cache_update(file, workers[1], 12.0, 'uuid-a')
+    check_open_indexes(transfers)
+    assert transfers.open_rows == {(0, 1): {0: None}, (0, 2): {1: None}, (1, 1): {2: None}, (1, 2): {3: None}}
+    assert transfers.open_file_rows == {0: {0: None, 1: None}, 1: {2: None, 3: None}}
+    assert transfers.open_transfers == {(0, 'uuid-a'): 0, (0, 'uuid-b'): 1}
+
+    # a closed row leaves the indexes, and so does its key once it has no open row left
+    transfers.unlink(file, workers[1], 13.0)
+    transfers.cache_invalid(temp, workers[2], 13.5, None)
+    check_open_indexes(transfers)
+    assert transfers.open_rows == {(0, 2): {1: None}, (1, 1): {2: None}}
+    assert transfers.open_file_rows == {0: {1: None}, 1: {2: None}}
+    assert transfers.open_transfers == {(0, 'uuid-b'): 1}
+
+    # a late cache-update of the closed row does not bring it back
+    transfers.cache_update(file, workers[1], 14.0, 'uuid-a')
+    check_open_indexes(transfers)
+    assert transfers.frame().row(0)[-2:] == (12.0, 13.0)
+
+    # a restarted row does, under its new destination, whether it was open or closed
+    transfers.add(file.file_id, 3, 15.0, 'uuid-a', 2)
+    transfers.add(file.file_id, 1, 15.5, 'uuid-b', 2)
+    check_open_indexes(transfers)
+    assert transfers.open_rows == {(0, 3): {0: None}, (0, 1): {1: None}, (1, 1): {2: None}}
+    assert list(transfers.open_file_rows[0]) == [0, 1] and list(transfers.open_file_rows[1]) == [2]
+    assert transfers.open_transfers == {(0, 'uuid-a'): 0, (0, 'uuid-b'): 1}
+
+    transfers.cache_invalid(file, workers[3], 16.0, 'uuid-a')
+    transfers.unlink_all(temp.file_id, 17.0)
+    transfers.unlink_all(file.file_id, 18.0)
+    check_open_indexes(transfers)
+    assert transfers.open_rows == {} and transfers.open_file_rows == {} and transfers.open_transfers == {}
+    assert [row[-1] for row in transfers.frame().rows()] == [16.0, 18.0, 17.0, 13.5]
+
+
+class LinearTransfers:
+    """
+    The transfer events replayed on a list of rows, every event scanning all of them, to compare the indexed
+    lookups of TransferTable to.
+    """
+    def __init__(self):
+        self.rows = []      # [file id, dest worker id, transfer id, t_start, t_stage_in, t_stage_out]
+        self.ids = {}       # key: (file id, transfer id), value: row
+
+    def add(self, file_id, dest_worker_id, t_start, transfer_id=None):
+        row = self.ids.get((file_id, transfer_id)) if transfer_id is not None else None
+        if row is None:
+            row = len(self.rows)
+            self.rows.append(None)
+            if transfer_id is not None:
+                self.ids[(file_id, transfer_id)] = row
+        self.rows[row] = [file_id, dest_worker_id, transfer_id, t_start, None, None]
+
+    def _open(self, file_id, dest_worker_id=None, indexed=None):
+        return [r for r in self.rows if r[0] == file_id and r[5] is None
+                and (dest_worker_id is None or r[1] == dest_worker_id)
+                and (indexed is None or (r[2] is not None) == indexed)]
+
+    def _by_id(self, file_id, transfer_id):
+        row = self.ids.get((file_id, transfer_id))
+        return [self.rows[row]] if row is not None and self.rows[row][5] is None else []
+
+    def cache_update(self, file, worker_id, t, transfer_id):
+        if transfer_id == 'X' and file.producers:
+            self.add(file.file_id, worker_id, t)
+            self.rows[-1][4] = t
+            return
+        replicas = self._open(file.file_id, worker_id, False) if transfer_id == 'X' else self._by_id(file.file_id, transfer_id)
+        for r in replicas:
+            r[4] = t
+
+    def cache_invalid(self, file, worker_id, t, transfer_id):
+        replicas = self._open(file.file_id, worker_id, False) if transfer_id is None else self._by_id(file.file_id, transfer_id)
+        for r in replicas:
+            r[5] = t
+
+    def unlink(self, file, worker_id, t):
+        for r in self._open(file.file_id, worker_id):
+            r[5] = t
+
+    def unlink_all(self, file_id, t):
+        for r in self._open(file_id):
+            r[5] = t
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_random_interleavings_match_a_linear_scan(workers, seed):
+    rng = random.Random(seed)
+    files = [make_file(0), make_file(1), make_file(2, produced=True), make_file(3, produced=True)]
+    transfers, linear = TransferTable(), LinearTransfers()
+    for step in range(600):
+        t = float(step)
+        file, worker_id = rng.choice(files), rng.choice(list(workers))
+        transfer_id = f"uuid-{rng.randrange(12)}"
+        event = rng.choice(('add', 'add', 'add_unindexed', 'update', 'update_x', 'invalid', 'invalid_x',
+                            'unlink', 'unlink_all'))
+        if event == 'add':
+            transfers.add(file.file_id, worker_id, t, transfer_id, rng.choice(list(workers)))
+            linear.add(file.file_id, worker_id, t, transfer_id)
+        elif event == 'add_unindexed':
+            transfers.add(file.file_id, worker_id, t)
+            linear.add(file.file_id, worker_id, t)
+        elif event in ('update', 'update_x'):
+            transfer_id = transfer_id if event == 'update' else 'X'
+            transfers.cache_update(file, workers[worker_id], t, transfer_id)
+            linear.cache_update(file, worker_id, t, transfer_id)
+        elif event in ('invalid', 'invalid_x'):
+            transfer_id = transfer_id if event == 'invalid' else None
+            transfers.cache_invalid(file, workers[worker_id], t, transfer_id)
+            linear.cache_invalid(file, worker_id, t, transfer_id)
+        elif event == 'unlink':
+            transfers.unlink(file, workers[worker_id], t)
+            linear.unlink(file, worker_id, t)
+        else:
+            transfers.unlink_all(file.file_id, t)
+            linear.unlink_all(file.file_id, t)
+
+        if step % 50 == 0:
+            check_open_indexes(transfers)
+    check_open_indexes(transfers)
+
+    frame = transfers.frame()
+    assert frame.select('file_id', 'dest_worker_id', 't_start', 't_stage_in', 't_stage_out').rows() == \
+        [(r[0], r[1], r[3], r[4], r[5]) for r in linear.rows]
+    assert [transfer_id is not None for transfer_id in frame['transfer_id']] == [r[2] is not None for r in linear.rows]
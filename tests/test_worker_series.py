@@ -0,0 +1,135 @@
+import os
+import random
+import shutil
+
+import polars as pl
+import pytest
+
+import taskvine_report.utils as utils
+from taskvine_report.routes.worker_storage_consumption import aggregate_storage_data
+from taskvine_report.src.csv_manager import CSVManager, cumulative_worker_series
+from taskvine_report.src.data_parser import DataParser
+from taskvine_report.src.report_store import ReportStore
+from taskvine_report.utils import (
+    _is_worker_key, extract_series_points_dict, extract_worker_series_points_dict, read_worker_series_table,
+)
+
+
+# the per-worker series tables and their value column
+WORKER_SERIES = {
+    'worker_executing_tasks': 'executing_tasks',
+    'worker_waiting_retrieval_tasks': 'waiting_retrieval_tasks',
+    'worker_incoming_transfers': 'transfers',
+    'worker_outgoing_transfers': 'transfers',
+    'worker_storage_consumption': 'storage_mb',
+    'worker_storage_consumption_percentage': 'storage_percentage',
+}
+
+
+def wide_table(long, value_col):
+    """
+    A long table in the layout of the older versions: a row per time of any worker, a column per worker
+    key in sorted order with null at the times of the other workers, and the storage tables keep their
+    workflow_completion_percentage column last.
+    """
+    points = {}
+    for worker, time, value in long.select('worker', 'time', value_col).rows():
+        assert time not in points.setdefault(worker, {})
+        points[worker][time] = value
+    times = sorted({time for values in points.values() for time in values})
+    columns = [pl.Series('time', times, dtype=pl.Float64)]
+    columns += [pl.Series(worker, [points[worker].get(t) for t in times], dtype=pl.Float64) for worker in sorted(points)]
+    wide = pl.DataFrame(columns)
+    if 'workflow_completion_percentage' in long.columns:
+        completion = long.select('time', 'workflow_completion_percentage').unique('time')
+        wide = wide.join(completion, on='time', how='left', maintain_order='left')
+    return wide
+
+
+def wide_points(wide):
+    # what the routes took from a wide table: the points of every worker column
+    return extract_series_points_dict(wide.select('time', *[col for col in wide.columns if _is_worker_key(col)]), 'time')
+
+
+def wide_total_storage(wide):
+    # the accumulated storage of a wide table: the last value of every worker, summed at every time
+    workers = [col for col in wide.columns if _is_worker_key(col)]
+    total = wide.select('time', pl.sum_horizontal(pl.col(workers).forward_fill().fill_null(0)).alias('total_storage'))
+    return total.rows()
+
+
+@pytest.fixture(scope='module')
+def full_template(synthetic_template):
+    return synthetic_template(tasks=800, workers=6, cores=4, worker_failures=1, seed=5)
+
+
+def generate(full_template, template, **csv_manager_options):
+    shutil.copytree(os.path.join(full_template, 'vine-logs'), os.path.join(template, 'vine-logs'))
+    data_parser = DataParser(template)
+    data_parser.parse_logs()
+    CSVManager(template, data_parser=data_parser, **csv_manager_options).generate_csv_files()
+    store = ReportStore(template)
+    return {name: store.read(name) for name in WORKER_SERIES if store.exists(name)}
+
+
+@pytest.mark.parametrize('downsample_point_count', [1000, 20])
+def test_long_tables_give_the_points_of_the_wide_tables(full_template, tmp_path, downsample_point_count):
+    tables = generate(full_template, str(tmp_path / 'template'), downsample_point_count=downsample_point_count)
+    assert 'worker_executing_tasks' in tables and 'worker_storage_consumption' in tables
+
+    for name, long in tables.items():
+        value_col = WORKER_SERIES[name]
+        assert long.equals(long.sort('worker', 'time', maintain_order=True)), name
+        wide = wide_table(long, value_col)
+        points = extract_worker_series_points_dict(long, value_col)
+        assert points and list(points.items()) == list(wide_points(wide).items()), name
+        if downsample_point_count == 20:
+            assert max(len(p) for p in points.values()) <= 2 * downsample_point_count, name
+
+    long = tables['worker_storage_consumption']
+    assert aggregate_storage_data(long) == pytest.approx(wide_total_storage(wide_table(long, 'storage_mb')), rel=1e-12)
+
+
+def test_legacy_wide_tables_read_back_as_long_tables(full_template, tmp_path, monkeypatch):
+    template = str(tmp_path / 'template')
+    tables = generate(full_template, template)
+    store = ReportStore(template)
+    monkeypatch.setattr(utils, 'read_report_table', store.read)
+
+    # a table of the current layout is read as it is
+    for name, long in tables.items():
+        assert read_worker_series_table(name, WORKER_SERIES[name]).equals(long), name
+
+    # a template of an older version only has the wide csv-files
+    os.makedirs(store.legacy_csv_dir)
+    for name, long in tables.items():
+        wide_table(long, WORKER_SERIES[name]).write_csv(os.path.join(store.legacy_csv_dir, name + '.csv'))
+        os.remove(store.path(name))
+    for name, long in tables.items():
+        value_col = WORKER_SERIES[name]
+        table = read_worker_series_table(name, value_col)
+        assert table.columns == ['worker', 'time', value_col], name
+        assert table.equals(long.select('worker', 'time', value_col)), name
+        assert extract_worker_series_points_dict(table, value_col) == extract_worker_series_points_dict(long, value_col)
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_cumulative_worker_series_matches_a_running_sum_per_worker(seed):
+    rng = random.Random(seed)
+    events = [(rng.randrange(1, 6), rng.randrange(0, 400), rng.choice((1, -1, 2.5, -0.5))) for _ in range(2000)]
+
+    expected = []
+    for worker_id in sorted({worker_id for worker_id, _, _ in events}):
+        deltas = {}
+        for event_worker_id, time, delta in events:
+            if event_worker_id == worker_id:
+                deltas[time] = deltas.get(time, 0) + delta
+        total = 0
+        for time in sorted(deltas):
+            total += deltas[time]
+            expected.append((worker_id, time / 100, float(max(total, 0))))
+
+    events = pl.DataFrame(events, schema={'worker_id': pl.Int64, 'time': pl.Int64, 'delta': pl.Float64}, orient='row')
+    series = cumulative_worker_series(events, 'value')
+    assert series.columns == ['worker_id', 'time', 'value']
+    assert series.rows() == expected